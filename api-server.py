@@ -7,18 +7,129 @@ import sqlite3
 from urllib.parse import urlparse, parse_qs
 import sys
 import threading
+import time
 from datetime import datetime
 
+from db_shards import DEFAULT_SHARD_DIR, connect_shard, shard_path, validate_profile
+from practice_analytics import migrations_hint, missing_migrations, refresh_interview_questions
+from scrapers.description_store import DescriptionStore
+from scrapers.freshness import decayed_score, freshness_rank_sql, parse_posted_date, require_math_functions
+from scrapers.job_tags import normalize_tags
+from scrapers.location_gazetteer import location_filter_codes
+from scrapers.multi_profile import MAIN_PROFILE, load_profiles
+from scrapers.salary import CurrencyRates, parse_salary, profile_min_salary
+from scrapers.score_sketch import WEEK_SQL, ScoreSketchStore, week_of
+from scrapers.vector_index import JobVectorizer, VectorIndex, index_path_for
+from scrapers.what_if import WhatIfEngine
+
 PORT = 8081
 DB_PATH = './data/jobs-tracker.db'
+CONFIG_PATH = 'data/resume_config.json'
 
 SCRAPED_JOB_IMPORT_RE = re.compile(r'^/api/import-scraped-job/(\d+)$')
+SCRAPED_JOB_DETAIL_RE = re.compile(r'^/api/scraped-jobs/(\d+)$')
+SIMILAR_JOBS_RE = re.compile(r'^/api/scraped-jobs/(\d+)/similar$')
+PROFILE_PREFIX_RE = re.compile(r'^/p/([^/]+)(/.*)$')
+
+# scraped_jobs columns returned by the list and detail endpoints; the score
+# fields come from {scores} (scraped_jobs, or profile_job_scores joined by
+# _score_source() for a routed profile)
+SCRAPED_JOB_COLUMNS = '''
+    scraped_jobs.id, external_id, source, job_title, company, job_url,
+    location, tags, salary_range, posted_date,
+    {scores}.match_score, {scores}.classification, {scores}.matched_skills, {scores}.matched_domains,
+    {scores}.red_flags, {scores}.recommendation, scraped_at, imported_to_opportunities,
+    description_snippet, is_partial_score, canonical_job_id,
+    (SELECT COUNT(*) FROM scraped_jobs d WHERE d.canonical_job_id = scraped_jobs.id),
+    semantic_score, salary_min, salary_max, salary_currency, salary_period,
+    salary_min_inr, salary_max_inr, posted_at
+'''
+
+# /api/scraped-jobs sort options ({scores} as in SCRAPED_JOB_COLUMNS)
+SCRAPED_JOB_SORTS = {
+    'score': '{scores}.match_score DESC, scraped_at DESC',
+    'semantic': 'semantic_score IS NULL, semantic_score DESC, {scores}.match_score DESC',
+    # match_score with exponential freshness decay, read off its index
+    # (a profile's score has no rank column; its expression is sorted instead)
+    'rank': '{freshness_rank} DESC',
+}
 
 # Thread-local storage for database connections
 thread_local = threading.local()
 
+# What-if engine keeps the feature corpus in memory between requests
+_what_if_engine = None
+_what_if_lock = threading.Lock()
+
+def get_what_if_engine():
+    """Create the shared WhatIfEngine on first use"""
+    global _what_if_engine
+    with _what_if_lock:
+        if _what_if_engine is None:
+            _what_if_engine = WhatIfEngine(config_path=CONFIG_PATH)
+    return _what_if_engine
+
+# Similar-jobs index: one memory map shared by all request threads
+_vector_index = VectorIndex(index_path_for(DB_PATH))
+
+def get_profile_min_salary():
+    """profile.min_salary_inr of the routed profile's resume config (profiles.json), if any"""
+    profile = getattr(thread_local, 'profile', None)
+    config_path = load_profiles().get(profile, CONFIG_PATH) if profile else CONFIG_PATH
+    return profile_min_salary(config_path)
+
+# Migration 006 summary tables per (database, table), checked once;
+# database is None for the shared file, else the routed profile
+_summary_tables = {}
+
+def has_summary_table(table, shared=False):
+    """True if the routed (or shared) database has one of migration 006's summary tables"""
+    profile = None if shared else getattr(thread_local, 'profile', None)
+    if (profile, table) not in _summary_tables:
+        conn = get_shared_db() if shared else get_db()
+        exists = conn.execute(
+            "SELECT 1 FROM main.sqlite_master WHERE type = 'table' AND name = ?", (table,)
+        ).fetchone() is not None
+        if not exists:
+            print(f"⚠️  {table} missing ({profile or 'shared database'}): apply "
+                  f"migrations/006_add_dashboard_aggregates.sql; counting rows directly until then")
+        _summary_tables[(profile, table)] = exists
+    return _summary_tables[(profile, table)]
+
+# Analytics migrations missing per database (None: shared, else profile), checked once
+_practice_analytics_missing = {}
+
+def practice_analytics_missing():
+    """Analytics migrations the routed database lacks (empty when its summary tables exist)"""
+    profile = getattr(thread_local, 'profile', None)
+    if profile not in _practice_analytics_missing:
+        missing = missing_migrations(get_db())
+        if missing:
+            print(f"⚠️  Practice analytics tables missing ({profile or 'shared database'}): "
+                  f"{migrations_hint(missing)}; serving the views until then")
+        _practice_analytics_missing[profile] = missing
+    return _practice_analytics_missing[profile]
+
+def get_scores_profile():
+    """Routed profile whose scores are read from profile_job_scores (None: scraped_jobs scores)"""
+    profile = getattr(thread_local, 'profile', None)
+    return profile if profile is not None and profile in load_profiles() else None
+
 def get_db():
-    """Get thread-local database connection"""
+    """Get thread-local database connection (the routed profile's shard, if any)"""
+    profile = getattr(thread_local, 'profile', None)
+    if profile is not None:
+        return get_shard_db(profile)
+    return get_shared_db()
+
+def get_shared_db():
+    """
+    Get thread-local connection to the shared database.
+
+    Scraped-job reads use it even for routed requests: the scrapers' side-table
+    stores create their tables and triggers on construction, which would land
+    in a shard's main schema.
+    """
     if not hasattr(thread_local, 'conn') or thread_local.conn is None:
         thread_local.conn = sqlite3.connect(
             DB_PATH,
@@ -31,8 +142,53 @@ def get_db():
         thread_local.conn.execute("PRAGMA journal_mode=WAL")
     return thread_local.conn
 
+def get_shard_db(profile):
+    """Get thread-local connection to a profile's shard, with the shared DB attached"""
+    shards = thread_local.__dict__.setdefault('shards', {})
+    if profile not in shards:
+        conn = connect_shard(
+            profile, DB_PATH, DEFAULT_SHARD_DIR,
+            timeout=30.0,
+            isolation_level=None,  # Autocommit mode
+            check_same_thread=False
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        shards[profile] = conn
+    return shards[profile]
+
 class APIHandler(http.server.BaseHTTPRequestHandler):
+    def _route_profile(self):
+        """
+        Pick the database for this request.
+
+        A /p/<profile>/ path prefix (stripped here) or an X-Profile header
+        routes to data/shards/<profile>.db; no profile, or 'default', uses
+        the single database. Returns False after sending an error for an
+        unknown profile.
+        """
+        match = PROFILE_PREFIX_RE.match(self.path)
+        if match:
+            profile, self.path = match.group(1), match.group(2)
+        else:
+            profile = self.headers.get('X-Profile') or None
+
+        thread_local.profile = None
+        if profile is None or profile == MAIN_PROFILE:
+            return True
+        try:
+            if not shard_path(validate_profile(profile), DEFAULT_SHARD_DIR).exists():
+                self._send_json_response({"error": f"unknown profile '{profile}'"}, 404)
+                return False
+        except ValueError as e:
+            self._send_json_response({"error": str(e)}, 400)
+            return False
+        thread_local.profile = profile
+        return True
+
     def do_GET(self):
+        if not self._route_profile():
+            return
         parsed_path = urlparse(self.path)
         path = parsed_path.path
 
@@ -41,7 +197,7 @@ class APIHandler(http.server.BaseHTTPRequestHandler):
             conn = get_db()
             cursor = conn.cursor()
 
-            if path == '/api/metrics':
+            if path == '/api/metrics' and not has_summary_table('opportunity_stats'):
                 cursor.execute("""
                     SELECT
                         (SELECT COUNT(*) FROM opportunities WHERE status NOT IN ('Rejected', 'Declined', 'Ghosted', 'Accepted')) as active_count,
@@ -52,6 +208,20 @@ class APIHandler(http.server.BaseHTTPRequestHandler):
                 result = dict(cursor.fetchone())
                 self._send_json_response(result)
 
+            elif path == '/api/metrics':
+                # Opportunity counts come from opportunity_stats (migration 006),
+                # a few rows kept current by triggers. The interview count is
+                # date-relative, so it stays an indexed range over interactions.
+                cursor.execute("""
+                    SELECT
+                        (SELECT COALESCE(SUM(opportunity_count), 0) FROM opportunity_stats WHERE status NOT IN ('Rejected', 'Declined', 'Ghosted', 'Accepted')) as active_count,
+                        (SELECT COUNT(*) FROM interactions WHERE date BETWEEN DATE('now') AND DATE('now', '+7 days') AND type = 'Interview') as interview_count,
+                        (SELECT COALESCE(SUM(opportunity_count), 0) FROM opportunity_stats WHERE is_remote = 1 AND status NOT IN ('Rejected', 'Declined', 'Ghosted', 'Accepted')) as remote_count,
+                        (SELECT COALESCE(SUM(opportunity_count), 0) FROM opportunity_stats WHERE priority = 'High' AND status NOT IN ('Rejected', 'Declined', 'Ghosted', 'Accepted')) as priority_count
+                """)
+                result = dict(cursor.fetchone())
+                self._send_json_response(result)
+
             elif path == '/api/todays-agenda':
                 cursor.execute("""
                     SELECT i.id, i.type, i.date, i.time, i.meet_link,
@@ -98,13 +268,48 @@ class APIHandler(http.server.BaseHTTPRequestHandler):
                 self._send_json_response(results)
 
             # NEW LEARNING ENDPOINTS (PROPERLY PLACED INSIDE do_GET)
+            # Learning and practice analytics read the tables materialized by
+            # migration 007 / practice_analytics.py, or the aggregate views
+            # on a database without them
             elif path == '/api/learning-gaps':
-                cursor.execute("SELECT * FROM learning_gaps")
+                if practice_analytics_missing():
+                    cursor.execute("SELECT * FROM learning_gaps")
+                else:
+                    cursor.execute("""
+                        SELECT
+                            NULLIF(question_type, '') as question_type,
+                            NULLIF(difficulty, '') as difficulty,
+                            CAST(rating_sum AS REAL) / NULLIF(rating_count, 0) as avg_performance,
+                            question_count,
+                            weak_count,
+                            ROUND(100.0 * weak_count / question_count, 2) as weak_percentage
+                        FROM learning_gap_stats
+                        ORDER BY weak_percentage DESC, avg_performance ASC
+                    """)
                 results = [dict(row) for row in cursor.fetchall()]
                 self._send_json_response(results)
 
             elif path == '/api/study-priority':
-                cursor.execute("SELECT * FROM study_priority")
+                if practice_analytics_missing():
+                    cursor.execute("SELECT * FROM study_priority")
+                else:
+                    cursor.execute("""
+                        SELECT
+                            st.id, st.name, st.category, st.priority, st.status,
+                            st.deadline, st.estimated_hours, st.actual_hours,
+                            COALESCE(p.session_count, 0) as session_count,
+                            p.total_minutes as total_study_minutes,
+                            ROUND(CAST(p.total_minutes AS FLOAT) / 60, 2) as total_study_hours,
+                            CASE
+                                WHEN st.estimated_hours > 0 THEN
+                                    ROUND(100.0 * (p.total_minutes / 60.0) / st.estimated_hours, 2)
+                                ELSE 0
+                            END as progress_percentage
+                        FROM study_topics st
+                        LEFT JOIN study_topic_progress p ON p.topic_id = st.id
+                        WHERE st.status != 'Completed'
+                        ORDER BY st.priority DESC, st.deadline ASC
+                    """)
                 results = [dict(row) for row in cursor.fetchall()]
                 self._send_json_response(results)
 
@@ -137,7 +342,20 @@ class APIHandler(http.server.BaseHTTPRequestHandler):
                 self._send_json_response(result)
 
             elif path == '/api/sql-keyword-mastery':
-                cursor.execute("SELECT * FROM sql_keyword_mastery")
+                if practice_analytics_missing():
+                    cursor.execute("SELECT * FROM sql_keyword_mastery")
+                else:
+                    cursor.execute("""
+                        SELECT
+                            keyword,
+                            practice_count,
+                            correct_count,
+                            ROUND(100.0 * correct_count / practice_count, 1) as accuracy_percentage,
+                            ROUND(CAST(total_minutes AS REAL) / NULLIF(timed_count, 0), 1) as avg_time_minutes
+                        FROM practice_keyword_stats
+                        WHERE practice_count > 0
+                        ORDER BY practice_count DESC, accuracy_percentage ASC
+                    """)
                 results = [dict(row) for row in cursor.fetchall()]
                 self._send_json_response(results)
 
@@ -152,12 +370,37 @@ class APIHandler(http.server.BaseHTTPRequestHandler):
                 self._send_json_response(results)
 
             elif path == '/api/weekly-summary':
-                cursor.execute("SELECT * FROM weekly_practice_summary LIMIT 8")
+                if practice_analytics_missing():
+                    cursor.execute("SELECT * FROM weekly_practice_summary LIMIT 8")
+                else:
+                    cursor.execute("""
+                        SELECT
+                            week,
+                            total_sessions,
+                            platforms_used,
+                            correct_answers,
+                            ROUND(100.0 * correct_answers / total_sessions, 1) as accuracy_percentage,
+                            total_minutes,
+                            easy_questions,
+                            medium_questions,
+                            hard_questions
+                        FROM practice_weekly_stats
+                        ORDER BY week DESC
+                        LIMIT 8
+                    """)
                 results = [dict(row) for row in cursor.fetchall()]
                 self._send_json_response(results)
 
             elif path == '/api/common-mistakes':
-                cursor.execute("SELECT * FROM common_practice_mistakes")
+                if practice_analytics_missing():
+                    cursor.execute("SELECT * FROM common_practice_mistakes")
+                else:
+                    cursor.execute("""
+                        SELECT error_made, occurrence_count, concepts_affected, avg_recovery_time
+                        FROM practice_mistake_stats
+                        ORDER BY occurrence_count DESC
+                        LIMIT 10
+                    """)
                 results = [dict(row) for row in cursor.fetchall()]
                 self._send_json_response(results)
 
@@ -217,6 +460,20 @@ class APIHandler(http.server.BaseHTTPRequestHandler):
                 self._handle_scraped_jobs_stats()
                 return  # _handle_scraped_jobs_stats sends its own response
 
+            elif path == '/api/scraped-jobs/facets':
+                query_components = parse_qs(urlparse(self.path).query)
+                self._handle_scraped_job_facets(query_components)
+                return  # _handle_scraped_job_facets sends its own response
+
+            elif SIMILAR_JOBS_RE.match(path):
+                query_components = parse_qs(urlparse(self.path).query)
+                self._handle_similar_jobs(int(SIMILAR_JOBS_RE.match(path).group(1)), query_components)
+                return  # _handle_similar_jobs sends its own response
+
+            elif SCRAPED_JOB_DETAIL_RE.match(path):
+                self._handle_scraped_job_detail(int(SCRAPED_JOB_DETAIL_RE.match(path).group(1)))
+                return  # _handle_scraped_job_detail sends its own response
+
             elif self.path.startswith('/api/scraped-jobs'):
                 query_components = parse_qs(urlparse(self.path).query)
                 self._handle_scraped_jobs(query_components)
@@ -229,6 +486,8 @@ class APIHandler(http.server.BaseHTTPRequestHandler):
             self._send_json_response({"error": str(e)})
 
     def do_POST(self):
+        if not self._route_profile():
+            return
         match = SCRAPED_JOB_IMPORT_RE.match(self.path)
         if match:
             self._handle_import_scraped_job(int(match.group(1)))
@@ -254,11 +513,27 @@ class APIHandler(http.server.BaseHTTPRequestHandler):
                     else:
                         recruiter_phone = recruiter_contact
 
+                # Numeric salary fields win; otherwise salary_range text is parsed
+                salary_range = data.get('salary_range', '')
+                if data.get('salary_min') is not None:
+                    salary = {
+                        'salary_min': float(data['salary_min']),
+                        'salary_max': float(data['salary_max']) if data.get('salary_max') is not None else None,
+                        'salary_currency': (data.get('currency') or 'INR').upper(),
+                        'salary_period': data.get('period') or 'year'
+                    }
+                else:
+                    salary = parse_salary(salary_range)
+                # Rates live in the shared database, also for routed requests
+                salary_values = CurrencyRates(get_shared_db()).values(salary)
+
                 cursor.execute("""
                     INSERT INTO opportunities (
                         company, role, source, is_remote, tech_stack,
-                        recruiter_phone, recruiter_email, notes, status, priority
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                        recruiter_phone, recruiter_email, notes, status, priority,
+                        salary_range, salary_min, salary_max, salary_currency,
+                        salary_period, salary_min_inr, salary_max_inr
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 """, (
                     data.get('company', ''),
                     data.get('role', ''),
@@ -269,7 +544,9 @@ class APIHandler(http.server.BaseHTTPRequestHandler):
                     recruiter_email,
                     data.get('notes', ''),
                     data.get('status', 'Lead'),
-                    data.get('priority', 'Medium')
+                    data.get('priority', 'Medium'),
+                    salary_range,
+                    *salary_values
                 ))
 
                 new_id = cursor.lastrowid
@@ -295,6 +572,7 @@ class APIHandler(http.server.BaseHTTPRequestHandler):
                 conn = get_db()
                 cursor = conn.cursor()
 
+                cursor.execute("BEGIN")
                 cursor.execute("""
                     INSERT INTO interview_questions (
                         opportunity_id, question_text, question_type, difficulty,
@@ -312,6 +590,9 @@ class APIHandler(http.server.BaseHTTPRequestHandler):
                 ))
 
                 new_id = cursor.lastrowid
+                if not practice_analytics_missing():
+                    refresh_interview_questions(conn, [new_id])
+                conn.commit()
 
                 self._send_json_response({
                     "success": True,
@@ -320,6 +601,8 @@ class APIHandler(http.server.BaseHTTPRequestHandler):
                 })
 
             except Exception as e:
+                if get_db().in_transaction:
+                    get_db().rollback()
                 self.send_response(500)
                 self.send_header('Content-Type', 'application/json')
                 self.send_header('Access-Control-Allow-Origin', '*')
@@ -419,10 +702,14 @@ class APIHandler(http.server.BaseHTTPRequestHandler):
                 self._send_json_response({
                     "error": f"Failed to add source: {str(e)}"
                 }, 500)
+        elif self.path == '/api/what-if':
+            self._handle_what_if()
         else:
             self._send_json_response({"error": "Not found"}, 404)
 
     def do_PATCH(self):
+        if not self._route_profile():
+            return
         # Extract opportunity ID from path
         if self.path.startswith('/api/update-opportunity/'):
             try:
@@ -502,7 +789,7 @@ class APIHandler(http.server.BaseHTTPRequestHandler):
         self.send_response(200)
         self.send_header('Access-Control-Allow-Origin', '*')
         self.send_header('Access-Control-Allow-Methods', 'GET, POST, PATCH, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type, X-Profile')
         self.end_headers()
 
     def _handle_import_scraped_job(self, scraped_job_id):
@@ -515,12 +802,15 @@ class APIHandler(http.server.BaseHTTPRequestHandler):
                 self._send_json_response({"error": "scraped job not found"}, 404)
                 return
 
-            if job["imported_to_opportunities"]:
-                cur.execute(
-                    "SELECT id FROM opportunities WHERE scraped_job_id = ?",
-                    (scraped_job_id,),
-                )
-                existing = cur.fetchone()
+            # In a profile shard, imported_to_opportunities (shared) belongs
+            # to the main profile; the shard's own opportunities decide
+            sharded = getattr(thread_local, 'profile', None) is not None
+            cur.execute(
+                "SELECT id FROM opportunities WHERE scraped_job_id = ?",
+                (scraped_job_id,),
+            )
+            existing = cur.fetchone()
+            if (existing is not None) if sharded else job["imported_to_opportunities"]:
                 self._send_json_response({
                     "error": "already imported",
                     "opportunity_id": existing["id"] if existing else None,
@@ -532,20 +822,25 @@ class APIHandler(http.server.BaseHTTPRequestHandler):
                 """
                 INSERT INTO opportunities
                     (company, role, job_url, salary_range, source,
-                     tech_stack, status, scraped_job_id)
-                VALUES (?, ?, ?, ?, ?, ?, 'Lead', ?)
+                     tech_stack, status, scraped_job_id,
+                     salary_min, salary_max, salary_currency, salary_period,
+                     salary_min_inr, salary_max_inr)
+                VALUES (?, ?, ?, ?, ?, ?, 'Lead', ?, ?, ?, ?, ?, ?, ?)
                 """,
                 (
                     job["company"], job["job_title"], job["job_url"],
                     job["salary_range"], job["source"], job["tags"],
                     scraped_job_id,
+                    job["salary_min"], job["salary_max"], job["salary_currency"],
+                    job["salary_period"], job["salary_min_inr"], job["salary_max_inr"],
                 ),
             )
             new_opportunity_id = cur.lastrowid
-            cur.execute(
-                "UPDATE scraped_jobs SET imported_to_opportunities = 1 WHERE id = ?",
-                (scraped_job_id,),
-            )
+            if not sharded:
+                cur.execute(
+                    "UPDATE scraped_jobs SET imported_to_opportunities = 1 WHERE id = ?",
+                    (scraped_job_id,),
+                )
             conn.commit()
 
             self._send_json_response({
@@ -557,6 +852,28 @@ class APIHandler(http.server.BaseHTTPRequestHandler):
             conn.rollback()
             self._send_json_response({"error": str(e)}, 500)
 
+    def _handle_what_if(self):
+        """Re-score every stored job under candidate weights (no rescanning)"""
+        try:
+            content_length = int(self.headers.get('Content-Length') or 0)
+            data = json.loads(self.rfile.read(content_length).decode('utf-8') or '{}')
+
+            started = time.perf_counter()
+            result = get_what_if_engine().evaluate(
+                get_shared_db(),
+                scoring_weights=data.get('scoring_weights'),
+                term_weights=data.get('term_weights'),
+                top_n=int(data.get('top_n', 20))
+            )
+            result['elapsed_ms'] = round((time.perf_counter() - started) * 1000, 2)
+
+            self._send_json_response({'success': True, **result})
+
+        except (json.JSONDecodeError, ValueError, TypeError) as e:
+            self._send_json_response({'success': False, 'error': str(e)}, 400)
+        except Exception as e:
+            self._send_json_response({'success': False, 'error': str(e)}, 500)
+
     def _send_json_response(self, data, status_code=200):
         """Helper method to send JSON response"""
         self.send_response(status_code)
@@ -565,84 +882,409 @@ class APIHandler(http.server.BaseHTTPRequestHandler):
         self.end_headers()
         self.wfile.write(json.dumps(data).encode())
 
+    def _score_source(self):
+        """
+        Where the routed profile's scores come from.
+
+        Returns:
+            (scores, join, join_params): scores is the table named in
+            SCRAPED_JOB_COLUMNS; join (with its parameters) goes after
+            FROM scraped_jobs. Near-duplicates take their canonical job's
+            profile scores, as they do in scraped_jobs.
+        """
+        profile = get_scores_profile()
+        if profile is None:
+            return 'scraped_jobs', '', []
+        join = (' JOIN profile_job_scores ON profile_job_scores.profile = ?'
+                ' AND profile_job_scores.job_id = COALESCE(scraped_jobs.canonical_job_id, scraped_jobs.id)')
+        return 'profile_job_scores', join, [profile]
+
+    def _scraped_job_filters(self, conn, params, scores='scraped_jobs'):
+        """
+        WHERE clause of the /api/scraped-jobs filters, shared by the listing
+        and the facet counts.
+
+        Args:
+            scores: Table of the score fields (see _score_source())
+
+        Returns:
+            (query_prefix, where, query_params, filters_applied): query_prefix
+            is '' or the top_pct WITH clause, whose parameters lead query_params
+
+        Raises:
+            ValueError: On an invalid filter value (a 400 for the caller)
+        """
+        top_pct = params.get('top_pct', [None])[0]
+        if top_pct is not None:
+            top_pct = float(top_pct)
+            if not 0 < top_pct <= 100:
+                raise ValueError('top_pct must be in (0, 100]')
+            # The score sketches only hold the main profile's scores
+            if scores != 'scraped_jobs':
+                raise ValueError('top_pct is not available for profile scores')
+        # Annual INR; min_salary=profile uses profile.min_salary_inr
+        min_salary = params.get('min_salary', [None])[0]
+        max_salary = params.get('max_salary', [None])[0]
+        try:
+            if min_salary == 'profile':
+                min_salary = get_profile_min_salary()
+            elif min_salary is not None:
+                min_salary = float(min_salary)
+            if max_salary is not None:
+                max_salary = float(max_salary)
+        except ValueError:
+            raise ValueError("min_salary and max_salary must be numbers (INR per year) or min_salary=profile")
+        # Country / region codes or names, e.g. location=IN,EUROPE,Remote
+        location = params.get('location', [None])[0]
+        location_codes = sorted(location_filter_codes(location)) if location else None
+        # Any of several tags, e.g. tag=python,sql
+        tag = params.get('tag', [None])[0]
+        tags = normalize_tags(tag) or None
+        # A relative filter replaces the absolute default
+        min_score = float(params.get('min_score', [0 if top_pct else 70])[0])
+        classification = params.get('classification', [None])[0]
+        source = params.get('source', [None])[0]
+        company = params.get('company', [None])[0]
+        include_duplicates = params.get('include_duplicates', ['false'])[0].lower() == 'true'
+
+        # With a salary filter, '+' keeps the planner off the score index
+        # so the (usually more selective) salary index answers the range
+        salary_filtered = min_salary is not None or max_salary is not None
+        prefix = ''
+        where = f"{'+' if salary_filtered else ''}{scores}.match_score >= ?"
+        query_params = [min_score]
+
+        # Top N% of each job's source and week, from the score sketches
+        if top_pct:
+            thresholds = ScoreSketchStore(conn).thresholds(top_pct)
+            if thresholds:
+                prefix = ('WITH top_thresholds(source, week, min_score) AS (VALUES '
+                          + ', '.join('(?, ?, ?)' for _ in thresholds) + ')')
+                where += f''' AND {scores}.match_score >= (
+                    SELECT t.min_score FROM top_thresholds t
+                    WHERE t.source = scraped_jobs.source AND t.week = {WEEK_SQL})'''
+                query_params = [value for row in thresholds for value in row] + query_params
+            else:
+                where += ' AND 0'  # no sketches yet
+
+        # Add classification filter if provided
+        if classification:
+            where += f' AND {scores}.classification = ?'
+            query_params.append(classification)
+
+        # Add source filter if provided
+        if source:
+            where += ' AND source = ?'
+            query_params.append(source)
+
+        # Add company filter if provided
+        if company:
+            where += ' AND company = ?'
+            query_params.append(company)
+
+        # Salary range filters: the job's range must reach min_salary
+        # and start at or below max_salary
+        if min_salary is not None:
+            where += ' AND salary_max_inr >= ?'
+            query_params.append(min_salary)
+        if max_salary is not None:
+            where += ' AND salary_min_inr <= ?'
+            query_params.append(max_salary)
+
+        # Location filter: code index to location ids, then the location_id index
+        if location_codes:
+            where += f''' AND location_id IN (
+                SELECT location_id FROM normalized_location_codes
+                WHERE code IN ({', '.join('?' for _ in location_codes)}))'''
+            query_params.extend(location_codes)
+
+        # Tag filter: the (tag, job_id) index of the junction table
+        if tags:
+            where += f''' AND scraped_jobs.id IN (
+                SELECT job_id FROM scraped_job_tags
+                WHERE tag IN ({', '.join('?' for _ in tags)}))'''
+            query_params.extend(tags)
+
+        # Near-duplicate reposts are listed once, under their canonical job
+        if not include_duplicates:
+            where += ' AND canonical_job_id IS NULL'
+
+        filters_applied = {
+            'min_score': min_score,
+            'classification': classification,
+            'source': source,
+            'company': company,
+            'tag': tags,
+            'include_duplicates': include_duplicates,
+            'top_pct': top_pct,
+            'min_salary': min_salary,
+            'max_salary': max_salary,
+            'location': location_codes
+        }
+        return prefix, where, query_params, filters_applied
+
     def _handle_scraped_jobs(self, params):
         """Get scored jobs from scraper with filtering"""
         try:
-            # Parse query parameters
-            min_score = float(params.get('min_score', [70])[0])
+            conn = get_shared_db()
+            scores, join, join_params = self._score_source()
+            try:
+                prefix, where, query_params, filters_applied = self._scraped_job_filters(conn, params, scores)
+            except ValueError as e:
+                self._send_json_response({'success': False, 'error': str(e)}, 400)
+                return
             limit = int(params.get('limit', [50])[0])
-            classification = params.get('classification', [None])[0]
-            source = params.get('source', [None])[0]
+            sort = params.get('sort', ['score'])[0]
+            if sort not in SCRAPED_JOB_SORTS:
+                self._send_json_response({
+                    'success': False,
+                    'error': f"Invalid sort '{sort}' (expected one of {', '.join(SCRAPED_JOB_SORTS)})"
+                }, 400)
+                return
 
             # Build query
-            query = '''
-                SELECT
-                    id, external_id, source, job_title, company, job_url,
-                    location, tags, salary_range, posted_date,
-                    match_score, classification, matched_skills, matched_domains,
-                    red_flags, recommendation, scraped_at, imported_to_opportunities,
-                    description
-                FROM scraped_jobs
-                WHERE match_score >= ?
+            # List views only get the precomputed snippet; the full
+            # description is loaded by /api/scraped-jobs/<id>
+            freshness_rank = ('freshness_rank' if scores == 'scraped_jobs'
+                              else freshness_rank_sql(score_column=f'{scores}.match_score'))
+            query = f'''{prefix}
+                SELECT {SCRAPED_JOB_COLUMNS.format(scores=scores)}
+                FROM scraped_jobs{join}
+                WHERE {where}
+                ORDER BY {SCRAPED_JOB_SORTS[sort].format(scores=scores, freshness_rank=freshness_rank)} LIMIT ?
             '''
-
-            query_params = [min_score]
-
-            # Add classification filter if provided
-            if classification:
-                query += ' AND classification = ?'
-                query_params.append(classification)
-
-            # Add source filter if provided
-            if source:
-                query += ' AND source = ?'
-                query_params.append(source)
-
-            # Order and limit
-            query += ' ORDER BY match_score DESC, scraped_at DESC LIMIT ?'
-            query_params.append(limit)
+            # Join parameters come first: only main-profile scores have a
+            # top_pct WITH clause, which has no join
+            query_params = join_params + query_params + [limit]
 
             # Execute query
-            conn = get_db()
             cursor = conn.cursor()
             cursor.execute(query, query_params)
 
             # Format results
-            jobs = []
-            for row in cursor.fetchall():
-                jobs.append({
-                    'id': row[0],
-                    'external_id': row[1],
-                    'source': row[2],
-                    'job_title': row[3],
-                    'company': row[4],
-                    'job_url': row[5],
-                    'location': row[6],
-                    'tags': row[7],
-                    'salary_range': row[8],
-                    'posted_date': row[9],
-                    'match_score': round(row[10], 1),
-                    'classification': row[11],
-                    'matched_skills': json.loads(row[12]) if row[12] else [],
-                    'matched_domains': json.loads(row[13]) if row[13] else [],
-                    'red_flags': json.loads(row[14]) if row[14] else [],
-                    'recommendation': row[15],
-                    'scraped_at': row[16],
-                    'imported': bool(row[17]),
-                    'description': row[18][:200] + '...' if row[18] and len(row[18]) > 200 else row[18]
-                })
+            rows = cursor.fetchall()
+            jobs = [self._format_scraped_job(row) for row in rows]
+            self._add_percentiles(conn, rows, jobs, scores)
+            self._add_salary_checks(jobs)
 
             # Send response
             self._send_json_response({
                 'success': True,
                 'jobs': jobs,
                 'count': len(jobs),
-                'filters_applied': {
-                    'min_score': min_score,
-                    'classification': classification,
-                    'source': source,
-                    'limit': limit
-                }
+                'filters_applied': {**filters_applied, 'sort': sort, 'limit': limit}
+            })
+
+        except Exception as e:
+            self._send_json_response({
+                'success': False,
+                'error': str(e)
+            }, 500)
+
+    def _handle_scraped_job_facets(self, params):
+        """Counts per tag, classification, source and company under the /api/scraped-jobs filters"""
+        try:
+            conn = get_shared_db()
+            scores, join, join_params = self._score_source()
+            try:
+                prefix, where, query_params, filters_applied = self._scraped_job_filters(conn, params, scores)
+            except ValueError as e:
+                self._send_json_response({'success': False, 'error': str(e)}, 400)
+                return
+            facet_limit = int(params.get('facet_limit', [20])[0])
+            query_params = join_params + query_params  # as in _handle_scraped_jobs
+
+            total = conn.execute(
+                f'{prefix} SELECT COUNT(*) FROM scraped_jobs{join} WHERE {where}', query_params
+            ).fetchone()[0]
+
+            # Each facet is one GROUP BY over the filtered rows: tags through
+            # the junction table's (tag, job_id) index, the rest through
+            # their scraped_jobs column indexes
+            facets = {}
+            facet_sources = {
+                'tag': ('scraped_job_tags.tag',
+                        f'scraped_job_tags JOIN scraped_jobs ON scraped_jobs.id = scraped_job_tags.job_id{join}'),
+                'classification': (f'{scores}.classification', f'scraped_jobs{join}'),
+                'source': ('source', f'scraped_jobs{join}'),
+                'company': ('company', f'scraped_jobs{join}'),
+            }
+            for facet, (column, tables) in facet_sources.items():
+                rows = conn.execute(f'''{prefix}
+                    SELECT {column}, COUNT(*) AS count
+                    FROM {tables}
+                    WHERE {where}
+                    GROUP BY {column}
+                    ORDER BY count DESC, {column}
+                    LIMIT ?
+                ''', query_params + [facet_limit]).fetchall()
+                facets[facet] = [{'value': value, 'count': count} for value, count in rows]
+
+            self._send_json_response({
+                'success': True,
+                'total': total,
+                'facets': facets,
+                'filters_applied': {**filters_applied, 'facet_limit': facet_limit}
+            })
+
+        except Exception as e:
+            self._send_json_response({
+                'success': False,
+                'error': str(e)
+            }, 500)
+
+    def _format_scraped_job(self, row):
+        """JSON shape of a SCRAPED_JOB_COLUMNS row ('description' is the snippet)"""
+        return {
+            'id': row[0],
+            'external_id': row[1],
+            'source': row[2],
+            'job_title': row[3],
+            'company': row[4],
+            'job_url': row[5],
+            'location': row[6],
+            'tags': row[7],
+            'salary_range': row[8],
+            'posted_date': row[9],
+            'match_score': round(row[10], 1),
+            'classification': row[11],
+            'matched_skills': json.loads(row[12]) if row[12] else [],
+            'matched_domains': json.loads(row[13]) if row[13] else [],
+            'red_flags': json.loads(row[14]) if row[14] else [],
+            'recommendation': row[15],
+            'scraped_at': row[16],
+            'imported': bool(row[17]),
+            'description': row[18],
+            'is_partial_score': bool(row[19]),
+            'canonical_job_id': row[20],
+            'duplicate_count': row[21],
+            'semantic_score': row[22],
+            'salary': {
+                'min': row[23],
+                'max': row[24],
+                'currency': row[25],
+                'period': row[26],
+                'min_inr': row[27],
+                'max_inr': row[28]
+            },
+            'posted_at': row[29],
+            # Same decay as sort=rank: undated jobs age from scraped_at
+            'decayed_score': self._decayed_score(row)
+        }
+
+    def _decayed_score(self, row):
+        """match_score decayed by the age of a SCRAPED_JOB_COLUMNS row (None if undated)"""
+        posted_at = row[29] if row[29] is not None else parse_posted_date(row[16])
+        score = decayed_score(row[10], posted_at)
+        return round(score, 2) if score is not None else None
+
+    def _add_percentiles(self, conn, rows, jobs, scores='scraped_jobs'):
+        """
+        Set each job's 'percentile' within its source and week (None before
+        any sketch, and for profile scores, which have no sketches)
+        """
+        if scores != 'scraped_jobs':
+            for job in jobs:
+                job['percentile'] = None
+            return
+        keys = [(row[2], week_of(row[16])) if row[16] else None for row in rows]
+        sketches = ScoreSketchStore(conn).load_many(key for key in keys if key)
+        for row, key, job in zip(rows, keys, jobs):
+            sketch = sketches.get(key)
+            percentile = sketch.percentile(row[10]) if sketch and row[10] is not None else None
+            job['percentile'] = round(percentile, 1) if percentile is not None else None
+
+    def _add_salary_checks(self, jobs):
+        """Set salary.meets_profile_minimum against profile.min_salary_inr (None if unknown)"""
+        minimum = get_profile_min_salary()
+        for job in jobs:
+            top = job['salary']['max_inr']
+            job['salary']['meets_profile_minimum'] = (
+                top >= minimum if top is not None and minimum is not None else None
+            )
+
+    def _handle_scraped_job_detail(self, job_id):
+        """Get one scraped job with its full (decompressed) description"""
+        try:
+            conn = get_shared_db()
+            scores, join, join_params = self._score_source()
+            row = conn.execute(
+                f"SELECT {SCRAPED_JOB_COLUMNS.format(scores=scores)} FROM scraped_jobs{join} WHERE scraped_jobs.id = ?",
+                join_params + [job_id]
+            ).fetchone()
+            if row is None:
+                self._send_json_response({'success': False, 'error': 'scraped job not found'}, 404)
+                return
+
+            job = self._format_scraped_job(row)
+            self._add_percentiles(conn, [row], [job], scores)
+            self._add_salary_checks([job])
+            job['description_snippet'] = job['description']
+            job['description'] = DescriptionStore(conn).load(job_id)
+            job['duplicate_ids'] = [r[0] for r in conn.execute(
+                "SELECT id FROM scraped_jobs WHERE canonical_job_id = ? ORDER BY id", (job_id,)
+            )]
+            self._send_json_response({'success': True, 'job': job})
+
+        except Exception as e:
+            self._send_json_response({
+                'success': False,
+                'error': str(e)
+            }, 500)
+
+    def _handle_similar_jobs(self, job_id, params):
+        """Get the postings most similar to one scraped job, from the vector index"""
+        try:
+            limit = min(max(int(params.get('limit', [10])[0]), 1), 50)
+        except ValueError:
+            self._send_json_response({'success': False, 'error': 'limit must be an integer'}, 400)
+            return
+
+        try:
+            conn = get_shared_db()
+            row = conn.execute(
+                "SELECT canonical_job_id, job_title, tags FROM scraped_jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+            if row is None:
+                self._send_json_response({'success': False, 'error': 'scraped job not found'}, 404)
+                return
+
+            # A repost is compared as its canonical job
+            anchor_id = row[0] or job_id
+            query = _vector_index.get(anchor_id)
+            indexed = query is not None
+            if not indexed:
+                # Not indexed yet (older job or failed append): sketch it now
+                vectorizer = JobVectorizer()
+                vectorizer.refresh(conn)
+                query = vectorizer.sketch(row[1], row[2], DescriptionStore(conn).load(anchor_id))
+
+            # Over-fetch: deleted jobs and later-linked reposts are dropped below
+            matches = _vector_index.search(query, limit * 2 + 10, exclude={anchor_id}) if query else []
+            similarity = dict(matches)
+            jobs = []
+            if matches:
+                scores, join, join_params = self._score_source()
+                placeholders = ', '.join('?' for _ in matches)
+                rows = conn.execute(f'''
+                    SELECT {SCRAPED_JOB_COLUMNS.format(scores=scores)} FROM scraped_jobs{join}
+                    WHERE scraped_jobs.id IN ({placeholders}) AND canonical_job_id IS NULL
+                ''', join_params + list(similarity)).fetchall()
+                rows = sorted(rows, key=lambda r: -similarity[r[0]])[:limit]
+                for job_row in rows:
+                    job = self._format_scraped_job(job_row)
+                    job['similarity'] = round(similarity[job_row[0]], 3)
+                    jobs.append(job)
+                self._add_percentiles(conn, rows, jobs, scores)
+                self._add_salary_checks(jobs)
+
+            self._send_json_response({
+                'success': True,
+                'job_id': job_id,
+                'canonical_job_id': row[0],
+                'indexed': indexed,
+                'jobs': jobs,
+                'count': len(jobs)
             })
 
         except Exception as e:
@@ -654,58 +1296,45 @@ class APIHandler(http.server.BaseHTTPRequestHandler):
     def _handle_scraped_jobs_stats(self):
         """Get statistics about scraped jobs"""
         try:
-            conn = get_db()
+            conn = get_shared_db()
             cursor = conn.cursor()
 
-            # Get overall stats
+            if not has_summary_table('scraped_job_stats', shared=True):
+                stats_row, sources = self._scraped_jobs_stats_by_scan(cursor)
+                self._send_scraped_jobs_stats(stats_row, sources)
+                return
+
+            # Get overall stats from the trigger-maintained scraped_job_stats
+            # table (migration 006); it holds one row per source/score bucket
             cursor.execute('''
                 SELECT
-                    COUNT(*) as total,
-                    COUNT(CASE WHEN match_score >= 85 THEN 1 END) as excellent,
-                    COUNT(CASE WHEN match_score >= 75 AND match_score < 85 THEN 1 END) as high_fit,
-                    COUNT(CASE WHEN match_score >= 65 AND match_score < 75 THEN 1 END) as medium_fit,
-                    COUNT(CASE WHEN match_score >= 40 AND match_score < 65 THEN 1 END) as low_fit,
-                    COUNT(CASE WHEN match_score < 40 THEN 1 END) as no_fit,
-                    ROUND(AVG(match_score), 1) as avg_score,
-                    MAX(scraped_at) as last_scrape,
-                    COUNT(CASE WHEN imported_to_opportunities = 1 THEN 1 END) as imported_count
-                FROM scraped_jobs
+                    COALESCE(SUM(job_count), 0) as total,
+                    COALESCE(SUM(CASE WHEN score_bucket = 'EXCELLENT' THEN job_count END), 0) as excellent,
+                    COALESCE(SUM(CASE WHEN score_bucket = 'HIGH_FIT' THEN job_count END), 0) as high_fit,
+                    COALESCE(SUM(CASE WHEN score_bucket = 'MEDIUM_FIT' THEN job_count END), 0) as medium_fit,
+                    COALESCE(SUM(CASE WHEN score_bucket = 'LOW_FIT' THEN job_count END), 0) as low_fit,
+                    COALESCE(SUM(CASE WHEN score_bucket = 'NO_FIT' THEN job_count END), 0) as no_fit,
+                    ROUND(SUM(score_sum) / NULLIF(SUM(CASE WHEN score_bucket != 'UNSCORED' THEN job_count END), 0), 1) as avg_score,
+                    (SELECT MAX(scraped_at) FROM scraped_jobs) as last_scrape,
+                    COALESCE(SUM(imported_count), 0) as imported_count
+                FROM scraped_job_stats
             ''')
 
             stats_row = cursor.fetchone()
 
             # Get source breakdown
             cursor.execute('''
-                SELECT source, COUNT(*) as count, ROUND(AVG(match_score), 1) as avg_score
-                FROM scraped_jobs
+                SELECT
+                    source,
+                    SUM(job_count) as count,
+                    ROUND(SUM(score_sum) / NULLIF(SUM(CASE WHEN score_bucket != 'UNSCORED' THEN job_count END), 0), 1) as avg_score
+                FROM scraped_job_stats
                 GROUP BY source
+                HAVING SUM(job_count) > 0
                 ORDER BY count DESC
             ''')
 
-            sources = []
-            for row in cursor.fetchall():
-                sources.append({
-                    'source': row[0],
-                    'count': row[1],
-                    'avg_score': row[2]
-                })
-
-            # Format response
-            self._send_json_response({
-                'success': True,
-                'stats': {
-                    'total_jobs': stats_row[0],
-                    'excellent': stats_row[1],
-                    'high_fit': stats_row[2],
-                    'medium_fit': stats_row[3],
-                    'low_fit': stats_row[4],
-                    'no_fit': stats_row[5],
-                    'avg_score': stats_row[6],
-                    'last_scrape': stats_row[7],
-                    'imported_count': stats_row[8]
-                },
-                'sources': sources
-            })
+            self._send_scraped_jobs_stats(stats_row, cursor.fetchall())
 
         except Exception as e:
             self._send_json_response({
@@ -713,6 +1342,56 @@ class APIHandler(http.server.BaseHTTPRequestHandler):
                 'error': str(e)
             }, 500)
 
+    def _scraped_jobs_stats_by_scan(self, cursor):
+        """Overall and per-source stats counted from scraped_jobs (before migration 006)"""
+        cursor.execute('''
+            SELECT
+                COUNT(*) as total,
+                COUNT(CASE WHEN match_score >= 85 THEN 1 END) as excellent,
+                COUNT(CASE WHEN match_score >= 75 AND match_score < 85 THEN 1 END) as high_fit,
+                COUNT(CASE WHEN match_score >= 65 AND match_score < 75 THEN 1 END) as medium_fit,
+                COUNT(CASE WHEN match_score >= 40 AND match_score < 65 THEN 1 END) as low_fit,
+                COUNT(CASE WHEN match_score < 40 THEN 1 END) as no_fit,
+                ROUND(AVG(match_score), 1) as avg_score,
+                MAX(scraped_at) as last_scrape,
+                COUNT(CASE WHEN imported_to_opportunities = 1 THEN 1 END) as imported_count
+            FROM scraped_jobs
+        ''')
+        stats_row = cursor.fetchone()
+        cursor.execute('''
+            SELECT source, COUNT(*) as count, ROUND(AVG(match_score), 1) as avg_score
+            FROM scraped_jobs
+            GROUP BY source
+            ORDER BY count DESC
+        ''')
+        return stats_row, cursor.fetchall()
+
+    def _send_scraped_jobs_stats(self, stats_row, source_rows):
+        """Format the /api/scraped-jobs/stats response"""
+        sources = []
+        for row in source_rows:
+            sources.append({
+                'source': row[0],
+                'count': row[1],
+                'avg_score': row[2]
+            })
+
+        self._send_json_response({
+            'success': True,
+            'stats': {
+                'total_jobs': stats_row[0],
+                'excellent': stats_row[1],
+                'high_fit': stats_row[2],
+                'medium_fit': stats_row[3],
+                'low_fit': stats_row[4],
+                'no_fit': stats_row[5],
+                'avg_score': stats_row[6],
+                'last_scrape': stats_row[7],
+                'imported_count': stats_row[8]
+            },
+            'sources': sources
+        })
+
     def log_message(self, format, *args):
         sys.stdout.write(f"[API] {self.address_string()} - {format%args}\n")
 
@@ -720,6 +1399,12 @@ class ReusableTCPServer(socketserver.TCPServer):
     allow_reuse_address = True
 
 if __name__ == "__main__":
+    # sort=rank and every scraped_jobs write evaluate freshness_rank (ln)
+    try:
+        require_math_functions(get_shared_db())
+    except RuntimeError as e:
+        sys.exit(f"❌ {e}")
+
     print(f"""
 ╔════════════════════════════════════════════════════════╗
 ║     🚀 JOB TRACKER API SERVER + LEARNING SYSTEM        ║
@@ -754,6 +1439,10 @@ if __name__ == "__main__":
 ║     Scraped Jobs Endpoints:          🔍 NEW            ║
 ║     GET  /api/scraped-jobs           🔍 NEW            ║
 ║     GET  /api/scraped-jobs/stats     🔍 NEW            ║
+║     GET  /api/scraped-jobs/facets    🔍 NEW            ║
+║     GET  /api/scraped-jobs/<id>      🔍 NEW            ║
+║     GET  /api/scraped-jobs/<id>/similar 🔍 NEW         ║
+║     POST /api/what-if                🔍 NEW            ║
 ║                                                        ║
 ║     Press Ctrl+C to stop                               ║
 ╚════════════════════════════════════════════════════════╝
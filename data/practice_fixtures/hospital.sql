@@ -0,0 +1,92 @@
+-- Hospital practice schema (sql-practice.com layout) with a small sample dataset
+-- Loaded into an in-memory database by sql_checker.py to grade practice answers.
+
+CREATE TABLE province_names (
+  province_id CHAR(2) PRIMARY KEY,
+  province_name TEXT NOT NULL
+);
+
+CREATE TABLE patients (
+  patient_id INTEGER PRIMARY KEY,
+  first_name TEXT,
+  last_name TEXT,
+  gender CHAR(1),
+  birth_date DATE,
+  city TEXT,
+  province_id CHAR(2) REFERENCES province_names(province_id),
+  allergies TEXT,
+  height INTEGER,
+  weight INTEGER
+);
+
+CREATE TABLE doctors (
+  doctor_id INTEGER PRIMARY KEY,
+  first_name TEXT,
+  last_name TEXT,
+  specialty TEXT
+);
+
+CREATE TABLE admissions (
+  patient_id INTEGER REFERENCES patients(patient_id),
+  admission_date DATE,
+  discharge_date DATE,
+  diagnosis TEXT,
+  attending_doctor_id INTEGER REFERENCES doctors(doctor_id)
+);
+
+INSERT INTO province_names VALUES
+  ('AB', 'Alberta'),
+  ('BC', 'British Columbia'),
+  ('MB', 'Manitoba'),
+  ('NS', 'Nova Scotia'),
+  ('ON', 'Ontario'),
+  ('QC', 'Quebec'),
+  ('SK', 'Saskatchewan');
+
+INSERT INTO patients VALUES
+  (1, 'Donald', 'Waterfield', 'M', '1963-02-12', 'Barrie', 'ON', NULL, 156, 65),
+  (2, 'Mickey', 'Baasha', 'M', '1981-05-28', 'Dundas', 'ON', 'Sulfa', 185, 76),
+  (3, 'Jiji', 'Sharma', 'M', '1957-09-05', 'Hamilton', 'ON', 'Penicillin', 194, 106),
+  (4, 'Blair', 'Diaz', 'M', '1967-01-07', 'Hamilton', 'ON', NULL, 191, 104),
+  (5, 'Charles', 'Wolfe', 'M', '2017-11-19', 'Orillia', 'ON', 'Penicillin', 47, 10),
+  (6, 'Sue', 'Falcon', 'F', '2017-09-30', 'Ajax', 'ON', 'Penicillin', 43, 5),
+  (7, 'Thomas', 'ONeill', 'M', '1993-01-31', 'Burlington', 'ON', NULL, 180, 117),
+  (8, 'Sonny', 'Beckett', 'M', '1952-12-11', 'Port Hawkesbury', 'NS', NULL, 174, 105),
+  (9, 'Sister', 'Spitzer', 'F', '1966-10-15', 'Toronto', 'ON', 'Penicillin', 173, 95),
+  (10, 'Cedric', 'Coltrane', 'M', '1961-11-10', 'Toronto', 'ON', NULL, 157, 61),
+  (11, 'Hazel', 'Patel', 'F', '1992-04-18', 'Winnipeg', 'MB', 'Codeine', 165, 58),
+  (12, 'Ryan', 'Ng', 'M', '1988-07-02', 'Vancouver', 'BC', NULL, 178, 81),
+  (13, 'Alice', 'Tremblay', 'F', '1975-03-21', 'Montreal', 'QC', 'Peanuts', 162, 70),
+  (14, 'Jonah', 'Singh', 'M', '2001-12-25', 'Calgary', 'AB', NULL, 183, 88),
+  (15, 'Mei', 'Chen', 'F', '1999-06-14', 'Vancouver', 'BC', 'Sulfa', 158, 52),
+  (16, 'Omar', 'Haddad', 'M', '1948-08-09', 'Regina', 'SK', 'Aspirin', 170, 92),
+  (17, 'Grace', 'Kim', 'F', '2010-02-03', 'Toronto', 'ON', NULL, 140, 35),
+  (18, 'Lucas', 'Martin', 'M', '1983-10-27', 'Montreal', 'QC', 'Penicillin', 176, 79),
+  (19, 'Emma', 'Wilson', 'F', '1995-05-05', 'Hamilton', 'ON', NULL, 168, 63),
+  (20, 'Noah', 'Brown', 'M', '1970-01-16', 'Halifax', 'NS', 'Latex', 181, 99);
+
+INSERT INTO doctors VALUES
+  (1, 'Claude', 'Walls', 'Internist'),
+  (2, 'Joshua', 'Green', 'Cardiologist'),
+  (3, 'Miriam', 'Tregre', 'General Surgeon'),
+  (4, 'James', 'Russo', 'Gastroenterologist'),
+  (5, 'Scott', 'Hill', 'Internist'),
+  (6, 'Tasha', 'Phillips', 'Obstetrician/Gynecologist');
+
+INSERT INTO admissions VALUES
+  (1, '2018-09-20', '2018-09-24', 'Ineffective Breathing Pattern', 1),
+  (3, '2019-02-28', '2019-03-04', 'Post Partum Hemorrhage', 6),
+  (3, '2019-06-06', '2019-06-06', 'Abdominal Pain', 4),
+  (4, '2018-12-11', '2018-12-16', 'Diabetes', 1),
+  (6, '2019-01-15', '2019-01-17', 'Bronchitis', 5),
+  (7, '2018-06-07', '2018-06-08', 'Chest Pain', 2),
+  (9, '2018-12-31', '2019-01-04', 'Kidney Stones', 3),
+  (9, '2019-05-22', '2019-05-30', 'Pneumonia', 1),
+  (10, '2019-03-10', '2019-03-12', 'Appendicitis', 3),
+  (12, '2018-11-02', '2018-11-02', 'Migraine', 5),
+  (13, '2019-04-19', '2019-04-25', 'Hypertension', 2),
+  (15, '2019-07-01', '2019-07-03', 'Dehydration', 5),
+  (16, '2018-10-14', '2018-10-21', 'Heart Failure', 2),
+  (18, '2019-08-08', '2019-08-09', 'Fracture', 3),
+  (20, '2019-02-02', '2019-02-07', 'Pneumonia', 1),
+  (20, '2019-09-17', NULL, 'Diabetes', 4);
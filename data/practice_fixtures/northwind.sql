@@ -0,0 +1,181 @@
+-- Northwind practice schema (sql-practice.com layout) with a small sample dataset
+-- Loaded into an in-memory database by sql_checker.py to grade practice answers.
+
+CREATE TABLE categories (
+  category_id INTEGER PRIMARY KEY,
+  category_name TEXT,
+  description TEXT
+);
+
+CREATE TABLE customers (
+  customer_id TEXT PRIMARY KEY,
+  company_name TEXT,
+  contact_name TEXT,
+  contact_title TEXT,
+  address TEXT,
+  city TEXT,
+  region TEXT,
+  postal_code TEXT,
+  country TEXT,
+  phone TEXT,
+  fax TEXT
+);
+
+CREATE TABLE employees (
+  employee_id INTEGER PRIMARY KEY,
+  last_name TEXT,
+  first_name TEXT,
+  title TEXT,
+  title_of_courtesy TEXT,
+  birth_date DATE,
+  hire_date DATE,
+  address TEXT,
+  city TEXT,
+  region TEXT,
+  postal_code TEXT,
+  country TEXT,
+  home_phone TEXT,
+  extension TEXT,
+  reports_to INTEGER REFERENCES employees(employee_id)
+);
+
+CREATE TABLE shippers (
+  shipper_id INTEGER PRIMARY KEY,
+  company_name TEXT,
+  phone TEXT
+);
+
+CREATE TABLE suppliers (
+  supplier_id INTEGER PRIMARY KEY,
+  company_name TEXT,
+  contact_name TEXT,
+  contact_title TEXT,
+  address TEXT,
+  city TEXT,
+  region TEXT,
+  postal_code TEXT,
+  country TEXT,
+  phone TEXT,
+  fax TEXT,
+  home_page TEXT
+);
+
+CREATE TABLE products (
+  product_id INTEGER PRIMARY KEY,
+  product_name TEXT,
+  supplier_id INTEGER REFERENCES suppliers(supplier_id),
+  category_id INTEGER REFERENCES categories(category_id),
+  quantity_per_unit TEXT,
+  unit_price DECIMAL(10, 2),
+  units_in_stock INTEGER,
+  units_on_order INTEGER,
+  reorder_level INTEGER,
+  discontinued INTEGER
+);
+
+CREATE TABLE orders (
+  order_id INTEGER PRIMARY KEY,
+  customer_id TEXT REFERENCES customers(customer_id),
+  employee_id INTEGER REFERENCES employees(employee_id),
+  order_date DATE,
+  required_date DATE,
+  shipped_date DATE,
+  ship_via INTEGER REFERENCES shippers(shipper_id),
+  freight DECIMAL(10, 2),
+  ship_name TEXT,
+  ship_address TEXT,
+  ship_city TEXT,
+  ship_region TEXT,
+  ship_postal_code TEXT,
+  ship_country TEXT
+);
+
+CREATE TABLE order_details (
+  order_id INTEGER REFERENCES orders(order_id),
+  product_id INTEGER REFERENCES products(product_id),
+  unit_price DECIMAL(10, 2),
+  quantity INTEGER,
+  discount REAL
+);
+
+INSERT INTO categories VALUES
+  (1, 'Beverages', 'Soft drinks, coffees, teas, beers, and ales'),
+  (2, 'Condiments', 'Sweet and savory sauces, relishes, spreads, and seasonings'),
+  (3, 'Confections', 'Desserts, candies, and sweet breads'),
+  (4, 'Dairy Products', 'Cheeses'),
+  (5, 'Seafood', 'Seaweed and fish');
+
+INSERT INTO customers VALUES
+  ('ALFKI', 'Alfreds Futterkiste', 'Maria Anders', 'Sales Representative', 'Obere Str. 57', 'Berlin', NULL, '12209', 'Germany', '030-0074321', '030-0076545'),
+  ('ANATR', 'Ana Trujillo Emparedados y helados', 'Ana Trujillo', 'Owner', 'Avda. de la Constitucion 2222', 'Mexico D.F.', NULL, '05021', 'Mexico', '(5) 555-4729', '(5) 555-3745'),
+  ('AROUT', 'Around the Horn', 'Thomas Hardy', 'Sales Representative', '120 Hanover Sq.', 'London', NULL, 'WA1 1DP', 'UK', '(171) 555-7788', '(171) 555-6750'),
+  ('BERGS', 'Berglunds snabbkop', 'Christina Berglund', 'Order Administrator', 'Berguvsvagen 8', 'Lulea', NULL, 'S-958 22', 'Sweden', '0921-12 34 65', '0921-12 34 67'),
+  ('BONAP', 'Bon app', 'Laurence Lebihan', 'Owner', '12, rue des Bouchers', 'Marseille', NULL, '13008', 'France', '91.24.45.40', '91.24.45.41'),
+  ('BOTTM', 'Bottom-Dollar Markets', 'Elizabeth Lincoln', 'Accounting Manager', '23 Tsawassen Blvd.', 'Tsawassen', 'BC', 'T2F 8M4', 'Canada', '(604) 555-4729', '(604) 555-3745'),
+  ('GREAL', 'Great Lakes Food Market', 'Howard Snyder', 'Marketing Manager', '2732 Baker Blvd.', 'Eugene', 'OR', '97403', 'USA', '(503) 555-7555', NULL),
+  ('SEVES', 'Seven Seas Imports', 'Hari Kumar', 'Sales Manager', '90 Wadhurst Rd.', 'London', NULL, 'OX15 4NB', 'UK', '(171) 555-1717', '(171) 555-5646');
+
+INSERT INTO employees VALUES
+  (1, 'Davolio', 'Nancy', 'Sales Representative', 'Ms.', '1968-12-08', '1992-05-01', '507 - 20th Ave. E.', 'Seattle', 'WA', '98122', 'USA', '(206) 555-9857', '5467', 2),
+  (2, 'Fuller', 'Andrew', 'Vice President, Sales', 'Dr.', '1952-02-19', '1992-08-14', '908 W. Capital Way', 'Tacoma', 'WA', '98401', 'USA', '(206) 555-9482', '3457', NULL),
+  (3, 'Leverling', 'Janet', 'Sales Representative', 'Ms.', '1963-08-30', '1992-04-01', '722 Moss Bay Blvd.', 'Kirkland', 'WA', '98033', 'USA', '(206) 555-3412', '3355', 2),
+  (4, 'Peacock', 'Margaret', 'Sales Representative', 'Mrs.', '1958-09-19', '1993-05-03', '4110 Old Redmond Rd.', 'Redmond', 'WA', '98052', 'USA', '(206) 555-8122', '5176', 2),
+  (5, 'Buchanan', 'Steven', 'Sales Manager', 'Mr.', '1955-03-04', '1993-10-17', '14 Garrett Hill', 'London', NULL, 'SW1 8JR', 'UK', '(71) 555-4848', '3453', 2);
+
+INSERT INTO shippers VALUES
+  (1, 'Speedy Express', '(503) 555-9831'),
+  (2, 'United Package', '(503) 555-3199'),
+  (3, 'Federal Shipping', '(503) 555-9931');
+
+INSERT INTO suppliers VALUES
+  (1, 'Exotic Liquids', 'Charlotte Cooper', 'Purchasing Manager', '49 Gilbert St.', 'London', NULL, 'EC1 4SD', 'UK', '(171) 555-2222', NULL, NULL),
+  (2, 'New Orleans Cajun Delights', 'Shelley Burke', 'Order Administrator', 'P.O. Box 78934', 'New Orleans', 'LA', '70117', 'USA', '(100) 555-4822', NULL, '#CAJUN.HTM#'),
+  (3, 'Tokyo Traders', 'Yoshi Nagase', 'Marketing Manager', '9-8 Sekimai Musashino-shi', 'Tokyo', NULL, '100', 'Japan', '(03) 3555-5011', NULL, NULL),
+  (4, 'Pavlova, Ltd.', 'Ian Devling', 'Marketing Manager', '74 Rose St.', 'Melbourne', 'Victoria', '3058', 'Australia', '(03) 444-2343', '(03) 444-6588', NULL);
+
+INSERT INTO products VALUES
+  (1, 'Chai', 1, 1, '10 boxes x 20 bags', 18.00, 39, 0, 10, 0),
+  (2, 'Chang', 1, 1, '24 - 12 oz bottles', 19.00, 17, 40, 25, 0),
+  (3, 'Aniseed Syrup', 1, 2, '12 - 550 ml bottles', 10.00, 13, 70, 25, 0),
+  (4, 'Chef Antons Cajun Seasoning', 2, 2, '48 - 6 oz jars', 22.00, 53, 0, 0, 0),
+  (5, 'Chef Antons Gumbo Mix', 2, 2, '36 boxes', 21.35, 0, 0, 0, 1),
+  (6, 'Mishi Kobe Niku', 3, 5, '18 - 500 g pkgs.', 97.00, 29, 0, 0, 1),
+  (7, 'Ikura', 3, 5, '12 - 200 ml jars', 31.00, 31, 0, 0, 0),
+  (8, 'Pavlova', 4, 3, '32 - 500 g boxes', 17.45, 29, 0, 10, 0),
+  (9, 'Vegie-spread', 4, 2, '15 - 625 g jars', 43.90, 24, 0, 5, 0),
+  (10, 'Queso Cabrales', 4, 4, '1 kg pkg.', 21.00, 22, 30, 30, 0),
+  (11, 'Teatime Chocolate Biscuits', 4, 3, '10 boxes x 12 pieces', 9.20, 25, 0, 5, 0),
+  (12, 'Outback Lager', 4, 1, '24 - 355 ml bottles', 15.00, 15, 10, 30, 0);
+
+INSERT INTO orders VALUES
+  (10248, 'ALFKI', 5, '2016-07-04', '2016-08-01', '2016-07-16', 3, 32.38, 'Alfreds Futterkiste', 'Obere Str. 57', 'Berlin', NULL, '12209', 'Germany'),
+  (10249, 'ANATR', 4, '2016-07-05', '2016-08-16', '2016-07-10', 1, 11.61, 'Ana Trujillo', 'Avda. de la Constitucion 2222', 'Mexico D.F.', NULL, '05021', 'Mexico'),
+  (10250, 'AROUT', 4, '2016-07-08', '2016-08-05', '2016-07-12', 2, 65.83, 'Around the Horn', '120 Hanover Sq.', 'London', NULL, 'WA1 1DP', 'UK'),
+  (10251, 'BERGS', 3, '2016-07-08', '2016-08-05', '2016-07-15', 1, 41.34, 'Berglunds snabbkop', 'Berguvsvagen 8', 'Lulea', NULL, 'S-958 22', 'Sweden'),
+  (10252, 'BONAP', 4, '2016-07-09', '2016-08-06', '2016-07-11', 2, 51.30, 'Bon app', '12, rue des Bouchers', 'Marseille', NULL, '13008', 'France'),
+  (10253, 'BOTTM', 3, '2016-07-10', '2016-07-24', '2016-07-16', 2, 58.17, 'Bottom-Dollar Markets', '23 Tsawassen Blvd.', 'Tsawassen', 'BC', 'T2F 8M4', 'Canada'),
+  (10254, 'GREAL', 5, '2016-07-11', '2016-08-08', '2016-07-23', 2, 22.98, 'Great Lakes Food Market', '2732 Baker Blvd.', 'Eugene', 'OR', '97403', 'USA'),
+  (10255, 'ALFKI', 1, '2016-07-12', '2016-08-09', '2016-07-15', 3, 148.33, 'Alfreds Futterkiste', 'Obere Str. 57', 'Berlin', NULL, '12209', 'Germany'),
+  (10256, 'SEVES', 3, '2016-07-15', '2016-08-12', '2016-07-17', 2, 13.97, 'Seven Seas Imports', '90 Wadhurst Rd.', 'London', NULL, 'OX15 4NB', 'UK'),
+  (10257, 'AROUT', 4, '2016-07-16', '2016-08-13', NULL, 3, 81.91, 'Around the Horn', '120 Hanover Sq.', 'London', NULL, 'WA1 1DP', 'UK');
+
+INSERT INTO order_details VALUES
+  (10248, 11, 9.20, 12, 0),
+  (10248, 3, 10.00, 10, 0),
+  (10249, 6, 97.00, 9, 0),
+  (10249, 10, 21.00, 40, 0),
+  (10250, 4, 22.00, 10, 0),
+  (10250, 9, 43.90, 35, 0.15),
+  (10251, 1, 18.00, 6, 0.05),
+  (10251, 12, 15.00, 15, 0.05),
+  (10252, 8, 17.45, 40, 0.05),
+  (10252, 2, 19.00, 25, 0.05),
+  (10253, 7, 31.00, 20, 0),
+  (10253, 1, 18.00, 42, 0),
+  (10254, 10, 21.00, 15, 0.15),
+  (10255, 2, 19.00, 20, 0),
+  (10255, 8, 17.45, 35, 0),
+  (10256, 12, 15.00, 15, 0),
+  (10256, 7, 31.00, 12, 0),
+  (10257, 4, 22.00, 25, 0),
+  (10257, 11, 9.20, 6, 0);
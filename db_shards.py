@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Per-Profile Database Shards
+===========================
+Purpose: Optional sharded layout for running the tracker for several
+         candidates. Each profile gets its own SQLite file for its
+         pipeline, interviews, practice and learning data, so one
+         profile's writes never wait on another profile's lock.
+Author: Learning System
+Date: 2025-11-24
+
+Layout:
+    data/jobs-tracker.db         shared: scraped_jobs and everything derived
+                                 from postings (descriptions, features, token
+                                 index, signatures, profile_job_scores, ...)
+    data/shards/<profile>.db     per profile: opportunities, interactions,
+                                 questions, practice, sacred work, their
+                                 summary tables, triggers and views
+
+A shard connection ATTACHes the shared database as `shared`. SQLite resolves
+unqualified table names in `main` first, so per-profile tables come from the
+shard and scraped_jobs & co. from the shared file without changing any query.
+
+The shard schema is copied from the shared database's own schema (so every
+applied migration is included), minus the shared tables.
+
+Usage:
+    python3 db_shards.py create <profile> [--copy-data] [--db ./data/jobs-tracker.db]
+    python3 db_shards.py list
+"""
+
+import argparse
+import re
+import sqlite3
+from pathlib import Path
+from typing import List
+
+
+DEFAULT_DB_PATH = './data/jobs-tracker.db'
+DEFAULT_SHARD_DIR = './data/shards'
+
+PROFILE_NAME_RE = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+# Tables describing postings (or their reference data) rather than a
+# candidate; besides these, every table named scraped_job* stays shared
+SHARED_TABLES = {
+    'score_terms', 'index_tokens', 'job_tokens', 'feature_store_meta',
+    'normalized_texts', 'job_signatures', 'job_lsh_buckets',
+    'profile_job_scores', 'scorer_config_state', 'rescore_checkpoints',
+    'currency_rates', 'normalized_locations', 'normalized_location_codes',
+}
+
+# Reference rows every new shard starts with
+SEED_TABLES = ('job_sources',)
+
+
+def is_shared_table(name: str) -> bool:
+    """True if a table lives only in the shared database."""
+    return name in SHARED_TABLES or name.startswith('scraped_job') or name.startswith('sqlite_')
+
+
+def validate_profile(profile: str) -> str:
+    """
+    Check a profile name before it is used in a file path.
+
+    Raises:
+        ValueError: If the name is not 1-64 letters, digits, '_' or '-'
+    """
+    if not profile or not PROFILE_NAME_RE.match(profile):
+        raise ValueError(f"Invalid profile name '{profile}'")
+    return profile
+
+
+def shard_path(profile: str, shard_dir: str = DEFAULT_SHARD_DIR) -> Path:
+    """Path of a profile's shard file."""
+    return Path(shard_dir) / f"{validate_profile(profile)}.db"
+
+
+def list_shards(shard_dir: str = DEFAULT_SHARD_DIR) -> List[str]:
+    """Profiles that have a shard."""
+    directory = Path(shard_dir)
+    if not directory.is_dir():
+        return []
+    return sorted(p.stem for p in directory.glob('*.db') if PROFILE_NAME_RE.match(p.stem))
+
+
+def connect_shard(profile: str, shared_db: str = DEFAULT_DB_PATH,
+                  shard_dir: str = DEFAULT_SHARD_DIR, **connect_args) -> sqlite3.Connection:
+    """
+    Open a profile's shard with the shared database attached.
+
+    Args:
+        profile: Profile name
+        shared_db: Shared database path
+        shard_dir: Directory holding the shards
+        **connect_args: Passed to sqlite3.connect()
+
+    Returns:
+        Connection whose main database is the shard
+
+    Raises:
+        FileNotFoundError: If the profile has no shard
+    """
+    path = shard_path(profile, shard_dir)
+    if not path.exists():
+        raise FileNotFoundError(f"No shard for profile '{profile}' ({path})")
+    conn = sqlite3.connect(str(path), **connect_args)
+    conn.execute("ATTACH DATABASE ? AS shared", (str(Path(shared_db)),))
+    return conn
+
+
+def _profile_schema(conn: sqlite3.Connection, schema: str, types: tuple) -> List[str]:
+    """CREATE statements of the per-profile objects of the given types, in that order."""
+    rows = conn.execute(f"""
+        SELECT type, tbl_name, sql FROM "{schema}".sqlite_master
+        WHERE sql IS NOT NULL
+    """).fetchall()
+    return [sql for obj_type in types
+            for row_type, table, sql in rows
+            if row_type == obj_type and not is_shared_table(table)]
+
+
+def create_shard(profile: str, shared_db: str = DEFAULT_DB_PATH,
+                 shard_dir: str = DEFAULT_SHARD_DIR, copy_data: bool = False) -> Path:
+    """
+    Create a profile's shard from the shared database's schema.
+
+    Args:
+        profile: Profile name
+        shared_db: Shared database path (schema source)
+        shard_dir: Directory holding the shards
+        copy_data: Also copy the rows of every per-profile table (moving the
+            existing single-database profile into a shard); otherwise only
+            SEED_TABLES rows are copied
+
+    Returns:
+        Path of the new shard
+
+    Raises:
+        FileExistsError: If the shard already exists
+    """
+    path = shard_path(profile, shard_dir)
+    if path.exists():
+        raise FileExistsError(f"Shard already exists: {path}")
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    conn = sqlite3.connect(str(path), isolation_level=None)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("ATTACH DATABASE ? AS source", (str(Path(shared_db)),))
+
+        conn.execute("BEGIN")
+        for sql in _profile_schema(conn, 'source', ('table', 'index')):
+            conn.execute(sql)
+        tables = [row[0] for row in conn.execute(
+            "SELECT name FROM main.sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+        )]
+        for name in tables:
+            if copy_data or name in SEED_TABLES:
+                conn.execute(f'INSERT INTO main."{name}" SELECT * FROM source."{name}"')
+        if copy_data:
+            # Keep AUTOINCREMENT from reusing ids deleted before the move
+            conn.execute("""
+                UPDATE main.sqlite_sequence
+                SET seq = MAX(seq, COALESCE(
+                    (SELECT s.seq FROM source.sqlite_sequence s WHERE s.name = sqlite_sequence.name), 0))
+            """)
+
+        # Triggers and views last: summary tables were copied as they are,
+        # and must not be counted again by triggers firing on the copy
+        for sql in _profile_schema(conn, 'source', ('trigger', 'view')):
+            conn.execute(sql)
+        conn.execute("COMMIT")
+        conn.execute("DETACH DATABASE source")
+        return path
+    except Exception:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        conn.close()
+        path.unlink(missing_ok=True)
+        raise
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-profile database shards")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    create_parser = subparsers.add_parser('create', help="create a profile's shard from the shared schema")
+    create_parser.add_argument('profile', help="profile name (letters, digits, '_' or '-')")
+    create_parser.add_argument('--copy-data', action='store_true',
+                               help="copy the existing per-profile rows into the shard")
+    create_parser.add_argument('--db', default=DEFAULT_DB_PATH, help="shared database path")
+    create_parser.add_argument('--shard-dir', default=DEFAULT_SHARD_DIR, help="shard directory")
+
+    list_parser = subparsers.add_parser('list', help="list profiles with a shard")
+    list_parser.add_argument('--shard-dir', default=DEFAULT_SHARD_DIR, help="shard directory")
+
+    args = parser.parse_args()
+
+    if args.command == 'create':
+        created = create_shard(args.profile, args.db, args.shard_dir, args.copy_data)
+        print(f"✅ Created shard {created}")
+        print(f"   Route requests with 'X-Profile: {args.profile}' or the /p/{args.profile}/ prefix")
+    else:
+        for name in list_shards(args.shard_dir):
+            print(name)
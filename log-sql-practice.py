@@ -12,13 +12,25 @@ OOP CONCEPTS USED (for your learning):
 2. Encapsulation: Data validation in methods (validate_platform, validate_difficulty)
 3. Single Responsibility: Each class has one job (PracticeSession = data, SessionLogger = database)
 4. Dependency Injection: SessionLogger accepts db_path, making it testable
+
+USAGE:
+    python3 log-sql-practice.py                         # interactive
+    python3 log-sql-practice.py --import sessions.csv   # bulk import (.csv or JSON lines)
 """
 
+import argparse
+import csv
+import hashlib
+import json
+import os
 import sqlite3
-from datetime import datetime
-from typing import Optional, List
+from datetime import date, datetime
+from typing import Dict, Iterator, Optional, List, Tuple
 import sys
 
+from practice_analytics import migrations_hint, missing_migrations, refresh_practice_sessions
+import sql_checker
+
 
 # ==========================================
 # CLASS 1: Data Model (Represents one practice session)
@@ -53,7 +65,8 @@ class PracticeSession:
         error_made: Optional[str] = None,
         lesson_learned: Optional[str] = None,
         keywords_used: Optional[str] = None,
-        notes: Optional[str] = None
+        notes: Optional[str] = None,
+        practice_date: Optional[str] = None
     ):
         """
         Constructor - initializes the object with data.
@@ -77,7 +90,8 @@ class PracticeSession:
         self.lesson_learned = lesson_learned
         self.keywords_used = keywords_used
         self.notes = notes
-        self.practice_date = datetime.now().date()
+        # Imported sessions carry their own date; interactive ones are logged today
+        self.practice_date = self._validate_date(practice_date) if practice_date else datetime.now().date()
 
     def _validate_platform(self, platform: str) -> str:
         """
@@ -109,6 +123,32 @@ class PracticeSession:
             raise ValueError(f"Database must be one of: {', '.join(self.VALID_DATABASES)}")
         return normalized
 
+    def _validate_date(self, practice_date) -> date:
+        """Validate an ISO practice date (YYYY-MM-DD)"""
+        if isinstance(practice_date, date):
+            return practice_date
+        try:
+            return date.fromisoformat(str(practice_date).strip()[:10])
+        except ValueError:
+            raise ValueError(f"Practice date must be YYYY-MM-DD, got '{practice_date}'")
+
+    @staticmethod
+    def hash_content(practice_date, platform, database_used, question_text, my_query) -> str:
+        """
+        SHA-256 identifying a session, used to skip duplicates on import.
+
+        WHY STATIC?
+        Existing database rows are hashed too, without building an object.
+        """
+        parts = [str(practice_date), platform, database_used or '',
+                 ' '.join((question_text or '').split()), ' '.join((my_query or '').split())]
+        return hashlib.sha256('\x1f'.join(parts).encode('utf-8')).hexdigest()
+
+    def content_hash(self) -> str:
+        """Hash of date, platform, database, question and query"""
+        return self.hash_content(self.practice_date, self.platform, self.database_used,
+                                 self.question_text, self.my_query)
+
     def to_dict(self) -> dict:
         """
         Convert object to dictionary for database insertion.
@@ -130,7 +170,8 @@ class PracticeSession:
             'error_made': self.error_made,
             'lesson_learned': self.lesson_learned,
             'keywords_used': self.keywords_used,
-            'notes': self.notes
+            'notes': self.notes,
+            'content_hash': self.content_hash()
         }
 
     def __str__(self) -> str:
@@ -179,14 +220,31 @@ class SessionLogger:
         Defensive programming - ensures database is ready.
         Prevents cryptic "no such table" errors.
         """
-        # We assume migration already ran, but this is a safety check
-        pass
+        # We assume migration already ran, but this is a safety check.
+        # The analytics tables (migration 007+) are optional: without them
+        # sessions are still logged, only the summaries are not refreshed.
+        conn = sqlite3.connect(self.db_path)
+        try:
+            self.analytics_missing = missing_migrations(conn)
+        finally:
+            conn.close()
+
+    def _warn_analytics_missing(self):
+        """Say why the practice summaries are not updated"""
+        print(f"\n⚠️  Practice analytics not updated: {migrations_hint(self.analytics_missing)}, "
+              f"then run python3 practice_analytics.py rebuild")
+
+    @staticmethod
+    def _columns(conn: sqlite3.Connection) -> set:
+        """Columns of sql_practice_sessions (content_hash needs migration 009)"""
+        return {row[1] for row in conn.execute("PRAGMA table_info(sql_practice_sessions)")}
 
-    def save(self, session: PracticeSession) -> int:
+    def save(self, session: PracticeSession) -> Optional[int]:
         """
         Save a practice session to database.
 
-        RETURNS: The ID of the inserted row
+        RETURNS: The ID of the inserted row, or None if the same session is
+        already logged
 
         WHY RETURN ID?
         - Confirmation that save succeeded
@@ -197,6 +255,8 @@ class SessionLogger:
 
         # Convert object to dictionary
         data = session.to_dict()
+        if 'content_hash' not in self._columns(conn):
+            del data['content_hash']  # migration 009 not applied yet
 
         # Build SQL dynamically (safer than hardcoding columns)
         columns = ', '.join(data.keys())
@@ -205,10 +265,29 @@ class SessionLogger:
 
         try:
             cursor.execute(sql, list(data.values()))
-            conn.commit()
             session_id = cursor.lastrowid
+            if self.analytics_missing:
+                conn.commit()
+                print(f"\n✅ Session #{session_id} saved successfully!")
+                self._warn_analytics_missing()
+                return session_id
+            # Tag keywords and update the materialized analytics in the same transaction
+            refresh_practice_sessions(conn, [session_id])
+            conn.commit()
             print(f"\n✅ Session #{session_id} saved successfully!")
+            keywords = [row[0] for row in cursor.execute(
+                "SELECT keyword FROM session_keywords WHERE session_id = ?", (session_id,)
+            )]
+            if keywords:
+                print(f"   🔑 Keywords: {', '.join(keywords)}")
             return session_id
+        except sqlite3.IntegrityError as e:
+            conn.rollback()
+            if 'content_hash' in str(e):
+                print("\n⚠️  This session is already logged (same date, platform, question and query)")
+                return None
+            print(f"\n❌ Database error: {e}")
+            raise
         except sqlite3.Error as e:
             print(f"\n❌ Database error: {e}")
             conn.rollback()
@@ -217,6 +296,166 @@ class SessionLogger:
             # ALWAYS close connections (prevents database locks)
             conn.close()
 
+    def import_file(self, path: str, chunk_size: int = 500) -> Dict:
+        """
+        Bulk-load sessions from a CSV or JSON lines file.
+
+        Rows are streamed, validated through PracticeSession and inserted with
+        executemany, one transaction per chunk. Sessions whose content_hash is
+        already in the database (or earlier in the file) are skipped.
+
+        RETURNS: {'inserted': int, 'duplicates': int, 'errors': [(line, message)]}
+        """
+        report = {'inserted': 0, 'duplicates': 0, 'errors': []}
+        conn = sqlite3.connect(self.db_path, isolation_level=None)
+        try:
+            if 'content_hash' not in self._columns(conn):
+                report['errors'].append((0, "content_hash column missing; apply "
+                                            "migrations/009_add_practice_content_hash.sql first"))
+                return report
+            self._backfill_content_hashes(conn)
+            if self.analytics_missing:
+                self._warn_analytics_missing()
+            seen = set()
+            chunk = []
+            for line_no, record in self._read_records(path, report['errors']):
+                try:
+                    session = self._session_from_record(record)
+                except (ValueError, TypeError) as e:
+                    report['errors'].append((line_no, str(e)))
+                    continue
+                data = session.to_dict()
+                if data['content_hash'] in seen:
+                    report['duplicates'] += 1
+                    continue
+                seen.add(data['content_hash'])
+                chunk.append((line_no, data))
+                if len(chunk) >= chunk_size:
+                    self._insert_chunk(conn, chunk, report)
+                    chunk = []
+            if chunk:
+                self._insert_chunk(conn, chunk, report)
+            return report
+        finally:
+            conn.close()
+
+    def _insert_chunk(self, conn: sqlite3.Connection, chunk: List[Tuple[int, dict]], report: Dict):
+        """Insert one chunk in its own transaction and refresh analytics for it"""
+        hashes = [data['content_hash'] for _, data in chunk]
+        placeholders = ', '.join('?' for _ in hashes)
+
+        conn.execute("BEGIN")
+        try:
+            existing = {row[0] for row in conn.execute(
+                f"SELECT content_hash FROM sql_practice_sessions WHERE content_hash IN ({placeholders})",
+                hashes
+            )}
+            rows = [data for _, data in chunk if data['content_hash'] not in existing]
+            report['duplicates'] += len(chunk) - len(rows)
+
+            if rows:
+                columns = list(rows[0].keys())
+                inserted = conn.executemany(
+                    f"INSERT OR IGNORE INTO sql_practice_sessions ({', '.join(columns)}) "
+                    f"VALUES ({', '.join('?' for _ in columns)})",
+                    [[data[column] for column in columns] for data in rows]
+                ).rowcount
+                # Rows of this chunk's new hashes are the ones just inserted (unique index)
+                new_hashes = [data['content_hash'] for data in rows]
+                new_ids = [row[0] for row in conn.execute(
+                    f"SELECT id FROM sql_practice_sessions WHERE content_hash IN "
+                    f"({', '.join('?' for _ in new_hashes)})", new_hashes
+                )]
+                if not self.analytics_missing:
+                    refresh_practice_sessions(conn, new_ids)
+                report['inserted'] += inserted
+            conn.execute("COMMIT")
+        except sqlite3.Error as e:
+            first, last = chunk[0][0], chunk[-1][0]
+            report['errors'].append((first, f"chunk (lines {first}-{last}) not imported: {e}"))
+        finally:
+            # Any failure (not only sqlite3.Error) must not leave the transaction open
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+
+    def _read_records(self, path: str, errors: List[Tuple[int, str]]) -> Iterator[Tuple[int, dict]]:
+        """Stream (line number, record) pairs from a .csv or JSON lines file"""
+        extension = os.path.splitext(path)[1].lower()
+        with open(path, newline='', encoding='utf-8') as f:
+            if extension == '.csv':
+                reader = csv.DictReader(f)
+                for record in reader:
+                    yield reader.line_num, record
+                return
+
+            for line_no, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError as e:
+                    errors.append((line_no, f"invalid JSON: {e}"))
+                    continue
+                if not isinstance(record, dict):
+                    errors.append((line_no, "expected a JSON object"))
+                    continue
+                yield line_no, record
+
+    def _session_from_record(self, record: dict) -> PracticeSession:
+        """Build a validated PracticeSession from an import row"""
+        # CSV gives '' for empty cells; treat those like missing values
+        values = {key: (value.strip() if isinstance(value, str) else value)
+                  for key, value in record.items() if key}
+        values = {key: value for key, value in values.items() if value not in ('', None)}
+
+        for field in ('question_text', 'my_query', 'platform'):
+            if field not in values:
+                raise ValueError(f"Missing required field '{field}'")
+
+        is_correct = values.get('is_correct', False)
+        if isinstance(is_correct, str):
+            is_correct = is_correct.lower() in ['y', 'yes', '1', 'true']
+
+        time_spent = values.get('time_spent_minutes')
+        if time_spent is not None:
+            try:
+                time_spent = int(time_spent)
+            except (TypeError, ValueError):
+                raise ValueError(f"time_spent_minutes must be a whole number, got '{time_spent}'")
+
+        return PracticeSession(
+            question_text=str(values['question_text']),
+            my_query=str(values['my_query']),
+            platform=str(values['platform']),
+            difficulty=str(values.get('difficulty', 'Medium')),
+            database_used=str(values.get('database_used', 'None')),
+            correct_query=values.get('correct_query'),
+            is_correct=bool(is_correct),
+            time_spent_minutes=time_spent,
+            error_made=values.get('error_made'),
+            lesson_learned=values.get('lesson_learned'),
+            keywords_used=values.get('keywords_used'),
+            notes=values.get('notes'),
+            practice_date=values.get('practice_date')
+        )
+
+    def _backfill_content_hashes(self, conn: sqlite3.Connection):
+        """Hash rows logged before migration 009 so imports can skip them"""
+        rows = conn.execute("""
+            SELECT id, practice_date, platform, database_used, question_text, my_query
+            FROM sql_practice_sessions
+            WHERE content_hash IS NULL
+        """).fetchall()
+        if not rows:
+            return
+        conn.execute("BEGIN")
+        # OR IGNORE: a row that duplicates an earlier one keeps a NULL hash
+        conn.executemany(
+            "UPDATE OR IGNORE sql_practice_sessions SET content_hash = ? WHERE id = ?",
+            [(PracticeSession.hash_content(*row[1:]), row[0]) for row in rows]
+        )
+        conn.execute("COMMIT")
+
     def get_recent_sessions(self, limit: int = 5) -> List[dict]:
         """
         Fetch recent practice sessions.
@@ -281,11 +520,14 @@ class InteractiveCLI:
         # Optional fields
         print("\n--- Optional Details (press Enter to skip) ---")
         correct_query = input("Correct query (if different): ").strip() or None
-        is_correct = self._input_yes_no("Did you get it correct?", default=False)
+        # Grade against the practice fixtures when we can; the answer becomes the default
+        auto_correct = self._auto_check(my_query, correct_query, database)
+        is_correct = self._input_yes_no("Did you get it correct?", default=auto_correct)
         time_spent = self._input_int("Time spent (minutes)", optional=True)
         error_made = input("What error did you make? ").strip() or None
         lesson_learned = input("Key lesson learned: ").strip() or None
-        keywords = input("SQL keywords used (comma-separated, e.g., WHERE, JOIN): ").strip() or None
+        # Keywords are detected from your query automatically; add any extras here
+        keywords = input("Extra SQL keywords (auto-detected from query; comma-separated): ").strip() or None
         notes = input("Additional notes: ").strip() or None
 
         # Create and save session
@@ -305,7 +547,8 @@ class InteractiveCLI:
                 notes=notes
             )
 
-            self.logger.save(session)
+            if self.logger.save(session) is None:
+                return  # already logged
             print(f"\n{session}")
 
             # Show recent sessions
@@ -315,6 +558,19 @@ class InteractiveCLI:
             print(f"\n❌ Validation Error: {e}")
             sys.exit(1)
 
+    def _auto_check(self, my_query: str, correct_query: Optional[str], database: str) -> bool:
+        """Run sql_checker on Hospital/Northwind answers and print the verdict"""
+        database = database.strip().title()
+        if not correct_query or not sql_checker.supports(database):
+            return False
+        result = sql_checker.check_answer(my_query, correct_query, database)
+        if result['is_correct'] is None:
+            print(f"  ⚠️  Auto-check skipped: {result['message']}")
+            return False
+        icon = "✅" if result['is_correct'] else "❌"
+        print(f"  {icon} Auto-check ({database}): {result['status']} - {result['message']}")
+        return result['is_correct']
+
     def _input_required(self, prompt: str) -> str:
         """Helper: Get required input (can't be empty)"""
         while True:
@@ -373,7 +629,24 @@ def main():
     - Allows importing without running (useful for testing)
     - Keeps global scope clean
     """
-    logger = SessionLogger()  # Create database handler
+    parser = argparse.ArgumentParser(description="Log SQL practice sessions")
+    parser.add_argument('--import', dest='import_path', metavar='FILE',
+                        help="bulk import sessions from a .csv or JSON lines file")
+    parser.add_argument('--chunk-size', type=int, default=500,
+                        help="rows per import transaction (default: 500)")
+    parser.add_argument('--db', default='./data/jobs-tracker.db', help="SQLite database path")
+    args = parser.parse_args()
+
+    logger = SessionLogger(args.db)  # Create database handler
+
+    if args.import_path:
+        report = logger.import_file(args.import_path, chunk_size=args.chunk_size)
+        print(f"✅ Imported {report['inserted']} sessions "
+              f"({report['duplicates']} duplicates skipped, {len(report['errors'])} errors)")
+        for line_no, message in report['errors']:
+            print(f"   ❌ line {line_no}: {message}")
+        sys.exit(1 if report['errors'] else 0)
+
     cli = InteractiveCLI(logger)  # Create UI with injected logger
     cli.run()  # Start interactive session
 
@@ -0,0 +1,205 @@
+-- Migration 006: Trigger-maintained aggregate tables for dashboard stats
+--
+-- /api/metrics, /api/scraped-jobs/stats and RemoteOKIntegration.get_summary_stats
+-- used to scan opportunities / scraped_jobs on every request. These summary
+-- tables hold one row per distinct (source, score bucket) and
+-- (status, is_remote, priority) combination, so readers sum a handful of rows.
+--
+-- Triggers keep the counts current on INSERT, UPDATE and DELETE. The migration
+-- is safe to re-run: it rebuilds both tables from the base tables.
+--
+-- Requires scraped_jobs to exist (created by scrapers/remoteok_integration.py).
+--
+-- Usage:
+--   sqlite3 data/jobs-tracker.db < migrations/006_add_dashboard_aggregates.sql
+
+BEGIN TRANSACTION;
+
+-- ======================================
+-- Scraped jobs: counts per source and score bucket
+-- ======================================
+-- score_bucket uses the same thresholds as SimpleJobScorer.score_job:
+--   EXCELLENT >= 85, HIGH_FIT >= 75, MEDIUM_FIT >= 65, LOW_FIT >= 40, NO_FIT < 40
+-- Rows with a NULL match_score land in the UNSCORED bucket.
+CREATE TABLE IF NOT EXISTS scraped_job_stats (
+    source TEXT NOT NULL,
+    score_bucket TEXT NOT NULL,
+    job_count INTEGER NOT NULL DEFAULT 0,
+    score_sum REAL NOT NULL DEFAULT 0,
+    imported_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (source, score_bucket)
+);
+
+DELETE FROM scraped_job_stats;
+
+INSERT INTO scraped_job_stats (source, score_bucket, job_count, score_sum, imported_count)
+SELECT
+    COALESCE(source, ''),
+    CASE
+        WHEN match_score IS NULL THEN 'UNSCORED'
+        WHEN match_score >= 85 THEN 'EXCELLENT'
+        WHEN match_score >= 75 THEN 'HIGH_FIT'
+        WHEN match_score >= 65 THEN 'MEDIUM_FIT'
+        WHEN match_score >= 40 THEN 'LOW_FIT'
+        ELSE 'NO_FIT'
+    END AS score_bucket,
+    COUNT(*),
+    COALESCE(SUM(match_score), 0),
+    SUM(CASE WHEN imported_to_opportunities = 1 THEN 1 ELSE 0 END)
+FROM scraped_jobs
+GROUP BY 1, 2;
+
+DROP TRIGGER IF EXISTS scraped_job_stats_insert;
+CREATE TRIGGER scraped_job_stats_insert
+AFTER INSERT ON scraped_jobs
+BEGIN
+    INSERT INTO scraped_job_stats (source, score_bucket, job_count, score_sum, imported_count)
+    VALUES (
+        COALESCE(NEW.source, ''),
+        CASE
+            WHEN NEW.match_score IS NULL THEN 'UNSCORED'
+            WHEN NEW.match_score >= 85 THEN 'EXCELLENT'
+            WHEN NEW.match_score >= 75 THEN 'HIGH_FIT'
+            WHEN NEW.match_score >= 65 THEN 'MEDIUM_FIT'
+            WHEN NEW.match_score >= 40 THEN 'LOW_FIT'
+            ELSE 'NO_FIT'
+        END,
+        1,
+        COALESCE(NEW.match_score, 0),
+        CASE WHEN NEW.imported_to_opportunities = 1 THEN 1 ELSE 0 END
+    )
+    ON CONFLICT (source, score_bucket) DO UPDATE SET
+        job_count = job_count + excluded.job_count,
+        score_sum = score_sum + excluded.score_sum,
+        imported_count = imported_count + excluded.imported_count;
+END;
+
+DROP TRIGGER IF EXISTS scraped_job_stats_delete;
+CREATE TRIGGER scraped_job_stats_delete
+AFTER DELETE ON scraped_jobs
+BEGIN
+    UPDATE scraped_job_stats
+    SET job_count = job_count - 1,
+        score_sum = score_sum - COALESCE(OLD.match_score, 0),
+        imported_count = imported_count - CASE WHEN OLD.imported_to_opportunities = 1 THEN 1 ELSE 0 END
+    WHERE source = COALESCE(OLD.source, '')
+      AND score_bucket = CASE
+            WHEN OLD.match_score IS NULL THEN 'UNSCORED'
+            WHEN OLD.match_score >= 85 THEN 'EXCELLENT'
+            WHEN OLD.match_score >= 75 THEN 'HIGH_FIT'
+            WHEN OLD.match_score >= 65 THEN 'MEDIUM_FIT'
+            WHEN OLD.match_score >= 40 THEN 'LOW_FIT'
+            ELSE 'NO_FIT'
+        END;
+END;
+
+-- An UPDATE is a delete of the old row's contribution plus an insert of the new one
+DROP TRIGGER IF EXISTS scraped_job_stats_update;
+CREATE TRIGGER scraped_job_stats_update
+AFTER UPDATE OF source, match_score, imported_to_opportunities ON scraped_jobs
+BEGIN
+    UPDATE scraped_job_stats
+    SET job_count = job_count - 1,
+        score_sum = score_sum - COALESCE(OLD.match_score, 0),
+        imported_count = imported_count - CASE WHEN OLD.imported_to_opportunities = 1 THEN 1 ELSE 0 END
+    WHERE source = COALESCE(OLD.source, '')
+      AND score_bucket = CASE
+            WHEN OLD.match_score IS NULL THEN 'UNSCORED'
+            WHEN OLD.match_score >= 85 THEN 'EXCELLENT'
+            WHEN OLD.match_score >= 75 THEN 'HIGH_FIT'
+            WHEN OLD.match_score >= 65 THEN 'MEDIUM_FIT'
+            WHEN OLD.match_score >= 40 THEN 'LOW_FIT'
+            ELSE 'NO_FIT'
+        END;
+
+    INSERT INTO scraped_job_stats (source, score_bucket, job_count, score_sum, imported_count)
+    VALUES (
+        COALESCE(NEW.source, ''),
+        CASE
+            WHEN NEW.match_score IS NULL THEN 'UNSCORED'
+            WHEN NEW.match_score >= 85 THEN 'EXCELLENT'
+            WHEN NEW.match_score >= 75 THEN 'HIGH_FIT'
+            WHEN NEW.match_score >= 65 THEN 'MEDIUM_FIT'
+            WHEN NEW.match_score >= 40 THEN 'LOW_FIT'
+            ELSE 'NO_FIT'
+        END,
+        1,
+        COALESCE(NEW.match_score, 0),
+        CASE WHEN NEW.imported_to_opportunities = 1 THEN 1 ELSE 0 END
+    )
+    ON CONFLICT (source, score_bucket) DO UPDATE SET
+        job_count = job_count + excluded.job_count,
+        score_sum = score_sum + excluded.score_sum,
+        imported_count = imported_count + excluded.imported_count;
+END;
+
+-- ======================================
+-- Opportunities: counts per status, remote flag and priority
+-- ======================================
+CREATE TABLE IF NOT EXISTS opportunity_stats (
+    status TEXT NOT NULL,
+    is_remote INTEGER NOT NULL,
+    priority TEXT NOT NULL,
+    opportunity_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (status, is_remote, priority)
+);
+
+DELETE FROM opportunity_stats;
+
+INSERT INTO opportunity_stats (status, is_remote, priority, opportunity_count)
+SELECT
+    COALESCE(status, ''),
+    CASE WHEN is_remote = 1 THEN 1 ELSE 0 END,
+    COALESCE(priority, ''),
+    COUNT(*)
+FROM opportunities
+GROUP BY 1, 2, 3;
+
+DROP TRIGGER IF EXISTS opportunity_stats_insert;
+CREATE TRIGGER opportunity_stats_insert
+AFTER INSERT ON opportunities
+BEGIN
+    INSERT INTO opportunity_stats (status, is_remote, priority, opportunity_count)
+    VALUES (
+        COALESCE(NEW.status, ''),
+        CASE WHEN NEW.is_remote = 1 THEN 1 ELSE 0 END,
+        COALESCE(NEW.priority, ''),
+        1
+    )
+    ON CONFLICT (status, is_remote, priority) DO UPDATE SET
+        opportunity_count = opportunity_count + 1;
+END;
+
+DROP TRIGGER IF EXISTS opportunity_stats_delete;
+CREATE TRIGGER opportunity_stats_delete
+AFTER DELETE ON opportunities
+BEGIN
+    UPDATE opportunity_stats
+    SET opportunity_count = opportunity_count - 1
+    WHERE status = COALESCE(OLD.status, '')
+      AND is_remote = CASE WHEN OLD.is_remote = 1 THEN 1 ELSE 0 END
+      AND priority = COALESCE(OLD.priority, '');
+END;
+
+DROP TRIGGER IF EXISTS opportunity_stats_update;
+CREATE TRIGGER opportunity_stats_update
+AFTER UPDATE OF status, is_remote, priority ON opportunities
+BEGIN
+    UPDATE opportunity_stats
+    SET opportunity_count = opportunity_count - 1
+    WHERE status = COALESCE(OLD.status, '')
+      AND is_remote = CASE WHEN OLD.is_remote = 1 THEN 1 ELSE 0 END
+      AND priority = COALESCE(OLD.priority, '');
+
+    INSERT INTO opportunity_stats (status, is_remote, priority, opportunity_count)
+    VALUES (
+        COALESCE(NEW.status, ''),
+        CASE WHEN NEW.is_remote = 1 THEN 1 ELSE 0 END,
+        COALESCE(NEW.priority, ''),
+        1
+    )
+    ON CONFLICT (status, is_remote, priority) DO UPDATE SET
+        opportunity_count = opportunity_count + 1;
+END;
+
+COMMIT;
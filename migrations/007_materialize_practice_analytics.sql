@@ -0,0 +1,134 @@
+-- Migration 007: Materialized learning and practice analytics
+--
+-- The sql_keyword_mastery, weekly_practice_summary, common_practice_mistakes,
+-- learning_gaps and study_priority views recompute their aggregates from the
+-- raw tables on every API request. These tables hold the same aggregates and
+-- are refreshed incrementally:
+--
+--   * practice_* tables  - by SessionLogger.save (log-sql-practice.py)
+--   * learning_gap_stats - by POST /api/add-question
+--   * study_topic_progress - by triggers on learning_sessions (no app writer)
+--
+-- The views are kept for ad-hoc use (queries/weekly-practice-summary.sql).
+--
+-- Usage:
+--   sqlite3 data/jobs-tracker.db < migrations/007_materialize_practice_analytics.sql
+--   python3 practice_analytics.py rebuild     # populate / recover the tables
+
+BEGIN TRANSACTION;
+
+-- ======================================
+-- SQL practice analytics
+-- ======================================
+-- Raw counters are stored; accuracy and averages are derived at read time
+CREATE TABLE IF NOT EXISTS practice_keyword_stats (
+    keyword TEXT PRIMARY KEY,
+    practice_count INTEGER NOT NULL DEFAULT 0,
+    correct_count INTEGER NOT NULL DEFAULT 0,
+    total_minutes INTEGER NOT NULL DEFAULT 0,
+    timed_count INTEGER NOT NULL DEFAULT 0   -- sessions with time_spent_minutes set
+);
+
+CREATE TABLE IF NOT EXISTS practice_weekly_stats (
+    week TEXT PRIMARY KEY,                   -- strftime('%Y-W%W', practice_date)
+    total_sessions INTEGER NOT NULL DEFAULT 0,
+    platforms_used INTEGER NOT NULL DEFAULT 0,
+    correct_answers INTEGER NOT NULL DEFAULT 0,
+    total_minutes INTEGER,
+    easy_questions INTEGER NOT NULL DEFAULT 0,
+    medium_questions INTEGER NOT NULL DEFAULT 0,
+    hard_questions INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS practice_mistake_stats (
+    error_made TEXT PRIMARY KEY,
+    occurrence_count INTEGER NOT NULL DEFAULT 0,
+    concepts_affected TEXT,
+    avg_recovery_time REAL
+);
+
+CREATE INDEX IF NOT EXISTS idx_practice_mistake_occurrences
+    ON practice_mistake_stats(occurrence_count DESC);
+
+-- Lets a single error group be recomputed without a table scan
+CREATE INDEX IF NOT EXISTS idx_practice_error_made
+    ON sql_practice_sessions(error_made);
+
+-- ======================================
+-- Interview learning gaps
+-- ======================================
+-- NULL question_type / difficulty are stored as '' so they can be keyed
+CREATE TABLE IF NOT EXISTS learning_gap_stats (
+    question_type TEXT NOT NULL,
+    difficulty TEXT NOT NULL,
+    question_count INTEGER NOT NULL DEFAULT 0,
+    rating_sum INTEGER NOT NULL DEFAULT 0,
+    rating_count INTEGER NOT NULL DEFAULT 0,
+    weak_count INTEGER NOT NULL DEFAULT 0,   -- my_rating <= 2
+    PRIMARY KEY (question_type, difficulty)
+);
+
+-- ======================================
+-- Study topic progress (trigger-maintained)
+-- ======================================
+CREATE TABLE IF NOT EXISTS study_topic_progress (
+    topic_id INTEGER PRIMARY KEY,
+    session_count INTEGER NOT NULL DEFAULT 0,
+    total_minutes INTEGER NOT NULL DEFAULT 0
+);
+
+DELETE FROM study_topic_progress;
+
+INSERT INTO study_topic_progress (topic_id, session_count, total_minutes)
+SELECT topic_id, COUNT(*), SUM(duration_minutes)
+FROM learning_sessions
+WHERE topic_id IS NOT NULL
+GROUP BY topic_id;
+
+DROP TRIGGER IF EXISTS study_topic_progress_insert;
+CREATE TRIGGER study_topic_progress_insert
+AFTER INSERT ON learning_sessions
+WHEN NEW.topic_id IS NOT NULL
+BEGIN
+    INSERT INTO study_topic_progress (topic_id, session_count, total_minutes)
+    VALUES (NEW.topic_id, 1, NEW.duration_minutes)
+    ON CONFLICT (topic_id) DO UPDATE SET
+        session_count = session_count + 1,
+        total_minutes = total_minutes + excluded.total_minutes;
+END;
+
+DROP TRIGGER IF EXISTS study_topic_progress_delete;
+CREATE TRIGGER study_topic_progress_delete
+AFTER DELETE ON learning_sessions
+WHEN OLD.topic_id IS NOT NULL
+BEGIN
+    UPDATE study_topic_progress
+    SET session_count = session_count - 1,
+        total_minutes = total_minutes - OLD.duration_minutes
+    WHERE topic_id = OLD.topic_id;
+
+    DELETE FROM study_topic_progress
+    WHERE topic_id = OLD.topic_id AND session_count <= 0;
+END;
+
+DROP TRIGGER IF EXISTS study_topic_progress_update;
+CREATE TRIGGER study_topic_progress_update
+AFTER UPDATE OF topic_id, duration_minutes ON learning_sessions
+BEGIN
+    UPDATE study_topic_progress
+    SET session_count = session_count - 1,
+        total_minutes = total_minutes - OLD.duration_minutes
+    WHERE topic_id = OLD.topic_id;
+
+    DELETE FROM study_topic_progress
+    WHERE topic_id = OLD.topic_id AND session_count <= 0;
+
+    INSERT INTO study_topic_progress (topic_id, session_count, total_minutes)
+    SELECT NEW.topic_id, 1, NEW.duration_minutes
+    WHERE NEW.topic_id IS NOT NULL
+    ON CONFLICT (topic_id) DO UPDATE SET
+        session_count = session_count + 1,
+        total_minutes = total_minutes + excluded.total_minutes;
+END;
+
+COMMIT;
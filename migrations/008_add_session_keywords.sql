@@ -0,0 +1,62 @@
+-- Migration 008: Normalized session_keywords junction table
+--
+-- keywords_used is free text typed by the user, so keyword mastery had to
+-- split and pattern-match it. SessionLogger.save now tokenizes my_query with
+-- sql_lexer.py and writes one (session_id, keyword) row per SQL concept,
+-- merged with any keywords typed by hand.
+--
+-- Usage:
+--   sqlite3 data/jobs-tracker.db < migrations/008_add_session_keywords.sql
+--   python3 practice_analytics.py backfill-keywords   # tag existing sessions
+
+BEGIN TRANSACTION;
+
+CREATE TABLE IF NOT EXISTS session_keywords (
+    session_id INTEGER NOT NULL REFERENCES sql_practice_sessions(id) ON DELETE CASCADE,
+    keyword TEXT NOT NULL,
+    PRIMARY KEY (session_id, keyword)
+) WITHOUT ROWID;
+
+-- Keyword -> sessions lookups for mastery GROUP BYs
+CREATE INDEX IF NOT EXISTS idx_session_keywords_keyword
+    ON session_keywords(keyword, session_id);
+
+-- foreign_keys is off by default in this project, so cascade by trigger
+DROP TRIGGER IF EXISTS session_keywords_cleanup;
+CREATE TRIGGER session_keywords_cleanup
+AFTER DELETE ON sql_practice_sessions
+BEGIN
+    DELETE FROM session_keywords WHERE session_id = OLD.id;
+END;
+
+-- Ad-hoc views (queries/weekly-practice-summary.sql) read the junction too
+DROP VIEW IF EXISTS sql_keyword_mastery;
+CREATE VIEW sql_keyword_mastery AS
+SELECT
+  sk.keyword,
+  COUNT(*) as practice_count,
+  SUM(CASE WHEN s.is_correct = 1 THEN 1 ELSE 0 END) as correct_count,
+  ROUND(100.0 * SUM(CASE WHEN s.is_correct = 1 THEN 1 ELSE 0 END) / COUNT(*), 1) as accuracy_percentage,
+  ROUND(AVG(s.time_spent_minutes), 1) as avg_time_minutes
+FROM session_keywords sk
+JOIN sql_practice_sessions s ON s.id = sk.session_id
+GROUP BY sk.keyword
+ORDER BY practice_count DESC, accuracy_percentage ASC;
+
+DROP VIEW IF EXISTS common_practice_mistakes;
+CREATE VIEW common_practice_mistakes AS
+SELECT
+  s.error_made,
+  COUNT(*) as occurrence_count,
+  (SELECT GROUP_CONCAT(DISTINCT sk.keyword)
+     FROM session_keywords sk
+     JOIN sql_practice_sessions s2 ON s2.id = sk.session_id
+    WHERE s2.error_made = s.error_made) as concepts_affected,
+  ROUND(AVG(s.time_spent_minutes), 1) as avg_recovery_time
+FROM sql_practice_sessions s
+WHERE s.error_made IS NOT NULL AND s.error_made != ''
+GROUP BY s.error_made
+ORDER BY occurrence_count DESC
+LIMIT 10;
+
+COMMIT;
@@ -0,0 +1,17 @@
+-- Migration 009: content_hash for de-duplicating practice sessions
+--
+-- Bulk imports (python3 log-sql-practice.py --import FILE) may load the same
+-- session export more than once. content_hash is a SHA-256 of the session's
+-- date, platform, database, question and query (whitespace-normalized),
+-- computed by PracticeSession.content_hash() in log-sql-practice.py.
+--
+-- Existing rows keep NULL until the first import fills them in (rows that are
+-- already duplicates of each other stay NULL). The unique index ignores NULLs.
+--
+-- Usage:
+--   sqlite3 data/jobs-tracker.db < migrations/009_add_practice_content_hash.sql
+
+ALTER TABLE sql_practice_sessions ADD COLUMN content_hash TEXT;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_practice_content_hash
+    ON sql_practice_sessions(content_hash);
@@ -0,0 +1,14 @@
+-- Migration 010: is_partial_score flag on scraped_jobs
+--
+-- RemoteOKIntegration scores with a cascade threshold (filters.min_match_score
+-- by default): when location, experience, title and tags already show a job
+-- cannot reach the threshold, the description is not scanned and the stored
+-- match_score is what the short fields alone earn (an estimate; the full
+-- score is below the threshold either way).
+-- Those rows are flagged here; scrapers/rescore_all.py scores them fully and
+-- clears the flag.
+--
+-- Usage:
+--   sqlite3 data/jobs-tracker.db < migrations/010_add_partial_score_flag.sql
+
+ALTER TABLE scraped_jobs ADD COLUMN is_partial_score BOOLEAN DEFAULT 0;
@@ -0,0 +1,18 @@
+-- Migration 011: description_snippet on scraped_jobs
+--
+-- Full descriptions move to the compressed scraped_job_descriptions side
+-- table (scrapers/description_store.py); list views read this short preview
+-- instead. After applying, move the inline text out of scraped_jobs with:
+--   python3 scrapers/description_store.py backfill
+--
+-- Usage:
+--   sqlite3 data/jobs-tracker.db < migrations/011_add_description_snippet.sql
+
+ALTER TABLE scraped_jobs ADD COLUMN description_snippet TEXT;
+
+UPDATE scraped_jobs
+SET description_snippet = CASE
+    WHEN LENGTH(description) > 200 THEN SUBSTR(description, 1, 200) || '...'
+    ELSE description
+END
+WHERE description IS NOT NULL;
@@ -0,0 +1,17 @@
+-- Migration 012: canonical_job_id on scraped_jobs
+--
+-- A posting whose title and description are a near-duplicate (MinHash / LSH,
+-- scrapers/near_duplicates.py) of an earlier job links to it here instead of
+-- being scored again. NULL for canonical jobs. Rescoring skips linked rows and
+-- copies the canonical job's new scores to them.
+-- After applying, link the near-duplicates already stored with:
+--   python3 scrapers/near_duplicates.py backfill
+--
+-- Usage:
+--   sqlite3 data/jobs-tracker.db < migrations/012_add_canonical_job_id.sql
+
+ALTER TABLE scraped_jobs ADD COLUMN canonical_job_id INTEGER REFERENCES scraped_jobs(id);
+
+CREATE INDEX IF NOT EXISTS idx_scraped_jobs_canonical
+ON scraped_jobs(canonical_job_id)
+WHERE canonical_job_id IS NOT NULL;
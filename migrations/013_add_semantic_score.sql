@@ -0,0 +1,17 @@
+-- Migration 013: semantic_score on scraped_jobs
+--
+-- TF-IDF cosine similarity (0-100) of a posting to
+-- data/resumes/master_resume.json, computed by scrapers/semantic_score.py.
+-- Sortable in the API (sort=semantic) and weighted into match_score by the
+-- optional scoring_weights.semantic_match (default 0). NULL until computed;
+-- near-duplicates carry their canonical job's value.
+-- After applying, compute it for the jobs already stored with:
+--   python3 scrapers/semantic_score.py backfill
+--
+-- Usage:
+--   sqlite3 data/jobs-tracker.db < migrations/013_add_semantic_score.sql
+
+ALTER TABLE scraped_jobs ADD COLUMN semantic_score REAL;
+
+CREATE INDEX IF NOT EXISTS idx_scraped_jobs_semantic
+ON scraped_jobs(semantic_score DESC);
@@ -0,0 +1,22 @@
+-- Migration 014: stated requirements on scraped_jobs
+--
+-- Typed values scrapers/requirement_extractor.py pulls from a posting's
+-- title and description in one pass: years of experience (max NULL for
+-- "5+ years"), seniority level, salary with its ISO currency and period
+-- ('year', 'month' or 'hour'), and work mode ('hybrid', 'remote' or
+-- 'onsite'). NULL where the posting states nothing. score_job() uses the
+-- experience and work mode for its experience and location components.
+-- After applying, fill them for the jobs already stored with:
+--   python3 scrapers/requirement_extractor.py backfill
+--
+-- Usage:
+--   sqlite3 data/jobs-tracker.db < migrations/014_add_job_requirements.sql
+
+ALTER TABLE scraped_jobs ADD COLUMN experience_min INTEGER;
+ALTER TABLE scraped_jobs ADD COLUMN experience_max INTEGER;
+ALTER TABLE scraped_jobs ADD COLUMN seniority TEXT;
+ALTER TABLE scraped_jobs ADD COLUMN salary_min REAL;
+ALTER TABLE scraped_jobs ADD COLUMN salary_max REAL;
+ALTER TABLE scraped_jobs ADD COLUMN salary_currency TEXT;
+ALTER TABLE scraped_jobs ADD COLUMN salary_period TEXT;
+ALTER TABLE scraped_jobs ADD COLUMN work_mode TEXT;
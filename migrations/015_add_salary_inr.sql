@@ -0,0 +1,82 @@
+-- Migration 015: numeric salaries with INR conversion
+--
+-- salary_range is display text ("$120,000 - $150,000"), so filtering on pay
+-- parsed every row. Salaries are now also stored as numbers:
+--   - opportunities gets salary_min / salary_max / salary_currency /
+--     salary_period (scraped_jobs has them since migration 014)
+--   - both tables get salary_min_inr / salary_max_inr, the range as annual
+--     INR (hourly x 2080, monthly x 12); salary_max_inr is the top of the
+--     range, or salary_min_inr for an open-ended "X+"
+--   - currency_rates holds INR per unit of each currency (local, no lookups;
+--     change one with `python3 scrapers/salary.py set-rate USD 88.5`)
+-- /api/scraped-jobs?min_salary=&max_salary= filters on the INR columns
+-- through their indexes.
+--
+-- The RemoteOK salary_range format is parsed here; free-text ranges (e.g.
+-- "18-25 LPA" on opportunities) need:
+--   python3 scrapers/salary.py backfill
+-- Existing profile shards need the opportunities columns too:
+--   python3 scrapers/salary.py backfill --db data/shards/<profile>.db --shared-db data/jobs-tracker.db
+-- after running the opportunities ALTER TABLE lines below on the shard.
+--
+-- Usage:
+--   sqlite3 data/jobs-tracker.db < migrations/015_add_salary_inr.sql
+
+BEGIN TRANSACTION;
+
+CREATE TABLE IF NOT EXISTS currency_rates (
+    currency TEXT PRIMARY KEY,
+    inr_per_unit REAL NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Approximate rates, November 2025 (scrapers/salary.py DEFAULT_RATES)
+INSERT OR IGNORE INTO currency_rates (currency, inr_per_unit) VALUES
+    ('INR', 1.0),
+    ('USD', 88.5),
+    ('EUR', 102.5),
+    ('GBP', 116.5);
+
+ALTER TABLE scraped_jobs ADD COLUMN salary_min_inr REAL;
+ALTER TABLE scraped_jobs ADD COLUMN salary_max_inr REAL;
+
+ALTER TABLE opportunities ADD COLUMN salary_min REAL;
+ALTER TABLE opportunities ADD COLUMN salary_max REAL;
+ALTER TABLE opportunities ADD COLUMN salary_currency TEXT;
+ALTER TABLE opportunities ADD COLUMN salary_period TEXT;
+ALTER TABLE opportunities ADD COLUMN salary_min_inr REAL;
+ALTER TABLE opportunities ADD COLUMN salary_max_inr REAL;
+
+-- RemoteOK ranges: "$X - $Y" or "$X+", annual USD; they take precedence
+-- over a salary extracted from the description
+UPDATE scraped_jobs
+SET salary_min = CAST(REPLACE(REPLACE(REPLACE(
+        CASE WHEN instr(salary_range, ' - ') THEN substr(salary_range, 1, instr(salary_range, ' - ') - 1)
+             ELSE salary_range END,
+        '$', ''), ',', ''), '+', '') AS REAL),
+    salary_max = CASE WHEN instr(salary_range, ' - ')
+        THEN CAST(REPLACE(REPLACE(substr(salary_range, instr(salary_range, ' - ') + 3), '$', ''), ',', '') AS REAL)
+        END,
+    salary_currency = 'USD',
+    salary_period = 'year'
+WHERE salary_range GLOB '$[0-9]*';
+
+UPDATE scraped_jobs
+SET salary_min_inr = ROUND(salary_min * (SELECT inr_per_unit FROM currency_rates WHERE currency = salary_currency)
+        * CASE salary_period WHEN 'hour' THEN 2080 WHEN 'month' THEN 12 ELSE 1 END, 2),
+    salary_max_inr = ROUND(COALESCE(salary_max, salary_min)
+        * (SELECT inr_per_unit FROM currency_rates WHERE currency = salary_currency)
+        * CASE salary_period WHEN 'hour' THEN 2080 WHEN 'month' THEN 12 ELSE 1 END, 2)
+WHERE salary_min IS NOT NULL;
+
+-- min_salary tests the top of a range, max_salary its bottom
+CREATE INDEX IF NOT EXISTS idx_scraped_jobs_salary_max_inr
+ON scraped_jobs(salary_max_inr) WHERE salary_max_inr IS NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_scraped_jobs_salary_min_inr
+ON scraped_jobs(salary_min_inr) WHERE salary_min_inr IS NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_opportunities_salary_max_inr
+ON opportunities(salary_max_inr) WHERE salary_max_inr IS NOT NULL;
+
+COMMIT;
@@ -0,0 +1,47 @@
+-- Migration 016: typed posted_at and freshness-decayed ranking
+--
+-- posted_date is the board's string; posted_at is the same moment as Unix
+-- epoch seconds, filled at ingest by scrapers/freshness.py.
+--
+-- freshness_rank = ln(match_score) + posted_at * ln 2 / half-life is a
+-- virtual generated column with an index. Ordering by it equals ordering by
+-- match_score * 2^(-age / half-life) at any moment (the current time only
+-- shifts every job's log equally), so /api/scraped-jobs?sort=rank walks the
+-- index instead of sorting the table, and nothing is ever recomputed.
+-- The half-life is 7 days (scrapers/freshness.py HALF_LIFE_DAYS); to change
+-- it, drop the index and column and add them again with the new constant.
+-- Jobs without posted_at decay from scraped_at; scores below 1 count as 1.
+-- Needs SQLite 3.35+ built with math functions (ln): without them every
+-- insert into scraped_jobs would fail, so the script stops at the ln(1)
+-- check below before changing anything. The Python writers check the same
+-- (scrapers/freshness.py require_math_functions).
+--
+-- ISO 8601 dates (RemoteOK's format) are parsed here; other formats such as
+-- "3 days ago" need:
+--   python3 scrapers/freshness.py backfill
+--
+-- Usage:
+--   sqlite3 data/jobs-tracker.db < migrations/016_add_posted_at.sql
+
+.bail on
+SELECT 'ln() available' WHERE ln(1) IS NULL;
+
+BEGIN TRANSACTION;
+
+ALTER TABLE scraped_jobs ADD COLUMN posted_at INTEGER;
+
+UPDATE scraped_jobs
+SET posted_at = CAST(strftime('%s', posted_date) AS INTEGER)
+WHERE posted_date IS NOT NULL AND strftime('%s', posted_date) IS NOT NULL;
+
+ALTER TABLE scraped_jobs ADD COLUMN freshness_rank REAL GENERATED ALWAYS AS (
+    ln(MAX(match_score, 1)) + COALESCE(posted_at, CAST(strftime('%s', scraped_at) AS INTEGER)) * 0.6931471805599453 / 604800.0
+) VIRTUAL;
+
+CREATE INDEX IF NOT EXISTS idx_scraped_jobs_posted_at
+ON scraped_jobs(posted_at DESC);
+
+CREATE INDEX IF NOT EXISTS idx_scraped_jobs_freshness_rank
+ON scraped_jobs(freshness_rank DESC);
+
+COMMIT;
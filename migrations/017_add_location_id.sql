@@ -0,0 +1,39 @@
+-- Migration 017: normalized locations and the location filter index
+--
+-- Each distinct raw location string is normalized once by
+-- scrapers/location_gazetteer.py into country codes (ISO 3166-1 alpha-2),
+-- regions (EUROPE, LATAM, ...) and REMOTE / HYBRID / GLOBAL flags.
+-- normalized_location_codes lists every code of a location, so
+-- /api/scraped-jobs?location=IN,EUROPE is an index lookup on the code
+-- followed by idx_scraped_jobs_location, instead of a LIKE scan.
+--
+-- Ingest assigns location_id; stored jobs need:
+--   python3 scrapers/location_gazetteer.py backfill
+--
+-- Usage:
+--   sqlite3 data/jobs-tracker.db < migrations/017_add_location_id.sql
+
+BEGIN TRANSACTION;
+
+CREATE TABLE IF NOT EXISTS normalized_locations (
+    id INTEGER PRIMARY KEY,
+    raw TEXT UNIQUE NOT NULL,
+    countries TEXT,
+    regions TEXT,
+    is_remote BOOLEAN NOT NULL DEFAULT 0,
+    is_hybrid BOOLEAN NOT NULL DEFAULT 0,
+    is_global BOOLEAN NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS normalized_location_codes (
+    code TEXT NOT NULL,
+    location_id INTEGER NOT NULL REFERENCES normalized_locations(id),
+    PRIMARY KEY (code, location_id)
+) WITHOUT ROWID;
+
+ALTER TABLE scraped_jobs ADD COLUMN location_id INTEGER;
+
+CREATE INDEX IF NOT EXISTS idx_scraped_jobs_location
+ON scraped_jobs(location_id);
+
+COMMIT;
@@ -0,0 +1,54 @@
+-- Migration 018: tag junction table and facet indexes
+--
+-- scraped_jobs.tags is a comma-joined string; scraped_job_tags holds one
+-- (job_id, tag) row per normalized tag (lowercased, trimmed), written at
+-- ingest by scrapers/job_tags.py. The (tag, job_id) index serves
+-- /api/scraped-jobs?tag= and the tag counts of /api/scraped-jobs/facets;
+-- the source and company indexes serve their filters and GROUP BYs.
+-- A trigger removes a job's tag rows when the job is deleted.
+--
+-- Existing jobs are indexed here; to re-index them with the Python
+-- normalization (whitespace collapsed as well):
+--   python3 scrapers/job_tags.py backfill --all
+--
+-- Usage:
+--   sqlite3 data/jobs-tracker.db < migrations/018_add_scraped_job_tags.sql
+
+BEGIN TRANSACTION;
+
+CREATE TABLE IF NOT EXISTS scraped_job_tags (
+    job_id INTEGER NOT NULL REFERENCES scraped_jobs(id),
+    tag TEXT NOT NULL,
+    PRIMARY KEY (job_id, tag)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_scraped_job_tags_tag
+ON scraped_job_tags(tag, job_id);
+
+CREATE TRIGGER IF NOT EXISTS scraped_job_tags_cleanup
+AFTER DELETE ON scraped_jobs
+BEGIN
+    DELETE FROM scraped_job_tags WHERE job_id = OLD.id;
+END;
+
+-- Split each tags string at its commas
+WITH RECURSIVE split(job_id, tag, rest) AS (
+    SELECT id, '', tags || ',' FROM scraped_jobs
+    WHERE tags IS NOT NULL AND tags != ''
+    UNION ALL
+    SELECT job_id,
+           lower(trim(substr(rest, 1, instr(rest, ',') - 1))),
+           substr(rest, instr(rest, ',') + 1)
+    FROM split
+    WHERE rest != ''
+)
+INSERT OR IGNORE INTO scraped_job_tags (job_id, tag)
+SELECT job_id, tag FROM split WHERE tag != '';
+
+CREATE INDEX IF NOT EXISTS idx_scraped_jobs_source
+ON scraped_jobs(source);
+
+CREATE INDEX IF NOT EXISTS idx_scraped_jobs_company
+ON scraped_jobs(company);
+
+COMMIT;
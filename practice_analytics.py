@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+Practice Analytics - Materialized Learning Stats
+=================================================
+Purpose: Keep the SQL practice and interview learning aggregates in tables
+         (migration 007) instead of recomputing views on every API request.
+Author: Learning System
+Date: 2025-11-20
+
+Writers call the refresh functions with the ids they just inserted, inside
+their own transaction. Only the affected keyword / week / error / question
+group is touched, so the cost does not grow with practice history.
+On a database without the analytics tables, writers skip the refresh (see
+missing_migrations) and readers fall back to the views.
+
+Usage:
+    python3 practice_analytics.py rebuild [--db ./data/jobs-tracker.db]
+    python3 practice_analytics.py backfill-keywords [--db ./data/jobs-tracker.db]
+"""
+
+import argparse
+import sqlite3
+import sys
+from datetime import date, timedelta
+from typing import Dict, Iterable, Tuple
+
+from sql_lexer import merge_keywords
+
+
+DEFAULT_DB_PATH = './data/jobs-tracker.db'
+
+# Tables the refresh functions write, by the migration that creates them
+MIGRATION_TABLES = {
+    '007_materialize_practice_analytics.sql': (
+        'practice_keyword_stats', 'practice_weekly_stats', 'practice_mistake_stats',
+        'learning_gap_stats', 'study_topic_progress',
+    ),
+    '008_add_session_keywords.sql': ('session_keywords',),
+}
+
+
+def missing_migrations(conn: sqlite3.Connection) -> Tuple[str, ...]:
+    """Migrations whose analytics tables the (main) database lacks; empty when ready."""
+    tables = {row[0] for row in conn.execute("SELECT name FROM main.sqlite_master WHERE type = 'table'")}
+    return tuple(migration for migration, names in MIGRATION_TABLES.items()
+                 if not tables.issuperset(names))
+
+
+def migrations_hint(missing: Iterable[str]) -> str:
+    """'apply migrations/... and migrations/...' for a warning or error message."""
+    return "apply " + " and ".join(f"migrations/{migration}" for migration in missing)
+
+
+def week_key(practice_date: str) -> str:
+    """Return the strftime('%Y-W%W') week used by weekly_practice_summary."""
+    return date.fromisoformat(practice_date[:10]).strftime('%Y-W%W')
+
+
+def _week_bounds(practice_date: str) -> Tuple[str, str]:
+    """Monday..Sunday around a date, used to narrow a week refresh to an index range."""
+    day = date.fromisoformat(practice_date[:10])
+    monday = day - timedelta(days=day.weekday())
+    return str(monday), str(monday + timedelta(days=6))
+
+
+# ==========================================
+# SQL practice sessions
+# ==========================================
+def index_session_keywords(conn: sqlite3.Connection, session_ids: Iterable[int]) -> set:
+    """
+    (Re)write session_keywords rows for the given sessions.
+
+    Keywords come from tokenizing my_query (sql_lexer.py) merged with the
+    hand-typed keywords_used. Does not commit.
+
+    Returns:
+        Every keyword added or removed, for refreshing keyword stats
+    """
+    session_ids = list(session_ids)
+    if not session_ids:
+        return set()
+
+    placeholders = ', '.join('?' for _ in session_ids)
+    touched = {row[0] for row in conn.execute(f"""
+        SELECT DISTINCT keyword FROM session_keywords
+        WHERE session_id IN ({placeholders})
+    """, session_ids)}
+    conn.execute(f"DELETE FROM session_keywords WHERE session_id IN ({placeholders})", session_ids)
+
+    rows = []
+    for session_id, my_query, keywords_used in conn.execute(f"""
+        SELECT id, my_query, keywords_used
+        FROM sql_practice_sessions
+        WHERE id IN ({placeholders})
+    """, session_ids).fetchall():
+        for keyword in merge_keywords(my_query, keywords_used):
+            rows.append((session_id, keyword))
+            touched.add(keyword)
+
+    conn.executemany(
+        "INSERT OR IGNORE INTO session_keywords (session_id, keyword) VALUES (?, ?)",
+        rows
+    )
+    return touched
+
+
+def refresh_practice_sessions(conn: sqlite3.Connection, session_ids: Iterable[int]) -> None:
+    """
+    Tag newly inserted sql_practice_sessions rows and fold them into the
+    practice_* tables.
+
+    Only the affected keyword, week and error groups are recomputed, each
+    through an index (session_keywords.keyword, practice_date, error_made).
+    Does not commit.
+    """
+    session_ids = list(session_ids)
+    if not session_ids:
+        return
+
+    keywords = index_session_keywords(conn, session_ids)
+
+    placeholders = ', '.join('?' for _ in session_ids)
+    rows = conn.execute(f"""
+        SELECT practice_date, error_made
+        FROM sql_practice_sessions
+        WHERE id IN ({placeholders})
+    """, session_ids).fetchall()
+
+    weeks = {}
+    errors = set()
+    for practice_date, error_made in rows:
+        if practice_date:
+            weeks[week_key(practice_date)] = practice_date
+        if error_made:
+            errors.add(error_made)
+
+    for keyword in keywords:
+        _refresh_keyword(conn, keyword)
+
+    for week, practice_date in weeks.items():
+        _refresh_week(conn, week, practice_date)
+
+    for error_made in errors:
+        _refresh_mistake(conn, error_made)
+
+
+def _refresh_keyword(conn: sqlite3.Connection, keyword: str) -> None:
+    """Recompute one practice_keyword_stats row from session_keywords."""
+    conn.execute("DELETE FROM practice_keyword_stats WHERE keyword = ?", (keyword,))
+    conn.execute("""
+        INSERT INTO practice_keyword_stats
+            (keyword, practice_count, correct_count, total_minutes, timed_count)
+        SELECT
+            sk.keyword,
+            COUNT(*),
+            SUM(CASE WHEN s.is_correct = 1 THEN 1 ELSE 0 END),
+            COALESCE(SUM(s.time_spent_minutes), 0),
+            COUNT(s.time_spent_minutes)
+        FROM session_keywords sk
+        JOIN sql_practice_sessions s ON s.id = sk.session_id
+        WHERE sk.keyword = ?
+        GROUP BY sk.keyword
+    """, (keyword,))
+
+
+def _refresh_week(conn: sqlite3.Connection, week: str, practice_date: str) -> None:
+    """Recompute one practice_weekly_stats row."""
+    start, end = _week_bounds(practice_date)
+    conn.execute("DELETE FROM practice_weekly_stats WHERE week = ?", (week,))
+    conn.execute("""
+        INSERT INTO practice_weekly_stats (
+            week, total_sessions, platforms_used, correct_answers, total_minutes,
+            easy_questions, medium_questions, hard_questions
+        )
+        SELECT
+            ?,
+            COUNT(*),
+            COUNT(DISTINCT platform),
+            SUM(CASE WHEN is_correct = 1 THEN 1 ELSE 0 END),
+            SUM(time_spent_minutes),
+            COUNT(CASE WHEN difficulty = 'Easy' THEN 1 END),
+            COUNT(CASE WHEN difficulty = 'Medium' THEN 1 END),
+            COUNT(CASE WHEN difficulty = 'Hard' THEN 1 END)
+        FROM sql_practice_sessions
+        WHERE practice_date BETWEEN ? AND ?
+          AND strftime('%Y-W%W', practice_date) = ?
+        GROUP BY strftime('%Y-W%W', practice_date)
+    """, (week, start, end, week))
+
+
+def _refresh_mistake(conn: sqlite3.Connection, error_made: str) -> None:
+    """Recompute one practice_mistake_stats row."""
+    conn.execute("DELETE FROM practice_mistake_stats WHERE error_made = ?", (error_made,))
+    conn.execute("""
+        INSERT INTO practice_mistake_stats
+            (error_made, occurrence_count, concepts_affected, avg_recovery_time)
+        SELECT
+            error_made,
+            COUNT(*),
+            (SELECT GROUP_CONCAT(DISTINCT sk.keyword)
+               FROM session_keywords sk
+               JOIN sql_practice_sessions s2 ON s2.id = sk.session_id
+              WHERE s2.error_made = ?1),
+            ROUND(AVG(time_spent_minutes), 1)
+        FROM sql_practice_sessions
+        WHERE error_made = ?1
+        GROUP BY error_made
+    """, (error_made,))
+
+
+# ==========================================
+# Interview questions
+# ==========================================
+def refresh_interview_questions(conn: sqlite3.Connection, question_ids: Iterable[int]) -> None:
+    """
+    Recompute the learning_gap_stats groups touched by interview_questions rows.
+
+    Does not commit.
+    """
+    question_ids = list(question_ids)
+    if not question_ids:
+        return
+
+    placeholders = ', '.join('?' for _ in question_ids)
+    groups = conn.execute(f"""
+        SELECT DISTINCT question_type, difficulty
+        FROM interview_questions
+        WHERE id IN ({placeholders})
+    """, question_ids).fetchall()
+
+    for question_type, difficulty in groups:
+        conn.execute("""
+            DELETE FROM learning_gap_stats
+            WHERE question_type = COALESCE(?, '') AND difficulty = COALESCE(?, '')
+        """, (question_type, difficulty))
+        conn.execute("""
+            INSERT INTO learning_gap_stats (
+                question_type, difficulty, question_count,
+                rating_sum, rating_count, weak_count
+            )
+            SELECT
+                COALESCE(question_type, ''),
+                COALESCE(difficulty, ''),
+                COUNT(*),
+                COALESCE(SUM(my_rating), 0),
+                COUNT(my_rating),
+                SUM(CASE WHEN my_rating <= 2 THEN 1 ELSE 0 END)
+            FROM interview_questions
+            WHERE question_type IS ? AND difficulty IS ?
+            GROUP BY question_type, difficulty
+        """, (question_type, difficulty))
+
+
+# ==========================================
+# Full rebuild (recovery)
+# ==========================================
+def rebuild_all(conn: sqlite3.Connection) -> Dict[str, int]:
+    """
+    Rebuild every materialized analytics table from the base tables.
+
+    Returns:
+        Row counts per rebuilt table
+    """
+    conn.execute("BEGIN")
+    try:
+        for table in ('practice_keyword_stats', 'practice_weekly_stats',
+                      'practice_mistake_stats', 'learning_gap_stats',
+                      'study_topic_progress'):
+            conn.execute(f"DELETE FROM {table}")
+
+        session_ids = [row[0] for row in conn.execute("SELECT id FROM sql_practice_sessions")]
+        for start in range(0, len(session_ids), 500):
+            refresh_practice_sessions(conn, session_ids[start:start + 500])
+
+        question_ids = [row[0] for row in conn.execute("SELECT id FROM interview_questions")]
+        for start in range(0, len(question_ids), 500):
+            refresh_interview_questions(conn, question_ids[start:start + 500])
+
+        conn.execute("""
+            INSERT INTO study_topic_progress (topic_id, session_count, total_minutes)
+            SELECT topic_id, COUNT(*), SUM(duration_minutes)
+            FROM learning_sessions
+            WHERE topic_id IS NOT NULL
+            GROUP BY topic_id
+        """)
+        conn.execute("COMMIT")
+    except sqlite3.Error:
+        conn.execute("ROLLBACK")
+        raise
+
+    return {
+        table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        for table in ('practice_keyword_stats', 'practice_weekly_stats',
+                      'practice_mistake_stats', 'learning_gap_stats',
+                      'study_topic_progress')
+    }
+
+
+def backfill_session_keywords(conn: sqlite3.Connection, batch_size: int = 500) -> int:
+    """
+    Tag every existing practice session and refresh the keyword / mistake stats.
+
+    Returns:
+        Number of session_keywords rows written
+    """
+    conn.execute("BEGIN")
+    try:
+        session_ids = [row[0] for row in conn.execute("SELECT id FROM sql_practice_sessions")]
+        keywords = set()
+        for start in range(0, len(session_ids), batch_size):
+            keywords |= index_session_keywords(conn, session_ids[start:start + batch_size])
+
+        conn.execute("DELETE FROM practice_keyword_stats")
+        for keyword in keywords:
+            _refresh_keyword(conn, keyword)
+        for (error_made,) in conn.execute("""
+            SELECT DISTINCT error_made FROM sql_practice_sessions
+            WHERE error_made IS NOT NULL AND error_made != ''
+        """).fetchall():
+            _refresh_mistake(conn, error_made)
+        conn.execute("COMMIT")
+    except sqlite3.Error:
+        conn.execute("ROLLBACK")
+        raise
+
+    return conn.execute("SELECT COUNT(*) FROM session_keywords").fetchone()[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain materialized practice analytics")
+    parser.add_argument('command', choices=['rebuild', 'backfill-keywords'],
+                        help="rebuild: recompute all analytics tables; "
+                             "backfill-keywords: tag existing sessions in session_keywords")
+    parser.add_argument('--db', default=DEFAULT_DB_PATH, help="SQLite database path")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db, isolation_level=None)
+    try:
+        missing = missing_migrations(conn)
+        if missing:
+            print(f"❌ The analytics tables are missing: {migrations_hint(missing)} first")
+            sys.exit(1)
+        if args.command == 'rebuild':
+            counts = rebuild_all(conn)
+            print("✅ Practice analytics rebuilt")
+            for table, count in counts.items():
+                print(f"   {table:<24} {count:5d} rows")
+        elif args.command == 'backfill-keywords':
+            count = backfill_session_keywords(conn)
+            print(f"✅ Tagged practice sessions ({count} session_keywords rows)")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,23 @@ This package contains job scraping and scoring functionality.
 
 Modules:
     - simple_scorer: Job scoring engine with weighted algorithm
+    - term_matcher: Single-pass matching of terms and keyword synonyms
+    - text_normalizer: HTML / mojibake cleanup of job text, cached by content hash
+    - description_store: Compressed full job descriptions in a side table
+    - multi_profile: One-scan scoring of several candidate profiles
+    - near_duplicates: MinHash / LSH detection of reposted jobs
+    - semantic_score: TF-IDF similarity of postings to the master resume
+    - vector_index: Memory-mapped SimHash / int8 vector index for similar jobs
+    - score_sketch: KLL score quantile sketches per source and week
+    - requirement_extractor: One-pass extraction of stated experience, seniority, salary and work mode
+    - salary: Numeric salaries converted to annual INR with local currency rates
+    - freshness: Typed posting timestamps and freshness-decayed ranking
+    - location_gazetteer: Raw locations normalized to country / region codes and remote / hybrid flags
+    - job_tags: Normalized (job_id, tag) index for tag filters and facet counts
+    - feature_store: Per-job sparse match features saved at score time
+    - what_if: Vectorized re-scoring of stored features under candidate weights
+    - rescoring: Config-diff driven incremental rescoring (apply / watch)
+    - rescore_all: Resumable parallel rescoring of every scraped job
     - (future) job_scraper: Web scraping for job boards
     - (future) resume_parser: Resume text extraction
 """
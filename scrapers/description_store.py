@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Compressed Job Description Storage
+
+Full job descriptions live compressed in a side table instead of a truncated
+copy in every scraped_jobs row:
+
+    scraped_job_descriptions  job_id -> codec, compressed body, length
+    scraped_jobs.description_snippet  short plain-text preview for list views
+
+List queries never touch the side table; a description is decompressed only
+when one job is opened (GET /api/scraped-jobs/<id>) or rescored.
+
+Bodies use zstd when the zstandard package is installed, zlib otherwise;
+the codec is stored per row so both can be read back.
+
+Usage:
+    python3 scrapers/description_store.py backfill [--db data/jobs-tracker.db]
+
+Author: Karthik Shetty
+Created: 2025-11-23
+"""
+
+import argparse
+import logging
+import sqlite3
+import zlib
+from typing import Dict, Iterable, Optional
+
+try:
+    import zstandard
+except ImportError:  # zlib fallback
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+SNIPPET_LENGTH = 200
+ZLIB_LEVEL = 6
+ZSTD_LEVEL = 9
+
+
+def make_snippet(text: Optional[str], length: int = SNIPPET_LENGTH) -> str:
+    """First `length` characters of a description, with '...' if cut."""
+    if not text:
+        return ''
+    return text[:length] + '...' if len(text) > length else text
+
+
+def compress(text: str) -> tuple:
+    """
+    Compress a description.
+
+    Returns:
+        (codec, body bytes)
+    """
+    data = text.encode('utf-8')
+    if zstandard is not None:
+        return 'zstd', zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return 'zlib', zlib.compress(data, ZLIB_LEVEL)
+
+
+def decompress(codec: str, body: bytes) -> str:
+    """
+    Decompress a stored body.
+
+    Raises:
+        RuntimeError: If the row is zstd and zstandard is not installed
+        ValueError: If the codec is unknown
+    """
+    if codec == 'zlib':
+        return zlib.decompress(body).decode('utf-8')
+    if codec == 'zstd':
+        if zstandard is None:
+            raise RuntimeError("Description stored with zstd; install the zstandard package to read it")
+        return zstandard.ZstdDecompressor().decompress(body).decode('utf-8')
+    raise ValueError(f"Unknown description codec '{codec}'")
+
+
+class DescriptionStore:
+    """
+    Reads and writes compressed descriptions on an open connection.
+
+    Writes do not commit; callers save the description in the same
+    transaction as its scraped_jobs row.
+    """
+
+    def __init__(self, conn: sqlite3.Connection):
+        """
+        Args:
+            conn: Open SQLite connection to the jobs tracker database
+        """
+        self.conn = conn
+        self.create_table()
+
+    def create_table(self) -> None:
+        """Create the side table and its cleanup trigger if missing."""
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS scraped_job_descriptions (
+                job_id INTEGER PRIMARY KEY REFERENCES scraped_jobs(id),
+                codec TEXT NOT NULL,
+                body BLOB NOT NULL,
+                text_length INTEGER NOT NULL
+            )
+        """)
+        self.conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS scraped_job_descriptions_cleanup
+            AFTER DELETE ON scraped_jobs
+            BEGIN
+                DELETE FROM scraped_job_descriptions WHERE job_id = OLD.id;
+            END
+        """)
+
+    def save(self, job_id: int, text: Optional[str]) -> None:
+        """
+        Store the full description of one job (replaces any previous one).
+
+        Args:
+            job_id: scraped_jobs.id
+            text: Normalized description
+        """
+        codec, body = compress(text or '')
+        self.conn.execute("""
+            INSERT OR REPLACE INTO scraped_job_descriptions (job_id, codec, body, text_length)
+            VALUES (?, ?, ?, ?)
+        """, (job_id, codec, body, len(text or '')))
+
+    def load(self, job_id: int) -> Optional[str]:
+        """
+        Full description of one job.
+
+        Falls back to scraped_jobs.description for rows not yet backfilled.
+
+        Returns:
+            Description text, or None if the job does not exist
+        """
+        return self.load_many([job_id]).get(job_id)
+
+    def load_many(self, job_ids: Iterable[int]) -> Dict[int, str]:
+        """
+        Full descriptions of several jobs.
+
+        Returns:
+            {job_id: description} for the jobs that exist
+        """
+        job_ids = list(job_ids)
+        descriptions = {}
+        for start in range(0, len(job_ids), 500):
+            batch = job_ids[start:start + 500]
+            placeholders = ', '.join('?' for _ in batch)
+            for job_id, codec, body, legacy in self.conn.execute(f"""
+                SELECT j.id, d.codec, d.body, j.description
+                FROM scraped_jobs j
+                LEFT JOIN scraped_job_descriptions d ON d.job_id = j.id
+                WHERE j.id IN ({placeholders})
+            """, batch):
+                descriptions[job_id] = decompress(codec, body) if body is not None else (legacy or '')
+        return descriptions
+
+
+def backfill(db_path: str = "data/jobs-tracker.db", batch_size: int = 500) -> Dict[str, int]:
+    """
+    Move inline scraped_jobs.description text into the side table.
+
+    Each moved row gets its snippet and a NULL description, in batched
+    transactions.
+
+    Returns:
+        Dictionary with 'moved', 'text_bytes' and 'stored_bytes'
+    """
+    conn = sqlite3.connect(db_path, timeout=30.0, isolation_level=None)
+    try:
+        store = DescriptionStore(conn)
+        counts = {'moved': 0, 'text_bytes': 0, 'stored_bytes': 0}
+        last_id = 0
+        while True:
+            rows = conn.execute("""
+                SELECT id, description FROM scraped_jobs
+                WHERE id > ? AND description IS NOT NULL
+                ORDER BY id LIMIT ?
+            """, (last_id, batch_size)).fetchall()
+            if not rows:
+                break
+            conn.execute("BEGIN")
+            try:
+                for job_id, text in rows:
+                    store.save(job_id, text)
+                    conn.execute(
+                        "UPDATE scraped_jobs SET description = NULL, description_snippet = ? WHERE id = ?",
+                        (make_snippet(text), job_id)
+                    )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            last_id = rows[-1][0]
+            counts['moved'] += len(rows)
+            counts['text_bytes'] += sum(len(text.encode('utf-8')) for _, text in rows)
+
+        counts['stored_bytes'] = conn.execute(
+            "SELECT COALESCE(SUM(LENGTH(body)), 0) FROM scraped_job_descriptions"
+        ).fetchone()[0]
+        return counts
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compressed scraped job descriptions")
+    parser.add_argument('command', choices=['backfill'],
+                        help="backfill: move inline descriptions into the compressed side table")
+    parser.add_argument('--db', default="data/jobs-tracker.db", help="SQLite database path")
+    args = parser.parse_args()
+
+    result = backfill(args.db)
+    print(f"✅ Moved {result['moved']} descriptions "
+          f"({result['text_bytes']:,} bytes of text; side table now {result['stored_bytes']:,} bytes, "
+          f"{'zstd' if zstandard is not None else 'zlib'})")
+    if result['moved']:
+        print("   Run VACUUM to return the freed scraped_jobs pages to the file system")
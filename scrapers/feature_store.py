@@ -0,0 +1,428 @@
+#!/usr/bin/env python3
+"""
+Score-Time Feature Store
+
+Persists a compact sparse feature vector for every scored job so scoring
+weights can be re-applied (what_if.py) without rescanning descriptions:
+
+    score_terms           term dictionary: (kind, term) -> term_id
+    scraped_job_features  per job: packed term ids, location and experience
+                          scores, title stage adjustment / short-circuit flag
+    index_tokens          token dictionary: token -> token_id, and the number
+                          of jobs containing it (doc_count, kept by triggers)
+    job_tokens            inverted index: token_id -> job ids whose text has the token
+
+kind is 'skill', 'domain' or 'red_flag'. Term ids are stored as a packed
+array of unsigned 32-bit ints (4 bytes per matched term).
+
+The token index lets a config edit (rescoring.py) find the only jobs a
+changed term can match: every token of the term must occur in the job text.
+Its document frequencies are the IDF statistics of semantic_score.py.
+
+Usage:
+    python3 scrapers/feature_store.py backfill [--db data/jobs-tracker.db]
+
+Author: Karthik Shetty
+Created: 2025-11-21
+"""
+
+import argparse
+import logging
+import re
+import sqlite3
+from array import array
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+TERM_KINDS = ('skill', 'domain', 'red_flag')
+
+# features dict key (SimpleJobScorer.score_job) -> term kind
+FEATURE_KINDS = {
+    'skills': 'skill',
+    'domains': 'domain',
+    'red_flags': 'red_flag',
+}
+
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+
+def text_tokens(text: str) -> Set[str]:
+    """
+    Lowercase alphanumeric runs of a text.
+
+    A word-boundary match of a term in the scorer implies every token of the
+    term is in this set, so it is a safe prefilter.
+    """
+    return set(TOKEN_RE.findall((text or '').lower()))
+
+
+def term_token_groups(kind: str, term: str) -> List[Set[str]]:
+    """
+    Token sets a job must contain (any one group) for the term to match.
+
+    Domains match on any '/'- or ','-separated part longer than 2 characters,
+    like SimpleJobScorer.calculate_domain_score; other kinds need all tokens.
+    """
+    if kind == 'domain':
+        parts = [p.strip() for p in re.split(r'[/,]', term.lower())]
+        return [text_tokens(p) for p in parts if len(p) > 2]
+    return [text_tokens(term)]
+
+
+def pack_term_ids(term_ids: Iterable[int]) -> bytes:
+    """Encode term ids as a sorted uint32 array."""
+    return array('I', sorted(set(term_ids))).tobytes()
+
+
+def unpack_term_ids(blob: bytes) -> array:
+    """Decode a packed term id array."""
+    ids = array('I')
+    ids.frombytes(blob or b'')
+    return ids
+
+
+class FeatureStore:
+    """
+    Reads and writes per-job score features on an open connection.
+
+    Writes do not commit; callers save features in the same transaction as
+    the scraped_jobs row they belong to.
+    """
+
+    def __init__(self, conn: sqlite3.Connection):
+        """
+        Args:
+            conn: Open SQLite connection to the jobs tracker database
+        """
+        self.conn = conn
+        self._term_ids: Dict[Tuple[str, str], int] = {}
+        self._token_ids: Dict[str, int] = {}
+        self.create_tables()
+
+    def create_tables(self) -> None:
+        """Create the feature tables, indexes and version triggers if missing."""
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS score_terms (
+                term_id INTEGER PRIMARY KEY,
+                kind TEXT NOT NULL,
+                term TEXT NOT NULL,
+                UNIQUE(kind, term)
+            )
+        """)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS scraped_job_features (
+                job_id INTEGER PRIMARY KEY REFERENCES scraped_jobs(id),
+                term_ids BLOB NOT NULL,
+                location_score REAL NOT NULL,
+                experience_score REAL NOT NULL,
+                title_adjustment REAL NOT NULL DEFAULT 0,
+                short_circuit INTEGER NOT NULL DEFAULT 0,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        # Stores created before the title stage
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(scraped_job_features)")}
+        for column in ('title_adjustment REAL NOT NULL DEFAULT 0',
+                       'short_circuit INTEGER NOT NULL DEFAULT 0'):
+            if column.split()[0] not in columns:
+                self.conn.execute(f"ALTER TABLE scraped_job_features ADD COLUMN {column}")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS index_tokens (
+                token_id INTEGER PRIMARY KEY,
+                token TEXT NOT NULL UNIQUE,
+                doc_count INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS job_tokens (
+                token_id INTEGER NOT NULL,
+                job_id INTEGER NOT NULL,
+                PRIMARY KEY (token_id, job_id)
+            ) WITHOUT ROWID
+        """)
+        self.conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_job_tokens_job
+            ON job_tokens(job_id)
+        """)
+        # Stores created before document frequencies were kept
+        if 'doc_count' not in {row[1] for row in self.conn.execute("PRAGMA table_info(index_tokens)")}:
+            self.conn.execute("ALTER TABLE index_tokens ADD COLUMN doc_count INTEGER NOT NULL DEFAULT 0")
+            self.conn.execute("""
+                UPDATE index_tokens
+                SET doc_count = (SELECT COUNT(*) FROM job_tokens t WHERE t.token_id = index_tokens.token_id)
+            """)
+        for event, change in (('INSERT', '+ 1 WHERE token_id = NEW.token_id'),
+                              ('DELETE', '- 1 WHERE token_id = OLD.token_id')):
+            self.conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS job_tokens_doc_count_{event.lower()}
+                AFTER {event} ON job_tokens
+                BEGIN
+                    UPDATE index_tokens SET doc_count = doc_count {change};
+                END
+            """)
+        # Bumped on every feature change so what-if can cache the corpus
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS feature_store_meta (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                version INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        self.conn.execute("INSERT OR IGNORE INTO feature_store_meta (id, version) VALUES (1, 0)")
+        for event in ('INSERT', 'UPDATE', 'DELETE'):
+            self.conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS scraped_job_features_version_{event.lower()}
+                AFTER {event} ON scraped_job_features
+                BEGIN
+                    UPDATE feature_store_meta SET version = version + 1 WHERE id = 1;
+                END
+            """)
+        self.conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS scraped_job_features_cleanup
+            AFTER DELETE ON scraped_jobs
+            BEGIN
+                DELETE FROM scraped_job_features WHERE job_id = OLD.id;
+                DELETE FROM job_tokens WHERE job_id = OLD.id;
+            END
+        """)
+
+    def term_id(self, kind: str, term: str) -> int:
+        """
+        Look up (or assign) the id of a term.
+
+        Args:
+            kind: 'skill', 'domain' or 'red_flag'
+            term: Config key, e.g. 'SQL' or 'ETL/DWH'
+
+        Returns:
+            Stable integer term id
+        """
+        key = (kind, term)
+        if key not in self._term_ids:
+            self.conn.execute(
+                "INSERT OR IGNORE INTO score_terms (kind, term) VALUES (?, ?)", key
+            )
+            row = self.conn.execute(
+                "SELECT term_id FROM score_terms WHERE kind = ? AND term = ?", key
+            ).fetchone()
+            self._term_ids[key] = row[0]
+        return self._term_ids[key]
+
+    def save(self, job_id: int, features: Dict, text: Optional[str] = None) -> None:
+        """
+        Store the features of one scored job (replaces any previous row).
+
+        Args:
+            job_id: scraped_jobs.id
+            features: score_job(...)['features']
+            text: Scored text (simple_scorer.job_text); when given, the
+                job's token index entries are rewritten too
+        """
+        if text is not None:
+            self.index_tokens(job_id, text)
+
+        term_ids = [
+            self.term_id(kind, term)
+            for key, kind in FEATURE_KINDS.items()
+            for term in features.get(key, [])
+        ]
+        self.conn.execute("""
+            INSERT OR REPLACE INTO scraped_job_features
+                (job_id, term_ids, location_score, experience_score,
+                 title_adjustment, short_circuit, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+        """, (
+            job_id,
+            pack_term_ids(term_ids),
+            features.get('location_score', 0),
+            features.get('experience_score', 0),
+            features.get('title_adjustment', 0),
+            int(features.get('short_circuit', False))
+        ))
+
+    def index_tokens(self, job_id: int, text: str) -> None:
+        """
+        Bring the inverted-index rows of one job in line with its text.
+
+        Only added and removed tokens are written, so rescoring an unchanged
+        job leaves the index (and the document frequencies) untouched.
+        """
+        tokens = text_tokens(text)
+        missing = [t for t in tokens if t not in self._token_ids]
+        if missing:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO index_tokens (token) VALUES (?)",
+                [(t,) for t in missing]
+            )
+            for start in range(0, len(missing), 500):
+                batch = missing[start:start + 500]
+                placeholders = ', '.join('?' for _ in batch)
+                self._token_ids.update(self.conn.execute(
+                    f"SELECT token, token_id FROM index_tokens WHERE token IN ({placeholders})",
+                    batch
+                ).fetchall())
+
+        wanted = {self._token_ids[t] for t in tokens}
+        stored = {row[0] for row in self.conn.execute(
+            "SELECT token_id FROM job_tokens WHERE job_id = ?", (job_id,)
+        )}
+        if stored - wanted:
+            self.conn.executemany(
+                "DELETE FROM job_tokens WHERE token_id = ? AND job_id = ?",
+                [(token_id, job_id) for token_id in stored - wanted]
+            )
+        self.conn.executemany(
+            "INSERT INTO job_tokens (token_id, job_id) VALUES (?, ?)",
+            [(token_id, job_id) for token_id in wanted - stored]
+        )
+
+    def document_frequencies(self) -> Tuple[int, Dict[str, int]]:
+        """
+        Document frequencies of every indexed token.
+
+        Returns:
+            (number of indexed jobs, {token: number of jobs containing it})
+        """
+        documents = self.conn.execute(
+            "SELECT COUNT(*) FROM scraped_job_features"
+        ).fetchone()[0]
+        return documents, dict(self.conn.execute(
+            "SELECT token, doc_count FROM index_tokens WHERE doc_count > 0"
+        ))
+
+    def jobs_with_tokens(self, tokens: Set[str]) -> Set[int]:
+        """Ids of jobs whose text contains every token."""
+        if not tokens:
+            return set()
+        tokens = list(tokens)
+        placeholders = ', '.join('?' for _ in tokens)
+        token_ids = [row[0] for row in self.conn.execute(
+            f"SELECT token_id FROM index_tokens WHERE token IN ({placeholders})", tokens
+        )]
+        if len(token_ids) < len(tokens):
+            return set()  # some token never occurs in any job
+        placeholders = ', '.join('?' for _ in token_ids)
+        return {row[0] for row in self.conn.execute(f"""
+            SELECT job_id FROM job_tokens
+            WHERE token_id IN ({placeholders})
+            GROUP BY job_id
+            HAVING COUNT(*) = ?
+        """, token_ids + [len(token_ids)])}
+
+    def jobs_for_term(self, kind: str, term: str) -> Optional[Set[int]]:
+        """
+        Jobs that could match a term (a superset of the real matches).
+
+        Returns:
+            Set of job ids, or None if the term has no alphanumeric token
+            and so cannot be narrowed down
+        """
+        groups = term_token_groups(kind, term)
+        if not groups or not all(groups):
+            return None
+        jobs = set()
+        for tokens in groups:
+            jobs |= self.jobs_with_tokens(tokens)
+        return jobs
+
+    def clear_cache(self) -> None:
+        """Forget cached ids, e.g. after a rollback discarded new dictionary rows."""
+        self._term_ids.clear()
+        self._token_ids.clear()
+
+    def version(self) -> int:
+        """Current feature_store_meta version (changes whenever features change)."""
+        row = self.conn.execute("SELECT version FROM feature_store_meta WHERE id = 1").fetchone()
+        return row[0] if row else 0
+
+    def terms(self) -> List[Tuple[int, str, str]]:
+        """All (term_id, kind, term) rows."""
+        return self.conn.execute(
+            "SELECT term_id, kind, term FROM score_terms ORDER BY term_id"
+        ).fetchall()
+
+    def iter_features(self) -> Iterable[Tuple[int, float, bytes, float, float]]:
+        """
+        Yield (job_id, match_score, term_ids blob, location_score, experience_score,
+        title_adjustment, short_circuit, semantic_score).
+        """
+        return self.conn.execute("""
+            SELECT f.job_id, j.match_score, f.term_ids, f.location_score, f.experience_score,
+                   f.title_adjustment, f.short_circuit, j.semantic_score
+            FROM scraped_job_features f
+            JOIN scraped_jobs j ON j.id = f.job_id
+            ORDER BY f.job_id
+        """)
+
+
+def backfill(db_path: str, config_path: str = "data/resume_config.json",
+             batch_size: int = 500) -> int:
+    """
+    Score stored jobs missing a feature row or token index entries and save both.
+
+    Uses the stored description (description_store), so this is a one-time
+    rescan; new jobs get features when they are scored.
+
+    Returns:
+        Number of jobs backfilled
+    """
+    try:
+        from .description_store import DescriptionStore
+        from .simple_scorer import SimpleJobScorer, job_text
+    except ImportError:
+        from description_store import DescriptionStore
+        from simple_scorer import SimpleJobScorer, job_text
+
+    scorer = SimpleJobScorer(config_path=config_path)
+    conn = sqlite3.connect(db_path, timeout=30.0)
+    try:
+        store = FeatureStore(conn)
+        descriptions = DescriptionStore(conn)
+        conn.commit()
+        total = 0
+        last_id = 0
+        while True:
+            rows = conn.execute("""
+                SELECT j.id, j.job_title, j.location, j.company, j.tags
+                FROM scraped_jobs j
+                LEFT JOIN scraped_job_features f ON f.job_id = j.id
+                WHERE (f.job_id IS NULL
+                       OR NOT EXISTS (SELECT 1 FROM job_tokens t WHERE t.job_id = j.id))
+                  AND j.canonical_job_id IS NULL
+                  AND j.id > ?
+                ORDER BY j.id
+                LIMIT ?
+            """, (last_id, batch_size)).fetchall()
+            if not rows:
+                break
+            full_text = descriptions.load_many(row[0] for row in rows)
+            for job_id, title, location, company, tags in rows:
+                job_data = {
+                    'title': title or '',
+                    'description': full_text.get(job_id, ''),
+                    'location': location or '',
+                    'company': company or '',
+                    'tags': tags or '',
+                    'experience_required': ''
+                }
+                result = scorer.score_job(job_data)
+                store.save(job_id, result['features'], text=job_text(job_data))
+            conn.commit()
+            total += len(rows)
+            last_id = rows[-1][0]
+        return total
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain the score-time feature store")
+    parser.add_argument('command', choices=['backfill'],
+                        help="backfill: compute features and token index entries for jobs missing them")
+    parser.add_argument('--db', default="data/jobs-tracker.db", help="SQLite database path")
+    parser.add_argument('--config', default="data/resume_config.json", help="Resume config path")
+    args = parser.parse_args()
+
+    logging.getLogger('simple_scorer').setLevel(logging.WARNING)
+    count = backfill(args.db, args.config)
+    print(f"✅ Backfilled features for {count} jobs")
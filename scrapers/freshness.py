@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Posting Freshness
+
+posted_date is whatever string the board returned, and a week-old posting
+with a good score ranked above yesterday's slightly weaker one. This
+module gives postings a typed timestamp and a freshness-decayed rank:
+
+    - posted_at: posted_date parsed to Unix epoch seconds (ISO 8601 with or
+      without a time zone, epoch numbers, "3 days ago"); ingest stores it
+      and `backfill` fills stored jobs
+    - decayed score: match_score * 2^(-age / HALF_LIFE_DAYS)
+    - freshness_rank: ln(match_score) + posted_at * ln 2 / half-life, a
+      virtual generated column (migration 016). The log of the decayed
+      score differs from it only by a term that is the same for every job
+      at a given moment, so ordering by it is ordering by decayed score,
+      and its index stays valid without ever being recomputed
+
+Jobs without posted_at decay from scraped_at. Scores below 1 count as 1
+(ln 0 is undefined). The column needs SQLite's math functions: without
+them every write to scraped_jobs fails, so the writers call
+require_math_functions() first and stop with a clear message instead.
+
+Usage:
+    python3 scrapers/freshness.py backfill [--db data/jobs-tracker.db] [--all]
+
+Author: Karthik Shetty
+Created: 2025-11-26
+"""
+
+import argparse
+import logging
+import math
+import re
+import sqlite3
+import time
+from datetime import datetime, timezone
+from typing import Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# Days after which a posting's score counts half; baked into freshness_rank
+# (changing it needs the column redefined, see migration 016)
+HALF_LIFE_DAYS = 7
+
+RELATIVE_RE = re.compile(
+    r'^\s*(?:(?P<count>\d+|an?)\+?\s+(?P<unit>minute|hour|day|week|month)s?\s+ago'
+    r'|(?P<word>just\s+now|today|yesterday))\s*$',
+    re.IGNORECASE
+)
+UNIT_SECONDS = {'minute': 60, 'hour': 3600, 'day': 86400, 'week': 7 * 86400, 'month': 30 * 86400}
+
+# Plausible posting times: after 2000-01-01, before now plus a day of clock skew
+MIN_EPOCH = 946684800
+
+
+def parse_posted_date(value: Union[str, int, float, None],
+                      now: Optional[float] = None) -> Optional[int]:
+    """
+    Unix epoch seconds of a posting date.
+
+    Args:
+        value: posted_date as stored ("2025-11-06T08:01:09+00:00",
+            "2025-11-06", "1762416069", "3 days ago", ...) or an epoch number
+        now: Reference time for relative dates (default: current time; pass
+            the scrape time when backfilling)
+
+    Returns:
+        Epoch seconds, or None if the value cannot be parsed or is implausible
+    """
+    now = time.time() if now is None else now
+    if value is None or value == '':
+        return None
+
+    if isinstance(value, (int, float)) or str(value).strip().isdigit():
+        epoch = float(value)
+        if epoch > 1e11:
+            epoch /= 1000  # milliseconds
+    else:
+        text = str(value).strip()
+        relative = RELATIVE_RE.match(text)
+        if relative:
+            if relative.group('word'):
+                word = relative.group('word').lower()
+                epoch = now - 86400 if word == 'yesterday' else now
+            else:
+                count = relative.group('count')
+                count = 1 if count.lower() in ('a', 'an') else int(count)
+                epoch = now - count * UNIT_SECONDS[relative.group('unit').lower()]
+        else:
+            try:
+                parsed = datetime.fromisoformat(text.replace(' ', 'T', 1) if len(text) > 10 else text)
+            except ValueError:
+                return None
+            if parsed.tzinfo is None:
+                parsed = parsed.replace(tzinfo=timezone.utc)  # boards post in UTC
+            epoch = parsed.timestamp()
+
+    if not MIN_EPOCH <= epoch <= now + 86400:
+        return None
+    return int(epoch)
+
+
+def require_math_functions(conn: sqlite3.Connection) -> None:
+    """
+    Check that SQLite can evaluate freshness_rank.
+
+    Raises:
+        RuntimeError: If ln() is missing (SQLite before 3.35, or built
+            without SQLITE_ENABLE_MATH_FUNCTIONS)
+    """
+    try:
+        conn.execute("SELECT ln(1)").fetchone()
+    except sqlite3.OperationalError:
+        raise RuntimeError(
+            f"SQLite {sqlite3.sqlite_version} has no ln() math function, which the "
+            f"scraped_jobs.freshness_rank column (migration 016) needs for every insert "
+            f"and score update; use a Python whose SQLite is 3.35+ built with math functions"
+        ) from None
+
+
+def freshness_rank_sql(half_life_days: float = HALF_LIFE_DAYS, score_column: str = 'match_score') -> str:
+    """
+    SQL expression of freshness_rank (the generated column's definition).
+
+    score_column swaps in another score, e.g. a profile's from profile_job_scores.
+    """
+    return (f"ln(MAX({score_column}, 1)) + COALESCE(posted_at, CAST(strftime('%s', scraped_at) AS INTEGER))"
+            f" * {math.log(2)!r} / {half_life_days * 86400.0!r}")
+
+
+def decayed_score(match_score: Optional[float], posted_at: Optional[int],
+                  now: Optional[float] = None, half_life_days: float = HALF_LIFE_DAYS) -> Optional[float]:
+    """match_score decayed by posting age (None without a score or timestamp)."""
+    if match_score is None or posted_at is None:
+        return None
+    now = time.time() if now is None else now
+    age_days = max(0.0, now - posted_at) / 86400
+    return match_score * 0.5 ** (age_days / half_life_days)
+
+
+def backfill(db_path: str = "data/jobs-tracker.db", all_jobs: bool = False,
+             batch_size: int = 1000) -> int:
+    """
+    Parse posted_date into posted_at for stored jobs.
+
+    Needs migration 016. Relative dates are resolved against scraped_at.
+
+    Args:
+        db_path: SQLite database path
+        all_jobs: Re-parse every job, not only jobs without posted_at
+
+    Returns:
+        Number of jobs given a posted_at
+    """
+    conn = sqlite3.connect(db_path, timeout=30.0, isolation_level=None)
+    try:
+        require_math_functions(conn)
+        pending = "" if all_jobs else "AND posted_at IS NULL"
+        total = 0
+        last_id = 0
+        while True:
+            rows = conn.execute(f"""
+                SELECT id, posted_date, CAST(strftime('%s', scraped_at) AS INTEGER)
+                FROM scraped_jobs
+                WHERE id > ? AND posted_date IS NOT NULL {pending}
+                ORDER BY id
+                LIMIT ?
+            """, (last_id, batch_size)).fetchall()
+            if not rows:
+                break
+            updates = [(parse_posted_date(posted_date, scraped), job_id)
+                       for job_id, posted_date, scraped in rows]
+            conn.execute("BEGIN")
+            conn.executemany("UPDATE scraped_jobs SET posted_at = ? WHERE id = ?", updates)
+            conn.execute("COMMIT")
+            total += sum(1 for posted_at, _ in updates if posted_at is not None)
+            last_id = rows[-1][0]
+        return total
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Typed posting timestamps for freshness ranking")
+    parser.add_argument('command', choices=['backfill'],
+                        help="backfill: parse posted_date into posted_at for stored jobs")
+    parser.add_argument('--db', default="data/jobs-tracker.db", help="SQLite database path")
+    parser.add_argument('--all', action='store_true', help="re-parse every job")
+    args = parser.parse_args()
+
+    count = backfill(args.db, args.all)
+    print(f"✅ Parsed posted_at for {count} jobs")
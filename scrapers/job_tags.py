@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Job Tag Index
+
+scraped_jobs.tags is the board's tag list joined with commas, so counting
+or filtering postings by tag meant splitting every row. Ingest also writes
+each posting's tags, normalized, to a junction table:
+
+    scraped_job_tags  (job_id, tag) primary key, plus a (tag, job_id) index
+
+normalize_tags() lowercases tags, collapses whitespace and drops repeats.
+/api/scraped-jobs?tag= filters through the (tag, job_id) index and
+/api/scraped-jobs/facets counts postings per tag with an indexed GROUP BY.
+
+Usage:
+    python3 scrapers/job_tags.py backfill [--db data/jobs-tracker.db] [--all]
+
+Author: Karthik Shetty
+Created: 2025-11-27
+"""
+
+import argparse
+import logging
+import sqlite3
+from typing import Iterable, List, Union
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_tags(tags: Union[str, Iterable[str], None]) -> List[str]:
+    """
+    Distinct normalized tags of a tag list or a comma-joined tags string.
+
+    Example:
+        >>> normalize_tags("Python, SQL,  full time, python")
+        ['full time', 'python', 'sql']
+    """
+    if not tags:
+        return []
+    if isinstance(tags, str):
+        tags = tags.split(',')
+    return sorted({' '.join(tag.split()).lower() for tag in tags} - {''})
+
+
+class JobTagStore:
+    """
+    Normalized tags of scraped jobs, on an open connection.
+
+    Writes do not commit; ingest saves tags in the same transaction as the
+    job.
+    """
+
+    def __init__(self, conn: sqlite3.Connection):
+        """
+        Args:
+            conn: Open SQLite connection to the jobs tracker database
+        """
+        self.conn = conn
+        self.create_table()
+
+    def create_table(self) -> None:
+        """Create scraped_job_tags, its tag index and cleanup trigger if missing."""
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS scraped_job_tags (
+                job_id INTEGER NOT NULL REFERENCES scraped_jobs(id),
+                tag TEXT NOT NULL,
+                PRIMARY KEY (job_id, tag)
+            ) WITHOUT ROWID
+        """)
+        self.conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_scraped_job_tags_tag
+            ON scraped_job_tags(tag, job_id)
+        """)
+        self.conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS scraped_job_tags_cleanup
+            AFTER DELETE ON scraped_jobs
+            BEGIN
+                DELETE FROM scraped_job_tags WHERE job_id = OLD.id;
+            END
+        """)
+
+    def save(self, job_id: int, tags: Union[str, Iterable[str], None]) -> int:
+        """
+        Replace a job's tags.
+
+        Returns:
+            Number of tags stored
+        """
+        normalized = normalize_tags(tags)
+        self.conn.execute("DELETE FROM scraped_job_tags WHERE job_id = ?", (job_id,))
+        self.conn.executemany("INSERT INTO scraped_job_tags (job_id, tag) VALUES (?, ?)",
+                              [(job_id, tag) for tag in normalized])
+        return len(normalized)
+
+
+def backfill(db_path: str = "data/jobs-tracker.db", all_jobs: bool = False,
+             batch_size: int = 1000) -> int:
+    """
+    Index the tags of stored jobs.
+
+    Tag rows of jobs deleted before the cleanup trigger existed are
+    dropped first.
+
+    Args:
+        db_path: SQLite database path
+        all_jobs: Re-index every job, not only jobs without tag rows
+
+    Returns:
+        Number of jobs indexed
+    """
+    conn = sqlite3.connect(db_path, timeout=30.0, isolation_level=None)
+    try:
+        store = JobTagStore(conn)
+        conn.execute("DELETE FROM scraped_job_tags WHERE job_id NOT IN (SELECT id FROM scraped_jobs)")
+        pending = "" if all_jobs else """
+            AND NOT EXISTS (SELECT 1 FROM scraped_job_tags t WHERE t.job_id = scraped_jobs.id)"""
+        total = 0
+        last_id = 0
+        while True:
+            rows = conn.execute(f"""
+                SELECT id, tags FROM scraped_jobs
+                WHERE id > ? AND tags IS NOT NULL AND tags != '' {pending}
+                ORDER BY id
+                LIMIT ?
+            """, (last_id, batch_size)).fetchall()
+            if not rows:
+                break
+            conn.execute("BEGIN")
+            for job_id, tags in rows:
+                store.save(job_id, tags)
+            conn.execute("COMMIT")
+            total += len(rows)
+            last_id = rows[-1][0]
+        return total
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Normalized tag index of scraped jobs")
+    parser.add_argument('command', choices=['backfill'],
+                        help="backfill: index the tags of stored jobs")
+    parser.add_argument('--db', default="data/jobs-tracker.db", help="SQLite database path")
+    parser.add_argument('--all', action='store_true', help="re-index every job")
+    args = parser.parse_args()
+
+    count = backfill(args.db, args.all)
+    print(f"✅ Indexed the tags of {count} jobs")
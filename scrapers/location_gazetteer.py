@@ -0,0 +1,416 @@
+#!/usr/bin/env python3
+"""
+Location Gazetteer
+
+Job board locations are free text ("LatAm, North Macedonia, Portugal,
+Serbia", "Remote - US", "Bengaluru / Hybrid"). This module maps a raw
+location string to normalized codes once:
+
+    - countries as ISO 3166 alpha-2 codes (names, common aliases and major
+      cities resolve to their country), each with its region: NA, LATAM,
+      EUROPE, MEA or APAC
+    - region names ("LatAm", "EMEA", "Asia Pacific") to their regions, and
+      "worldwide" / "anywhere" / "global" to GLOBAL
+    - remote and hybrid flags (the REMOTE / HYBRID codes)
+
+All aliases are compiled into one regex, so a string is scanned once.
+Two-letter abbreviations (US, UK, EU) and ISO 3166 alpha-3 codes (CAN,
+DEU, IND) only match in capitals, so "us" in "join us" is not the United
+States and "can" is not Canada.
+
+normalize_location() is memoized per distinct raw string in memory, and
+LocationStore keeps every distinct string once in normalized_locations,
+with its codes in normalized_location_codes; scraped_jobs.location_id
+(migration 017) points at it, so /api/scraped-jobs?location= is an indexed
+lookup. SimpleJobScorer reads the remote and hybrid flags instead of
+running substring checks per job.
+
+Usage:
+    python3 scrapers/location_gazetteer.py backfill [--db data/jobs-tracker.db] [--all]
+
+Author: Karthik Shetty
+Created: 2025-11-26
+"""
+
+import argparse
+import logging
+import re
+import sqlite3
+from functools import lru_cache
+from typing import Dict, NamedTuple, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+REGIONS = ('NA', 'LATAM', 'EUROPE', 'MEA', 'APAC')
+FLAG_CODES = ('GLOBAL', 'REMOTE', 'HYBRID')
+
+# US state names ("Georgia" is left to the country)
+US_STATES = (
+    'alabama', 'alaska', 'arizona', 'arkansas', 'california', 'colorado', 'connecticut', 'delaware',
+    'florida', 'hawaii', 'idaho', 'illinois', 'indiana', 'iowa', 'kansas', 'kentucky', 'louisiana',
+    'maine', 'maryland', 'massachusetts', 'michigan', 'minnesota', 'mississippi', 'missouri',
+    'montana', 'nebraska', 'nevada', 'new hampshire', 'new jersey', 'new mexico', 'north carolina',
+    'north dakota', 'ohio', 'oklahoma', 'oregon', 'pennsylvania', 'rhode island', 'south carolina',
+    'south dakota', 'tennessee', 'texas', 'utah', 'vermont', 'virginia', 'washington', 'west virginia',
+    'wisconsin', 'wyoming',
+)
+
+# ISO code: (region, names, aliases and cities)
+COUNTRIES = {
+    # North America
+    'US': ('NA', ('united states', 'united states of america', 'usa', 'u.s.', 'u.s.a.', 'US', 'america',
+                  'new york', 'nyc', 'san francisco', 'bay area', 'seattle', 'austin', 'boston',
+                  'chicago', 'los angeles', 'denver', 'atlanta', 'miami', 'washington dc',
+                  'silicon valley', 'palo alto', 'mountain view', 'menlo park') + US_STATES),
+    'CA': ('NA', ('canada', 'toronto', 'vancouver', 'montreal', 'ottawa', 'calgary')),
+    # Latin America
+    'MX': ('LATAM', ('mexico', 'mexico city', 'guadalajara')),
+    'BR': ('LATAM', ('brazil', 'brasil', 'sao paulo', 'são paulo', 'rio de janeiro')),
+    'AR': ('LATAM', ('argentina', 'buenos aires')),
+    'CO': ('LATAM', ('colombia', 'bogota', 'bogotá', 'medellin', 'medellín')),
+    'CL': ('LATAM', ('chile', 'santiago')),
+    'PE': ('LATAM', ('peru', 'perú', 'lima')),
+    'UY': ('LATAM', ('uruguay', 'montevideo')),
+    'CR': ('LATAM', ('costa rica',)),
+    'EC': ('LATAM', ('ecuador',)),
+    'GT': ('LATAM', ('guatemala',)),
+    'DO': ('LATAM', ('dominican republic',)),
+    'VE': ('LATAM', ('venezuela',)),
+    'PA': ('LATAM', ('panama',)),
+    # Europe
+    'GB': ('EUROPE', ('united kingdom', 'UK', 'u.k.', 'great britain', 'britain', 'england', 'scotland',
+                      'wales', 'northern ireland', 'london', 'manchester', 'edinburgh')),
+    'IE': ('EUROPE', ('ireland', 'dublin')),
+    'DE': ('EUROPE', ('germany', 'deutschland', 'berlin', 'munich', 'hamburg', 'frankfurt')),
+    'FR': ('EUROPE', ('france', 'paris', 'lyon')),
+    'ES': ('EUROPE', ('spain', 'madrid', 'barcelona')),
+    'PT': ('EUROPE', ('portugal', 'lisbon', 'porto')),
+    'IT': ('EUROPE', ('italy', 'milan', 'rome')),
+    'NL': ('EUROPE', ('netherlands', 'the netherlands', 'holland', 'amsterdam', 'rotterdam')),
+    'BE': ('EUROPE', ('belgium', 'brussels')),
+    'LU': ('EUROPE', ('luxembourg',)),
+    'CH': ('EUROPE', ('switzerland', 'zurich', 'zürich', 'geneva')),
+    'AT': ('EUROPE', ('austria', 'vienna')),
+    'PL': ('EUROPE', ('poland', 'warsaw', 'krakow', 'kraków', 'wroclaw')),
+    'CZ': ('EUROPE', ('czech republic', 'czechia', 'prague')),
+    'SK': ('EUROPE', ('slovakia', 'bratislava')),
+    'HU': ('EUROPE', ('hungary', 'budapest')),
+    'RO': ('EUROPE', ('romania', 'bucharest', 'cluj')),
+    'BG': ('EUROPE', ('bulgaria', 'sofia')),
+    'GR': ('EUROPE', ('greece', 'athens')),
+    'CY': ('EUROPE', ('cyprus',)),
+    'MT': ('EUROPE', ('malta',)),
+    'SE': ('EUROPE', ('sweden', 'stockholm')),
+    'NO': ('EUROPE', ('norway', 'oslo')),
+    'DK': ('EUROPE', ('denmark', 'copenhagen')),
+    'FI': ('EUROPE', ('finland', 'helsinki')),
+    'IS': ('EUROPE', ('iceland',)),
+    'EE': ('EUROPE', ('estonia', 'tallinn')),
+    'LV': ('EUROPE', ('latvia', 'riga')),
+    'LT': ('EUROPE', ('lithuania', 'vilnius')),
+    'UA': ('EUROPE', ('ukraine', 'kyiv', 'kiev')),
+    'MD': ('EUROPE', ('moldova',)),
+    'RS': ('EUROPE', ('serbia', 'belgrade')),
+    'HR': ('EUROPE', ('croatia', 'zagreb')),
+    'SI': ('EUROPE', ('slovenia', 'ljubljana')),
+    'BA': ('EUROPE', ('bosnia and herzegovina', 'bosnia', 'sarajevo')),
+    'ME': ('EUROPE', ('montenegro',)),
+    'MK': ('EUROPE', ('north macedonia', 'macedonia', 'skopje')),
+    'AL': ('EUROPE', ('albania', 'tirana')),
+    'XK': ('EUROPE', ('kosovo',)),
+    'GE': ('EUROPE', ('georgia', 'tbilisi')),
+    'AM': ('EUROPE', ('armenia', 'yerevan')),
+    # Middle East and Africa
+    'TR': ('MEA', ('turkey', 'türkiye', 'turkiye', 'istanbul')),
+    'IL': ('MEA', ('israel', 'tel aviv')),
+    'AE': ('MEA', ('united arab emirates', 'uae', 'dubai', 'abu dhabi')),
+    'SA': ('MEA', ('saudi arabia', 'riyadh')),
+    'QA': ('MEA', ('qatar', 'doha')),
+    'EG': ('MEA', ('egypt', 'cairo')),
+    'MA': ('MEA', ('morocco',)),
+    'ZA': ('MEA', ('south africa', 'cape town', 'johannesburg')),
+    'NG': ('MEA', ('nigeria', 'lagos')),
+    'KE': ('MEA', ('kenya', 'nairobi')),
+    'GH': ('MEA', ('ghana', 'accra')),
+    # Asia Pacific
+    'IN': ('APAC', ('india', 'bangalore', 'bengaluru', 'mumbai', 'pune', 'hyderabad', 'chennai',
+                    'delhi', 'new delhi', 'delhi ncr', 'ncr', 'gurgaon', 'gurugram', 'noida', 'kolkata',
+                    'ahmedabad', 'kochi', 'coimbatore', 'jaipur', 'mysore', 'mysuru', 'mangalore')),
+    'PK': ('APAC', ('pakistan', 'karachi', 'lahore')),
+    'BD': ('APAC', ('bangladesh', 'dhaka')),
+    'LK': ('APAC', ('sri lanka', 'colombo')),
+    'NP': ('APAC', ('nepal', 'kathmandu')),
+    'SG': ('APAC', ('singapore',)),
+    'MY': ('APAC', ('malaysia', 'kuala lumpur')),
+    'ID': ('APAC', ('indonesia', 'jakarta')),
+    'TH': ('APAC', ('thailand', 'bangkok')),
+    'VN': ('APAC', ('vietnam', 'viet nam', 'ho chi minh city', 'hanoi')),
+    'PH': ('APAC', ('philippines', 'manila')),
+    'JP': ('APAC', ('japan', 'tokyo')),
+    'KR': ('APAC', ('south korea', 'korea', 'seoul')),
+    'CN': ('APAC', ('china', 'shanghai', 'beijing', 'shenzhen')),
+    'HK': ('APAC', ('hong kong',)),
+    'TW': ('APAC', ('taiwan', 'taipei')),
+    'AU': ('APAC', ('australia', 'sydney', 'melbourne', 'brisbane', 'perth')),
+    'NZ': ('APAC', ('new zealand', 'auckland', 'wellington')),
+}
+
+# ISO 3166 alpha-3 code: alpha-2 code ("CAN-Remote", "DEU / AUT"); USA is
+# a name above. Codes that are also everyday words or time zones in
+# capitals (ARE, ARM, COL, DOM, EST, FIN, GEO, MAR, PAN, PER) are left out.
+ALPHA3_CODES = {
+    'CAN': 'CA', 'MEX': 'MX', 'BRA': 'BR', 'ARG': 'AR', 'CHL': 'CL', 'URY': 'UY', 'CRI': 'CR',
+    'ECU': 'EC', 'GTM': 'GT', 'VEN': 'VE',
+    'GBR': 'GB', 'IRL': 'IE', 'DEU': 'DE', 'FRA': 'FR', 'ESP': 'ES', 'PRT': 'PT', 'ITA': 'IT',
+    'NLD': 'NL', 'BEL': 'BE', 'LUX': 'LU', 'CHE': 'CH', 'AUT': 'AT', 'POL': 'PL', 'CZE': 'CZ',
+    'SVK': 'SK', 'HUN': 'HU', 'ROU': 'RO', 'BGR': 'BG', 'GRC': 'GR', 'CYP': 'CY', 'MLT': 'MT',
+    'SWE': 'SE', 'NOR': 'NO', 'DNK': 'DK', 'ISL': 'IS', 'LVA': 'LV', 'LTU': 'LT', 'UKR': 'UA',
+    'MDA': 'MD', 'SRB': 'RS', 'HRV': 'HR', 'SVN': 'SI', 'BIH': 'BA', 'MNE': 'ME', 'MKD': 'MK',
+    'ALB': 'AL',
+    'TUR': 'TR', 'ISR': 'IL', 'SAU': 'SA', 'QAT': 'QA', 'EGY': 'EG', 'ZAF': 'ZA', 'NGA': 'NG',
+    'KEN': 'KE', 'GHA': 'GH',
+    'IND': 'IN', 'PAK': 'PK', 'BGD': 'BD', 'LKA': 'LK', 'NPL': 'NP', 'SGP': 'SG', 'MYS': 'MY',
+    'IDN': 'ID', 'THA': 'TH', 'VNM': 'VN', 'PHL': 'PH', 'JPN': 'JP', 'KOR': 'KR', 'CHN': 'CN',
+    'HKG': 'HK', 'TWN': 'TW', 'AUS': 'AU', 'NZL': 'NZ',
+}
+
+# Alias: region codes (and GLOBAL)
+REGION_ALIASES = {
+    'north america': ('NA',),
+    'latam': ('LATAM',), 'latin america': ('LATAM',), 'south america': ('LATAM',),
+    'central america': ('LATAM',),
+    'americas': ('NA', 'LATAM'),
+    'europe': ('EUROPE',), 'EU': ('EUROPE',), 'european union': ('EUROPE',),
+    'emea': ('EUROPE', 'MEA'),
+    'middle east': ('MEA',), 'africa': ('MEA',), 'mena': ('MEA',),
+    'apac': ('APAC',), 'asia': ('APAC',), 'asia pacific': ('APAC',), 'oceania': ('APAC',),
+    'worldwide': ('GLOBAL',), 'world wide': ('GLOBAL',), 'global': ('GLOBAL',), 'anywhere': ('GLOBAL',),
+}
+
+
+def _key(text: str) -> str:
+    return ' '.join(re.split(r'[\s-]+', text.lower()))
+
+
+def _alias_pattern(alias: str) -> str:
+    escaped = r'[\s-]+'.join(re.escape(part) for part in alias.split())
+    if len(alias) <= 3 and alias.isupper():
+        return rf'(?-i:\b{escaped}\b)'  # US, UK, EU, CAN: capitals only
+    # Aliases ending in '.' (u.s.) have no word boundary after them
+    return rf'\b{escaped}' + (r'\b' if alias[-1].isalnum() else '')
+
+
+def _build_aliases() -> Dict[str, Tuple[str, ...]]:
+    aliases: Dict[str, Tuple[str, ...]] = {}
+    for code, (region, names) in COUNTRIES.items():
+        for name in names:
+            aliases[name] = (code,)
+    aliases.update((alpha3, (code,)) for alpha3, code in ALPHA3_CODES.items())
+    aliases.update(REGION_ALIASES)
+    return aliases
+
+
+ALIASES = _build_aliases()
+ALIAS_CODES = {_key(alias): codes for alias, codes in ALIASES.items()}
+COUNTRY_REGIONS = {code: region for code, (region, _) in COUNTRIES.items()}
+KNOWN_CODES = frozenset(COUNTRY_REGIONS) | frozenset(REGIONS) | frozenset(FLAG_CODES)
+
+# Remote keywords are the ones the location score always used
+LOCATION_RE = re.compile(
+    '|'.join(
+        [r'(?P<remote>\bremote|\banywhere\b|\bwork\s+from\s+home\b|\bwfh\b)', r'(?P<hybrid>\bhybrid)']
+        + [f'(?:{_alias_pattern(alias)})' for alias in sorted(ALIASES, key=len, reverse=True)]
+    ),
+    re.IGNORECASE
+)
+
+
+class Location(NamedTuple):
+    """Normalized location of one raw string."""
+    countries: Tuple[str, ...]
+    regions: Tuple[str, ...]
+    is_remote: bool
+    is_hybrid: bool
+    is_global: bool
+
+    @property
+    def codes(self) -> Tuple[str, ...]:
+        """Every code a location= filter can match."""
+        flags = (('GLOBAL',) if self.is_global else ()) + (('REMOTE',) if self.is_remote else ()) \
+            + (('HYBRID',) if self.is_hybrid else ())
+        return self.countries + self.regions + flags
+
+
+@lru_cache(maxsize=8192)
+def normalize_location(raw: Optional[str]) -> Location:
+    """
+    Countries, regions and remote / hybrid flags of a raw location string.
+
+    A country also adds its region; "anywhere" is both remote and GLOBAL.
+    """
+    countries: Set[str] = set()
+    regions: Set[str] = set()
+    is_remote = is_hybrid = is_global = False
+    for match in LOCATION_RE.finditer(raw or ''):
+        if match.lastgroup == 'remote':
+            is_remote = True
+            is_global = is_global or match.group(0).lower() == 'anywhere'
+        elif match.lastgroup == 'hybrid':
+            is_hybrid = True
+        else:
+            for code in ALIAS_CODES[_key(match.group(0))]:
+                if code == 'GLOBAL':
+                    is_global = True
+                elif code in COUNTRY_REGIONS:
+                    countries.add(code)
+                    regions.add(COUNTRY_REGIONS[code])
+                else:
+                    regions.add(code)
+    return Location(tuple(sorted(countries)), tuple(sorted(regions)), is_remote, is_hybrid, is_global)
+
+
+def location_filter_codes(value: str) -> Set[str]:
+    """
+    Codes a location= filter value asks for.
+
+    Args:
+        value: Comma-separated codes (IN, EUROPE, REMOTE) or names
+            ("India", "Bangalore", "LatAm")
+
+    Raises:
+        ValueError: If a part names no known location
+    """
+    codes: Set[str] = set()
+    for part in (p.strip() for p in value.split(',')):
+        if not part:
+            continue
+        if part.upper() in KNOWN_CODES:
+            codes.add(part.upper())
+            continue
+        location = normalize_location(part)
+        # A country name asks for the country, not its whole region
+        found = location.countries or location.regions or location.codes
+        if not found:
+            raise ValueError(f"Unknown location '{part}'")
+        codes.update(found)
+    return codes
+
+
+class LocationStore:
+    """
+    Distinct raw locations and their codes, on an open connection.
+
+    Writes do not commit; ingest assigns location ids in the same
+    transaction as the jobs.
+    """
+
+    def __init__(self, conn: sqlite3.Connection):
+        """
+        Args:
+            conn: Open SQLite connection to the jobs tracker database
+        """
+        self.conn = conn
+        self._ids: Dict[str, int] = {}
+        self.create_tables()
+
+    def create_tables(self) -> None:
+        """Create normalized_locations and normalized_location_codes if missing."""
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS normalized_locations (
+                id INTEGER PRIMARY KEY,
+                raw TEXT UNIQUE NOT NULL,
+                countries TEXT,
+                regions TEXT,
+                is_remote BOOLEAN NOT NULL DEFAULT 0,
+                is_hybrid BOOLEAN NOT NULL DEFAULT 0,
+                is_global BOOLEAN NOT NULL DEFAULT 0
+            )
+        """)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS normalized_location_codes (
+                code TEXT NOT NULL,
+                location_id INTEGER NOT NULL REFERENCES normalized_locations(id),
+                PRIMARY KEY (code, location_id)
+            ) WITHOUT ROWID
+        """)
+
+    def location_id(self, raw: Optional[str]) -> Optional[int]:
+        """
+        Id of a raw location string, normalizing it on first sight.
+
+        Returns:
+            normalized_locations.id, or None for an empty location
+        """
+        if not raw:
+            return None
+        cached = self._ids.get(raw)
+        if cached is not None:
+            return cached
+        row = self.conn.execute("SELECT id FROM normalized_locations WHERE raw = ?", (raw,)).fetchone()
+        if row:
+            location_id = row[0]
+        else:
+            location = normalize_location(raw)
+            location_id = self.conn.execute("""
+                INSERT INTO normalized_locations (raw, countries, regions, is_remote, is_hybrid, is_global)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (raw, ','.join(location.countries), ','.join(location.regions),
+                  int(location.is_remote), int(location.is_hybrid), int(location.is_global))).lastrowid
+            self.conn.executemany(
+                "INSERT INTO normalized_location_codes (code, location_id) VALUES (?, ?)",
+                [(code, location_id) for code in location.codes]
+            )
+        self._ids[raw] = location_id
+        return location_id
+
+    def clear(self) -> None:
+        """Forget every normalized string (after editing the gazetteer); ids are reassigned."""
+        self.conn.execute("UPDATE scraped_jobs SET location_id = NULL")
+        self.conn.execute("DELETE FROM normalized_location_codes")
+        self.conn.execute("DELETE FROM normalized_locations")
+        self._ids.clear()
+
+
+def backfill(db_path: str = "data/jobs-tracker.db", renormalize: bool = False) -> int:
+    """
+    Set scraped_jobs.location_id for stored jobs.
+
+    Needs migration 017.
+
+    Args:
+        db_path: SQLite database path
+        renormalize: Drop every stored normalization first (after editing
+            the gazetteer), not only fill jobs without a location id
+
+    Returns:
+        Number of jobs given a location id
+    """
+    conn = sqlite3.connect(db_path, timeout=30.0, isolation_level=None)
+    try:
+        store = LocationStore(conn)
+        conn.execute("BEGIN")
+        if renormalize:
+            store.clear()
+        rows = conn.execute("""
+            SELECT id, location FROM scraped_jobs
+            WHERE location_id IS NULL AND location IS NOT NULL AND location != ''
+        """).fetchall()
+        conn.executemany("UPDATE scraped_jobs SET location_id = ? WHERE id = ?",
+                         [(store.location_id(location), job_id) for job_id, location in rows])
+        conn.execute("COMMIT")
+        return len(rows)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Normalize scraped job locations")
+    parser.add_argument('command', choices=['backfill'],
+                        help="backfill: normalize the locations of stored jobs")
+    parser.add_argument('--db', default="data/jobs-tracker.db", help="SQLite database path")
+    parser.add_argument('--all', action='store_true',
+                        help="drop stored normalizations and redo every job (after editing the gazetteer)")
+    args = parser.parse_args()
+
+    count = backfill(args.db, args.all)
+    print(f"✅ Normalized the locations of {count} jobs")
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Multi-Profile Job Scoring
+
+Scores each posting against several candidate resume configs with a single
+text scan:
+
+    - the skills, domains and red flags of every profile (each with its own
+      keyword_synonyms) are compiled into one TermMatcher.union() regex
+    - a posting is scanned once; every profile's SimpleJobScorer computes
+      its score from its share of the hits (title, location and experience
+      stay per profile; the stated requirements they use are extracted once)
+    - results are stored per profile in profile_job_scores
+
+The main profile (data/resume_config.json) keeps writing scraped_jobs as
+before; the additional profiles are listed in data/profiles.json:
+
+    {
+        "profiles": {
+            "priya": "data/profiles/priya.json",
+            "arjun": "data/profiles/arjun.json"
+        }
+    }
+
+Each file has the resume_config.json layout.
+
+Usage:
+    python3 scrapers/multi_profile.py rescore [--db data/jobs-tracker.db] [--profile NAME]
+
+Author: Karthik Shetty
+Created: 2025-11-24
+"""
+
+import argparse
+import json
+import logging
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+try:
+    from .requirement_extractor import extract_requirements
+    from .simple_scorer import SimpleJobScorer, config_term_weights, job_text
+    from .term_matcher import TermMatcher
+except ImportError:
+    from requirement_extractor import extract_requirements
+    from simple_scorer import SimpleJobScorer, config_term_weights, job_text
+    from term_matcher import TermMatcher
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROFILES_PATH = "data/profiles.json"
+
+# Name of the data/resume_config.json profile, whose scores live in scraped_jobs
+MAIN_PROFILE = 'default'
+
+
+def load_profiles(path: str = DEFAULT_PROFILES_PATH) -> Dict[str, str]:
+    """
+    Additional profiles listed in the profiles file.
+
+    Args:
+        path: profiles.json path
+
+    Returns:
+        {profile name: config path}; empty if the file does not exist
+
+    Raises:
+        ValueError: If a profile uses the reserved main profile name
+    """
+    profiles_file = Path(path)
+    if not profiles_file.exists():
+        return {}
+    with open(profiles_file, 'r', encoding='utf-8') as f:
+        profiles = json.load(f).get('profiles', {})
+    if MAIN_PROFILE in profiles:
+        raise ValueError(f"Profile name '{MAIN_PROFILE}' is reserved for data/resume_config.json")
+    return dict(profiles)
+
+
+class MultiProfileScorer:
+    """
+    Scores a job for every profile from one shared term scan.
+
+    Example:
+        >>> scorer = MultiProfileScorer({'default': SimpleJobScorer(),
+        ...                              'priya': SimpleJobScorer('data/profiles/priya.json')})
+        >>> results = scorer.score_job(job_data)
+        >>> results['priya']['final_score']
+    """
+
+    def __init__(self, scorers: Dict[str, SimpleJobScorer]):
+        """
+        Build the union matcher.
+
+        Args:
+            scorers: {profile name: scorer with that profile's config}
+        """
+        self.scorers = dict(scorers)
+        self.matcher = TermMatcher.union({
+            name: (config_term_weights(scorer.config), scorer.synonyms)
+            for name, scorer in self.scorers.items()
+        })
+
+    @classmethod
+    def from_paths(cls, profiles: Dict[str, str]) -> 'MultiProfileScorer':
+        """Build from {profile name: config path}."""
+        return cls({name: SimpleJobScorer(config_path=path) for name, path in profiles.items()})
+
+    def score_job(self, job_data: Dict) -> Dict[str, Dict]:
+        """
+        Score a job for every profile.
+
+        Args:
+            job_data: SimpleJobScorer.score_job() input
+
+        Returns:
+            {profile name: score_job() result}
+        """
+        if not job_data.get('requirements'):
+            job_data = dict(job_data, requirements=extract_requirements(
+                job_data.get('title'), job_data.get('description')))
+        scanned_text = job_text(job_data)
+        found = self.matcher.match(' '.join(scanned_text.lower().split()))
+        results = {}
+        for name, scorer in self.scorers.items():
+            matches = {kind: found[(name, kind)] for kind in ('skill', 'domain', 'red_flag')}
+            results[name] = scorer.score_job(job_data, matches=matches)
+        return results
+
+
+class ProfileScoreStore:
+    """
+    Per-profile scores in profile_job_scores, on an open connection.
+
+    Writes do not commit; callers save scores in the same transaction as
+    their scraped_jobs row.
+    """
+
+    def __init__(self, conn: sqlite3.Connection):
+        """
+        Args:
+            conn: Open SQLite connection to the jobs tracker database
+        """
+        self.conn = conn
+        self.create_table()
+
+    def create_table(self) -> None:
+        """Create profile_job_scores, its ranking index and cleanup trigger if missing."""
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS profile_job_scores (
+                profile TEXT NOT NULL,
+                job_id INTEGER NOT NULL REFERENCES scraped_jobs(id),
+                match_score REAL,
+                classification TEXT,
+                matched_skills TEXT,
+                matched_domains TEXT,
+                red_flags TEXT,
+                recommendation TEXT,
+                scored_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (profile, job_id)
+            ) WITHOUT ROWID
+        """)
+        self.conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_profile_job_scores_rank
+            ON profile_job_scores(profile, match_score DESC)
+        """)
+        self.conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS profile_job_scores_cleanup
+            AFTER DELETE ON scraped_jobs
+            BEGIN
+                DELETE FROM profile_job_scores WHERE job_id = OLD.id;
+            END
+        """)
+
+    def save(self, job_id: int, results: Dict[str, Dict]) -> None:
+        """
+        Store score_job() results of one job (replaces earlier scores).
+
+        Args:
+            job_id: scraped_jobs.id
+            results: {profile name: score_job() result}
+        """
+        self.conn.executemany("""
+            INSERT OR REPLACE INTO profile_job_scores (
+                profile, job_id, match_score, classification, matched_skills,
+                matched_domains, red_flags, recommendation
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, [
+            (name, job_id, result['final_score'], result['classification'],
+             json.dumps(result['matched_skills']), json.dumps(result['matched_domains']),
+             json.dumps(result['red_flags']), result['recommendation'])
+            for name, result in results.items()
+        ])
+
+    def profiles(self) -> List[str]:
+        """Profiles with stored scores."""
+        return [row[0] for row in self.conn.execute(
+            "SELECT DISTINCT profile FROM profile_job_scores ORDER BY profile"
+        )]
+
+
+def rescore_profiles(db_path: str = "data/jobs-tracker.db",
+                     profiles_path: str = DEFAULT_PROFILES_PATH,
+                     only: Optional[Iterable[str]] = None,
+                     batch_size: int = 200) -> Dict[str, int]:
+    """
+    Score every canonical scraped job for the additional profiles.
+
+    Run after adding a profile or editing its config; one scan per job
+    covers all profiles.
+
+    Args:
+        db_path: SQLite database path
+        profiles_path: profiles.json path
+        only: Profile names to score (default: all in the file)
+        batch_size: Jobs per transaction
+
+    Returns:
+        {'jobs': jobs scored, 'profiles': profiles scored}
+    """
+    try:
+        from .description_store import DescriptionStore
+    except ImportError:
+        from description_store import DescriptionStore
+
+    profiles = load_profiles(profiles_path)
+    if only:
+        missing = set(only) - set(profiles)
+        if missing:
+            raise ValueError(f"Unknown profile(s): {', '.join(sorted(missing))}")
+        profiles = {name: path for name, path in profiles.items() if name in set(only)}
+    if not profiles:
+        return {'jobs': 0, 'profiles': 0}
+
+    scorer = MultiProfileScorer.from_paths(profiles)
+    conn = sqlite3.connect(db_path, timeout=30.0, isolation_level=None)
+    try:
+        store = ProfileScoreStore(conn)
+        descriptions = DescriptionStore(conn)
+        total = 0
+        last_id = 0
+        while True:
+            rows = conn.execute("""
+                SELECT id, job_title, location, company, tags, semantic_score
+                FROM scraped_jobs
+                WHERE canonical_job_id IS NULL AND id > ?
+                ORDER BY id
+                LIMIT ?
+            """, (last_id, batch_size)).fetchall()
+            if not rows:
+                break
+            full_text = descriptions.load_many(row[0] for row in rows)
+            conn.execute("BEGIN")
+            try:
+                for job_id, title, location, company, tags, semantic_score in rows:
+                    store.save(job_id, scorer.score_job({
+                        'title': title or '',
+                        'description': full_text.get(job_id, ''),
+                        'location': location or '',
+                        'company': company or '',
+                        'tags': tags or '',
+                        'experience_required': '',
+                        'semantic_score': semantic_score
+                    }))
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            total += len(rows)
+            last_id = rows[-1][0]
+        return {'jobs': total, 'profiles': len(profiles)}
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score scraped jobs for additional candidate profiles")
+    parser.add_argument('command', choices=['rescore'],
+                        help="rescore: score every stored job for the profiles in profiles.json")
+    parser.add_argument('--db', default="data/jobs-tracker.db", help="SQLite database path")
+    parser.add_argument('--profiles', default=DEFAULT_PROFILES_PATH, help="profiles.json path")
+    parser.add_argument('--profile', action='append', help="only this profile (repeatable)")
+    args = parser.parse_args()
+
+    logging.getLogger('simple_scorer').setLevel(logging.WARNING)
+
+    result = rescore_profiles(args.db, args.profiles, args.profile)
+    print(f"✅ Scored {result['jobs']} jobs for {result['profiles']} profile(s)")
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+Near-Duplicate Job Detection
+
+The same role is often reposted under a new external id (and will arrive
+from several boards), so external_id uniqueness does not catch it. Each
+canonical job gets a MinHash signature of its normalized title and
+description, indexed with banded LSH:
+
+    job_signatures   job_id -> packed 64-value MinHash signature, title key
+    job_lsh_buckets  (band, bucket hash) -> job_id, one row per band
+
+A new posting is compared only with the jobs sharing at least one band
+bucket. If it has the same title (case, punctuation and word spacing
+ignored) and location (scraped_jobs.location_id), and the estimated
+Jaccard similarity of its word 3-grams reaches the threshold (default
+0.8), it is stored as a near-duplicate. Companies reuse one description
+template across levels ("Associate" / "Associate Principal") and cities,
+so text similarity alone is not enough: a copied score includes the
+location component.
+
+For a near-duplicate:
+
+    - scraped_jobs.canonical_job_id points at the first posting of the role
+    - score fields are copied from the canonical job instead of scoring it
+    - no feature row, token index entries or signature are written
+    - rescoring skips it; rescoring the canonical job updates its copies
+
+With 16 bands of 4 rows, pairs at similarity 0.8 share a bucket >99.9% of
+the time and unrelated postings (similarity 0.3) ~12%; candidates are then
+checked against the full signature.
+
+Backfill also unlinks near-duplicates stored under a different location
+than their canonical job (linked before the location was part of the key);
+the next rescore_all.py run scores them.
+
+Usage:
+    python3 scrapers/near_duplicates.py backfill [--db data/jobs-tracker.db]
+
+Author: Karthik Shetty
+Created: 2025-11-24
+"""
+
+import argparse
+import hashlib
+import logging
+import random
+import re
+import sqlite3
+from array import array
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+NUM_PERMUTATIONS = 64
+BANDS = 16
+ROWS_PER_BAND = NUM_PERMUTATIONS // BANDS
+SHINGLE_SIZE = 3
+DEFAULT_THRESHOLD = 0.8
+
+# Universal hashing (a * x + b) mod p over 64-bit shingle hashes
+_PRIME = (1 << 61) - 1
+_rng = random.Random(20251124)  # fixed seed: signatures must be stable across runs
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME))
+                 for _ in range(NUM_PERMUTATIONS)]
+
+WORD_RE = re.compile(r'[a-z0-9]+')
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> Set[str]:
+    """Word n-grams of a lowercased text (the words themselves if shorter)."""
+    words = WORD_RE.findall((text or '').lower())
+    if len(words) <= size:
+        return {' '.join(words)} if words else set()
+    return {' '.join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def minhash_signature(text: str) -> Tuple[int, ...]:
+    """
+    MinHash signature of a text's shingles.
+
+    Returns:
+        NUM_PERMUTATIONS ints; empty tuple for a text without words
+    """
+    hashes = [int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'little')
+              for shingle in shingles(text)]
+    if not hashes:
+        return ()
+    return tuple(min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMUTATIONS)
+
+
+def estimate_similarity(first: Iterable[int], second: Iterable[int]) -> float:
+    """Estimated Jaccard similarity: fraction of equal signature values."""
+    first, second = tuple(first), tuple(second)
+    if not first or len(first) != len(second):
+        return 0.0
+    return sum(a == b for a, b in zip(first, second)) / len(first)
+
+
+def band_buckets(signature: Tuple[int, ...]) -> List[Tuple[int, int]]:
+    """(band, bucket) pairs of a signature; buckets are signed 64-bit for SQLite."""
+    buckets = []
+    for band in range(BANDS):
+        rows = array('Q', signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]).tobytes()
+        digest = hashlib.blake2b(rows, digest_size=8).digest()
+        buckets.append((band, int.from_bytes(digest, 'little', signed=True)))
+    return buckets
+
+
+def job_signature_text(title: Optional[str], description: Optional[str]) -> str:
+    """Text a posting is compared on."""
+    return f"{title or ''}\n{description or ''}"
+
+
+def title_key(title: Optional[str]) -> str:
+    """Title as compared between postings: lowercase words, single-spaced."""
+    return ' '.join(WORD_RE.findall((title or '').lower()))
+
+
+class NearDuplicateIndex:
+    """
+    LSH index of canonical job signatures on an open connection.
+
+    Writes do not commit; callers add a job in the same transaction as its
+    scraped_jobs row.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, threshold: float = DEFAULT_THRESHOLD):
+        """
+        Args:
+            conn: Open SQLite connection to the jobs tracker database
+            threshold: Minimum estimated Jaccard similarity of a near-duplicate
+        """
+        self.conn = conn
+        self.threshold = threshold
+        self.create_tables()
+
+    def create_tables(self) -> None:
+        """Create the signature and bucket tables and their cleanup trigger if missing."""
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS job_signatures (
+                job_id INTEGER PRIMARY KEY REFERENCES scraped_jobs(id),
+                signature BLOB NOT NULL,
+                title_key TEXT NOT NULL
+            )
+        """)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS job_lsh_buckets (
+                band INTEGER NOT NULL,
+                bucket INTEGER NOT NULL,
+                job_id INTEGER NOT NULL,
+                PRIMARY KEY (band, bucket, job_id)
+            ) WITHOUT ROWID
+        """)
+        self.conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_job_lsh_buckets_job
+            ON job_lsh_buckets(job_id)
+        """)
+        # A deleted canonical job leaves its copies canonical themselves;
+        # the next rescore_all.py run scores them
+        self.conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS job_signatures_cleanup
+            AFTER DELETE ON scraped_jobs
+            BEGIN
+                DELETE FROM job_signatures WHERE job_id = OLD.id;
+                DELETE FROM job_lsh_buckets WHERE job_id = OLD.id;
+                UPDATE scraped_jobs SET canonical_job_id = NULL WHERE canonical_job_id = OLD.id;
+            END
+        """)
+
+    def find_canonical(self, signature: Tuple[int, ...], title: Optional[str],
+                       location_id: Optional[int] = None) -> Optional[Tuple[int, float]]:
+        """
+        Most similar indexed job with the same title and location, at or above the threshold.
+
+        Args:
+            signature: minhash_signature() of the new posting
+            title: Title of the new posting
+            location_id: LocationStore.location_id() of the new posting's location
+
+        Returns:
+            (canonical job_id, estimated similarity) or None
+        """
+        if not signature:
+            return None
+        candidates: Set[int] = set()
+        for band, bucket in band_buckets(signature):
+            candidates.update(row[0] for row in self.conn.execute(
+                "SELECT job_id FROM job_lsh_buckets WHERE band = ? AND bucket = ?", (band, bucket)
+            ))
+        if not candidates:
+            return None
+
+        best = None
+        placeholders = ', '.join('?' for _ in candidates)
+        for job_id, blob in self.conn.execute(
+            f"""
+            SELECT s.job_id, s.signature
+            FROM job_signatures s
+            JOIN scraped_jobs j ON j.id = s.job_id
+            WHERE s.title_key = ? AND j.location_id IS ? AND s.job_id IN ({placeholders})
+            """,
+            [title_key(title), location_id] + sorted(candidates)
+        ):
+            similarity = estimate_similarity(signature, array('Q', blob))
+            if similarity >= self.threshold and (best is None or similarity > best[1]
+                                                 or (similarity == best[1] and job_id < best[0])):
+                best = (job_id, similarity)
+        return best
+
+    def add(self, job_id: int, signature: Tuple[int, ...], title: Optional[str]) -> None:
+        """Index a canonical job (replaces any previous entry)."""
+        if not signature:
+            return
+        self.conn.execute("DELETE FROM job_lsh_buckets WHERE job_id = ?", (job_id,))
+        self.conn.execute(
+            "INSERT OR REPLACE INTO job_signatures (job_id, signature, title_key) VALUES (?, ?, ?)",
+            (job_id, array('Q', signature).tobytes(), title_key(title))
+        )
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO job_lsh_buckets (band, bucket, job_id) VALUES (?, ?, ?)",
+            [(band, bucket, job_id) for band, bucket in band_buckets(signature)]
+        )
+
+    def link(self, job_id: int, canonical_id: int) -> None:
+        """
+        Mark a stored job as a near-duplicate: link it and copy the canonical scores.
+
+        Its signature, features and token index entries are dropped.
+        """
+        self.conn.execute("""
+            UPDATE scraped_jobs
+            SET canonical_job_id = ?,
+                (match_score, classification, matched_skills, matched_domains,
+                 red_flags, recommendation, is_partial_score) = (
+                    SELECT match_score, classification, matched_skills, matched_domains,
+                           red_flags, recommendation, is_partial_score
+                    FROM scraped_jobs WHERE id = ?
+                )
+            WHERE id = ?
+        """, (canonical_id, canonical_id, job_id))
+        self.conn.execute("DELETE FROM job_signatures WHERE job_id = ?", (job_id,))
+        self.conn.execute("DELETE FROM job_lsh_buckets WHERE job_id = ?", (job_id,))
+        self.conn.execute("DELETE FROM scraped_job_features WHERE job_id = ?", (job_id,))
+        self.conn.execute("DELETE FROM job_tokens WHERE job_id = ?", (job_id,))
+
+
+def backfill(db_path: str = "data/jobs-tracker.db", threshold: float = DEFAULT_THRESHOLD,
+             batch_size: int = 500) -> Dict[str, int]:
+    """
+    Index stored canonical jobs in id order, linking near-duplicates of earlier ones.
+
+    Needs migrations 012 and 017. Jobs already indexed are skipped, so
+    reruns only handle new rows. Near-duplicates whose location differs
+    from their canonical job's are unlinked first and indexed as canonical
+    jobs; they keep the copied scores until rescore_all.py runs.
+
+    Returns:
+        Dictionary with 'unlinked', 'indexed' and 'linked' counts
+    """
+    try:
+        from .description_store import DescriptionStore
+        from .feature_store import FeatureStore
+        from .freshness import require_math_functions
+        from .score_sketch import ScoreSketchStore
+    except ImportError:
+        from description_store import DescriptionStore
+        from feature_store import FeatureStore
+        from freshness import require_math_functions
+        from score_sketch import ScoreSketchStore
+
+    conn = sqlite3.connect(db_path, timeout=30.0, isolation_level=None)
+    try:
+        require_math_functions(conn)  # link() copies scores into scraped_jobs
+        FeatureStore(conn)  # link() clears feature rows
+        index = NearDuplicateIndex(conn, threshold)
+        descriptions = DescriptionStore(conn)
+        conn.execute("BEGIN")
+        unlinked = conn.execute("""
+            UPDATE scraped_jobs SET canonical_job_id = NULL
+            WHERE canonical_job_id IS NOT NULL
+              AND location_id IS NOT (SELECT c.location_id FROM scraped_jobs c
+                                      WHERE c.id = scraped_jobs.canonical_job_id)
+        """).rowcount
+        conn.execute("COMMIT")
+        counts = {'unlinked': unlinked, 'indexed': 0, 'linked': 0}
+        last_id = 0
+        while True:
+            rows = conn.execute("""
+                SELECT j.id, j.job_title, j.location_id
+                FROM scraped_jobs j
+                LEFT JOIN job_signatures s ON s.job_id = j.id
+                WHERE j.canonical_job_id IS NULL AND s.job_id IS NULL AND j.id > ?
+                ORDER BY j.id
+                LIMIT ?
+            """, (last_id, batch_size)).fetchall()
+            if not rows:
+                break
+            full_text = descriptions.load_many(row[0] for row in rows)
+            conn.execute("BEGIN")
+            try:
+                for job_id, title, location_id in rows:
+                    signature = minhash_signature(job_signature_text(title, full_text.get(job_id)))
+                    match = index.find_canonical(signature, title, location_id)
+                    if match:
+                        index.link(job_id, match[0])
+                        counts['linked'] += 1
+                    else:
+                        index.add(job_id, signature, title)
+                        counts['indexed'] += 1
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            last_id = rows[-1][0]
+
+        if counts['linked'] or counts['unlinked']:
+            # Linked reposts no longer count in the score distributions (unlinked ones do)
+            conn.execute("BEGIN")
+            ScoreSketchStore(conn).rebuild()
+            conn.execute("COMMIT")
+        return counts
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Near-duplicate detection for scraped jobs")
+    parser.add_argument('command', choices=['backfill'],
+                        help="backfill: index stored jobs and link near-duplicates to their canonical job")
+    parser.add_argument('--db', default="data/jobs-tracker.db", help="SQLite database path")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="minimum estimated Jaccard similarity")
+    args = parser.parse_args()
+
+    result = backfill(args.db, args.threshold)
+    print(f"✅ Indexed {result['indexed']} canonical jobs, "
+          f"linked {result['linked']} near-duplicates")
+    if result['unlinked']:
+        print(f"⚠️  Unlinked {result['unlinked']} near-duplicates stored under another location; "
+              f"run scrapers/rescore_all.py to score them")
@@ -13,11 +13,26 @@ import requests
 import sqlite3
 import json
 import logging
+import time
 from datetime import datetime
 from typing import List, Dict, Tuple, Optional
 from pathlib import Path
 
-from simple_scorer import SimpleJobScorer
+from simple_scorer import SimpleJobScorer, job_text
+from feature_store import FeatureStore
+from term_matcher import TermMatcher
+from text_normalizer import TextNormalizer
+from description_store import DescriptionStore, make_snippet
+from near_duplicates import NearDuplicateIndex, job_signature_text, minhash_signature
+from multi_profile import MAIN_PROFILE, MultiProfileScorer, ProfileScoreStore, load_profiles
+from semantic_score import SemanticScorer
+from requirement_extractor import REQUIREMENT_COLUMNS, extract_requirements, requirement_values
+from freshness import freshness_rank_sql, parse_posted_date, require_math_functions
+from job_tags import JobTagStore
+from location_gazetteer import LocationStore
+from salary import CurrencyRates
+from score_sketch import ScoreSketchStore
+from vector_index import JobVectorizer, VectorIndex, index_path_for
 
 # Configure logging
 logging.basicConfig(
@@ -26,7 +41,6 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-
 class RemoteOKIntegration:
     """
     Integrate RemoteOK job scraping with SimpleJobScorer.
@@ -35,12 +49,17 @@ class RemoteOKIntegration:
     resume profile, and stores high-quality matches in database.
     """
 
-    def __init__(self, db_path: str = "data/jobs-tracker.db"):
+    def __init__(self, db_path: str = "data/jobs-tracker.db",
+                 score_threshold: Optional[float] = None):
         """
         Initialize RemoteOK integration.
 
         Args:
             db_path: Path to SQLite database file
+            score_threshold: Cascade threshold for score_job(); jobs that
+                cannot reach it are stored with a partial score and no
+                description scan. None uses filters.cascade_threshold
+                (min_match_score if unset); 0 always scores fully
         """
         self.db_path = db_path
         self.base_url = "https://remoteok.com/api"
@@ -53,6 +72,40 @@ class RemoteOKIntegration:
             logger.error(f"Failed to initialize scorer: {e}")
             raise
 
+        if score_threshold is None:
+            # Must exceed the lowest bound the weights allow, or nothing is
+            # pruned: 75 as shipped (full skills, domain and experience, capped red flags)
+            filters = self.scorer.config.get('filters', {})
+            score_threshold = filters.get('cascade_threshold', filters.get('min_match_score', 0))
+        self.score_threshold = score_threshold
+
+        # Additional candidate profiles (data/profiles.json) share one scan
+        # per job with the main profile
+        profiles = load_profiles()
+        self.multi_scorer = None
+        if profiles:
+            self.multi_scorer = MultiProfileScorer({
+                MAIN_PROFILE: self.scorer,
+                **{name: SimpleJobScorer(config_path=path) for name, path in profiles.items()}
+            })
+            logger.info(f"Scoring {len(profiles)} additional profile(s): {', '.join(profiles)}")
+
+        # TF-IDF similarity to the master resume; optional
+        try:
+            self.semantic_scorer = SemanticScorer()
+        except FileNotFoundError:
+            self.semantic_scorer = None
+            logger.info("No master resume found; semantic_score is not computed")
+
+        # Similar-jobs index (data/job_vectors.idx), appended after each run
+        self.vector_index = VectorIndex(index_path_for(db_path))
+
+        # Relevance prefilter: whole-word keyword matcher compiled once; the
+        # keywords live in the config only (a missing list raises KeyError)
+        keywords = self.scorer.config['filters']['relevance_keywords']
+        self.relevance_matcher = TermMatcher({'keyword': dict.fromkeys(keywords, 0)})
+        self.filter_stats: Dict = {}
+
         # Verify database path exists
         db_file = Path(db_path)
         if not db_file.parent.exists():
@@ -126,42 +179,56 @@ class RemoteOKIntegration:
         """
         Filter jobs by relevance to QA/Data/Testing domains.
 
+        Keywords (filters.relevance_keywords) match as whole words. Position
+        and tags are checked first; the description is only normalized and
+        scanned for jobs they do not settle. Counts are kept in
+        self.filter_stats.
+
         Args:
             jobs: List of all jobs from API
 
         Returns:
             Filtered list of relevant jobs
         """
-        # Keywords to search for (case-insensitive)
-        keywords = [
-            'qa', 'test', 'quality', 'automation', 'sdet',
-            'etl', 'data', 'sql', 'analytics', 'validation',
-            'quality assurance', 'test engineer', 'data engineer',
-            'backend', 'api testing', 'data quality'
-        ]
-
+        started = time.perf_counter()
         relevant_jobs = []
+        matched_on = {'position_tags': 0, 'description': 0}
 
         for job in jobs:
             try:
-                # Combine searchable text
-                position = job.get('position', '').lower()
-                description = job.get('description', '').lower()
                 tags = job.get('tags', [])
-                tags_text = ' '.join(tags).lower() if tags else ''
+                tags_text = ' '.join(tags) if isinstance(tags, list) else (tags or '')
 
-                # Combine all text for searching
-                searchable_text = f"{position} {description} {tags_text}"
+                # Short fields first
+                head = self.scorer.normalize_text(f"{job.get('position', '')} {tags_text}")
+                if self.relevance_matcher.first_match(head):
+                    matched_on['position_tags'] += 1
+                    relevant_jobs.append(job)
+                    continue
 
-                # Check if any keyword matches
-                if any(keyword in searchable_text for keyword in keywords):
+                description = self.scorer.normalize_text(job.get('description', ''))
+                if self.relevance_matcher.first_match(description):
+                    matched_on['description'] += 1
                     relevant_jobs.append(job)
 
             except Exception as e:
                 logger.warning(f"Error processing job for filtering: {e}")
                 continue
 
-        logger.info(f"Filtered {len(relevant_jobs)} relevant jobs from {len(jobs)} total")
+        total = len(jobs)
+        self.filter_stats = {
+            'total': total,
+            'relevant': len(relevant_jobs),
+            'matched_on_position_tags': matched_on['position_tags'],
+            'matched_on_description': matched_on['description'],
+            # Share of fetched jobs dropped before scoring
+            'filter_rate': round(1 - len(relevant_jobs) / total, 3) if total else 0.0,
+            'seconds': round(time.perf_counter() - started, 4),
+        }
+
+        logger.info(f"Filtered {len(relevant_jobs)} relevant jobs from {total} total "
+                    f"(filter rate {self.filter_stats['filter_rate']:.1%}, "
+                    f"{matched_on['description']} needed the description)")
         return relevant_jobs
 
     def create_scraped_jobs_table(self) -> None:
@@ -172,10 +239,12 @@ class RemoteOKIntegration:
         """
         try:
             conn = sqlite3.connect(self.db_path, timeout=30.0)
+            # freshness_rank is evaluated on every insert
+            require_math_functions(conn)
             cursor = conn.cursor()
 
             # Create main table
-            cursor.execute("""
+            cursor.execute(f"""
                 CREATE TABLE IF NOT EXISTS scraped_jobs (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     external_id TEXT UNIQUE NOT NULL,
@@ -185,6 +254,7 @@ class RemoteOKIntegration:
                     job_url TEXT NOT NULL,
                     location TEXT,
                     description TEXT,
+                    description_snippet TEXT,
                     tags TEXT,
                     salary_range TEXT,
                     posted_date TEXT,
@@ -195,7 +265,23 @@ class RemoteOKIntegration:
                     red_flags TEXT,
                     recommendation TEXT,
                     scraped_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    imported_to_opportunities BOOLEAN DEFAULT 0
+                    imported_to_opportunities BOOLEAN DEFAULT 0,
+                    is_partial_score BOOLEAN DEFAULT 0,
+                    canonical_job_id INTEGER REFERENCES scraped_jobs(id),
+                    semantic_score REAL,
+                    experience_min INTEGER,
+                    experience_max INTEGER,
+                    seniority TEXT,
+                    salary_min REAL,
+                    salary_max REAL,
+                    salary_currency TEXT,
+                    salary_period TEXT,
+                    work_mode TEXT,
+                    salary_min_inr REAL,
+                    salary_max_inr REAL,
+                    posted_at INTEGER,
+                    freshness_rank REAL GENERATED ALWAYS AS ({freshness_rank_sql()}) VIRTUAL,
+                    location_id INTEGER
                 )
             """)
 
@@ -215,6 +301,57 @@ class RemoteOKIntegration:
                 ON scraped_jobs(scraped_at DESC)
             """)
 
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_scraped_jobs_canonical
+                ON scraped_jobs(canonical_job_id)
+                WHERE canonical_job_id IS NOT NULL
+            """)
+
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_scraped_jobs_semantic
+                ON scraped_jobs(semantic_score DESC)
+            """)
+
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_scraped_jobs_salary_max_inr
+                ON scraped_jobs(salary_max_inr) WHERE salary_max_inr IS NOT NULL
+            """)
+
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_scraped_jobs_salary_min_inr
+                ON scraped_jobs(salary_min_inr) WHERE salary_min_inr IS NOT NULL
+            """)
+
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_scraped_jobs_posted_at
+                ON scraped_jobs(posted_at DESC)
+            """)
+
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_scraped_jobs_freshness_rank
+                ON scraped_jobs(freshness_rank DESC)
+            """)
+
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_scraped_jobs_location
+                ON scraped_jobs(location_id)
+            """)
+
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_scraped_jobs_source
+                ON scraped_jobs(source)
+            """)
+
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_scraped_jobs_company
+                ON scraped_jobs(company)
+            """)
+
+            # Gazetteer tables (location_id points into normalized_locations)
+            LocationStore(conn)
+            # Tag junction table
+            JobTagStore(conn)
+
             conn.commit()
             logger.info("Created/verified scraped_jobs table and indexes")
 
@@ -241,17 +378,46 @@ class RemoteOKIntegration:
 
         stored_count = 0
         high_fit_count = 0
+        title_skipped_count = 0
+        partial_count = 0
+        duplicate_count = 0
 
         try:
             conn = sqlite3.connect(self.db_path, timeout=30.0)
             cursor = conn.cursor()
+            feature_store = FeatureStore(conn)
+            # Raw HTML / mojibake is cleaned once here; the scorer, the
+            # database and the API only ever see the normalized text
+            normalizer = TextNormalizer(conn)
+            descriptions = DescriptionStore(conn)
+            near_duplicates = NearDuplicateIndex(conn)
+            profile_scores = ProfileScoreStore(conn) if self.multi_scorer else None
+            # IDF from the token index as of this run's start
+            semantic_scorer = self.semantic_scorer
+            if semantic_scorer:
+                semantic_scorer.refresh(conn)
+                if not semantic_scorer.documents:
+                    semantic_scorer = None  # no indexed jobs to take IDF from yet
+            vectorizer = JobVectorizer()
+            vectorizer.refresh(conn)
+            new_vectors = []
+            score_sketches = ScoreSketchStore(conn)
+            currency_rates = CurrencyRates(conn)
+            location_store = LocationStore(conn)
+            job_tags = JobTagStore(conn)
 
             for idx, job in enumerate(jobs, 1):
                 try:
+                    # Prepare external_id
+                    external_id = str(job.get('id', f"remoteok_{idx}"))
+                    if cursor.execute("SELECT 1 FROM scraped_jobs WHERE external_id = ?",
+                                      (external_id,)).fetchone():
+                        continue  # already stored; don't score it again
+
                     # Prepare job data for scoring
-                    position = job.get('position', 'Unknown Position')
-                    company = job.get('company', 'Unknown Company')
-                    description = job.get('description', '')
+                    position = normalizer.normalize(job.get('position')) or 'Unknown Position'
+                    company = normalizer.normalize(job.get('company')) or 'Unknown Company'
+                    description = normalizer.normalize(job.get('description'))
 
                     # Handle location (can be array or string)
                     location_raw = job.get('location', 'Remote')
@@ -259,10 +425,11 @@ class RemoteOKIntegration:
                         location = ', '.join(location_raw) if location_raw else 'Remote'
                     else:
                         location = location_raw if location_raw else 'Remote'
+                    location = normalizer.normalize(location) or 'Remote'
 
                     # Handle tags
                     tags_raw = job.get('tags', [])
-                    tags = ', '.join(tags_raw) if tags_raw else ''
+                    tags = normalizer.normalize(', '.join(tags_raw)) if tags_raw else ''
 
                     # Prepare job_data for scorer
                     job_data = {
@@ -274,11 +441,48 @@ class RemoteOKIntegration:
                         'experience_required': ''  # RemoteOK doesn't provide this consistently
                     }
 
-                    # Score the job
-                    score_result = self.scorer.score_job(job_data)
-
-                    # Prepare external_id
-                    external_id = str(job.get('id', f"remoteok_{idx}"))
+                    # Normalized once per distinct location string, for the indexed
+                    # location filter and the near-duplicate key
+                    location_id = location_store.location_id(location)
+
+                    # A repost of a stored role in the same location links to it and reuses its scores
+                    signature = minhash_signature(job_signature_text(position, description))
+                    canonical = near_duplicates.find_canonical(signature, position, location_id)
+                    profile_results = None
+                    if canonical:
+                        canonical_id = canonical[0]
+                        *score_fields, semantic_score = cursor.execute("""
+                            SELECT match_score, classification, matched_skills, matched_domains,
+                                   red_flags, recommendation, is_partial_score, semantic_score
+                            FROM scraped_jobs WHERE id = ?
+                        """, (canonical_id,)).fetchone()
+                        # Stated experience, salary and work mode, stored with the row
+                        requirements = extract_requirements(position, description)
+                    else:
+                        canonical_id = None
+                        semantic_score = None
+                        if semantic_scorer:
+                            semantic_score = semantic_scorer.score(job_text(job_data))
+                            job_data['semantic_score'] = semantic_score
+                        if self.multi_scorer:
+                            # One scan scores every profile, so there is no cascade to save it
+                            profile_results = self.multi_scorer.score_job(job_data)
+                            score_result = profile_results.pop(MAIN_PROFILE)
+                        else:
+                            # Score the job (cascade: clearly irrelevant jobs skip the description scan)
+                            score_result = self.scorer.score_job(job_data, threshold=self.score_threshold)
+                        score_fields = (
+                            score_result['final_score'],
+                            score_result['classification'],
+                            json.dumps(score_result['matched_skills']),
+                            json.dumps(score_result['matched_domains']),
+                            json.dumps(score_result['red_flags']),
+                            score_result['recommendation'],
+                            int(score_result['is_partial_score'])
+                        )
+                        # Extracted by the scorer: from the title alone for a partial
+                        # score, so a pruned description is never read
+                        requirements = score_result['requirements']
 
                     # Prepare job URL
                     slug = job.get('slug', '')
@@ -294,20 +498,29 @@ class RemoteOKIntegration:
                     else:
                         salary_range = None
 
+                    # The board's numbers (annual USD) beat a salary found in the text
+                    if salary_min:
+                        requirements.update(salary_min=float(salary_min),
+                                            salary_max=float(salary_max) if salary_max else None,
+                                            salary_currency='USD', salary_period='year')
+                    salary_min_inr, salary_max_inr = currency_rates.values(requirements)[4:]
+
                     # Prepare posted date
                     posted_date = job.get('date', datetime.now().isoformat())
-
-                    # Truncate description to 2000 characters
-                    description_truncated = description[:2000] if description else ''
+                    # Typed, indexed timestamp for freshness ranking (RemoteOK also sends the epoch)
+                    posted_at = parse_posted_date(job.get('epoch') or posted_date)
 
                     # Insert into database (IGNORE duplicates)
-                    cursor.execute("""
+                    cursor.execute(f"""
                         INSERT OR IGNORE INTO scraped_jobs (
                             external_id, source, job_title, company, job_url, location,
-                            description, tags, salary_range, posted_date,
+                            description_snippet, tags, salary_range, posted_date,
                             match_score, classification, matched_skills, matched_domains,
-                            red_flags, recommendation
-                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                            red_flags, recommendation, is_partial_score, canonical_job_id,
+                            semantic_score, {', '.join(REQUIREMENT_COLUMNS)},
+                            salary_min_inr, salary_max_inr, posted_at, location_id
+                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?,
+                                  ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                     """, (
                         external_id,
                         'RemoteOK',
@@ -315,22 +528,49 @@ class RemoteOKIntegration:
                         company,
                         job_url,
                         location,
-                        description_truncated,
+                        make_snippet(description),
                         tags,
                         salary_range,
                         posted_date,
-                        score_result['final_score'],
-                        score_result['classification'],
-                        json.dumps(score_result['matched_skills']),
-                        json.dumps(score_result['matched_domains']),
-                        json.dumps(score_result['red_flags']),
-                        score_result['recommendation']
+                        *score_fields,
+                        canonical_id,
+                        semantic_score,
+                        *requirement_values(requirements),
+                        salary_min_inr,
+                        salary_max_inr,
+                        posted_at,
+                        location_id
                     ))
 
                     # Check if row was actually inserted (not a duplicate)
                     if cursor.rowcount > 0:
                         stored_count += 1
 
+                        # Full text goes to the compressed side table; the
+                        # row itself only keeps the snippet
+                        descriptions.save(cursor.lastrowid, description)
+                        # Normalized tags for the tag filter and facet counts
+                        job_tags.save(cursor.lastrowid, tags)
+
+                        if canonical_id is not None:
+                            duplicate_count += 1
+                            continue
+
+                        near_duplicates.add(cursor.lastrowid, signature, position)
+                        new_vectors.append((cursor.lastrowid, vectorizer.sketch(position, tags, description)))
+                        if profile_results:
+                            profile_scores.save(cursor.lastrowid, profile_results)
+
+                        # Keep the full match vector for what-if reweighting and
+                        # index the text for incremental rescoring
+                        feature_store.save(cursor.lastrowid, score_result['features'],
+                                           text=job_text(job_data))
+
+                        if score_result['short_circuit']:
+                            title_skipped_count += 1
+                        elif score_result['is_partial_score']:
+                            partial_count += 1
+
                         # Track high-fit jobs
                         if score_result['classification'] in ['EXCELLENT', 'HIGH_FIT']:
                             high_fit_count += 1
@@ -343,9 +583,22 @@ class RemoteOKIntegration:
                     print(f"⚠️  Error processing job: {e}")
                     continue
 
+            # This run's canonical jobs join their source / week score distribution
+            score_sketches.add_jobs(job_id for job_id, _ in new_vectors)
+
             # Commit all changes
             conn.commit()
-            logger.info(f"Stored {stored_count} jobs ({high_fit_count} high-fit)")
+
+            # Index only committed jobs; a failed write leaves them out of
+            # /similar results until `vector_index.py build` runs
+            try:
+                self.vector_index.append(new_vectors)
+            except OSError as e:
+                logger.warning(f"Could not update the similar-jobs index: {e}")
+            logger.info(f"Stored {stored_count} jobs ({high_fit_count} high-fit, "
+                        f"{title_skipped_count} skipped on avoided titles, "
+                        f"{partial_count} partially scored below {self.score_threshold}, "
+                        f"{duplicate_count} near-duplicates of stored jobs)")
 
         except sqlite3.Error as e:
             logger.error(f"Database error during storage: {e}")
@@ -371,38 +624,34 @@ class RemoteOKIntegration:
 
             stats = {}
 
-            # Total jobs
-            cursor.execute("SELECT COUNT(*) FROM scraped_jobs")
-            stats['total_jobs'] = cursor.fetchone()[0]
-
-            # Excellent (85+)
-            cursor.execute("SELECT COUNT(*) FROM scraped_jobs WHERE match_score >= 85")
-            stats['excellent'] = cursor.fetchone()[0]
-
-            # High fit (75-84)
-            cursor.execute("""
-                SELECT COUNT(*) FROM scraped_jobs
-                WHERE match_score >= 75 AND match_score < 85
-            """)
-            stats['high_fit'] = cursor.fetchone()[0]
-
-            # Medium fit (65-74)
-            cursor.execute("""
-                SELECT COUNT(*) FROM scraped_jobs
-                WHERE match_score >= 65 AND match_score < 75
-            """)
-            stats['medium_fit'] = cursor.fetchone()[0]
-
-            # Low fit (40-64)
-            cursor.execute("""
-                SELECT COUNT(*) FROM scraped_jobs
-                WHERE match_score >= 40 AND match_score < 65
-            """)
-            stats['low_fit'] = cursor.fetchone()[0]
-
-            # No fit (<40)
-            cursor.execute("SELECT COUNT(*) FROM scraped_jobs WHERE match_score < 40")
-            stats['no_fit'] = cursor.fetchone()[0]
+            # Bucket counts come from scraped_job_stats, which triggers keep
+            # current (migration 006), instead of one table scan per bucket;
+            # before that migration, one pass over scraped_jobs
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'scraped_job_stats'")
+            if cursor.fetchone():
+                cursor.execute("""
+                    SELECT
+                        COALESCE(SUM(job_count), 0),
+                        COALESCE(SUM(CASE WHEN score_bucket = 'EXCELLENT' THEN job_count END), 0),
+                        COALESCE(SUM(CASE WHEN score_bucket = 'HIGH_FIT' THEN job_count END), 0),
+                        COALESCE(SUM(CASE WHEN score_bucket = 'MEDIUM_FIT' THEN job_count END), 0),
+                        COALESCE(SUM(CASE WHEN score_bucket = 'LOW_FIT' THEN job_count END), 0),
+                        COALESCE(SUM(CASE WHEN score_bucket = 'NO_FIT' THEN job_count END), 0)
+                    FROM scraped_job_stats
+                """)
+            else:
+                cursor.execute("""
+                    SELECT
+                        COUNT(*),
+                        COUNT(CASE WHEN match_score >= 85 THEN 1 END),
+                        COUNT(CASE WHEN match_score >= 75 AND match_score < 85 THEN 1 END),
+                        COUNT(CASE WHEN match_score >= 65 AND match_score < 75 THEN 1 END),
+                        COUNT(CASE WHEN match_score >= 40 AND match_score < 65 THEN 1 END),
+                        COUNT(CASE WHEN match_score < 40 THEN 1 END)
+                    FROM scraped_jobs
+                """)
+            (stats['total_jobs'], stats['excellent'], stats['high_fit'],
+             stats['medium_fit'], stats['low_fit'], stats['no_fit']) = cursor.fetchone()
 
             # Top 5 jobs
             cursor.execute("""
@@ -458,7 +707,8 @@ class RemoteOKIntegration:
             return (0, 0)
 
         print(f"   ✅ Found {len(relevant_jobs)} relevant jobs "
-              f"(filtered by QA/Data/Testing keywords)")
+              f"(filtered by QA/Data/Testing keywords, "
+              f"{self.filter_stats['filter_rate']:.0%} dropped)")
 
         # Step 3: Score and store
         print(f"\n⚖️  Step 3/3: Scoring and storing jobs in database...")
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+Structured Requirement Extraction
+
+Pulls the requirements a posting states in prose into typed values, so
+scoring and filtering do not depend on a board's optional fields
+(RemoteOK has no experience field at all):
+
+    - years of experience: "3-5 years", "5+ years of experience",
+      "at least 4 years", "6 or more years"
+    - seniority: a level word in the title (junior, senior, lead, staff, ...)
+      or an "X-level" phrase in the description
+    - salary: "$120k - $150k", "€60,000 per year", "USD 45/hour",
+      "₹18-25 LPA"; amounts in millions or billions (funding rounds) are
+      ignored
+    - work mode: hybrid, remote or onsite phrases; negated ones ("no
+      remote", "not a remote role", "no WFH") are skipped
+
+Every pattern is one precompiled alternation, so the title and normalized
+description are scanned once (re.finditer); each match is dispatched on
+the alternative that matched. The first mention of each kind wins; work
+mode prefers hybrid over onsite over remote, since a hybrid role usually
+also mentions remote days and an explicit onsite phrase outweighs a
+passing mention of remote work.
+
+Seniority is stored as stated, but never turned into years of
+experience: a level word alone does not say what the posting requires.
+
+score_job() uses the result for the experience and location components,
+and ingest stores it in the typed scraped_jobs columns of migration 014.
+
+Usage:
+    python3 scrapers/requirement_extractor.py backfill [--db data/jobs-tracker.db] [--all]
+
+Author: Karthik Shetty
+Created: 2025-11-25
+"""
+
+import argparse
+import logging
+import re
+import sqlite3
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Longest plausible experience requirement; larger numbers are not years of experience
+MAX_YEARS = 30
+
+# Seniority levels, most junior first, and the words that name them
+SENIORITY_WORDS = {
+    'intern': 'intern', 'internship': 'intern',
+    'junior': 'junior', 'jr': 'junior', 'entry': 'junior', 'graduate': 'junior',
+    'mid': 'mid', 'middle': 'mid', 'intermediate': 'mid',
+    'senior': 'senior', 'sr': 'senior',
+    'lead': 'lead',
+    'staff': 'staff',
+    'principal': 'principal',
+}
+CURRENCY_CODES = {
+    '$': 'USD', 'usd': 'USD', '€': 'EUR', 'eur': 'EUR', '£': 'GBP', 'gbp': 'GBP',
+    '₹': 'INR', 'inr': 'INR', 'rs': 'INR', 'rs.': 'INR',
+}
+MULTIPLIERS = {'k': 1_000, 'lpa': 100_000, 'lakh': 100_000, 'lakhs': 100_000, 'lac': 100_000, 'lacs': 100_000}
+PERIODS = {'year': 'year', 'yr': 'year', 'annum': 'year', 'annually': 'year', 'yearly': 'year',
+           'pa': 'year', 'p.a.': 'year', 'month': 'month', 'mo': 'month', 'monthly': 'month',
+           'hour': 'hour', 'hr': 'hour', 'hourly': 'hour'}
+# Amounts without a multiplier or stated period below this are not salaries
+MIN_BARE_SALARY = 10_000
+
+WORK_MODES = ('hybrid', 'onsite', 'remote')
+
+_CURRENCY = r'(?:[$€£₹]|(?<!\w)(?:usd|eur|gbp|inr|rs\.?)(?!\w))'
+_AMOUNT = r'\d[\d,]*(?:\.\d+)?'
+_MULTIPLIER = r'(?:k|lpa|lakhs?|lacs?)'
+_DASH = r'(?:-|–|—|to)'
+_PERIOD = (r'(?:\s*(?:/|per|an?)\s*(?P<sal_per>year|yr|annum|month|mo|hour|hr)\b'
+           r'|\s+(?P<sal_adv>annually|yearly|monthly|hourly|p\.a\.|pa\b))?')
+
+REQUIREMENT_RE = re.compile('|'.join((
+    # Salary with a currency: "$120k - $150k", "€60,000 per year", "USD 45/hr"
+    rf'(?P<salary>(?P<sal_cur>{_CURRENCY})\s*(?P<sal_min>{_AMOUNT})\s*(?P<sal_mul>{_MULTIPLIER})?\b'
+    rf'(?!\s*(?:m|mm|million|bn|billion)\b)'
+    rf'(?:\s*{_DASH}\s*{_CURRENCY}?\s*(?P<sal_max>{_AMOUNT})\s*(?P<sal_mul2>{_MULTIPLIER})?\b'
+    rf'(?!\s*(?:m|mm|million|bn|billion)\b))?'
+    rf'(?:\s*(?P<sal_code>(?<!\w)(?:usd|eur|gbp|inr)\b))?{_PERIOD})',
+    # Indian packages without a currency: "18-25 LPA", "20 lakhs per annum"
+    rf'(?P<lakhs>(?P<lakh_min>\d+(?:\.\d+)?)\s*(?:{_DASH}\s*(?P<lakh_max>\d+(?:\.\d+)?)\s*)?'
+    rf'(?:lpa|lakhs?|lacs?)\b(?:\s+per\s+annum)?)',
+    # "3-5 years", "5+ years", "4 years of professional experience"
+    r'(?P<experience>(?P<exp_min>\d{1,2})(?:\s*' + _DASH + r'\s*(?P<exp_max>\d{1,2}))?\s*(?P<exp_plus>\+|plus\b)?'
+    r"\s*(?:years?|yrs?)'?(?:\s*(?P<exp_plus2>\+))?"
+    r'(?P<exp_context>(?:\s+(?:of|in|with))?(?:\s+[\w/+#.-]+){0,3}?\s+experience)?)',
+    # "at least 5 years", "minimum of 3 years", "6 or more years"
+    r'(?P<experience_min>(?:at\s+least|minimum(?:\s+of)?|min\.?|over|more\s+than)\s+(?P<least>\d{1,2})\s*\+?\s*(?:years?|yrs?)\b'
+    r'|(?P<or_more>\d{1,2})\s+or\s+more\s+(?:years?|yrs?)\b)',
+    # "senior-level", "entry level"
+    r'(?P<level_phrase>\b(?P<level>entry|junior|mid|middle|senior)[\s-]+level\b)',
+    # Level words; only counted in the title
+    r'(?P<seniority>\b(?:' + '|'.join(sorted(set(SENIORITY_WORDS) - {'entry'}, key=len, reverse=True)) + r')\b\.?)',
+    # Work mode; a negated remote phrase is matched whole so it is not counted
+    r'(?P<mode_negated>\b(?:no|not|non)(?:[\s-]+(?:a|an|fully|100%))?[\s-]+'
+    r'(?:remote|work(?:ing)?\s+from\s+home|wfh)\b)',
+    r'(?P<mode_hybrid>\bhybrid\b)',
+    r'(?P<mode_remote>\b(?:remote|work(?:ing)?\s+from\s+home|wfh)\b)',
+    r'(?P<mode_onsite>\b(?:on[\s-]?site|in[\s-](?:the\s+)?office|office[\s-]based)\b)',
+)), re.IGNORECASE)
+
+
+def _number(text: str) -> float:
+    return float(text.replace(',', ''))
+
+
+def _salary(match: re.Match) -> Optional[Dict]:
+    """Salary fields of a salary or lakhs match, or None if it is not a salary."""
+    if match.lastgroup == 'lakhs':
+        low = _number(match.group('lakh_min')) * 100_000
+        high = _number(match.group('lakh_max')) * 100_000 if match.group('lakh_max') else None
+        currency, period = 'INR', 'year'
+    else:
+        multiplier = match.group('sal_mul') or match.group('sal_mul2')
+        high_multiplier = match.group('sal_mul2') or multiplier
+        scale = MULTIPLIERS.get(multiplier.lower(), 1) if multiplier else 1
+        low = _number(match.group('sal_min')) * scale
+        high = None
+        if match.group('sal_max'):
+            high = _number(match.group('sal_max')) * (
+                MULTIPLIERS.get(high_multiplier.lower(), 1) if high_multiplier else 1)
+        code = (match.group('sal_code') or match.group('sal_cur')).lower()
+        currency = CURRENCY_CODES[code]
+        if currency != 'INR' and multiplier and multiplier.lower() != 'k':
+            currency = 'INR'  # lakhs are always rupees
+        stated = match.group('sal_per') or match.group('sal_adv')
+        period = PERIODS.get(stated.lower()) if stated else None
+        if period is None:
+            if not multiplier and max(low, high or 0) < MIN_BARE_SALARY:
+                return None  # "$50 gift card"
+            period = 'year'
+    if high is not None and high < low:
+        return None
+    return {'salary_min': low, 'salary_max': high, 'salary_currency': currency, 'salary_period': period}
+
+
+def _experience(match: re.Match) -> Optional[tuple]:
+    """(min, max) years of an experience match, max None for open-ended ones."""
+    if match.lastgroup == 'experience_min':
+        low = int(match.group('least') or match.group('or_more'))
+        return (low, None) if low <= MAX_YEARS else None
+    low = int(match.group('exp_min'))
+    high = int(match.group('exp_max')) if match.group('exp_max') else None
+    plus = match.group('exp_plus') or match.group('exp_plus2')
+    # A bare "N years" is only a requirement next to the word experience
+    if high is None and not plus and not match.group('exp_context'):
+        return None
+    if high is not None and (high < low or high > MAX_YEARS):
+        return None
+    if low > MAX_YEARS:
+        return None
+    return (low, None) if plus else (low, high if high is not None else low)
+
+
+def extract_requirements(title: Optional[str], description: Optional[str]) -> Dict:
+    """
+    Experience, seniority, salary and work mode stated in a posting.
+
+    Args:
+        title: Job title
+        description: Normalized description (text_normalizer output)
+
+    Returns:
+        Dictionary with experience_min / experience_max (years; max None
+        for "5+"), seniority, salary_min / salary_max, salary_currency (ISO
+        code), salary_period ('year', 'month' or 'hour') and work_mode
+        ('hybrid', 'remote' or 'onsite'); None where nothing was found
+    """
+    title = title or ''
+    text = f"{title}\n{description or ''}"
+    title_end = len(title)
+
+    found = {
+        'experience_min': None, 'experience_max': None, 'seniority': None,
+        'salary_min': None, 'salary_max': None, 'salary_currency': None, 'salary_period': None,
+        'work_mode': None,
+    }
+    title_seniority = phrase_seniority = None
+    modes = set()
+
+    for match in REQUIREMENT_RE.finditer(text):
+        kind = match.lastgroup
+        if kind in ('salary', 'lakhs'):
+            if found['salary_min'] is None:
+                salary = _salary(match)
+                if salary:
+                    found.update(salary)
+        elif kind in ('experience', 'experience_min'):
+            if found['experience_min'] is None:
+                years = _experience(match)
+                if years:
+                    found['experience_min'], found['experience_max'] = years
+        elif kind == 'level_phrase':
+            phrase_seniority = phrase_seniority or SENIORITY_WORDS[match.group('level').lower()]
+        elif kind == 'seniority':
+            if match.start() < title_end and title_seniority is None:
+                title_seniority = SENIORITY_WORDS[match.group(kind).rstrip('.').lower()]
+        elif kind != 'mode_negated':
+            modes.add(kind[len('mode_'):])
+
+    found['seniority'] = title_seniority or phrase_seniority
+    found['work_mode'] = next((mode for mode in WORK_MODES if mode in modes), None)
+    return found
+
+
+def experience_requirement(requirements: Dict) -> str:
+    """
+    Experience requirement string for score_job() ("3-5 years", "5+ years").
+
+    Empty if the posting states no years (score_job() then keeps the
+    neutral experience score).
+    """
+    low, high = requirements.get('experience_min'), requirements.get('experience_max')
+    if low is not None:
+        if high is None:
+            return f"{low}+ years"
+        return f"{low} years" if high == low else f"{low}-{high} years"
+    return ''
+
+
+# scraped_jobs columns holding extract_requirements() values (migration 014)
+REQUIREMENT_COLUMNS = (
+    'experience_min', 'experience_max', 'seniority', 'salary_min', 'salary_max',
+    'salary_currency', 'salary_period', 'work_mode',
+)
+
+
+def requirement_values(requirements: Dict) -> tuple:
+    """extract_requirements() values in REQUIREMENT_COLUMNS order."""
+    return tuple(requirements.get(column) for column in REQUIREMENT_COLUMNS)
+
+
+def backfill(db_path: str = "data/jobs-tracker.db", all_jobs: bool = False,
+             batch_size: int = 500) -> int:
+    """
+    Extract requirements of stored jobs into the typed columns.
+
+    Needs migration 014. Near-duplicates are extracted from their own text.
+
+    Args:
+        db_path: SQLite database path
+        all_jobs: Re-extract every job (e.g. after changing the patterns),
+            not only jobs that were never extracted
+
+    Returns:
+        Number of jobs updated
+    """
+    try:
+        from .description_store import DescriptionStore
+    except ImportError:
+        from description_store import DescriptionStore
+
+    conn = sqlite3.connect(db_path, timeout=30.0, isolation_level=None)
+    try:
+        descriptions = DescriptionStore(conn)
+        # Jobs that state none of them are extracted again on every run
+        pending = "" if all_jobs else ''.join(f" AND {column} IS NULL" for column in REQUIREMENT_COLUMNS)
+        assignments = ', '.join(f"{column} = ?" for column in REQUIREMENT_COLUMNS)
+        total = 0
+        last_id = 0
+        while True:
+            rows = conn.execute(f"""
+                SELECT id, job_title FROM scraped_jobs
+                WHERE id > ?{pending}
+                ORDER BY id
+                LIMIT ?
+            """, (last_id, batch_size)).fetchall()
+            if not rows:
+                break
+            full_text = descriptions.load_many(row[0] for row in rows)
+            conn.execute("BEGIN")
+            conn.executemany(
+                f"UPDATE scraped_jobs SET {assignments} WHERE id = ?",
+                [requirement_values(extract_requirements(title, full_text.get(job_id, ''))) + (job_id,)
+                 for job_id, title in rows]
+            )
+            conn.execute("COMMIT")
+            total += len(rows)
+            last_id = rows[-1][0]
+        return total
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Extract stated requirements of scraped jobs")
+    parser.add_argument('command', choices=['backfill'],
+                        help="backfill: fill the requirement columns of stored jobs")
+    parser.add_argument('--db', default="data/jobs-tracker.db", help="SQLite database path")
+    parser.add_argument('--all', action='store_true', help="re-extract every job")
+    args = parser.parse_args()
+
+    count = backfill(args.db, args.all)
+    print(f"✅ Extracted requirements of {count} jobs")
+    print("   Run scrapers/rescore_all.py to apply them to match_score")
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Rescore All Scraped Jobs
+
+Rescores every row in scraped_jobs with the current SimpleJobScorer without
+deleting and re-scraping:
+
+    - rows are read in id order with keyset pagination (WHERE id > ?);
+      near-duplicates are skipped and take their canonical job's new scores
+    - chunks are scored in a process pool, one scorer per worker
+    - results are written back one transaction per chunk, together with a
+      checkpoint row (rescore_checkpoints), so an interrupted run resumes
+      after the last committed chunk
+    - throughput and ETA are printed as chunks complete
+
+A finished run records the config in scorer_config_state, so a later
+`rescoring.py apply` only handles edits made after it, and rebuilds the
+per source / week score sketches (score_sketch.py).
+
+Usage:
+    python3 scrapers/rescore_all.py [--db data/jobs-tracker.db] [--workers 4]
+    python3 scrapers/rescore_all.py --restart   # ignore an unfinished run
+
+Author: Karthik Shetty
+Created: 2025-11-22
+"""
+
+import argparse
+import logging
+import os
+import signal
+import sqlite3
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+try:
+    from .description_store import DescriptionStore
+    from .feature_store import FeatureStore
+    from .freshness import require_math_functions
+    from .rescoring import (job_data_from_row, load_rescore_rows, record_config,
+                            create_config_state_table, score_values, write_scores)
+    from .score_sketch import ScoreSketchStore
+    from .simple_scorer import SimpleJobScorer
+except ImportError:
+    from description_store import DescriptionStore
+    from feature_store import FeatureStore
+    from freshness import require_math_functions
+    from rescoring import (job_data_from_row, load_rescore_rows, record_config,
+                           create_config_state_table, score_values, write_scores)
+    from score_sketch import ScoreSketchStore
+    from simple_scorer import SimpleJobScorer
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 250
+
+# Scorer owned by each worker process (built once by _init_worker)
+_worker_scorer = None
+
+
+def _init_worker(config_path: str) -> None:
+    global _worker_scorer
+    # Ctrl+C is handled by the parent, which stops after the last committed chunk
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    logging.getLogger('simple_scorer').setLevel(logging.WARNING)
+    _worker_scorer = SimpleJobScorer(config_path=config_path)
+
+
+def _score_chunk(rows: List[tuple], scorer: Optional[SimpleJobScorer] = None) -> List[Tuple[tuple, Dict]]:
+    """Score a chunk of RESCORE_COLUMNS rows; returns (score values, features) per row."""
+    scorer = scorer or _worker_scorer
+    results = []
+    for row in rows:
+        result = scorer.score_job(job_data_from_row(row))
+        results.append((score_values(result), result['features']))
+    return results
+
+
+def create_checkpoint_table(conn: sqlite3.Connection) -> None:
+    """Create rescore_checkpoints (one row per rescore-all run)."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS rescore_checkpoints (
+            run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            config_path TEXT NOT NULL,
+            config_hash TEXT NOT NULL,
+            last_job_id INTEGER NOT NULL DEFAULT 0,
+            processed INTEGER NOT NULL DEFAULT 0,
+            changed INTEGER NOT NULL DEFAULT 0,
+            started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            finished_at TIMESTAMP
+        )
+    """)
+
+
+def _start_or_resume(conn: sqlite3.Connection, scorer: SimpleJobScorer,
+                     restart: bool) -> Tuple[int, int, bool]:
+    """
+    Find the unfinished run for this config, or start a new one.
+
+    Returns:
+        (run_id, last_job_id, resumed)
+    """
+    if not restart:
+        row = conn.execute("""
+            SELECT run_id, last_job_id
+            FROM rescore_checkpoints
+            WHERE config_path = ? AND config_hash = ? AND finished_at IS NULL
+            ORDER BY run_id DESC
+            LIMIT 1
+        """, (scorer.config_path, scorer.config_hash)).fetchone()
+        if row:
+            return row[0], row[1], True
+
+    cursor = conn.execute(
+        "INSERT INTO rescore_checkpoints (config_path, config_hash) VALUES (?, ?)",
+        (scorer.config_path, scorer.config_hash)
+    )
+    return cursor.lastrowid, 0, False
+
+
+def _read_chunk(conn: sqlite3.Connection, descriptions: DescriptionStore,
+                after_id: int, chunk_size: int) -> List[tuple]:
+    return load_rescore_rows(conn, descriptions, "id > ? ORDER BY id LIMIT ?", (after_id, chunk_size))
+
+
+def _format_eta(seconds: float) -> str:
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+    return f"{seconds // 60}m{seconds % 60:02d}s"
+
+
+def _print_progress(done: int, total: int, changed: int, started: float) -> None:
+    elapsed = max(time.perf_counter() - started, 1e-9)
+    rate = done / elapsed
+    eta = (total - done) / rate if rate else 0
+    percent = 100 * done / total if total else 100
+    line = (f"   {done:,}/{total:,} jobs ({percent:5.1f}%)  {rate:,.0f} jobs/s  "
+            f"ETA {_format_eta(eta)}  changed {changed:,}")
+    if sys.stdout.isatty():
+        print("\r" + line, end='', flush=True)
+    else:
+        print(line, flush=True)
+
+
+def rescore_all(db_path: str = "data/jobs-tracker.db",
+                config_path: str = "data/resume_config.json",
+                workers: Optional[int] = None,
+                chunk_size: int = DEFAULT_CHUNK_SIZE,
+                restart: bool = False,
+                progress: Optional[Callable[[int, int, int, float], None]] = _print_progress) -> Dict:
+    """
+    Rescore every scraped job, resuming an interrupted run for the same config.
+
+    Args:
+        db_path: SQLite database path
+        config_path: Resume config to score with
+        workers: Worker processes (None = CPU count, 0 = score in this process)
+        chunk_size: Jobs per chunk / transaction
+        restart: Start from the first job even if a run was interrupted
+        progress: Called after each chunk with (done, total, changed, started)
+
+    Returns:
+        Summary dictionary (run_id, resumed, processed, changed, seconds)
+    """
+    scorer = SimpleJobScorer(config_path=config_path)
+    conn = sqlite3.connect(db_path, timeout=30.0, isolation_level=None)
+    try:
+        require_math_functions(conn)
+        create_checkpoint_table(conn)
+        create_config_state_table(conn)
+        store = FeatureStore(conn)
+        descriptions = DescriptionStore(conn)
+
+        run_id, last_id, resumed = _start_or_resume(conn, scorer, restart)
+        total = conn.execute(
+            "SELECT COUNT(*) FROM scraped_jobs WHERE canonical_job_id IS NULL AND id > ?", (last_id,)
+        ).fetchone()[0]
+        summary = {'run_id': run_id, 'resumed': resumed, 'start_after_id': last_id,
+                   'processed': 0, 'changed': 0}
+        started = time.perf_counter()
+
+        def write_chunk(rows, results):
+            changed = 0
+            conn.execute("BEGIN")
+            try:
+                for row, (values, features) in zip(rows, results):
+                    if write_scores(conn, store, row, values, features):
+                        changed += 1
+                conn.execute("""
+                    UPDATE rescore_checkpoints
+                    SET last_job_id = ?, processed = processed + ?, changed = changed + ?,
+                        updated_at = CURRENT_TIMESTAMP
+                    WHERE run_id = ?
+                """, (rows[-1][0], len(rows), changed, run_id))
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                store.clear_cache()
+                raise
+            summary['processed'] += len(rows)
+            summary['changed'] += changed
+            if progress:
+                progress(summary['processed'], total, summary['changed'], started)
+
+        if workers == 0:
+            while True:
+                rows = _read_chunk(conn, descriptions, last_id, chunk_size)
+                if not rows:
+                    break
+                write_chunk(rows, _score_chunk(rows, scorer))
+                last_id = rows[-1][0]
+        else:
+            workers = workers or os.cpu_count() or 1
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(config_path,)) as pool:
+                # Keep a few chunks in flight; write them back in id order so
+                # the checkpoint only ever moves forward
+                pending = deque()
+                read_after = last_id
+                try:
+                    while True:
+                        while len(pending) < workers * 2:
+                            rows = _read_chunk(conn, descriptions, read_after, chunk_size)
+                            if not rows:
+                                break
+                            read_after = rows[-1][0]
+                            pending.append((rows, pool.submit(_score_chunk, rows)))
+                        if not pending:
+                            break
+                        rows, future = pending.popleft()
+                        write_chunk(rows, future.result())
+                except BaseException:
+                    for _, future in pending:
+                        future.cancel()
+                    raise
+
+        conn.execute("BEGIN")
+        conn.execute(
+            "UPDATE rescore_checkpoints SET finished_at = CURRENT_TIMESTAMP WHERE run_id = ?",
+            (run_id,)
+        )
+        record_config(conn, scorer)
+        ScoreSketchStore(conn).rebuild()
+        conn.execute("COMMIT")
+
+        summary['seconds'] = round(time.perf_counter() - started, 2)
+        return summary
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rescore every scraped job with the current config")
+    parser.add_argument('--db', default="data/jobs-tracker.db", help="SQLite database path")
+    parser.add_argument('--config', default="data/resume_config.json", help="Resume config path")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="worker processes (default: CPU count, 0: no pool)")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="jobs per chunk and transaction")
+    parser.add_argument('--restart', action='store_true',
+                        help="start over instead of resuming an interrupted run")
+    args = parser.parse_args()
+
+    logging.getLogger('simple_scorer').setLevel(logging.WARNING)
+
+    print("\n" + "=" * 70)
+    print("🔁 Rescoring all scraped jobs")
+    print("=" * 70)
+    try:
+        result = rescore_all(args.db, args.config, args.workers, args.chunk_size, args.restart)
+    except KeyboardInterrupt:
+        print("\n⏸️  Interrupted - progress is checkpointed; rerun to resume")
+        sys.exit(130)
+
+    if sys.stdout.isatty():
+        print()
+    if result['resumed']:
+        print(f"↪️  Resumed run #{result['run_id']} after job id {result['start_after_id']}")
+    rate = result['processed'] / result['seconds'] if result['seconds'] else 0
+    print(f"✅ Rescored {result['processed']:,} jobs in {result['seconds']:.1f}s "
+          f"({rate:,.0f} jobs/s), {result['changed']:,} scores changed")
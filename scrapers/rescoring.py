@@ -0,0 +1,425 @@
+#!/usr/bin/env python3
+"""
+Incremental Rescoring on Config Changes
+
+Compares resume_config.json with the config last applied to the database
+(scorer_config_state) and rescores only the jobs the edit can affect:
+
+    - a skill / domain / red flag added, removed or reweighted: jobs whose
+      text contains the tokens of the term or one of its synonyms
+      (feature_store inverted index)
+    - a keyword_synonyms alias added or removed: jobs containing the alias
+    - a preferred / avoid title keyword added or removed: jobs containing it
+    - scoring_weights, years of experience, acceptable locations or the
+      title boost / penalty / short_circuit settings: all jobs
+    - anything else (auto_import_threshold, meta, ...): no stored score changes
+
+Near-duplicate postings (near_duplicates.py) are not rescored; they take
+the new scores of their canonical job. Updates are written in batched
+transactions; rescore_all.py shares the row loading and write-back helpers
+below.
+
+The additional profiles of data/profiles.json (multi_profile.py) are
+applied the same way, each against its own last applied config; their
+affected jobs are rescored into profile_job_scores.
+
+Usage:
+    python3 scrapers/rescoring.py apply [--db data/jobs-tracker.db] [--profiles data/profiles.json]
+    python3 scrapers/rescoring.py watch [--interval 2]
+
+Author: Karthik Shetty
+Created: 2025-11-22
+"""
+
+import argparse
+import json
+import logging
+import sqlite3
+import time
+from typing import Dict, Iterable, List, Optional, Set
+
+try:
+    from .description_store import DescriptionStore
+    from .feature_store import FeatureStore
+    from .freshness import require_math_functions
+    from .multi_profile import DEFAULT_PROFILES_PATH, ProfileScoreStore, load_profiles
+    from .score_sketch import ScoreSketchStore
+    from .simple_scorer import SimpleJobScorer, diff_configs, job_text
+except ImportError:
+    from description_store import DescriptionStore
+    from feature_store import FeatureStore
+    from freshness import require_math_functions
+    from multi_profile import DEFAULT_PROFILES_PATH, ProfileScoreStore, load_profiles
+    from score_sketch import ScoreSketchStore
+    from simple_scorer import SimpleJobScorer, diff_configs, job_text
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 200
+
+# scraped_jobs columns read for rescoring: scorer input, then stored results
+# (load_rescore_rows swaps the inline description for the full stored text)
+RESCORE_COLUMNS = """
+    id, job_title, description, location, company, tags,
+    match_score, classification, matched_skills, matched_domains,
+    red_flags, recommendation, is_partial_score, semantic_score
+"""
+
+
+def create_config_state_table(conn: sqlite3.Connection) -> None:
+    """Create scorer_config_state (last applied config per config path)."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS scorer_config_state (
+            config_path TEXT PRIMARY KEY,
+            content_hash TEXT NOT NULL,
+            config_json TEXT NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def record_config(conn: sqlite3.Connection, scorer: SimpleJobScorer) -> None:
+    """Store the scorer's config as the last applied one."""
+    conn.execute("""
+        INSERT OR REPLACE INTO scorer_config_state
+            (config_path, content_hash, config_json, applied_at)
+        VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+    """, (scorer.config_path, scorer.config_hash, json.dumps(scorer.config)))
+
+
+def affected_job_ids(store: FeatureStore, diff: Dict) -> Optional[Set[int]]:
+    """
+    Jobs whose stored score a config diff can change.
+
+    Args:
+        store: Feature store with the token index
+        diff: diff_configs() result
+
+    Returns:
+        Set of job ids, or None when every job must be rescored
+    """
+    if diff['full_rescore']:
+        return None
+
+    job_ids = set()
+    for kind, terms in diff['terms'].items():
+        for term in terms:
+            candidates = store.jobs_for_term(kind, term)
+            if candidates is None:
+                logger.info(f"Term '{term}' has no indexable token; rescoring all jobs")
+                return None
+            job_ids |= candidates
+    # An alias credits its canonical term, so its jobs need a rescore as well
+    for alias in diff['aliases']:
+        candidates = store.jobs_for_term('alias', alias)
+        if candidates is None:
+            logger.info(f"Alias '{alias}' has no indexable token; rescoring all jobs")
+            return None
+        job_ids |= candidates
+    # Title keywords: the token index covers the title, so this is a superset
+    for title in diff['title_terms']:
+        candidates = store.jobs_for_term('title', title)
+        if candidates is None:
+            logger.info(f"Title keyword '{title}' has no indexable token; rescoring all jobs")
+            return None
+        job_ids |= candidates
+    return job_ids
+
+
+def load_rescore_rows(conn: sqlite3.Connection, descriptions: DescriptionStore,
+                      where: str, params: Iterable) -> List[tuple]:
+    """
+    RESCORE_COLUMNS rows matching a WHERE clause, with full descriptions.
+
+    Near-duplicates (canonical_job_id set) are never returned; write_scores()
+    updates them with their canonical job.
+
+    Args:
+        conn: Open connection
+        descriptions: Store holding the compressed full descriptions
+        where: SQL after WHERE (may include ORDER BY / LIMIT)
+        params: Query parameters
+
+    Returns:
+        Row tuples in RESCORE_COLUMNS order
+    """
+    rows = conn.execute(
+        f"SELECT {RESCORE_COLUMNS} FROM scraped_jobs WHERE canonical_job_id IS NULL AND {where}", params
+    ).fetchall()
+    full_text = descriptions.load_many(row[0] for row in rows)
+    return [row[:2] + (full_text.get(row[0], ''),) + row[3:] for row in rows]
+
+
+def job_data_from_row(row) -> Dict:
+    """score_job() input from a RESCORE_COLUMNS row."""
+    return {
+        'title': row[1] or '',
+        'description': row[2] or '',
+        'location': row[3] or '',
+        'company': row[4] or '',
+        'tags': row[5] or '',
+        'experience_required': '',
+        'semantic_score': row[13]
+    }
+
+
+def score_values(result: Dict) -> tuple:
+    """Stored scraped_jobs score fields, in RESCORE_COLUMNS order."""
+    return (
+        result['final_score'],
+        result['classification'],
+        json.dumps(result['matched_skills']),
+        json.dumps(result['matched_domains']),
+        json.dumps(result['red_flags']),
+        result['recommendation'],
+        int(result['is_partial_score'])
+    )
+
+
+def write_scores(conn: sqlite3.Connection, store: FeatureStore, row,
+                 values: tuple, features: Dict) -> bool:
+    """
+    Write one rescored job inside the caller's transaction.
+
+    Changed scores are copied to the job's near-duplicates in the same
+    statement.
+
+    Returns:
+        True if the stored score fields changed
+    """
+    changed = values != tuple(row[6:13])
+    if changed:
+        # Near-duplicates share the canonical job's title and location, so its scores are theirs
+        conn.execute("""
+            UPDATE scraped_jobs
+            SET match_score = ?, classification = ?, matched_skills = ?,
+                matched_domains = ?, red_flags = ?, recommendation = ?,
+                is_partial_score = ?
+            WHERE id = ? OR canonical_job_id = ?
+        """, values + (row[0], row[0]))
+    store.save(row[0], features, text=job_text(job_data_from_row(row)))
+    return changed
+
+
+def _batches(conn: sqlite3.Connection, job_ids: Optional[Iterable[int]],
+             batch_size: int) -> Iterable[List[int]]:
+    """Yield id batches: the given ids sorted, or every job by keyset pagination."""
+    if job_ids is not None:
+        ordered = sorted(job_ids)
+        for start in range(0, len(ordered), batch_size):
+            yield ordered[start:start + batch_size]
+        return
+
+    last_id = 0
+    while True:
+        batch = [row[0] for row in conn.execute(
+            "SELECT id FROM scraped_jobs WHERE canonical_job_id IS NULL AND id > ? ORDER BY id LIMIT ?",
+            (last_id, batch_size)
+        )]
+        if not batch:
+            return
+        yield batch
+        last_id = batch[-1]
+
+
+def rescore_jobs(conn: sqlite3.Connection, scorer: SimpleJobScorer,
+                 job_ids: Optional[Iterable[int]] = None,
+                 batch_size: int = DEFAULT_BATCH_SIZE,
+                 profile: Optional[str] = None) -> Dict[str, int]:
+    """
+    Rescore stored jobs and write results back, one transaction per batch.
+
+    Rows whose score fields are unchanged are not rewritten; features and
+    token index entries are always refreshed. If any score changed, the
+    score sketches are rebuilt.
+
+    Args:
+        conn: Connection in autocommit mode (isolation_level=None)
+        scorer: Scorer with the config to apply
+        job_ids: Jobs to rescore, or None for all
+        batch_size: Jobs per transaction
+        profile: Additional profile the scorer belongs to; its scores go to
+            profile_job_scores and scraped_jobs, features and sketches are
+            left alone
+
+    Returns:
+        Dictionary with 'rescored' and 'changed' counts
+    """
+    if not profile:
+        require_math_functions(conn)  # score updates re-evaluate freshness_rank
+    store = FeatureStore(conn)
+    descriptions = DescriptionStore(conn)
+    profile_scores = ProfileScoreStore(conn) if profile else None
+    counts = {'rescored': 0, 'changed': 0}
+
+    for batch in _batches(conn, job_ids, batch_size):
+        placeholders = ', '.join('?' for _ in batch)
+        rows = load_rescore_rows(conn, descriptions, f"id IN ({placeholders})", batch)
+        if profile_scores:
+            stored = dict(conn.execute(
+                f"SELECT job_id, match_score FROM profile_job_scores WHERE profile = ? AND job_id IN ({placeholders})",
+                [profile] + batch
+            ))
+
+        conn.execute("BEGIN")
+        try:
+            for row in rows:
+                result = scorer.score_job(job_data_from_row(row))
+                if profile_scores:
+                    profile_scores.save(row[0], {profile: result})
+                    changed = stored.get(row[0]) != result['final_score']
+                else:
+                    changed = write_scores(conn, store, row, score_values(result), result['features'])
+                if changed:
+                    counts['changed'] += 1
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            store.clear_cache()
+            raise
+
+        counts['rescored'] += len(rows)
+
+    if counts['changed'] and not profile_scores:
+        # Score distributions cannot drop the old scores; recount them
+        conn.execute("BEGIN")
+        ScoreSketchStore(conn).rebuild()
+        conn.execute("COMMIT")
+    return counts
+
+
+def apply_config_changes(conn: sqlite3.Connection, scorer: SimpleJobScorer,
+                         batch_size: int = DEFAULT_BATCH_SIZE,
+                         profile: Optional[str] = None) -> Dict:
+    """
+    Bring stored scores in line with the scorer's current config.
+
+    The first run only records the config as the baseline.
+
+    Args:
+        conn: Connection in autocommit mode (isolation_level=None)
+        scorer: Scorer holding the config to apply
+        profile: Additional profile the config belongs to (None: the main
+            resume config, whose scores live in scraped_jobs)
+
+    Returns:
+        Summary dictionary (status, diff, affected, rescored, changed)
+    """
+    create_config_state_table(conn)
+    row = conn.execute(
+        "SELECT content_hash, config_json FROM scorer_config_state WHERE config_path = ?",
+        (scorer.config_path,)
+    ).fetchone()
+
+    if row is None:
+        record_config(conn, scorer)
+        return {'status': 'baseline'}
+    if row[0] == scorer.config_hash:
+        return {'status': 'unchanged'}
+
+    diff = diff_configs(json.loads(row[1]), scorer.config)
+    job_ids = affected_job_ids(FeatureStore(conn), diff)
+    counts = rescore_jobs(conn, scorer, job_ids, batch_size, profile)
+    record_config(conn, scorer)
+
+    return {
+        'status': 'applied',
+        'diff': {
+            'terms': {kind: sorted(terms) for kind, terms in diff['terms'].items() if terms},
+            'aliases': sorted(diff['aliases']),
+            'title_terms': sorted(diff['title_terms']),
+            'full_rescore': diff['full_rescore'],
+            'changed_sections': diff['changed_sections'],
+        },
+        'affected': 'all' if job_ids is None else len(job_ids),
+        **counts,
+    }
+
+
+def profile_scorers(profiles_path: str = DEFAULT_PROFILES_PATH) -> Dict[str, SimpleJobScorer]:
+    """Scorers of the additional profiles in profiles.json, by profile name."""
+    return {name: SimpleJobScorer(config_path=path)
+            for name, path in load_profiles(profiles_path).items()}
+
+
+def _print_summary(summary: Dict, profile: Optional[str] = None) -> None:
+    if profile:
+        print(f"👤 Profile '{profile}':")
+    if summary['status'] == 'baseline':
+        print("📌 Recorded current config as the baseline (no rescoring)")
+    elif summary['status'] == 'unchanged':
+        print("✅ Config unchanged since last apply")
+    else:
+        terms = summary['diff']['terms']
+        changed_terms = ', '.join([f"{kind}:{t}" for kind, ts in terms.items() for t in ts] +
+                                  [f"alias:{a}" for a in summary['diff']['aliases']] +
+                                  [f"title:{t}" for t in summary['diff']['title_terms']])
+        print(f"🔄 Config change applied: {changed_terms or 'no term changes'}"
+              f"{' (full rescore)' if summary['diff']['full_rescore'] else ''}")
+        print(f"   Affected: {summary['affected']}  Rescored: {summary['rescored']}  "
+              f"Score changed: {summary['changed']}")
+
+
+def watch(db_path: str, config_path: str, interval: float = 2.0,
+          batch_size: int = DEFAULT_BATCH_SIZE,
+          profiles_path: str = DEFAULT_PROFILES_PATH) -> None:
+    """
+    Poll the config files (main and profiles) and apply each change as it is saved.
+
+    A malformed edit is logged and skipped; the previous config stays active.
+    """
+    scorers = {None: SimpleJobScorer(config_path=config_path), **profile_scorers(profiles_path)}
+    conn = sqlite3.connect(db_path, timeout=30.0, isolation_level=None)
+    try:
+        for profile, scorer in scorers.items():
+            _print_summary(apply_config_changes(conn, scorer, batch_size, profile), profile)
+        print(f"👀 Watching {', '.join(s.config_path for s in scorers.values())} "
+              f"(every {interval:g}s, Ctrl+C to stop)")
+        while True:
+            time.sleep(interval)
+            for profile, scorer in scorers.items():
+                try:
+                    diff = scorer.reload_if_changed()
+                except (json.JSONDecodeError, UnicodeDecodeError, KeyError) as e:
+                    logger.error(f"Ignoring invalid config edit in {scorer.config_path}: {e}")
+                    continue
+                if diff is not None:
+                    _print_summary(apply_config_changes(conn, scorer, batch_size, profile), profile)
+    except KeyboardInterrupt:
+        print("\n👋 Stopped watching")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rescore jobs affected by resume_config.json edits")
+    parser.add_argument('command', choices=['apply', 'watch'],
+                        help="apply: rescore for changes since the last apply; "
+                             "watch: keep applying changes as the file is saved")
+    parser.add_argument('--db', default="data/jobs-tracker.db", help="SQLite database path")
+    parser.add_argument('--config', default="data/resume_config.json", help="Resume config path")
+    parser.add_argument('--profiles', default=DEFAULT_PROFILES_PATH,
+                        help="profiles.json path (additional profiles to apply)")
+    parser.add_argument('--interval', type=float, default=2.0, help="watch poll interval (seconds)")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help="jobs per transaction")
+    args = parser.parse_args()
+
+    # Per-job scoring logs are too noisy for bulk runs
+    logging.getLogger('simple_scorer').setLevel(logging.WARNING)
+
+    if args.command == 'watch':
+        watch(args.db, args.config, args.interval, args.batch_size, args.profiles)
+    else:
+        scorer = SimpleJobScorer(config_path=args.config)
+        conn = sqlite3.connect(args.db, timeout=30.0, isolation_level=None)
+        try:
+            _print_summary(apply_config_changes(conn, scorer, args.batch_size))
+            for profile, profile_scorer in profile_scorers(args.profiles).items():
+                _print_summary(apply_config_changes(conn, profile_scorer, args.batch_size, profile), profile)
+        finally:
+            conn.close()
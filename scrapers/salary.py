@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Numeric Salaries in INR
+
+salary_range is display text ("$120,000 - $150,000", "18-25 LPA"), so
+filtering on pay meant parsing every row. This module keeps salaries as
+numbers instead:
+
+    - salary_min / salary_max / salary_currency / salary_period as stated
+      (RemoteOK's numeric fields, requirement_extractor.py, or a parsed
+      salary_range)
+    - salary_min_inr / salary_max_inr: the same range as annual INR, for
+      indexed range filters and the profile.min_salary_inr check;
+      salary_max_inr is the top of the range (salary_min for "X+")
+    - rates come from the local currency_rates table (INR per unit), seeded
+      with DEFAULT_RATES; no network lookups
+
+Hourly pay is annualized at HOURS_PER_YEAR, monthly pay at 12 months.
+Changing a rate with `set-rate` re-converts the stored salaries in that
+currency.
+
+Usage:
+    python3 scrapers/salary.py backfill [--db data/jobs-tracker.db]
+    python3 scrapers/salary.py set-rate USD 88.5 [--db data/jobs-tracker.db]
+
+Author: Karthik Shetty
+Created: 2025-11-26
+"""
+
+import argparse
+import json
+import logging
+import sqlite3
+from typing import Dict, Optional, Tuple
+
+try:
+    from .requirement_extractor import extract_requirements
+except ImportError:
+    from requirement_extractor import extract_requirements
+
+logger = logging.getLogger(__name__)
+
+# INR per unit of each currency (approximate, November 2025)
+DEFAULT_RATES = {
+    'INR': 1.0,
+    'USD': 88.5,
+    'EUR': 102.5,
+    'GBP': 116.5,
+}
+
+HOURS_PER_YEAR = 2080
+PERIOD_FACTORS = {'year': 1, 'month': 12, 'hour': HOURS_PER_YEAR}
+
+# Stated salary columns, then their annual INR conversion
+SALARY_COLUMNS = (
+    'salary_min', 'salary_max', 'salary_currency', 'salary_period',
+    'salary_min_inr', 'salary_max_inr',
+)
+
+
+def parse_salary(text: Optional[str]) -> Dict:
+    """
+    Stated salary of a salary_range or free text ("$120k - $150k", "18-25 LPA").
+
+    Returns:
+        salary_min, salary_max, salary_currency and salary_period; all None
+        if the text holds no salary
+    """
+    requirements = extract_requirements('', text or '')
+    return {key: requirements[key] for key in SALARY_COLUMNS[:4]}
+
+
+def profile_min_salary(config_path: str = "data/resume_config.json") -> Optional[float]:
+    """profile.min_salary_inr of a resume config (None if unset)."""
+    with open(config_path, 'r', encoding='utf-8') as f:
+        value = json.load(f).get('profile', {}).get('min_salary_inr')
+    return float(value) if value else None
+
+
+class CurrencyRates:
+    """
+    INR conversion rates in the currency_rates table.
+
+    Example:
+        >>> rates = CurrencyRates(conn)
+        >>> rates.annual_inr(45, 'USD', 'hour')
+        8283600.0
+    """
+
+    def __init__(self, conn: sqlite3.Connection):
+        """
+        Args:
+            conn: Open SQLite connection to the shared jobs tracker database
+        """
+        self.conn = conn
+        self.create_table()
+        self.rates = dict(conn.execute("SELECT currency, inr_per_unit FROM currency_rates"))
+        missing = {code: rate for code, rate in DEFAULT_RATES.items() if code not in self.rates}
+        if missing:
+            conn.executemany("INSERT INTO currency_rates (currency, inr_per_unit) VALUES (?, ?)",
+                             missing.items())
+            self.rates.update(missing)
+
+    def create_table(self) -> None:
+        """Create currency_rates if missing."""
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS currency_rates (
+                currency TEXT PRIMARY KEY,
+                inr_per_unit REAL NOT NULL,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+
+    def annual_inr(self, amount: Optional[float], currency: Optional[str],
+                   period: Optional[str]) -> Optional[float]:
+        """Annual INR of an amount (None for an unknown currency or no amount)."""
+        rate = self.rates.get(currency)
+        if amount is None or rate is None:
+            return None
+        return round(amount * rate * PERIOD_FACTORS.get(period or 'year', 1), 2)
+
+    def values(self, salary: Dict) -> Tuple:
+        """
+        Stored values of a salary, in SALARY_COLUMNS order.
+
+        Args:
+            salary: Dictionary with salary_min, salary_max, salary_currency
+                and salary_period (parse_salary() or extract_requirements())
+        """
+        low, high = salary.get('salary_min'), salary.get('salary_max')
+        currency, period = salary.get('salary_currency'), salary.get('salary_period')
+        return (
+            low, high, currency, period,
+            self.annual_inr(low, currency, period),
+            self.annual_inr(high if high is not None else low, currency, period),
+        )
+
+    def set_rate(self, currency: str, inr_per_unit: float) -> int:
+        """
+        Change a rate and re-convert the stored scraped_jobs salaries in it.
+
+        Does not commit. Opportunities in profile shards keep their old
+        conversion until `backfill` runs on the shard.
+
+        Returns:
+            Number of scraped jobs re-converted
+        """
+        currency = currency.upper()
+        self.conn.execute("""
+            INSERT INTO currency_rates (currency, inr_per_unit, updated_at)
+            VALUES (?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT(currency) DO UPDATE SET inr_per_unit = excluded.inr_per_unit,
+                                                updated_at = excluded.updated_at
+        """, (currency, inr_per_unit))
+        self.rates[currency] = inr_per_unit
+        return convert_table(self.conn, 'scraped_jobs', self, currency)
+
+
+def convert_table(conn: sqlite3.Connection, table: str, rates: CurrencyRates,
+                  currency: Optional[str] = None) -> int:
+    """
+    Recompute salary_min_inr / salary_max_inr of a table's rows.
+
+    Args:
+        conn: Connection holding the table
+        table: 'scraped_jobs' or 'opportunities'
+        rates: Conversion rates
+        currency: Only rows in this currency (default: every row with a salary)
+
+    Returns:
+        Number of rows updated
+    """
+    where, params = "salary_min IS NOT NULL", []
+    if currency:
+        where, params = where + " AND salary_currency = ?", [currency]
+    rows = conn.execute(
+        f"SELECT id, salary_min, salary_max, salary_currency, salary_period FROM {table} WHERE {where}",
+        params
+    ).fetchall()
+    conn.executemany(
+        f"UPDATE {table} SET salary_min_inr = ?, salary_max_inr = ? WHERE id = ?",
+        [rates.values({'salary_min': low, 'salary_max': high,
+                       'salary_currency': cur, 'salary_period': period})[4:] + (row_id,)
+         for row_id, low, high, cur, period in rows]
+    )
+    return len(rows)
+
+
+def backfill(db_path: str = "data/jobs-tracker.db", shared_db: Optional[str] = None) -> Dict[str, int]:
+    """
+    Parse salary_range into the numeric columns, then convert every stored
+    salary to INR.
+
+    Needs migration 015. A salary_range (the job board's numeric fields,
+    or what was entered for an opportunity) takes precedence over a salary
+    extracted from the description (migration 014).
+
+    Args:
+        db_path: Database holding the rows (the shared database or a shard)
+        shared_db: Shared database with currency_rates, when db_path is a
+            shard; scraped_jobs is then left alone
+
+    Returns:
+        {'parsed': rows given a salary from salary_range, 'converted': rows converted}
+    """
+    conn = sqlite3.connect(db_path, timeout=30.0, isolation_level=None)
+    rates_conn = sqlite3.connect(shared_db, timeout=30.0, isolation_level=None) if shared_db else conn
+    try:
+        rates = CurrencyRates(rates_conn)
+        tables = ('opportunities',) if shared_db else ('scraped_jobs', 'opportunities')
+        assignments = ', '.join(f"{column} = ?" for column in SALARY_COLUMNS)
+        result = {'parsed': 0, 'converted': 0}
+        conn.execute("BEGIN")
+        for table in tables:
+            rows = conn.execute(f"""
+                SELECT id, salary_range FROM {table}
+                WHERE salary_range IS NOT NULL AND salary_range != ''
+            """).fetchall()
+            updates = [(row_id, parse_salary(text)) for row_id, text in rows]
+            updates = [(row_id, salary) for row_id, salary in updates if salary['salary_min'] is not None]
+            conn.executemany(f"UPDATE {table} SET {assignments} WHERE id = ?",
+                             [rates.values(salary) + (row_id,) for row_id, salary in updates])
+            result['parsed'] += len(updates)
+            result['converted'] += convert_table(conn, table, rates)
+        conn.execute("COMMIT")
+        return result
+    finally:
+        conn.close()
+        if rates_conn is not conn:
+            rates_conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Numeric salaries and INR conversion")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    backfill_parser = subparsers.add_parser('backfill', help="parse salary_range and convert salaries to INR")
+    backfill_parser.add_argument('--db', default="data/jobs-tracker.db", help="SQLite database path")
+    backfill_parser.add_argument('--shared-db', help="shared database with currency_rates, when --db is a shard")
+
+    rate_parser = subparsers.add_parser('set-rate', help="set a currency's INR rate and re-convert its salaries")
+    rate_parser.add_argument('currency', help="ISO code, e.g. USD")
+    rate_parser.add_argument('inr_per_unit', type=float, help="INR per unit of the currency")
+    rate_parser.add_argument('--db', default="data/jobs-tracker.db", help="SQLite database path")
+
+    args = parser.parse_args()
+
+    if args.command == 'backfill':
+        result = backfill(args.db, args.shared_db)
+        print(f"✅ Parsed {result['parsed']} salary ranges, converted {result['converted']} salaries to INR")
+    else:
+        conn = sqlite3.connect(args.db, timeout=30.0, isolation_level=None)
+        try:
+            conn.execute("BEGIN")
+            count = CurrencyRates(conn).set_rate(args.currency, args.inr_per_unit)
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+        print(f"✅ {args.currency.upper()} = ₹{args.inr_per_unit}; re-converted {count} scraped jobs")
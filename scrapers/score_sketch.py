@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Streaming Score Quantiles
+
+match_score is absolute, and the classification thresholds (85/75/65/40)
+mean less as the feed changes. This module keeps the distribution of
+scores per source and per week as KLL quantile sketches, so a job can be
+ranked against the postings it arrived with:
+
+    - each (source, week) gets a KLL sketch (Karnin, Lang, Liberty 2016):
+      a stack of compactors where level h holds items of weight 2^h; a full
+      level is sorted and every other item is promoted, so memory stays
+      about 3k values however many scores are added, with rank error ~1/k
+    - sketches are updated in the ingest transaction and stored as JSON in
+      scraped_job_score_sketches; weeks start on Monday (scraped_at, UTC)
+    - near-duplicates are not counted; they repeat their canonical score
+
+percentile() places a score in its week's distribution and
+thresholds(top_pct) turns "top N%" into one minimum score per
+(source, week), so the API filters without sorting the table.
+
+Sketches cannot forget a score, so rescoring rebuilds them from
+scraped_jobs (rescoring.py and rescore_all.py do this after a run).
+
+Usage:
+    python3 scrapers/score_sketch.py rebuild [--db data/jobs-tracker.db]
+
+Author: Karthik Shetty
+Created: 2025-11-25
+"""
+
+import argparse
+import json
+import logging
+import math
+import random
+import sqlite3
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_K = 200
+# Capacity of each level relative to the one above it
+CAPACITY_DECAY = 2 / 3
+
+# Week of a scraped_jobs row: the Monday on or before scraped_at
+WEEK_SQL = "date(scraped_at, 'weekday 0', '-6 days')"
+
+_rng = random.Random()
+
+
+def week_of(timestamp: str) -> str:
+    """Python equivalent of WEEK_SQL for a 'YYYY-MM-DD[ HH:MM:SS]' timestamp."""
+    day = date.fromisoformat(timestamp[:10])
+    return (day - timedelta(days=day.weekday())).isoformat()
+
+
+class KLLSketch:
+    """
+    KLL quantile sketch of float values.
+
+    Example:
+        >>> sketch = KLLSketch()
+        >>> for score in scores:
+        ...     sketch.update(score)
+        >>> sketch.quantile(0.9)     # score at the 90th percentile
+        >>> sketch.percentile(72.5)  # share of scores below 72.5, in percent
+    """
+
+    def __init__(self, k: int = DEFAULT_K, compactors: Optional[List[List[float]]] = None):
+        """
+        Args:
+            k: Capacity of the top level; rank error is about 1/k
+            compactors: Stored levels (from_json)
+        """
+        self.k = k
+        self.compactors: List[List[float]] = compactors or [[]]
+        self.count = sum(len(items) << level for level, items in enumerate(self.compactors))
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.compactors) - level - 1
+        return max(2, int(math.ceil(self.k * CAPACITY_DECAY ** depth)))
+
+    def _compress(self) -> None:
+        """Compact the lowest full level until the sketch fits its capacity."""
+        while (sum(len(items) for items in self.compactors)
+               >= sum(self._capacity(level) for level in range(len(self.compactors)))):
+            for level, items in enumerate(self.compactors):
+                if len(items) < self._capacity(level):
+                    continue
+                if level + 1 == len(self.compactors):
+                    self.compactors.append([])
+                items.sort()
+                kept = [items.pop()] if len(items) % 2 else []
+                # Each promoted item stands for itself and its neighbour
+                self.compactors[level + 1].extend(items[_rng.randrange(2)::2])
+                self.compactors[level] = kept
+                break
+
+    def update(self, value: float) -> None:
+        """Add one value."""
+        self.compactors[0].append(value)
+        self.count += 1
+        self._compress()
+
+    def merge(self, other: 'KLLSketch') -> None:
+        """Add every value summarized by another sketch."""
+        while len(self.compactors) < len(other.compactors):
+            self.compactors.append([])
+        for level, items in enumerate(other.compactors):
+            self.compactors[level].extend(items)
+        self.count += other.count
+        self._compress()
+
+    def _weighted(self) -> List[Tuple[float, int]]:
+        return sorted((value, 1 << level)
+                      for level, items in enumerate(self.compactors) for value in items)
+
+    def percentile(self, value: float) -> Optional[float]:
+        """
+        Percentile rank of a value (ties count half), 0-100.
+
+        Returns:
+            None for an empty sketch
+        """
+        if not self.count:
+            return None
+        below = equal = 0
+        for item, weight in self._weighted():
+            if item < value:
+                below += weight
+            elif item == value:
+                equal += weight
+            else:
+                break
+        return 100.0 * (below + equal / 2) / self.count
+
+    def quantile(self, fraction: float) -> Optional[float]:
+        """
+        Smallest value with more than `fraction` of the weight at or below it.
+
+        Returns:
+            None for an empty sketch
+        """
+        if not self.count:
+            return None
+        target = fraction * self.count
+        cumulative = 0
+        weighted = self._weighted()
+        for value, weight in weighted:
+            cumulative += weight
+            if cumulative > target:
+                return value
+        return weighted[-1][0]
+
+    def to_json(self) -> str:
+        return json.dumps({'k': self.k, 'compactors': self.compactors}, separators=(',', ':'))
+
+    @classmethod
+    def from_json(cls, text: str) -> 'KLLSketch':
+        data = json.loads(text)
+        return cls(data['k'], data['compactors'])
+
+
+class ScoreSketchStore:
+    """
+    Per (source, week) score sketches in scraped_job_score_sketches.
+
+    Writes do not commit; ingest updates sketches in the same transaction
+    as the jobs they count.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, k: int = DEFAULT_K):
+        """
+        Args:
+            conn: Open SQLite connection to the jobs tracker database
+            k: Capacity of new sketches
+        """
+        self.conn = conn
+        self.k = k
+        self.create_table()
+
+    def create_table(self) -> None:
+        """Create scraped_job_score_sketches if missing."""
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS scraped_job_score_sketches (
+                source TEXT NOT NULL,
+                week TEXT NOT NULL,
+                job_count INTEGER NOT NULL,
+                sketch TEXT NOT NULL,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (source, week)
+            ) WITHOUT ROWID
+        """)
+
+    def _save(self, source: str, week: str, sketch: KLLSketch) -> None:
+        self.conn.execute("""
+            INSERT OR REPLACE INTO scraped_job_score_sketches (source, week, job_count, sketch, updated_at)
+            VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+        """, (source, week, sketch.count, sketch.to_json()))
+
+    def load_many(self, keys: Iterable[Tuple[str, str]]) -> Dict[Tuple[str, str], KLLSketch]:
+        """Stored sketches of the given (source, week) keys (missing keys are left out)."""
+        sketches = {}
+        for source, week in set(keys):
+            row = self.conn.execute(
+                "SELECT sketch FROM scraped_job_score_sketches WHERE source = ? AND week = ?",
+                (source, week)
+            ).fetchone()
+            if row:
+                sketches[(source, week)] = KLLSketch.from_json(row[0])
+        return sketches
+
+    def add_scores(self, scores: Iterable[Tuple[str, str, float]]) -> int:
+        """
+        Add (source, week, score) values to their sketches.
+
+        Returns:
+            Number of scores added
+        """
+        grouped: Dict[Tuple[str, str], List[float]] = defaultdict(list)
+        for source, week, score in scores:
+            if score is not None:
+                grouped[(source, week)].append(score)
+        sketches = self.load_many(grouped)
+        for key, values in grouped.items():
+            sketch = sketches.get(key) or KLLSketch(self.k)
+            for value in values:
+                sketch.update(value)
+            self._save(key[0], key[1], sketch)
+        return sum(len(values) for values in grouped.values())
+
+    def add_jobs(self, job_ids: Iterable[int]) -> int:
+        """
+        Add the stored scores of canonical scraped jobs.
+
+        Returns:
+            Number of scores added
+        """
+        job_ids = list(job_ids)
+        added = 0
+        for start in range(0, len(job_ids), 500):
+            batch = job_ids[start:start + 500]
+            placeholders = ', '.join('?' for _ in batch)
+            added += self.add_scores(self.conn.execute(f"""
+                SELECT source, {WEEK_SQL}, match_score
+                FROM scraped_jobs
+                WHERE id IN ({placeholders}) AND canonical_job_id IS NULL AND source IS NOT NULL
+            """, batch))
+        return added
+
+    def rebuild(self) -> int:
+        """
+        Recompute every sketch from scraped_jobs (after rescoring or deletes).
+
+        Returns:
+            Number of scores added
+        """
+        self.conn.execute("DELETE FROM scraped_job_score_sketches")
+        return self.add_scores(self.conn.execute(f"""
+            SELECT source, {WEEK_SQL}, match_score
+            FROM scraped_jobs
+            WHERE canonical_job_id IS NULL AND source IS NOT NULL AND scraped_at IS NOT NULL
+            ORDER BY id
+        """))
+
+    def thresholds(self, top_pct: float) -> List[Tuple[str, str, float]]:
+        """
+        Minimum score of the top `top_pct` percent in every (source, week).
+
+        Ties at the threshold are included, so a group may return slightly
+        more than top_pct percent of its jobs.
+
+        Returns:
+            (source, week, min_score) rows
+        """
+        return [(source, week, KLLSketch.from_json(sketch).quantile(1 - top_pct / 100))
+                for source, week, sketch in self.conn.execute(
+                    "SELECT source, week, sketch FROM scraped_job_score_sketches WHERE job_count > 0"
+                )]
+
+
+def rebuild(db_path: str = "data/jobs-tracker.db") -> int:
+    """Rebuild every sketch; returns the number of scores counted."""
+    conn = sqlite3.connect(db_path, timeout=30.0, isolation_level=None)
+    try:
+        store = ScoreSketchStore(conn)
+        conn.execute("BEGIN")
+        count = store.rebuild()
+        conn.execute("COMMIT")
+        return count
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per source / week score quantile sketches")
+    parser.add_argument('command', choices=['rebuild'],
+                        help="rebuild: recompute every sketch from scraped_jobs")
+    parser.add_argument('--db', default="data/jobs-tracker.db", help="SQLite database path")
+    args = parser.parse_args()
+
+    count = rebuild(args.db)
+    print(f"✅ Rebuilt score sketches from {count} jobs")
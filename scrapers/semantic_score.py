@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+TF-IDF Semantic Relevance
+
+Scores how close a posting's wording is to data/resumes/master_resume.json,
+locally and without any model download, so postings that describe the same
+work in other words than the configured keywords still rank:
+
+    - texts are tokenized like the feature store token index (lowercase
+      alphanumeric runs, English stop words dropped)
+    - TF is sublinear (1 + ln count), IDF is smoothed ln((1 + N) / (1 + df)) + 1
+    - document frequencies come from the token index (index_tokens.doc_count),
+      which triggers keep current as jobs are indexed, re-indexed or deleted
+    - a batch of jobs becomes one CSR matrix (rows L2-normalized) and its
+      cosine similarities to the resume vector are one sparse matrix-vector
+      product (SciPy when installed, the same CSR arrays in pure Python
+      otherwise)
+
+semantic_score = 100 * cosine / FULL_MATCH_COSINE, capped at 100, is stored
+in scraped_jobs.semantic_score (sortable) and feeds score_job() through the
+optional scoring_weights.semantic_match weight.
+
+Usage:
+    python3 scrapers/semantic_score.py backfill [--db data/jobs-tracker.db] [--all]
+
+Author: Karthik Shetty
+Created: 2025-11-24
+"""
+
+import argparse
+import json
+import logging
+import math
+import sqlite3
+from array import array
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence
+
+try:
+    from scipy.sparse import csr_matrix
+    import numpy as np
+except ImportError:  # pure-Python CSR fallback
+    csr_matrix = None
+    np = None
+
+try:
+    from .feature_store import TOKEN_RE, FeatureStore
+except ImportError:
+    from feature_store import TOKEN_RE, FeatureStore
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RESUME_PATH = "data/resumes/master_resume.json"
+
+# Cosine similarity treated as a full (100) match; resume-vs-posting cosines
+# of strong matches sit around 0.2-0.3 because postings carry a lot of
+# boilerplate the resume never mentions
+FULL_MATCH_COSINE = 0.3
+
+STOP_WORDS = frozenset("""
+    a about above after again all also am an and any are as at be because been
+    before being below between both but by can could did do does doing down
+    during each etc few for from further get had has have having he her here
+    hers him his how i if in into is it its itself just me more most my no nor
+    not now of off on once only or other our ours out over own per same she
+    should so some such than that the their theirs them then there these they
+    this those through to too under until up very via was we were what when
+    where which while who whom why will with within without would you your
+    yours
+""".split())
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lowercase tokens of a text without stop words and bare numbers."""
+    return [token for token in TOKEN_RE.findall((text or '').lower())
+            if len(token) > 1 and token not in STOP_WORDS and not token.isdigit()]
+
+
+def idf(documents: int, doc_freq: int) -> float:
+    """Smoothed inverse document frequency of a token in doc_freq of documents."""
+    return math.log((1 + documents) / (1 + doc_freq)) + 1
+
+
+def tfidf_vector(counts: Counter, documents: int, doc_freq: Dict[str, int]) -> Dict[str, float]:
+    """L2-normalized sublinear TF-IDF weights of a text's token counts."""
+    weights = {token: (1 + math.log(count)) * idf(documents, doc_freq.get(token, 0))
+               for token, count in counts.items()}
+    norm = math.sqrt(sum(w * w for w in weights.values()))
+    return {token: w / norm for token, w in weights.items()} if norm else {}
+
+
+def _strings(value) -> Iterable[str]:
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _strings(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _strings(item)
+
+
+def resume_text(resume: Dict) -> str:
+    """Searchable text of a master resume (contact details left out)."""
+    return '\n'.join(_strings({key: value for key, value in resume.items() if key != 'personal'}))
+
+
+class IdfSnapshot:
+    """
+    Document frequencies of the token index, for TF-IDF weighting.
+
+    IDF statistics are loaded with refresh(); between refreshes they are
+    a snapshot, which is fine for a batch or one scraper run.
+    """
+
+    def __init__(self):
+        self.documents = 0
+        self.doc_freq: Dict[str, int] = {}
+
+    def refresh(self, conn: sqlite3.Connection) -> None:
+        """Load the current document frequencies from the token index."""
+        self.documents, self.doc_freq = FeatureStore(conn).document_frequencies()
+
+    def tfidf(self, counts: Counter) -> Dict[str, float]:
+        """tfidf_vector() of token counts under the loaded statistics."""
+        return tfidf_vector(counts, self.documents, self.doc_freq)
+
+
+class SemanticScorer(IdfSnapshot):
+    """TF-IDF cosine similarity of job texts to the master resume."""
+
+    def __init__(self, resume_path: str = DEFAULT_RESUME_PATH):
+        """
+        Args:
+            resume_path: master_resume.json path
+
+        Raises:
+            FileNotFoundError: If the resume does not exist
+        """
+        super().__init__()
+        with open(resume_path, 'r', encoding='utf-8') as f:
+            self.resume_counts = Counter(tokenize(resume_text(json.load(f))))
+        self._resume_vector: Dict[str, float] = {}
+
+    def refresh(self, conn: sqlite3.Connection) -> None:
+        """Load the current document frequencies and reweight the resume."""
+        super().refresh(conn)
+        self._resume_vector = self.tfidf(self.resume_counts)
+
+    def similarities(self, texts: Sequence[str]) -> List[float]:
+        """
+        Cosine similarity of each text to the resume, in one sparse product.
+
+        Args:
+            texts: Job texts (simple_scorer.job_text)
+
+        Returns:
+            Cosine similarities (0-1), in input order
+        """
+        if not texts:
+            return []
+        if not self._resume_vector:
+            raise RuntimeError("SemanticScorer.refresh() must be called before scoring")
+
+        # Columns: resume tokens first, so the resume vector is a dense prefix
+        columns = {token: i for i, token in enumerate(self._resume_vector)}
+        data, indices, indptr = array('d'), array('l'), array('l', [0])
+        for text in texts:
+            for token, weight in self.tfidf(Counter(tokenize(text))).items():
+                column = columns.get(token)
+                if column is None:
+                    column = columns[token] = len(columns)
+                indices.append(column)
+                data.append(weight)
+            indptr.append(len(indices))
+
+        resume = [0.0] * len(columns)
+        for token, weight in self._resume_vector.items():
+            resume[columns[token]] = weight
+
+        if csr_matrix is not None:
+            matrix = csr_matrix((np.asarray(data, dtype=np.float64),
+                                 np.asarray(indices, dtype=np.int64),
+                                 np.asarray(indptr, dtype=np.int64)),
+                                shape=(len(texts), len(columns)))
+            return (matrix @ np.asarray(resume)).tolist()
+
+        return [sum(data[k] * resume[indices[k]] for k in range(indptr[row], indptr[row + 1]))
+                for row in range(len(texts))]
+
+    def scores(self, texts: Sequence[str]) -> List[float]:
+        """semantic_score (0-100) of each text."""
+        return [round(min(100.0, 100.0 * cosine / FULL_MATCH_COSINE), 2)
+                for cosine in self.similarities(texts)]
+
+    def score(self, text: str) -> float:
+        """semantic_score (0-100) of one text."""
+        return self.scores([text])[0]
+
+
+def backfill(db_path: str = "data/jobs-tracker.db", resume_path: str = DEFAULT_RESUME_PATH,
+             rescore_all_jobs: bool = False, batch_size: int = 500) -> int:
+    """
+    Compute scraped_jobs.semantic_score for canonical jobs.
+
+    Needs migration 013. Jobs are scored in batches, one sparse product each.
+
+    Args:
+        db_path: SQLite database path
+        resume_path: master_resume.json path
+        rescore_all_jobs: Recompute every job (e.g. after editing the
+            resume), not only jobs without a score
+
+    Returns:
+        Number of jobs scored
+    """
+    try:
+        from .description_store import DescriptionStore
+        from .simple_scorer import job_text
+    except ImportError:
+        from description_store import DescriptionStore
+        from simple_scorer import job_text
+
+    scorer = SemanticScorer(resume_path)
+    conn = sqlite3.connect(db_path, timeout=30.0, isolation_level=None)
+    try:
+        scorer.refresh(conn)
+        descriptions = DescriptionStore(conn)
+        pending = "" if rescore_all_jobs else "AND semantic_score IS NULL"
+        total = 0
+        last_id = 0
+        while True:
+            rows = conn.execute(f"""
+                SELECT id, job_title, location, company, tags
+                FROM scraped_jobs
+                WHERE canonical_job_id IS NULL {pending} AND id > ?
+                ORDER BY id
+                LIMIT ?
+            """, (last_id, batch_size)).fetchall()
+            if not rows:
+                break
+            full_text = descriptions.load_many(row[0] for row in rows)
+            texts = [job_text({'title': title or '', 'description': full_text.get(job_id, ''),
+                               'location': location or '', 'company': company or '', 'tags': tags or ''})
+                     for job_id, title, location, company, tags in rows]
+            conn.execute("BEGIN")
+            # Near-duplicates take their canonical job's score
+            conn.executemany(
+                "UPDATE scraped_jobs SET semantic_score = ? WHERE id = ? OR canonical_job_id = ?",
+                [(score, row[0], row[0]) for score, row in zip(scorer.scores(texts), rows)]
+            )
+            # Cached what-if corpora hold semantic scores too
+            conn.execute("UPDATE feature_store_meta SET version = version + 1 WHERE id = 1")
+            conn.execute("COMMIT")
+            total += len(rows)
+            last_id = rows[-1][0]
+        return total
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="TF-IDF similarity of scraped jobs to the master resume")
+    parser.add_argument('command', choices=['backfill'],
+                        help="backfill: compute semantic_score for jobs that have none")
+    parser.add_argument('--db', default="data/jobs-tracker.db", help="SQLite database path")
+    parser.add_argument('--resume', default=DEFAULT_RESUME_PATH, help="master_resume.json path")
+    parser.add_argument('--all', action='store_true', help="recompute every job's score")
+    args = parser.parse_args()
+
+    count = backfill(args.db, args.resume, args.all)
+    print(f"✅ Computed semantic_score for {count} jobs")
+    print("   With scoring_weights.semantic_match > 0, run scrapers/rescore_all.py to apply it")
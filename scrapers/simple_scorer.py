@@ -10,12 +10,23 @@ Author: Karthik Shetty
 Created: 2025-11-14
 """
 
+import hashlib
 import json
+import os
 import re
 import logging
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional, Set
 from pathlib import Path
 
+try:
+    from .location_gazetteer import normalize_location
+    from .requirement_extractor import WORK_MODES, experience_requirement, extract_requirements
+    from .term_matcher import TermMatcher, alias_patterns, config_synonyms
+except ImportError:
+    from location_gazetteer import normalize_location
+    from requirement_extractor import WORK_MODES, experience_requirement, extract_requirements
+    from term_matcher import TermMatcher, alias_patterns, config_synonyms
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -23,6 +34,54 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Normalization constants shared with the what-if reweighting (what_if.py)
+SKILLS_MAX_SCORE = 100   # sum of top 10 critical skills (10*10)
+DOMAIN_MAX_SCORE = 50    # sum of top 6 domains (6*8=48, rounded)
+RED_FLAG_CAP = -50       # penalties never go below this
+
+# job_title_keywords defaults (overridable in the config)
+TITLE_PREFERRED_BOOST = 10   # points added for a preferred title
+TITLE_AVOID_PENALTY = -15    # points added for an avoided title (no short-circuit)
+TITLE_STAGES = ('preferred', 'avoid')
+
+# Distinct location texts whose score is memoized (the memo is cleared when full)
+LOCATION_CACHE_SIZE = 4096
+
+# (minimum score, classification), highest first
+CLASSIFICATION_THRESHOLDS = [
+    (85, "EXCELLENT"),
+    (75, "HIGH_FIT"),
+    (65, "MEDIUM_FIT"),
+    (40, "LOW_FIT"),
+]
+
+
+# Config sections whose change alters every job's score
+GLOBAL_CONFIG_KEYS = [
+    ('scoring_weights',),
+    ('profile', 'years_experience'),
+    ('filters', 'location_keywords', 'acceptable'),
+    ('job_title_keywords', 'preferred', 'boost'),
+    ('job_title_keywords', 'avoid', 'penalty'),
+    ('job_title_keywords', 'avoid', 'short_circuit'),
+]
+
+
+def classify_score(score: float) -> str:
+    """
+    Map a 0-100 score to its classification.
+
+    Args:
+        score: Final job score
+
+    Returns:
+        EXCELLENT, HIGH_FIT, MEDIUM_FIT, LOW_FIT or NO_FIT
+    """
+    for threshold, classification in CLASSIFICATION_THRESHOLDS:
+        if score >= threshold:
+            return classification
+    return "NO_FIT"
+
 
 class SimpleJobScorer:
     """
@@ -34,6 +93,10 @@ class SimpleJobScorer:
     - Domain Match: 20%
     - Location Match: 10%
     - Red Flags: 10% (negative)
+
+    A title stage runs first: a preferred title adds a boost, and an avoided
+    title returns NO_FIT without scanning the description (or adds a
+    penalty when job_title_keywords.avoid.short_circuit is false).
     """
 
     def __init__(self, config_path: str = "data/resume_config.json"):
@@ -49,6 +112,7 @@ class SimpleJobScorer:
         """
         logger.info(f"Loading configuration from {config_path}")
 
+        self.config_path = config_path
         config_file = Path(config_path)
         if not config_file.exists():
             raise FileNotFoundError(
@@ -56,52 +120,131 @@ class SimpleJobScorer:
                 f"Please ensure {config_path} exists."
             )
 
+        raw = config_file.read_bytes()
+        self.config = self._load_config_bytes(raw)
+        self.config_hash = hashlib.sha256(raw).hexdigest()
+        self._config_stat = self._stat_config()
+
+        # Parse configuration sections
+        self._parse_config()
+        logger.info("Configuration loaded successfully")
+
+    def _load_config_bytes(self, raw: bytes) -> Dict:
+        """Parse config JSON, naming the file in errors."""
         try:
-            with open(config_file, 'r', encoding='utf-8') as f:
-                self.config = json.load(f)
+            return json.loads(raw.decode('utf-8'))
         except json.JSONDecodeError as e:
             raise json.JSONDecodeError(
-                f"Malformed JSON in {config_path}: {e.msg}",
+                f"Malformed JSON in {self.config_path}: {e.msg}",
                 e.doc,
                 e.pos
             )
 
-        # Parse configuration sections
-        self._parse_config()
-        logger.info("Configuration loaded successfully")
+    def _stat_config(self) -> Tuple[int, int]:
+        stat = os.stat(self.config_path)
+        return stat.st_mtime_ns, stat.st_size
 
-    def _parse_config(self) -> None:
-        """Parse and structure configuration data for efficient access."""
-        # Combine all skills into a single dictionary with weights
-        self.all_skills = {}
+    def reload_if_changed(self) -> Optional[Dict]:
+        """
+        Reload the config if the file changed on disk.
 
-        for category in ['critical', 'high_value', 'nice_to_have']:
-            items = self.config['skills'][category]['items']
-            self.all_skills.update(items)
+        The mtime/size check is a cheap stat; the content hash then filters
+        out touches that did not change anything.
 
-        # Parse red flags
-        self.red_flags = {}
-        for category in ['deal_breakers', 'consultancy_signals',
-                         'manual_testing_only', 'outdated_tech']:
-            if category in self.config['red_flags']:
-                items = self.config['red_flags'][category].get('items', {})
-                self.red_flags.update(items)
+        Returns:
+            diff_configs() result if the content changed, else None
 
-        # Parse domains
-        self.domains = self.config['domains']['items']
+        Raises:
+            json.JSONDecodeError: If the new file is malformed (the old
+                config stays active)
+            KeyError: If the new config misses a required section (the old
+                config stays active)
+        """
+        stat = self._stat_config()
+        if stat == self._config_stat:
+            return None
+
+        raw = Path(self.config_path).read_bytes()
+        content_hash = hashlib.sha256(raw).hexdigest()
+        if content_hash == self.config_hash:
+            self._config_stat = stat
+            return None
+
+        new_config = self._load_config_bytes(raw)
+        diff = diff_configs(self.config, new_config)
+
+        # Parse first: a failure leaves config, hash and stat untouched, so
+        # the edit is retried (and fails loudly) on the next poll
+        self._parse_config(new_config)
+        self.config = new_config
+        self.config_hash = content_hash
+        self._config_stat = stat
+        logger.info(f"Reloaded configuration from {self.config_path} "
+                    f"({sum(len(t) for t in diff['terms'].values())} terms changed, "
+                    f"full rescore: {diff['full_rescore']})")
+        return diff
+
+    def _parse_config(self, config: Optional[Dict] = None) -> None:
+        """
+        Parse and structure configuration data for efficient access.
 
-        # Parse scoring weights
-        self.weights = self.config['scoring_weights']
+        Every field is built before any is assigned, so a config missing a
+        required section raises without touching the active one.
 
-        # Resume profile
-        self.profile = self.config['profile']
+        Args:
+            config: Configuration to parse (default: self.config)
 
-        # Thresholds
-        self.auto_import_threshold = self.config['auto_import_threshold']
+        Raises:
+            KeyError: If a required section is missing
+        """
+        config = self.config if config is None else config
+
+        # Skills, red flags and domains as {term: weight}
+        term_weights = config_term_weights(config)
+        skills, red_flags, domains = term_weights['skill'], term_weights['red_flag'], term_weights['domain']
+        synonyms = config_synonyms(config)
+        title_keywords = config.get('job_title_keywords', {})
+        title_stages = config_title_keywords(config)
+
+        parsed = {
+            'all_skills': skills,
+            'red_flags': red_flags,
+            'domains': domains,
+
+            # Best skills / domain scores any job text can earn (cascade bound)
+            'skills_ceiling': min(100, sum(w for w in skills.values() if w > 0) / SKILLS_MAX_SCORE * 100),
+            'domain_ceiling': min(100, sum(w for w in domains.values() if w > 0) / DOMAIN_MAX_SCORE * 100),
+
+            # keyword_synonyms aliases are compiled into the same single-pass matcher
+            'synonyms': synonyms,
+            'term_matcher': TermMatcher(term_weights, synonyms),
+
+            # Title stage
+            'title_keywords': title_stages,
+            'title_matcher': TermMatcher(
+                {stage: dict.fromkeys(items, 0) for stage, items in title_stages.items()}
+            ),
+            'title_boost': title_keywords.get('preferred', {}).get('boost', TITLE_PREFERRED_BOOST),
+            'title_penalty': title_keywords.get('avoid', {}).get('penalty', TITLE_AVOID_PENALTY),
+            'title_short_circuit': title_keywords.get('avoid', {}).get('short_circuit', True),
+
+            # Scoring weights, resume profile and thresholds
+            'weights': config['scoring_weights'],
+            'profile': config['profile'],
+            'auto_import_threshold': config['auto_import_threshold'],
+
+            # Location: acceptable keywords, and scores memoized per distinct location text
+            'acceptable_locations': [
+                loc.lower() for loc in config.get('filters', {}).get('location_keywords', {}).get('acceptable', [])
+            ],
+            '_location_scores': {},
+        }
+        self.__dict__.update(parsed)
 
         logger.debug(f"Loaded {len(self.all_skills)} skills, "
                     f"{len(self.red_flags)} red flags, "
-                    f"{len(self.domains)} domains")
+                    f"{len(self.domains)} domains, "
+                    f"{self.term_matcher.pattern_count} match patterns")
 
     def normalize_text(self, text: str) -> str:
         """
@@ -117,12 +260,14 @@ class SimpleJobScorer:
             return ""
         return " ".join(text.lower().strip().split())
 
-    def calculate_skills_score(self, job_text: str) -> Tuple[float, List[Dict[str, any]]]:
+    def calculate_skills_score(self, job_text: str,
+                               matches: Optional[Dict[str, Set[str]]] = None) -> Tuple[float, List[Dict[str, any]]]:
         """
         Calculate skills match score.
 
         Args:
             job_text: Normalized job description text
+            matches: term_matcher.match() result, if already computed
 
         Returns:
             Tuple of (normalized_score, list of matched skills)
@@ -132,15 +277,11 @@ class SimpleJobScorer:
         matched_skills = []
         total_weight = 0
 
-        job_text = self.normalize_text(job_text)
+        found = (matches or self._match_terms(job_text))['skill']
 
+        # Config order, so ties keep a stable order after sorting
         for skill, weight in self.all_skills.items():
-            # Create regex pattern with word boundaries
-            # Handle special characters in skill names
-            skill_pattern = re.escape(skill.lower())
-            pattern = r'\b' + skill_pattern + r'\b'
-
-            if re.search(pattern, job_text):
+            if skill in found:
                 matched_skills.append({
                     'skill': skill,
                     'weight': weight
@@ -151,9 +292,7 @@ class SimpleJobScorer:
         matched_skills.sort(key=lambda x: x['weight'], reverse=True)
 
         # Normalize to 0-100 scale
-        # Assume max possible skills score is sum of top 10 critical skills (10*10=100)
-        max_possible_score = 100
-        normalized_score = min(100, (total_weight / max_possible_score) * 100)
+        normalized_score = min(100, (total_weight / SKILLS_MAX_SCORE) * 100)
 
         logger.debug(f"Skills matched: {len(matched_skills)}, "
                     f"Total weight: {total_weight}, "
@@ -161,12 +300,14 @@ class SimpleJobScorer:
 
         return normalized_score, matched_skills
 
-    def calculate_red_flags(self, job_text: str) -> Tuple[float, List[Dict[str, any]]]:
+    def calculate_red_flags(self, job_text: str,
+                            matches: Optional[Dict[str, Set[str]]] = None) -> Tuple[float, List[Dict[str, any]]]:
         """
         Calculate red flag penalties.
 
         Args:
             job_text: Normalized job description text
+            matches: term_matcher.match() result, if already computed
 
         Returns:
             Tuple of (total_penalty, list of red flags found)
@@ -176,34 +317,35 @@ class SimpleJobScorer:
         red_flags_found = []
         total_penalty = 0
 
-        job_text = self.normalize_text(job_text)
+        found = (matches or self._match_terms(job_text))['red_flag']
 
         for flag, penalty in self.red_flags.items():
-            # Create regex pattern with word boundaries
-            flag_pattern = re.escape(flag.lower())
-            pattern = r'\b' + flag_pattern + r'\b'
-
-            if re.search(pattern, job_text):
+            if flag in found:
                 red_flags_found.append({
                     'flag': flag,
                     'penalty': penalty
                 })
                 total_penalty += penalty
 
-        # Cap penalty at -50 to avoid extreme negatives
-        total_penalty = max(total_penalty, -50)
+        # Cap penalty to avoid extreme negatives
+        total_penalty = max(total_penalty, RED_FLAG_CAP)
 
         logger.debug(f"Red flags found: {len(red_flags_found)}, "
                     f"Total penalty: {total_penalty}")
 
         return total_penalty, red_flags_found
 
-    def calculate_domain_score(self, job_text: str) -> Tuple[float, List[Dict[str, any]]]:
+    def calculate_domain_score(self, job_text: str,
+                               matches: Optional[Dict[str, Set[str]]] = None) -> Tuple[float, List[Dict[str, any]]]:
         """
         Calculate domain match score.
 
+        Domains match on any '/'- or ','-separated part longer than 2
+        characters (e.g. "ETL/DWH" matches "ETL" or "DWH").
+
         Args:
             job_text: Normalized job description text
+            matches: term_matcher.match() result, if already computed
 
         Returns:
             Tuple of (normalized_score, list of matched domains)
@@ -213,25 +355,10 @@ class SimpleJobScorer:
         matched_domains = []
         total_weight = 0
 
-        job_text = self.normalize_text(job_text)
+        found = (matches or self._match_terms(job_text))['domain']
 
         for domain, weight in self.domains.items():
-            # Create flexible pattern for domain matching
-            # Handle domain variations (e.g., "ETL/DWH" vs "ETL" or "DWH")
-            domain_lower = domain.lower()
-
-            # Split on / to check individual parts
-            domain_parts = [part.strip() for part in re.split(r'[/,]', domain_lower)]
-
-            matched = False
-            for part in domain_parts:
-                if len(part) > 2:  # Skip very short parts
-                    pattern = r'\b' + re.escape(part) + r'\b'
-                    if re.search(pattern, job_text):
-                        matched = True
-                        break
-
-            if matched:
+            if domain in found:
                 matched_domains.append({
                     'domain': domain,
                     'weight': weight
@@ -242,9 +369,7 @@ class SimpleJobScorer:
         matched_domains.sort(key=lambda x: x['weight'], reverse=True)
 
         # Normalize to 0-100 scale
-        # Assume max possible domain score is sum of top 6 domains (6*8=48, round to 50)
-        max_possible_score = 50
-        normalized_score = min(100, (total_weight / max_possible_score) * 100)
+        normalized_score = min(100, (total_weight / DOMAIN_MAX_SCORE) * 100)
 
         logger.debug(f"Domains matched: {len(matched_domains)}, "
                     f"Total weight: {total_weight}, "
@@ -252,35 +377,68 @@ class SimpleJobScorer:
 
         return normalized_score, matched_domains
 
-    def calculate_location_score(self, location: str) -> float:
+    def match_title(self, title: str) -> Tuple[Optional[str], List[str]]:
+        """
+        Match a job title against job_title_keywords.
+
+        Args:
+            title: Raw job title
+
+        Returns:
+            Tuple of (stage, matched keywords)
+            - stage: 'avoid' (takes precedence), 'preferred' or None
+            - matched keywords: in config order
+        """
+        found = self.title_matcher.match(self.normalize_text(title))
+        for stage in ('avoid', 'preferred'):
+            if found[stage]:
+                return stage, [t for t in self.title_keywords[stage] if t in found[stage]]
+        return None, []
+
+    def _match_terms(self, job_text: str) -> Dict[str, Set[str]]:
+        """Skills, domains and red flags (synonyms included) found in one scan."""
+        return self.term_matcher.match(self.normalize_text(job_text))
+
+    def calculate_location_score(self, location: str, work_mode: Optional[str] = None) -> float:
         """
         Calculate location match score.
 
         Args:
             location: Job location string
+            work_mode: Work mode stated in the description ('hybrid',
+                'remote' or 'onsite'), if any; only used when the location
+                is empty or names no place or mode the gazetteer knows
 
         Returns:
             Score from 0-100
         """
+        # The board's location wins over the description: a stated work
+        # mode never overrides a specific city, country or region
+        if work_mode and not (location and normalize_location(location).codes):
+            location = f"{location or ''} {work_mode}"
         if not location:
             return 50  # Neutral if location not specified
 
-        location = self.normalize_text(location)
-
-        # Check for remote indicators
-        remote_keywords = ['remote', 'anywhere', 'work from home', 'wfh']
-        if any(keyword in location for keyword in remote_keywords):
+        score = self._location_scores.get(location)
+        if score is None:
+            if len(self._location_scores) >= LOCATION_CACHE_SIZE:
+                self._location_scores.clear()
+            score = self._location_scores[location] = self._score_location(location)
+        return score
+
+    def _score_location(self, location: str) -> float:
+        """Location score of a non-empty location text (uncached)."""
+        # Remote / hybrid flags from the gazetteer's single scan
+        normalized = normalize_location(location)
+        if normalized.is_remote:
             return 100
-
-        # Check for hybrid
-        if 'hybrid' in location:
+        if normalized.is_hybrid:
             return 50
 
-        # Check for preferred locations from config
-        preferred_locations = self.config.get('filters', {}).get('location_keywords', {}).get('acceptable', [])
-        for pref_loc in preferred_locations:
-            if pref_loc.lower() in location:
-                return 30
+        # Check for acceptable locations from config
+        location = self.normalize_text(location)
+        if any(pref_loc in location for pref_loc in self.acceptable_locations):
+            return 30
 
         # Onsite or other
         return 0
@@ -350,10 +508,22 @@ class SimpleJobScorer:
                 else:
                     return 40
 
-    def score_job(self, job_data: Dict) -> Dict:
+    def score_job(self, job_data: Dict, threshold: Optional[float] = None,
+                  matches: Optional[Dict[str, Set[str]]] = None) -> Dict:
         """
         Score a job posting using weighted algorithm.
 
+        With a threshold, scoring cascades: location, experience, title and
+        the short fields (title, tags, company) are scored first, and if the
+        best score any description could add still falls below the
+        threshold, the description is not read at all. Years and a work
+        mode the description might state are taken at their best case for
+        the bound, so requirement extraction waits until a job passes it.
+        The result is then flagged with is_partial_score: final_score is
+        what the short fields alone earn (an estimate; the full score is
+        below the threshold either way), requirements are those of the
+        title, and score_upper_bound is the bound.
+
         Args:
             job_data: Dictionary with keys:
                 - title (required): Job title
@@ -361,7 +531,18 @@ class SimpleJobScorer:
                 - location (optional): Job location
                 - company (optional): Company name
                 - tags (optional): Comma-separated tags
-                - experience_required (optional): Experience requirement
+                - experience_required (optional): Experience requirement;
+                  if empty, the years stated in the posting
+                - requirements (optional): extract_requirements() result, if
+                  already extracted (e.g. by ingest, which stores it)
+                - semantic_score (optional): TF-IDF similarity to the master
+                  resume (semantic_score.py, 0-100); weighted by
+                  scoring_weights.semantic_match, default 0
+            threshold: Skip the description scan for jobs that cannot reach
+                this score (e.g. auto_import_threshold); None scores fully
+            matches: Terms already found in job_text(job_data) (e.g. by a
+                shared multi-profile scan); skips this scorer's own scan and
+                the cascade
 
         Returns:
             Dictionary with complete scoring breakdown
@@ -373,23 +554,60 @@ class SimpleJobScorer:
         if 'title' not in job_data or 'description' not in job_data:
             raise ValueError("job_data must contain 'title' and 'description' fields")
 
-        # Combine all text fields for analysis
-        full_text = " ".join([
-            job_data.get('title', ''),
-            job_data.get('description', ''),
-            job_data.get('tags', ''),
-            job_data.get('company', '')
-        ])
-
-        # Calculate component scores
-        skills_score, matched_skills = self.calculate_skills_score(full_text)
-        red_flag_penalty, red_flags_found = self.calculate_red_flags(full_text)
-        domain_score, matched_domains = self.calculate_domain_score(full_text)
-        location_score = self.calculate_location_score(job_data.get('location', ''))
-        experience_score = self.calculate_experience_score(
-            job_data.get('experience_required', ''),
-            self.profile['years_experience']
-        )
+        # Title stage: an avoided title skips the description scan
+        title_stage, title_matches = self.match_title(job_data.get('title', ''))
+        if title_stage == 'avoid' and self.title_short_circuit:
+            return self._short_circuit_result(job_data, title_matches)
+
+        title_adjustment = 0
+        if title_stage == 'preferred':
+            title_adjustment = self.title_boost
+        elif title_stage == 'avoid':
+            title_adjustment = self.title_penalty
+
+        # Stated experience, seniority and work mode (ingest passes them in)
+        requirements = job_data.get('requirements')
+        semantic_score = float(job_data.get('semantic_score') or 0)
+
+        # Cascade: red flags in the short fields already cap the final score
+        is_partial = False
+        upper_bound = None
+        shared_scan = matches is not None
+        if shared_scan:
+            scanned_text = job_text(job_data)
+        elif threshold is not None:
+            scanned_text = job_text(job_data, include_description=False)
+            matches = self._match_terms(scanned_text)
+            partial_penalty, _ = self.calculate_red_flags(scanned_text, matches)
+            if requirements is not None:
+                location_bound, experience_bound = self._requirement_scores(job_data, requirements)
+            else:
+                # Unread description: whatever work mode it states, and no
+                # stated years (the neutral 100 is the experience maximum)
+                location_bound = max(self.calculate_location_score(job_data.get('location', ''), mode)
+                                     for mode in (None,) + WORK_MODES)
+                experience_bound = self.calculate_experience_score(
+                    job_data.get('experience_required') or '', self.profile['years_experience'])
+            upper_bound = self.score_upper_bound(
+                experience_bound, location_bound, partial_penalty, title_adjustment,
+                semantic_score
+            )
+            is_partial = upper_bound < threshold
+
+        if requirements is None:
+            # One extractor pass; a partial result only reads the title
+            requirements = extract_requirements(
+                job_data.get('title'), None if is_partial else job_data.get('description'))
+        location_score, experience_score = self._requirement_scores(job_data, requirements)
+
+        if not is_partial and not shared_scan:
+            # Calculate component scores from a single scan of the full text
+            scanned_text = job_text(job_data)
+            matches = self._match_terms(scanned_text)
+
+        skills_score, matched_skills = self.calculate_skills_score(scanned_text, matches)
+        red_flag_penalty, red_flags_found = self.calculate_red_flags(scanned_text, matches)
+        domain_score, matched_domains = self.calculate_domain_score(scanned_text, matches)
 
         # Apply weights and calculate final score
         final_score = (
@@ -397,23 +615,16 @@ class SimpleJobScorer:
             (experience_score * self.weights['experience_match']) +
             (domain_score * self.weights['domain_match']) +
             (location_score * self.weights['location_match']) +
-            (red_flag_penalty * self.weights['red_flags'])
+            (red_flag_penalty * self.weights['red_flags']) +
+            (semantic_score * self.weights.get('semantic_match', 0)) +
+            title_adjustment
         )
 
         # Clamp between 0-100
         final_score = max(0, min(100, final_score))
 
         # Classify job
-        if final_score >= 85:
-            classification = "EXCELLENT"
-        elif final_score >= 75:
-            classification = "HIGH_FIT"
-        elif final_score >= 65:
-            classification = "MEDIUM_FIT"
-        elif final_score >= 40:
-            classification = "LOW_FIT"
-        else:
-            classification = "NO_FIT"
+        classification = classify_score(final_score)
 
         # Generate recommendation
         recommendation = self._get_recommendation(final_score, classification)
@@ -428,8 +639,15 @@ class SimpleJobScorer:
                 'experience_score': round(experience_score, 2),
                 'domain_score': round(domain_score, 2),
                 'location_score': round(location_score, 2),
-                'red_flag_penalty': round(red_flag_penalty, 2)
+                'red_flag_penalty': round(red_flag_penalty, 2),
+                'semantic_score': round(semantic_score, 2),
+                'title_adjustment': round(title_adjustment, 2)
             },
+            'title_match': {'stage': title_stage, 'keywords': title_matches},
+            'short_circuit': False,
+            'reason': None,
+            'is_partial_score': is_partial,
+            'score_upper_bound': round(upper_bound, 2) if upper_bound is not None else None,
             'matched_skills': matched_skills[:10],  # Top 10
             'matched_domains': matched_domains[:5],  # Top 5
             'red_flags': red_flags_found,
@@ -438,14 +656,116 @@ class SimpleJobScorer:
                 'company': job_data.get('company', 'N/A'),
                 'location': job_data.get('location', 'N/A')
             },
-            'should_auto_import': final_score >= self.auto_import_threshold
+            'should_auto_import': final_score >= self.auto_import_threshold,
+            'requirements': requirements,
+            # Everything that matched, before truncation; persisted by the
+            # feature store so weights can be re-applied without rescanning text
+            'features': {
+                'skills': [s['skill'] for s in matched_skills],
+                'domains': [d['domain'] for d in matched_domains],
+                'red_flags': [f['flag'] for f in red_flags_found],
+                'location_score': location_score,
+                'experience_score': experience_score,
+                'title_adjustment': title_adjustment,
+                'short_circuit': False
+            }
         }
 
         logger.info(f"Scored job '{job_data.get('title')}': "
-                   f"{final_score:.1f} ({classification})")
+                   f"{final_score:.1f} ({classification})"
+                   f"{f', partial (bound {upper_bound:.1f})' if is_partial else ''}")
 
         return result
 
+    def _requirement_scores(self, job_data: Dict, requirements: Dict) -> Tuple[float, float]:
+        """Location and experience scores of a job, given its extracted requirements."""
+        location_score = self.calculate_location_score(job_data.get('location', ''),
+                                                       requirements['work_mode'])
+        experience_score = self.calculate_experience_score(
+            job_data.get('experience_required') or experience_requirement(requirements),
+            self.profile['years_experience']
+        )
+        return location_score, experience_score
+
+    def score_upper_bound(self, experience_score: float, location_score: float,
+                          red_flag_penalty: float, title_adjustment: float = 0,
+                          semantic_score: float = 0) -> float:
+        """
+        Highest final score a job can reach whatever its description says.
+
+        Skills and domains are taken at their maximum; red flags can only
+        lower the score, so a penalty found so far is kept.
+
+        Args:
+            experience_score: Experience component (0-100)
+            location_score: Location component (0-100)
+            red_flag_penalty: Penalty found so far (<= 0)
+            title_adjustment: Title stage boost or penalty
+            semantic_score: Precomputed semantic component (0-100)
+
+        Returns:
+            Upper bound on final_score (0-100)
+        """
+        red_flags_weight = self.weights['red_flags']
+        bound = (
+            (self.skills_ceiling * self.weights['skills_match']) +
+            (experience_score * self.weights['experience_match']) +
+            (self.domain_ceiling * self.weights['domain_match']) +
+            (location_score * self.weights['location_match']) +
+            max(red_flag_penalty * red_flags_weight, RED_FLAG_CAP * red_flags_weight) +
+            (semantic_score * self.weights.get('semantic_match', 0)) +
+            title_adjustment
+        )
+        return max(0, min(100, bound))
+
+    def _short_circuit_result(self, job_data: Dict, title_matches: List[str]) -> Dict:
+        """
+        NO_FIT result for a job whose title is on the avoid list.
+
+        Same shape as a full score_job() result, with every component at 0.
+        """
+        reason = f"Title matches avoid keyword(s): {', '.join(title_matches)}"
+        logger.info(f"Skipped job '{job_data.get('title')}': {reason}")
+        return {
+            'final_score': 0.0,
+            'classification': 'NO_FIT',
+            'recommendation': f"🚫 SKIP - {reason}",
+            'breakdown': {
+                'skills_score': 0.0,
+                'experience_score': 0.0,
+                'domain_score': 0.0,
+                'location_score': 0.0,
+                'red_flag_penalty': 0.0,
+                'semantic_score': 0.0,
+                'title_adjustment': 0.0
+            },
+            'title_match': {'stage': 'avoid', 'keywords': title_matches},
+            'short_circuit': True,
+            'reason': reason,
+            'is_partial_score': False,
+            'score_upper_bound': None,
+            'matched_skills': [],
+            'matched_domains': [],
+            'red_flags': [],
+            'job_info': {
+                'title': job_data.get('title', 'N/A'),
+                'company': job_data.get('company', 'N/A'),
+                'location': job_data.get('location', 'N/A')
+            },
+            'should_auto_import': False,
+            # Only the title was read
+            'requirements': job_data.get('requirements') or extract_requirements(job_data.get('title'), None),
+            'features': {
+                'skills': [],
+                'domains': [],
+                'red_flags': [],
+                'location_score': 0,
+                'experience_score': 0,
+                'title_adjustment': 0,
+                'short_circuit': True
+            }
+        }
+
     def _get_recommendation(self, score: float, classification: str) -> str:
         """
         Generate actionable recommendation based on score.
@@ -467,6 +787,118 @@ class SimpleJobScorer:
         return recommendations.get(classification, f"Unknown classification ({score:.1f}%)")
 
 
+def job_text(job_data: Dict, include_description: bool = True) -> str:
+    """
+    Text the scorer searches for skills, domains and red flags.
+
+    Args:
+        job_data: Same dictionary as score_job()
+        include_description: False for the short fields only (cascade stage)
+
+    Returns:
+        Title, description, tags and company joined by spaces
+    """
+    return " ".join([
+        job_data.get('title', '') or '',
+        (job_data.get('description', '') or '') if include_description else '',
+        job_data.get('tags', '') or '',
+        job_data.get('company', '') or ''
+    ])
+
+
+def config_term_weights(config: Dict) -> Dict[str, Dict[str, float]]:
+    """
+    Term weights of a config, grouped by kind.
+
+    Args:
+        config: Parsed resume_config.json
+
+    Returns:
+        {'skill': {...}, 'domain': {...}, 'red_flag': {...}}
+    """
+    skills = {}
+    for category in ['critical', 'high_value', 'nice_to_have']:
+        skills.update(config.get('skills', {}).get(category, {}).get('items', {}))
+
+    red_flags = {}
+    for category in ['deal_breakers', 'consultancy_signals',
+                     'manual_testing_only', 'outdated_tech']:
+        red_flags.update(config.get('red_flags', {}).get(category, {}).get('items', {}))
+
+    return {
+        'skill': skills,
+        'domain': dict(config.get('domains', {}).get('items', {})),
+        'red_flag': red_flags,
+    }
+
+
+def config_title_keywords(config: Dict) -> Dict[str, List[str]]:
+    """
+    Title keywords of a config by stage.
+
+    Args:
+        config: Parsed resume_config.json
+
+    Returns:
+        {'preferred': [...], 'avoid': [...]}
+    """
+    title_keywords = config.get('job_title_keywords', {})
+    return {stage: list(title_keywords.get(stage, {}).get('items', [])) for stage in TITLE_STAGES}
+
+
+def diff_configs(old: Dict, new: Dict) -> Dict:
+    """
+    Work out what a config edit changes for stored scores.
+
+    Args:
+        old: Previously applied config
+        new: New config
+
+    Returns:
+        Dictionary with:
+            - terms: {kind: set of terms added, removed or reweighted}
+            - aliases: keyword_synonyms aliases added or removed, plus the
+              aliases of changed terms (jobs containing them may change too)
+            - title_terms: preferred / avoid title keywords added or removed
+            - full_rescore: True if every job's score may change
+            - changed_sections: top-level keys that differ
+    """
+    old_terms = config_term_weights(old)
+    new_terms = config_term_weights(new)
+    terms = {}
+    for kind in new_terms:
+        before, after = old_terms[kind], new_terms[kind]
+        terms[kind] = {t for t in before.keys() | after.keys() if before.get(t) != after.get(t)}
+
+    old_synonyms, new_synonyms = config_synonyms(old), config_synonyms(new)
+    aliases = set()
+    for key in old_synonyms.keys() | new_synonyms.keys():
+        aliases |= set(old_synonyms.get(key, ())) ^ set(new_synonyms.get(key, ()))
+    for kind, changed in terms.items():
+        aliases |= alias_patterns(kind, changed, old_synonyms)
+        aliases |= alias_patterns(kind, changed, new_synonyms)
+
+    old_titles, new_titles = config_title_keywords(old), config_title_keywords(new)
+    title_terms = set()
+    for stage in TITLE_STAGES:
+        title_terms |= set(old_titles[stage]) ^ set(new_titles[stage])
+
+    def lookup(config, path):
+        for key in path:
+            config = config.get(key) if isinstance(config, dict) else None
+        return config
+
+    full_rescore = any(lookup(old, path) != lookup(new, path) for path in GLOBAL_CONFIG_KEYS)
+
+    return {
+        'terms': terms,
+        'aliases': aliases,
+        'title_terms': title_terms,
+        'full_rescore': full_rescore,
+        'changed_sections': sorted(k for k in old.keys() | new.keys() if old.get(k) != new.get(k)),
+    }
+
+
 def print_job_score(result: Dict) -> None:
     """
     Pretty print job scoring results.
@@ -484,6 +916,14 @@ def print_job_score(result: Dict) -> None:
     print(f"📊 CLASSIFICATION: {result['classification']}")
     print(f"💡 RECOMMENDATION: {result['recommendation']}")
 
+    if result['is_partial_score']:
+        print(f"⏩ PARTIAL: description not scanned (upper bound {result['score_upper_bound']:.1f})")
+
+    if result['short_circuit']:
+        print(f"⏭️  SHORT-CIRCUIT: {result['reason']}")
+        print("\n" + "="*70)
+        return
+
     if result['should_auto_import']:
         print(f"✅ AUTO-IMPORT: YES (threshold: auto-import)")
     else:
@@ -495,6 +935,11 @@ def print_job_score(result: Dict) -> None:
     print(f"   Domain Match:      {result['breakdown']['domain_score']:6.2f}/100 (weight: 20%)")
     print(f"   Location Match:    {result['breakdown']['location_score']:6.2f}/100 (weight: 10%)")
     print(f"   Red Flag Penalty:  {result['breakdown']['red_flag_penalty']:6.2f} (weight: 10%)")
+    if result['breakdown'].get('semantic_score'):
+        print(f"   Semantic Match:    {result['breakdown']['semantic_score']:6.2f}")
+    if result['title_match']['stage']:
+        print(f"   Title ({result['title_match']['stage']}): {result['breakdown']['title_adjustment']:+6.2f} "
+              f"({', '.join(result['title_match']['keywords'])})")
 
     print(f"\n🔧 TOP MATCHED SKILLS ({len(result['matched_skills'])}):")
     for i, skill in enumerate(result['matched_skills'][:5], 1):
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Single-Pass Term Matcher
+
+Finds every configured skill, domain and red flag in a job text with one
+compiled regex instead of one search per term:
+
+    - all match patterns (terms, domain parts and keyword_synonyms aliases)
+      are merged into a character trie and emitted as a single alternation,
+      so the cost of a scan grows with the text, not the number of patterns
+    - the alternation sits in a lookahead at every word boundary, so
+      overlapping matches ("data warehouse" inside "enterprise data
+      warehouse") are all seen
+    - at one position the regex reports the longest pattern; shorter
+      patterns that are whole-word prefixes of it ("selenium" in "selenium
+      ui") are credited from a closure computed at build time
+
+Matching semantics are the same as a separate r'\\bpattern\\b' search per
+pattern on lowercased, whitespace-normalized text. An alias credits the
+term(s) of its keyword_synonyms key, and each term is credited once however
+many of its patterns occur.
+
+TermMatcher.union() merges several configs (e.g. one per candidate profile)
+into one regex whose kinds are (key, kind) pairs, so a text is scanned once
+for all of them.
+
+Author: Karthik Shetty
+Created: 2025-11-23
+"""
+
+import re
+from typing import Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+# (kind, term) credited by a pattern
+Target = Tuple[Hashable, str]
+
+
+def term_patterns(kind: str, term: str) -> List[str]:
+    """
+    Lowercase patterns that match a term.
+
+    Domains match on any '/'- or ','-separated part longer than 2
+    characters (e.g. 'ETL/DWH' matches 'etl' or 'dwh'); other kinds match
+    the whole term.
+    """
+    term = term.lower()
+    if kind == 'domain':
+        parts = [part.strip() for part in re.split(r'[/,]', term)]
+        return [part for part in parts if len(part) > 2]
+    return [term]
+
+
+def config_synonyms(config: Dict) -> Dict[str, List[str]]:
+    """
+    keyword_synonyms of a config as {lowercase key: lowercase aliases}.
+
+    Non-list entries (the section's 'description') are skipped.
+    """
+    synonyms = {}
+    for key, aliases in config.get('keyword_synonyms', {}).items():
+        if isinstance(aliases, list):
+            synonyms[key.lower()] = sorted({str(alias).lower() for alias in aliases} - {key.lower()})
+    return synonyms
+
+
+def pattern_targets(term_weights: Dict[str, Dict[str, float]],
+                    synonyms: Dict[str, List[str]] = None) -> Dict[str, Set[Target]]:
+    """
+    {pattern: (kind, term) targets} for a set of weighted terms and their synonyms.
+
+    Aliases of a keyword_synonyms key credit every term that has the key as
+    a pattern.
+    """
+    targets: Dict[str, Set[Target]] = {}
+    for kind, terms in term_weights.items():
+        for term in terms:
+            for pattern in term_patterns(kind, term):
+                if pattern:
+                    targets.setdefault(pattern, set()).add((kind, term))
+
+    for key, aliases in (synonyms or {}).items():
+        if key not in targets:
+            continue
+        for alias in aliases:
+            if alias:
+                targets.setdefault(alias, set()).update(targets[key])
+    return targets
+
+
+def _is_word(char: str) -> bool:
+    return char.isalnum() or char == '_'
+
+
+def _trie_regex(node: Dict) -> str:
+    """Regex for a trie node; longer continuations are tried first."""
+    end = '' in node
+    branches = [re.escape(char) + _trie_regex(child)
+                for char, child in sorted(node.items()) if char != '']
+    if not branches:
+        return ''
+    body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+    if end:
+        # Greedy optional: keep the longer pattern unless its trailing \b fails
+        return '(?:' + body + ')?'
+    return body
+
+
+class TermMatcher:
+    """
+    Compiled matcher for a set of weighted terms and their synonyms.
+
+    Example:
+        >>> matcher = TermMatcher({'skill': {'SQL': 10}}, {'sql': ['mysql']})
+        >>> matcher.match('mysql and postgres')
+        {'skill': {'SQL'}}
+    """
+
+    def __init__(self, term_weights: Dict[str, Dict[str, float]],
+                 synonyms: Dict[str, List[str]] = None):
+        """
+        Build the matcher.
+
+        Args:
+            term_weights: {kind: {term: weight}} (config_term_weights() result)
+            synonyms: {lowercase key: lowercase aliases} (config_synonyms() result);
+                aliases of a key credit every term that has the key as a pattern
+        """
+        self._build(list(term_weights), pattern_targets(term_weights, synonyms))
+
+    @classmethod
+    def union(cls, configs: Dict[Hashable, Tuple[Dict[str, Dict[str, float]],
+                                                 Optional[Dict[str, List[str]]]]]) -> 'TermMatcher':
+        """
+        One matcher for several term configs.
+
+        Each config keeps its own synonyms; match() reports kinds as
+        (key, kind) pairs.
+
+        Args:
+            configs: {key: (term_weights, synonyms)}
+
+        Returns:
+            TermMatcher whose kinds are (key, kind)
+        """
+        kinds = []
+        targets: Dict[str, Set[Target]] = {}
+        for key, (term_weights, synonyms) in configs.items():
+            kinds.extend((key, kind) for kind in term_weights)
+            for pattern, own in pattern_targets(term_weights, synonyms).items():
+                targets.setdefault(pattern, set()).update(((key, kind), term) for kind, term in own)
+        matcher = cls.__new__(cls)
+        matcher._build(kinds, targets)
+        return matcher
+
+    def _build(self, kinds: List[Hashable], targets: Dict[str, Set[Target]]) -> None:
+        self.kinds = kinds
+        self.pattern_count = len(targets)
+        self._regex = self._compile(targets)
+        self._closure = self._prefix_closure(targets)
+
+    def _compile(self, targets: Dict[str, Set[Target]]):
+        if not targets:
+            return None
+        trie: Dict = {}
+        for pattern in targets:
+            node = trie
+            for char in pattern:
+                node = node.setdefault(char, {})
+            node[''] = True
+        # Zero-width match at each word boundary; group 1 is the longest
+        # pattern starting there that is followed by a word boundary
+        return re.compile(r'\b(?=(' + _trie_regex(trie) + r')\b)')
+
+    @staticmethod
+    def _prefix_closure(targets: Dict[str, Set[Target]]) -> Dict[str, Tuple[Target, ...]]:
+        """
+        Targets credited when a pattern is the longest match at a position:
+        its own plus those of every pattern that is a whole-word prefix of it.
+        """
+        closure = {}
+        for pattern, own in targets.items():
+            credited = set(own)
+            for end in range(1, len(pattern)):
+                prefix = pattern[:end]
+                if prefix in targets and _is_word(pattern[end - 1]) != _is_word(pattern[end]):
+                    credited |= targets[prefix]
+            closure[pattern] = tuple(credited)
+        return closure
+
+    def match(self, text: str) -> Dict[str, Set[str]]:
+        """
+        Terms found in a text.
+
+        Args:
+            text: Lowercased, whitespace-normalized text
+
+        Returns:
+            {kind: set of matched terms} for every kind
+        """
+        found = {kind: set() for kind in self.kinds}
+        if self._regex is None or not text:
+            return found
+        seen = set()
+        for m in self._regex.finditer(text):
+            pattern = m.group(1)
+            if pattern in seen:
+                continue
+            seen.add(pattern)
+            for kind, term in self._closure[pattern]:
+                found[kind].add(term)
+        return found
+
+    def first_match(self, text: str) -> Optional[Target]:
+        """
+        First (kind, term) found in a text, stopping at the first hit.
+
+        Args:
+            text: Lowercased, whitespace-normalized text
+
+        Returns:
+            (kind, term) or None if nothing matches
+        """
+        if self._regex is None or not text:
+            return None
+        m = self._regex.search(text)
+        if m is None:
+            return None
+        return min(self._closure[m.group(1)])
+
+
+def alias_patterns(kind: str, terms: Iterable[str], synonyms: Dict[str, List[str]]) -> Set[str]:
+    """Aliases that credit any of the given terms."""
+    aliases = set()
+    for term in terms:
+        for pattern in term_patterns(kind, term):
+            aliases.update(synonyms.get(pattern, ()))
+    return aliases
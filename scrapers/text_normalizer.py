@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+"""
+Job Text Normalization
+
+Turns raw job board text (RemoteOK descriptions are HTML, often with UTF-8
+mojibake such as "weâ€™re") into plain text once, before scoring and
+storage:
+
+    - strip tags with a streaming HTMLParser (script/style content dropped,
+      block elements become line breaks) and unescape entities; text is
+      parsed only if it has a known HTML tag or a valid entity, so
+      "x<y and y>z" stays as it is
+    - repair UTF-8 text that was decoded as Latin-1 / cp1252 ("â€™" -> "’"),
+      only for the usual signatures, so "CAFÉ—Bar" stays as it is
+    - collapse runs of spaces and blank lines
+
+TextNormalizer caches results by content hash in memory and, given a
+connection, in the normalized_texts table, so a posting seen again on a
+later scrape is not parsed twice.
+
+Usage:
+    python3 scrapers/text_normalizer.py backfill [--db data/jobs-tracker.db] [--batch-size 500]
+
+Author: Karthik Shetty
+Created: 2025-11-23
+"""
+
+import argparse
+import hashlib
+import logging
+import re
+import sqlite3
+from collections import OrderedDict
+from html.entities import html5
+from html.parser import HTMLParser
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_SIZE = 4096
+
+# Tags whose boundaries separate text
+BLOCK_TAGS = {
+    'p', 'div', 'br', 'li', 'ul', 'ol', 'tr', 'td', 'th', 'table', 'section',
+    'article', 'header', 'footer', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+    'blockquote', 'pre', 'hr'
+}
+# Tags whose content is never text
+SKIP_TAGS = {'script', 'style', 'head', 'title', 'noscript'}
+# Every tag the parser removes; any other "<name ...>" is text ("x<y and y>z")
+HTML_TAGS = BLOCK_TAGS | SKIP_TAGS | {
+    'a', 'abbr', 'b', 'body', 'caption', 'code', 'dd', 'dl', 'dt', 'em', 'figcaption',
+    'figure', 'font', 'html', 'i', 'iframe', 'img', 'link', 'main', 'meta', 'nav',
+    's', 'small', 'span', 'strike', 'strong', 'sub', 'sup', 'tbody', 'tfoot', 'thead', 'u'
+}
+
+# A known start / end tag, a comment or doctype, or an entity (group 2,
+# checked against the HTML5 names); a bare "<" or "&" is not markup
+HTML_HINT_RE = re.compile(
+    r'</?(' + '|'.join(sorted(HTML_TAGS, key=len, reverse=True)) + r')(?=[\s/>])'
+    r'|<!(?:--|doctype)'
+    r'|&(#[0-9]+|#[xX][0-9a-fA-F]+|[a-zA-Z][a-zA-Z0-9]*);',
+    re.IGNORECASE
+)
+
+
+# char -> original byte, for both wrong decodings of bytes 0x80-0xFF; and the
+# cp1252 decoding (Latin-1 for the five bytes cp1252 leaves undefined)
+_CHAR_TO_BYTE = {}
+_CP1252_CHARS = {}
+for _b in range(0x80, 0x100):
+    _CHAR_TO_BYTE[chr(_b)] = _b
+    try:
+        _CP1252_CHARS[_b] = bytes([_b]).decode('cp1252')
+    except UnicodeDecodeError:
+        _CP1252_CHARS[_b] = chr(_b)
+    _CHAR_TO_BYTE[_CP1252_CHARS[_b]] = _b
+
+
+def _byte_chars(low: int, high: int) -> str:
+    """Characters that stand for a byte in [low, high] after a wrong decoding."""
+    return ''.join(sorted(c for c, b in _CHAR_TO_BYTE.items() if low <= b <= high))
+
+
+# The usual signatures only: "Ã" / "Â" (lead bytes C3 / C2: accented letters,
+# NBSP, symbols) and "â€" / "â„" (E2 80 / E2 84: quotes, dashes, ™) followed
+# by a continuation byte; other accented text ("É—") is left alone
+MOJIBAKE_RE = re.compile(
+    '(?:[ÃÂ]|â[€\x80„\x84])[' + re.escape(_byte_chars(0x80, 0xBF)) + ']'
+)
+
+
+def _redecode(match: re.Match) -> str:
+    chunk = match.group(0)
+    try:
+        repaired = bytes(_CHAR_TO_BYTE[c] for c in chunk).decode('utf-8')
+    except UnicodeDecodeError:
+        return chunk
+    # Kept only if one wrong decoding of the repair gives the run back
+    raw = repaired.encode('utf-8')
+    if chunk in (raw.decode('latin-1'), ''.join(_CP1252_CHARS[b] for b in raw)):
+        return repaired
+    return chunk
+
+
+def repair_mojibake(text: str) -> str:
+    """
+    Re-decode UTF-8 sequences that were decoded as Latin-1 or cp1252.
+
+    Only the usual mojibake signatures are replaced, and only when the
+    repair round-trips, so correct accented text is left alone.
+    """
+    if not text or text.isascii():
+        return text
+    return MOJIBAKE_RE.sub(_redecode, text)
+
+
+class _TextExtractor(HTMLParser):
+    """Collects text content; convert_charrefs unescapes entities."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts: List[str] = []
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag not in HTML_TAGS:
+            self.handle_data(self.get_starttag_text())
+        elif tag in SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag in BLOCK_TAGS:
+            self.parts.append('\n')
+
+    def handle_startendtag(self, tag, attrs):
+        if tag not in HTML_TAGS:
+            self.handle_data(self.get_starttag_text())
+        elif tag in BLOCK_TAGS:
+            self.parts.append('\n')
+
+    def handle_endtag(self, tag):
+        if tag not in HTML_TAGS:
+            self.handle_data(f'</{tag}>')
+        elif tag in SKIP_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag in BLOCK_TAGS:
+            self.parts.append('\n')
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self.parts.append(data)
+
+
+def has_markup(text: str) -> bool:
+    """Whether text has a known HTML tag, a comment or a valid entity."""
+    for match in HTML_HINT_RE.finditer(text):
+        entity = match.group(2)
+        if entity is None or entity.startswith('#') or f'{entity};' in html5:
+            return True
+    return False
+
+
+def strip_html(text: str) -> str:
+    """
+    Remove known tags and unescape entities.
+
+    Text without markup is returned unchanged (no parser run); inside
+    markup, a "<name ...>" that is not an HTML tag is kept as text.
+    """
+    if not text or not has_markup(text):
+        return text or ''
+    parser = _TextExtractor()
+    parser.feed(text)
+    parser.close()
+    return ''.join(parser.parts)
+
+
+_SPACES_RE = re.compile(r'[^\S\n]+')
+_BLANK_LINES_RE = re.compile(r'\s*\n\s*')
+
+
+def collapse_whitespace(text: str) -> str:
+    """Single spaces within lines, single newlines between them."""
+    text = _SPACES_RE.sub(' ', text.replace('\xa0', ' '))
+    return _BLANK_LINES_RE.sub('\n', text).strip()
+
+
+def normalize_text(raw: Optional[str]) -> str:
+    """
+    Plain text of a raw job board field.
+
+    Args:
+        raw: Field as received (HTML, entities, mojibake)
+
+    Returns:
+        Tag-free, repaired, whitespace-collapsed text
+    """
+    if not raw:
+        return ''
+    return collapse_whitespace(repair_mojibake(strip_html(raw)))
+
+
+def content_hash(raw: str) -> str:
+    """Cache key of a raw text."""
+    return hashlib.blake2b(raw.encode('utf-8', 'surrogatepass'), digest_size=16).hexdigest()
+
+
+def create_normalized_texts_table(conn: sqlite3.Connection) -> None:
+    """Create normalized_texts (raw content hash -> normalized text)."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS normalized_texts (
+            content_hash TEXT PRIMARY KEY,
+            normalized TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+class TextNormalizer:
+    """
+    normalize_text() with a two-level cache keyed by content hash.
+
+    The in-memory level is a small LRU; the SQLite level (optional) survives
+    between scraper runs. Writes do not commit, so they join the caller's
+    transaction.
+    """
+
+    def __init__(self, conn: Optional[sqlite3.Connection] = None,
+                 cache_size: int = DEFAULT_CACHE_SIZE):
+        """
+        Args:
+            conn: Connection for the persistent cache, or None for memory only
+            cache_size: Entries kept in memory
+        """
+        self.conn = conn
+        self.cache_size = cache_size
+        self._cache: OrderedDict = OrderedDict()
+        self.stats = {'memory_hits': 0, 'db_hits': 0, 'normalized': 0}
+        if conn is not None:
+            create_normalized_texts_table(conn)
+
+    def normalize(self, raw: Optional[str]) -> str:
+        """
+        Normalized text of a raw field, computed at most once per content.
+
+        Args:
+            raw: Field as received
+
+        Returns:
+            normalize_text(raw)
+        """
+        if not raw:
+            return ''
+        key = content_hash(raw)
+
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            self.stats['memory_hits'] += 1
+            return cached
+
+        text = None
+        if self.conn is not None:
+            row = self.conn.execute(
+                "SELECT normalized FROM normalized_texts WHERE content_hash = ?", (key,)
+            ).fetchone()
+            if row:
+                text = row[0]
+                self.stats['db_hits'] += 1
+
+        if text is None:
+            text = normalize_text(raw)
+            self.stats['normalized'] += 1
+            if self.conn is not None:
+                self.conn.execute(
+                    "INSERT OR IGNORE INTO normalized_texts (content_hash, normalized) VALUES (?, ?)",
+                    (key, text)
+                )
+
+        self._cache[key] = text
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return text
+
+
+def backfill(db_path: str = "data/jobs-tracker.db",
+             config_path: str = "data/resume_config.json",
+             batch_size: int = 500) -> int:
+    """
+    Normalize stored scraped_jobs text and rescore the rows that changed.
+
+    Jobs are read in id order with keyset pagination; each batch's text
+    updates and rescores commit together, so an interrupted run keeps its
+    finished batches and a rerun skips them (their text no longer changes).
+    Changed descriptions are written to the compressed side table
+    (description_store), which needs migration 011.
+
+    Returns:
+        Number of jobs whose text changed
+    """
+    try:
+        from .description_store import DescriptionStore, make_snippet
+        from .feature_store import FeatureStore
+        from .freshness import require_math_functions
+        from .rescoring import job_data_from_row, load_rescore_rows, score_values, write_scores
+        from .score_sketch import ScoreSketchStore
+        from .simple_scorer import SimpleJobScorer
+    except ImportError:
+        from description_store import DescriptionStore, make_snippet
+        from feature_store import FeatureStore
+        from freshness import require_math_functions
+        from rescoring import job_data_from_row, load_rescore_rows, score_values, write_scores
+        from score_sketch import ScoreSketchStore
+        from simple_scorer import SimpleJobScorer
+
+    scorer = SimpleJobScorer(config_path=config_path)
+    conn = sqlite3.connect(db_path, timeout=30.0, isolation_level=None)
+    try:
+        require_math_functions(conn)
+        normalizer = TextNormalizer(conn)
+        descriptions = DescriptionStore(conn)
+        store = FeatureStore(conn)
+        changed_text = 0
+        changed_scores = 0
+        last_id = 0
+        while True:
+            rows = conn.execute(
+                "SELECT id, job_title, company FROM scraped_jobs WHERE id > ? ORDER BY id LIMIT ?",
+                (last_id, batch_size)
+            ).fetchall()
+            if not rows:
+                break
+            full_text = descriptions.load_many(row[0] for row in rows)
+
+            conn.execute("BEGIN")
+            try:
+                changed = []
+                for job_id, title, company in rows:
+                    new_title = normalizer.normalize(title) or title
+                    new_company = normalizer.normalize(company) or company
+                    description = full_text.get(job_id, '')
+                    new_description = normalizer.normalize(description)
+                    if (new_title, new_company, new_description) == (title, company, description):
+                        continue
+                    descriptions.save(job_id, new_description)
+                    conn.execute("""
+                        UPDATE scraped_jobs
+                        SET job_title = ?, company = ?, description = NULL, description_snippet = ?
+                        WHERE id = ?
+                    """, (new_title, new_company, make_snippet(new_description), job_id))
+                    changed.append(job_id)
+
+                # Scores and the token index were computed from the raw text
+                if changed:
+                    placeholders = ', '.join('?' for _ in changed)
+                    for row in load_rescore_rows(conn, descriptions, f"id IN ({placeholders})", changed):
+                        result = scorer.score_job(job_data_from_row(row))
+                        if write_scores(conn, store, row, score_values(result), result['features']):
+                            changed_scores += 1
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                store.clear_cache()
+                raise
+            changed_text += len(changed)
+            last_id = rows[-1][0]
+
+        if changed_scores:
+            # Score distributions cannot drop the old scores; recount them
+            conn.execute("BEGIN")
+            ScoreSketchStore(conn).rebuild()
+            conn.execute("COMMIT")
+        return changed_text
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Normalize stored job text (HTML, mojibake, whitespace)")
+    parser.add_argument('command', choices=['backfill'],
+                        help="backfill: normalize scraped_jobs text in place and rescore changed jobs")
+    parser.add_argument('--db', default="data/jobs-tracker.db", help="SQLite database path")
+    parser.add_argument('--config', default="data/resume_config.json", help="Resume config path")
+    parser.add_argument('--batch-size', type=int, default=500, help="jobs per transaction")
+    args = parser.parse_args()
+
+    logging.getLogger('simple_scorer').setLevel(logging.WARNING)
+
+    count = backfill(args.db, args.config, args.batch_size)
+    print(f"✅ Normalized text of {count} jobs (rescored)")
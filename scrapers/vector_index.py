@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+"""
+Similar-Job Vector Index
+
+Finds the postings most similar to a given one without comparing it to
+every stored description:
+
+    - a job's text (title, tags, description) becomes an L2-normalized
+      TF-IDF vector (same tokens and weighting as semantic_score.py)
+    - the sparse vector is feature-hashed (signed) into DIMENSIONS dense
+      values and quantized to int8
+    - a random projection (one fixed +/-1 vector per token, derived from
+      its hash) gives SIGN_BITS sign bits: a SimHash whose Hamming distance
+      tracks the angle between two jobs
+
+Records are appended to a flat file (data/job_vectors.idx) that readers
+memory-map, so ingest adds jobs without rewriting anything and the API only
+maps the new tail. A query ranks all jobs by Hamming distance over the
+32-byte sign bits, then reranks the closest candidates by int8 cosine.
+A job re-added later (changed text) supersedes its earlier record.
+
+Job-to-job TF-IDF cosines are small (median ~0.06, related roles 0.25+),
+so the reranking vectors need many dimensions: with 1024, the hashed
+cosines rank every related pair of the sample corpus in its top results,
+where a 256-value projection missed over half. The SimHash only narrows
+the candidates and is kept generous.
+
+File layout (little-endian):
+    header  magic 'JVX1', version u16, dimensions u16, sign bits u16,
+            6 reserved bytes
+    record  job_id i64, sign bits (SIGN_BITS / 8 bytes), norm f32,
+            quantized vector (DIMENSIONS x i8)
+
+Usage:
+    python3 scrapers/vector_index.py build [--db data/jobs-tracker.db]
+
+Author: Karthik Shetty
+Created: 2025-11-25
+"""
+
+import argparse
+import heapq
+import logging
+import math
+import mmap
+import os
+import sqlite3
+import struct
+import threading
+from collections import Counter
+from pathlib import Path
+from functools import lru_cache
+from hashlib import blake2b
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pure-Python scan fallback
+    np = None
+
+try:
+    from .semantic_score import IdfSnapshot, tokenize
+except ImportError:
+    from semantic_score import IdfSnapshot, tokenize
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INDEX_PATH = "data/job_vectors.idx"
+
+DIMENSIONS = 1024
+SIGN_BITS = 256
+FORMAT_VERSION = 1
+MAGIC = b'JVX1'
+
+HEADER = struct.Struct('<4sHHH6x')
+RECORD = struct.Struct(f'<q{SIGN_BITS // 8}sf{DIMENSIONS}b')
+_PREFIX = struct.Struct(f'<q{SIGN_BITS // 8}sf')
+_VECTOR = struct.Struct(f'<{DIMENSIONS}b')
+
+# Hamming candidates reranked by cosine, per requested result (at least MIN_CANDIDATES)
+CANDIDATES_PER_RESULT = 100
+MIN_CANDIDATES = 1000
+
+if np is not None:
+    RECORD_DTYPE = np.dtype([('job_id', '<i8'), ('bits', 'u1', SIGN_BITS // 8),
+                             ('norm', '<f4'), ('vector', 'i1', DIMENSIONS)])
+    _POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+# (sign bits, quantized vector, norm of the quantized vector)
+Sketch = Tuple[int, Tuple[int, ...], float]
+
+
+def index_path_for(db_path: str) -> str:
+    """Index file kept next to a database (data/jobs-tracker.db -> data/job_vectors.idx)."""
+    return str(Path(db_path).with_name(Path(DEFAULT_INDEX_PATH).name))
+
+
+def job_vector_text(title: Optional[str], tags: Optional[str], description: Optional[str]) -> str:
+    """Text a posting is compared on."""
+    return f"{title or ''}\n{tags or ''}\n{description or ''}"
+
+
+@lru_cache(maxsize=65536)
+def _token_hash(token: str) -> Tuple[int, float, Tuple[float, ...]]:
+    """
+    Fixed random values of a token (stable across runs): its hashed
+    dimension, that dimension's sign, and its +/-1 projection vector.
+    """
+    digest = blake2b(token.encode('utf-8'), digest_size=8 + SIGN_BITS // 8).digest()
+    bucket = int.from_bytes(digest[:8], 'little')
+    bits = int.from_bytes(digest[8:], 'little')
+    return (bucket % DIMENSIONS, 1.0 if bucket >> 63 else -1.0,
+            tuple(1.0 if bits >> i & 1 else -1.0 for i in range(SIGN_BITS)))
+
+
+def sketch(weights: Dict[str, float]) -> Optional[Sketch]:
+    """
+    Sign bits and int8 hashed vector of sparse token weights.
+
+    Returns:
+        Sketch, or None for a text without tokens
+    """
+    vector = [0.0] * DIMENSIONS
+    projection = [0.0] * SIGN_BITS
+    for token, weight in weights.items():
+        dimension, sign, signs = _token_hash(token)
+        vector[dimension] += sign * weight
+        projection = [value + weight * s for value, s in zip(projection, signs)]
+
+    peak = max(abs(value) for value in vector) if weights else 0.0
+    if not peak:
+        return None
+    bits = sum(1 << i for i, value in enumerate(projection) if value > 0)
+    quantized = tuple(int(round(value / peak * 127)) for value in vector)
+    return bits, quantized, math.sqrt(sum(q * q for q in quantized))
+
+
+def pack_record(job_id: int, job_sketch: Sketch) -> bytes:
+    """Index file record of a job."""
+    bits, quantized, norm = job_sketch
+    return RECORD.pack(job_id, bits.to_bytes(SIGN_BITS // 8, 'little'), norm, *quantized)
+
+
+class JobVectorizer(IdfSnapshot):
+    """Sketches of job texts, with IDF from the token index (loaded by refresh())."""
+
+    def sketch(self, title: Optional[str], tags: Optional[str],
+               description: Optional[str]) -> Optional[Sketch]:
+        """Sketch of one posting (None if it has no tokens)."""
+        counts = Counter(tokenize(job_vector_text(title, tags, description)))
+        return sketch(self.tfidf(counts))
+
+
+class VectorIndex:
+    """
+    Append-only, memory-mapped sketch file.
+
+    Safe to share between threads; another process may append while this
+    one reads (readers only see whole records).
+    """
+
+    def __init__(self, path: str = DEFAULT_INDEX_PATH):
+        """
+        Args:
+            path: Index file path (created on the first append)
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._file_id = None   # (inode, size) of the mapped file
+        self._mmap = None
+        self._count = 0
+        # pure Python: job_id -> (record offset, sign bits)
+        self._entries: Dict[int, Tuple[int, int]] = {}
+        # NumPy: record array and the positions of each job's latest record
+        self._records = None
+        self._live = None
+
+    def append(self, records: Iterable[Tuple[int, Sketch]]) -> int:
+        """
+        Add or replace jobs.
+
+        Args:
+            records: (job_id, sketch) pairs
+
+        Returns:
+            Number of records written
+        """
+        data = b''.join(pack_record(job_id, job_sketch) for job_id, job_sketch in records if job_sketch)
+        if not data:
+            return 0
+        with open(self.path, 'ab') as f:
+            if f.tell() == 0:
+                f.write(HEADER.pack(MAGIC, FORMAT_VERSION, DIMENSIONS, SIGN_BITS))
+            f.write(data)
+        return len(data) // RECORD.size
+
+    @classmethod
+    def write(cls, path: str, records: Iterable[Tuple[int, Sketch]]) -> int:
+        """
+        Replace the index file with the given records.
+
+        Written to a temporary file first; readers notice the new file and
+        remap it.
+
+        Returns:
+            Number of records written
+        """
+        temp_path = f"{path}.tmp"
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        count = cls(temp_path).append(records)
+        if not count:
+            with open(temp_path, 'wb') as f:
+                f.write(HEADER.pack(MAGIC, FORMAT_VERSION, DIMENSIONS, SIGN_BITS))
+        os.replace(temp_path, path)
+        return count
+
+    def _refresh(self) -> None:
+        """Map the file again if it was appended to or replaced (call under the lock)."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            self._file_id, self._mmap, self._count = None, None, 0
+            self._entries, self._records, self._live = {}, None, None
+            return
+        file_id = (stat.st_ino, stat.st_size)
+        if file_id == self._file_id:
+            return
+        count = max(0, (stat.st_size - HEADER.size) // RECORD.size)
+        appended = self._file_id is not None and self._file_id[0] == stat.st_ino
+
+        with open(self.path, 'rb') as f:
+            mapped = (mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                      if stat.st_size >= HEADER.size else None)
+        if mapped is not None:
+            if HEADER.unpack_from(mapped, 0) != (MAGIC, FORMAT_VERSION, DIMENSIONS, SIGN_BITS):
+                raise ValueError(f"{self.path} is not a version {FORMAT_VERSION} job vector index "
+                                 f"with {DIMENSIONS} dimensions and {SIGN_BITS} sign bits; rebuild it")
+
+        if np is not None:
+            records = np.frombuffer(mapped, dtype=RECORD_DTYPE, count=count,
+                                    offset=HEADER.size) if count else None
+            live = None
+            if count:
+                # Last record of each job wins
+                _, last_reversed = np.unique(records['job_id'][::-1], return_index=True)
+                live = np.sort(count - 1 - last_reversed)
+            self._records, self._live = records, live
+        else:
+            start = self._count if appended else 0
+            if not appended:
+                self._entries = {}
+            for position in range(start, count):
+                offset = HEADER.size + position * RECORD.size
+                job_id, bits, _ = _PREFIX.unpack_from(mapped, offset)
+                self._entries[job_id] = (offset, int.from_bytes(bits, 'little'))
+
+        self._mmap, self._count, self._file_id = mapped, count, file_id
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh()
+            if np is not None:
+                return 0 if self._live is None else len(self._live)
+            return len(self._entries)
+
+    def get(self, job_id: int) -> Optional[Sketch]:
+        """Stored sketch of a job, or None if it is not indexed."""
+        with self._lock:
+            self._refresh()
+            if np is not None:
+                if self._live is None:
+                    return None
+                matches = self._live[self._records['job_id'][self._live] == job_id]
+                if not len(matches):
+                    return None
+                record = self._records[matches[0]]
+                return (int.from_bytes(record['bits'].tobytes(), 'little'),
+                        tuple(int(v) for v in record['vector']), float(record['norm']))
+            entry = self._entries.get(job_id)
+            if entry is None:
+                return None
+            _, _, norm, *quantized = RECORD.unpack_from(self._mmap, entry[0])
+            return entry[1], tuple(quantized), norm
+
+    def search(self, query: Sketch, limit: int = 10,
+               exclude: Optional[Set[int]] = None) -> List[Tuple[int, float]]:
+        """
+        Most similar indexed jobs.
+
+        Args:
+            query: Sketch of the job to compare with
+            limit: Number of results
+            exclude: Job ids to leave out (e.g. the query job)
+
+        Returns:
+            (job_id, cosine similarity) pairs, most similar first
+        """
+        exclude = exclude or set()
+        bits, quantized, norm = query
+        if not norm:
+            return []
+        candidates = max(MIN_CANDIDATES, limit * CANDIDATES_PER_RESULT)
+
+        with self._lock:
+            self._refresh()
+            if np is not None:
+                if self._live is None:
+                    return []
+                records = self._records[self._live]
+                if exclude:
+                    records = records[~np.isin(records['job_id'], list(exclude))]
+                if not len(records):
+                    return []
+                query_bits = np.frombuffer(bits.to_bytes(SIGN_BITS // 8, 'little'), dtype=np.uint8)
+                distances = _POPCOUNT[records['bits'] ^ query_bits].sum(axis=1, dtype=np.int32)
+                if len(records) > candidates:
+                    records = records[np.argpartition(distances, candidates)[:candidates]]
+                dots = records['vector'].astype(np.int32) @ np.asarray(quantized, dtype=np.int32)
+                norms = records['norm'].astype(np.float64) * norm
+                similarities = np.divide(dots, norms, out=np.zeros(len(records)), where=norms > 0)
+                order = np.argsort(-similarities, kind='stable')[:limit]
+                return [(int(records['job_id'][i]), float(similarities[i])) for i in order]
+
+            nearest = heapq.nsmallest(candidates, (
+                ((entry_bits ^ bits).bit_count(), job_id, offset)
+                for job_id, (offset, entry_bits) in self._entries.items()
+                if job_id not in exclude
+            ))
+            scored = []
+            for _, job_id, offset in nearest:
+                record_norm = _PREFIX.unpack_from(self._mmap, offset)[2]
+                if not record_norm:
+                    continue
+                vector = _VECTOR.unpack_from(self._mmap, offset + _PREFIX.size)
+                dot = sum(a * b for a, b in zip(vector, quantized))
+                scored.append((job_id, dot / (record_norm * norm)))
+            scored.sort(key=lambda item: -item[1])
+            return scored[:limit]
+
+
+def build(db_path: str = "data/jobs-tracker.db", index_path: Optional[str] = None,
+          batch_size: int = 500) -> int:
+    """
+    Rebuild the index from every canonical job (e.g. after a backfill).
+
+    Args:
+        db_path: SQLite database path
+        index_path: Index file (default: next to the database)
+
+    Returns:
+        Number of jobs indexed
+    """
+    try:
+        from .description_store import DescriptionStore
+    except ImportError:
+        from description_store import DescriptionStore
+
+    vectorizer = JobVectorizer()
+    conn = sqlite3.connect(db_path, timeout=30.0)
+    try:
+        vectorizer.refresh(conn)
+        descriptions = DescriptionStore(conn)
+
+        def records():
+            last_id = 0
+            while True:
+                rows = conn.execute("""
+                    SELECT id, job_title, tags FROM scraped_jobs
+                    WHERE canonical_job_id IS NULL AND id > ?
+                    ORDER BY id
+                    LIMIT ?
+                """, (last_id, batch_size)).fetchall()
+                if not rows:
+                    return
+                full_text = descriptions.load_many(row[0] for row in rows)
+                for job_id, title, tags in rows:
+                    yield job_id, vectorizer.sketch(title, tags, full_text.get(job_id))
+                last_id = rows[-1][0]
+
+        return VectorIndex.write(index_path or index_path_for(db_path), records())
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Similar-job vector index")
+    parser.add_argument('command', choices=['build'],
+                        help="build: rewrite the index from every stored canonical job")
+    parser.add_argument('--db', default="data/jobs-tracker.db", help="SQLite database path")
+    parser.add_argument('--index', help="index file path (default: job_vectors.idx next to the database)")
+    args = parser.parse_args()
+
+    index_path = args.index or index_path_for(args.db)
+    count = build(args.db, index_path)
+    print(f"✅ Indexed {count} jobs in {index_path}")
@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+"""
+What-If Reweighting
+
+Applies candidate scoring weights and term weights to every job in the
+feature store (feature_store.py) in one vectorized pass, and reports the new
+score distribution and ranking changes against the current config.
+
+No description is rescanned: a term only counts for the jobs it matched at
+score time, so terms that were never matched are reported as unknown.
+
+NumPy is used when installed; otherwise an equivalent pure-Python loop runs.
+
+Usage:
+    python3 scrapers/what_if.py --weight skills_match=0.5 --weight domain_match=0.1
+    python3 scrapers/what_if.py --term skill:Snowflake=12 --term red_flag:Vendor=0 --json
+
+Author: Karthik Shetty
+Created: 2025-11-21
+"""
+
+import argparse
+import json
+import logging
+import sqlite3
+import threading
+from typing import Dict, List, Optional
+
+try:
+    import numpy as np
+except ImportError:  # pure-Python fallback
+    np = None
+
+try:
+    from .feature_store import FeatureStore, TERM_KINDS, unpack_term_ids
+    from .simple_scorer import (SimpleJobScorer, SKILLS_MAX_SCORE, DOMAIN_MAX_SCORE,
+                                RED_FLAG_CAP, classify_score)
+except ImportError:
+    from feature_store import FeatureStore, TERM_KINDS, unpack_term_ids
+    from simple_scorer import (SimpleJobScorer, SKILLS_MAX_SCORE, DOMAIN_MAX_SCORE,
+                               RED_FLAG_CAP, classify_score)
+
+logger = logging.getLogger(__name__)
+
+WEIGHT_KEYS = ('skills_match', 'experience_match', 'domain_match', 'location_match', 'red_flags',
+               'semantic_match')
+CLASSIFICATIONS = ('EXCELLENT', 'HIGH_FIT', 'MEDIUM_FIT', 'LOW_FIT', 'NO_FIT')
+
+
+class WhatIfEngine:
+    """
+    Keeps the feature corpus in memory and re-scores it under candidate weights.
+
+    The corpus is reloaded only when the feature store version changes, so
+    repeated requests cost one small query plus the vectorized pass.
+    """
+
+    def __init__(self, config_path: str = "data/resume_config.json"):
+        """
+        Args:
+            config_path: Resume config providing the baseline weights
+        """
+        self.config_path = config_path
+        self.scorer = SimpleJobScorer(config_path=config_path)
+        self._lock = threading.Lock()
+        self._version = None
+        self._corpus = None
+
+    def _baseline_term_weights(self) -> Dict[str, Dict[str, float]]:
+        return {
+            'skill': dict(self.scorer.all_skills),
+            'domain': dict(self.scorer.domains),
+            'red_flag': dict(self.scorer.red_flags),
+        }
+
+    def _load(self, conn: sqlite3.Connection) -> Dict:
+        """Load (or reuse) the in-memory corpus for the current feature version."""
+        store = FeatureStore(conn)
+        version = store.version()
+        with self._lock:
+            if self._corpus is not None and version == self._version:
+                return self._corpus
+
+            terms = store.terms()
+            term_index = {(kind, term): term_id for term_id, kind, term in terms}
+            n_terms = max((t[0] for t in terms), default=0) + 1
+            term_kind = [None] * n_terms
+            for term_id, kind, _ in terms:
+                term_kind[term_id] = kind
+
+            job_ids, stored, location, experience, title, skipped, semantic = [], [], [], [], [], [], []
+            hits = {kind: ([], []) for kind in TERM_KINDS}  # kind -> (rows, term ids)
+            for row, (job_id, match_score, blob, loc, exp, title_adj, short, sem) in enumerate(
+                    store.iter_features()):
+                job_ids.append(job_id)
+                stored.append(match_score)
+                location.append(loc)
+                experience.append(exp)
+                title.append(title_adj)
+                skipped.append(bool(short))
+                semantic.append(sem or 0.0)
+                for term_id in unpack_term_ids(blob):
+                    rows, ids = hits[term_kind[term_id]]
+                    rows.append(row)
+                    ids.append(term_id)
+
+            corpus = {
+                'job_ids': job_ids,
+                'stored_scores': stored,
+                'location': location,
+                'experience': experience,
+                'title': title,
+                'short_circuit': skipped,
+                'semantic': semantic,
+                'hits': hits,
+                'term_index': term_index,
+                'n_terms': n_terms,
+            }
+            if np is not None:
+                corpus['location'] = np.asarray(location, dtype=np.float64)
+                corpus['experience'] = np.asarray(experience, dtype=np.float64)
+                corpus['title'] = np.asarray(title, dtype=np.float64)
+                corpus['short_circuit'] = np.asarray(skipped, dtype=bool)
+                corpus['semantic'] = np.asarray(semantic, dtype=np.float64)
+                corpus['hits'] = {
+                    kind: (np.asarray(rows, dtype=np.int64), np.asarray(ids, dtype=np.int64))
+                    for kind, (rows, ids) in hits.items()
+                }
+
+            self._corpus = corpus
+            self._version = version
+            logger.info(f"Loaded what-if corpus: {len(job_ids)} jobs, {len(terms)} terms")
+            return corpus
+
+    def _term_vector(self, corpus: Dict, term_weights: Dict[str, Dict[str, float]]):
+        """Dense term_id -> weight vector for the given per-kind weights."""
+        vector = [0.0] * corpus['n_terms']
+        for kind, weights in term_weights.items():
+            for term, weight in weights.items():
+                term_id = corpus['term_index'].get((kind, term))
+                if term_id is not None:
+                    vector[term_id] = float(weight)
+        return np.asarray(vector, dtype=np.float64) if np is not None else vector
+
+    def _score(self, corpus: Dict, weights: Dict[str, float], term_vector) -> List[float]:
+        """
+        Re-run SimpleJobScorer's weighted sum for every job.
+
+        Title adjustments are added as stored; jobs short-circuited on an
+        avoided title stay at 0.
+        """
+        n_jobs = len(corpus['job_ids'])
+
+        if np is not None:
+            sums = {}
+            for kind, (rows, ids) in corpus['hits'].items():
+                sums[kind] = np.bincount(rows, weights=term_vector[ids], minlength=n_jobs)
+            skills = np.minimum(100, sums['skill'] / SKILLS_MAX_SCORE * 100)
+            domains = np.minimum(100, sums['domain'] / DOMAIN_MAX_SCORE * 100)
+            penalty = np.maximum(sums['red_flag'], RED_FLAG_CAP)
+            scores = (skills * weights['skills_match']
+                      + corpus['experience'] * weights['experience_match']
+                      + domains * weights['domain_match']
+                      + corpus['location'] * weights['location_match']
+                      + penalty * weights['red_flags']
+                      + corpus['semantic'] * weights['semantic_match']
+                      + corpus['title'])
+            return np.where(corpus['short_circuit'], 0.0, np.clip(scores, 0, 100))
+
+        sums = {kind: [0.0] * n_jobs for kind in TERM_KINDS}
+        for kind, (rows, ids) in corpus['hits'].items():
+            totals = sums[kind]
+            for row, term_id in zip(rows, ids):
+                totals[row] += term_vector[term_id]
+        scores = []
+        for i in range(n_jobs):
+            if corpus['short_circuit'][i]:
+                scores.append(0.0)
+                continue
+            score = (min(100, sums['skill'][i] / SKILLS_MAX_SCORE * 100) * weights['skills_match']
+                     + corpus['experience'][i] * weights['experience_match']
+                     + min(100, sums['domain'][i] / DOMAIN_MAX_SCORE * 100) * weights['domain_match']
+                     + corpus['location'][i] * weights['location_match']
+                     + max(sums['red_flag'][i], RED_FLAG_CAP) * weights['red_flags']
+                     + corpus['semantic'][i] * weights['semantic_match']
+                     + corpus['title'][i])
+            scores.append(max(0, min(100, score)))
+        return scores
+
+    def evaluate(self, conn: sqlite3.Connection,
+                 scoring_weights: Optional[Dict[str, float]] = None,
+                 term_weights: Optional[Dict[str, Dict[str, float]]] = None,
+                 top_n: int = 20) -> Dict:
+        """
+        Score the corpus under candidate weights and compare with the current config.
+
+        Args:
+            conn: Open connection to the jobs tracker database
+            scoring_weights: Overrides for scoring_weights (skills_match, ...)
+            term_weights: Overrides per kind, e.g. {'skill': {'SQL': 12}}
+            top_n: Size of the ranking comparison
+
+        Returns:
+            Dictionary with distributions, summary stats and ranking changes
+
+        Raises:
+            ValueError: If a weight key or term kind is unknown
+        """
+        scoring_weights = scoring_weights or {}
+        term_weights = term_weights or {}
+        for key in scoring_weights:
+            if key not in WEIGHT_KEYS:
+                raise ValueError(f"Unknown scoring weight '{key}' (expected one of {', '.join(WEIGHT_KEYS)})")
+        for kind in term_weights:
+            if kind not in TERM_KINDS:
+                raise ValueError(f"Unknown term kind '{kind}' (expected one of {', '.join(TERM_KINDS)})")
+
+        corpus = self._load(conn)
+
+        base_weights = {key: float(self.scorer.weights.get(key, 0)) for key in WEIGHT_KEYS}
+        new_weights = dict(base_weights)
+        new_weights.update({key: float(value) for key, value in scoring_weights.items()})
+
+        base_terms = self._baseline_term_weights()
+        new_terms = {kind: dict(weights) for kind, weights in base_terms.items()}
+        unknown_terms = []
+        for kind, overrides in term_weights.items():
+            for term, weight in overrides.items():
+                new_terms[kind][term] = weight
+                if (kind, term) not in corpus['term_index']:
+                    unknown_terms.append(f"{kind}:{term}")
+
+        before = self._score(corpus, base_weights, self._term_vector(corpus, base_terms))
+        after = self._score(corpus, new_weights, self._term_vector(corpus, new_terms))
+
+        result = {
+            'job_count': len(corpus['job_ids']),
+            'weights': new_weights,
+            'unknown_terms': unknown_terms,
+            'before': _summarize(before),
+            'after': _summarize(after),
+        }
+        result.update(self._ranking_changes(conn, corpus, before, after, top_n))
+        return result
+
+    def _ranking_changes(self, conn: sqlite3.Connection, corpus: Dict,
+                         before, after, top_n: int) -> Dict:
+        job_ids = corpus['job_ids']
+        old_rank = _ranks(before)
+        new_rank = _ranks(after)
+        before_classes = [classify_score(s) for s in before]
+        after_classes = [classify_score(s) for s in after]
+
+        new_order = sorted(range(len(job_ids)), key=lambda i: new_rank[i])[:top_n]
+        titles = {}
+        top_ids = [job_ids[i] for i in new_order]
+        if top_ids:
+            placeholders = ', '.join('?' for _ in top_ids)
+            titles = {row[0]: (row[1], row[2]) for row in conn.execute(
+                f"SELECT id, job_title, company FROM scraped_jobs WHERE id IN ({placeholders})",
+                top_ids
+            )}
+
+        top = []
+        for i in new_order:
+            title, company = titles.get(job_ids[i], (None, None))
+            top.append({
+                'job_id': job_ids[i],
+                'job_title': title,
+                'company': company,
+                'old_score': round(float(before[i]), 2),
+                'new_score': round(float(after[i]), 2),
+                'old_rank': int(old_rank[i]) + 1,
+                'new_rank': int(new_rank[i]) + 1,
+            })
+
+        old_top = {i for i in range(len(job_ids)) if old_rank[i] < top_n}
+        new_top = set(new_order)
+        return {
+            'top': top,
+            'entered_top': sorted(job_ids[i] for i in new_top - old_top),
+            'left_top': sorted(job_ids[i] for i in old_top - new_top),
+            'reclassified': sum(1 for a, b in zip(before_classes, after_classes) if a != b),
+        }
+
+
+def _ranks(scores) -> List[int]:
+    """0-based rank of each job, highest score first (ties by corpus order)."""
+    if np is not None:
+        order = np.argsort(-np.asarray(scores), kind='stable')
+        ranks = np.empty(len(order), dtype=np.int64)
+        ranks[order] = np.arange(len(order))
+        return ranks.tolist()
+    order = sorted(range(len(scores)), key=lambda i: -scores[i])
+    ranks = [0] * len(scores)
+    for rank, i in enumerate(order):
+        ranks[i] = rank
+    return ranks
+
+
+def _summarize(scores) -> Dict:
+    """Classification counts and mean / median of a score vector."""
+    values = sorted(float(s) for s in scores)
+    distribution = {name: 0 for name in CLASSIFICATIONS}
+    for value in values:
+        distribution[classify_score(value)] += 1
+    n = len(values)
+    median = None
+    if n:
+        median = values[n // 2] if n % 2 else (values[n // 2 - 1] + values[n // 2]) / 2
+    return {
+        'distribution': distribution,
+        'avg_score': round(sum(values) / n, 2) if n else None,
+        'median_score': round(median, 2) if median is not None else None,
+    }
+
+
+def _parse_assignment(text: str):
+    name, sep, value = text.rpartition('=')
+    if not sep or not name:
+        raise argparse.ArgumentTypeError(f"expected NAME=VALUE, got '{text}'")
+    try:
+        return name, float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"'{value}' is not a number")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-score the feature store under candidate weights")
+    parser.add_argument('--db', default="data/jobs-tracker.db", help="SQLite database path")
+    parser.add_argument('--config', default="data/resume_config.json", help="Resume config path")
+    parser.add_argument('--weight', action='append', type=_parse_assignment, default=[],
+                        help="scoring weight override, e.g. skills_match=0.5")
+    parser.add_argument('--term', action='append', type=_parse_assignment, default=[],
+                        help="term weight override, e.g. skill:SQL=12 or red_flag:Vendor=0")
+    parser.add_argument('--top', type=int, default=10, help="ranking comparison size")
+    parser.add_argument('--json', action='store_true', help="print the raw JSON result")
+    args = parser.parse_args()
+
+    logging.getLogger('simple_scorer').setLevel(logging.WARNING)
+
+    term_overrides = {}
+    for name, value in args.term:
+        kind, sep, term = name.partition(':')
+        if not sep:
+            parser.error(f"--term needs KIND:TERM=VALUE, got '{name}'")
+        term_overrides.setdefault(kind, {})[term] = value
+
+    engine = WhatIfEngine(config_path=args.config)
+    conn = sqlite3.connect(args.db, timeout=30.0)
+    try:
+        result = engine.evaluate(conn, dict(args.weight), term_overrides, top_n=args.top)
+    except ValueError as e:
+        parser.error(str(e))
+    finally:
+        conn.close()
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print(f"\n📊 What-if over {result['job_count']} jobs "
+              f"({'NumPy' if np is not None else 'pure Python'})")
+        print(f"   {'':<12}{'before':>8}{'after':>8}")
+        for name in CLASSIFICATIONS:
+            print(f"   {name:<12}{result['before']['distribution'][name]:8d}"
+                  f"{result['after']['distribution'][name]:8d}")
+        print(f"   {'avg score':<12}{result['before']['avg_score'] or 0:8.1f}"
+              f"{result['after']['avg_score'] or 0:8.1f}")
+        print(f"\n   Reclassified: {result['reclassified']} jobs; "
+              f"{len(result['entered_top'])} entered / {len(result['left_top'])} left the top {args.top}")
+        if result['unknown_terms']:
+            print(f"   ⚠️  Never matched (needs a rescan): {', '.join(result['unknown_terms'])}")
+        print(f"\n🏆 New top {args.top}:")
+        for job in result['top']:
+            print(f"   {job['new_rank']:3d} (was {job['old_rank']:3d}) "
+                  f"[{job['old_score']:5.1f} -> {job['new_score']:5.1f}] "
+                  f"{job['company']} - {job['job_title']}")
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+SQL Answer Checker - Grade Practice Queries Automatically
+==========================================================
+Purpose: Decide is_correct for a practice session by running my_query and
+         correct_query against the Hospital / Northwind practice schemas.
+Author: Learning System
+Date: 2025-11-21
+
+Each fixture (data/practice_fixtures/*.sql) is loaded into an in-memory
+SQLite database once per process. Every query runs on its own copy made with
+the backup API, under a progress-handler deadline, so a bad query can neither
+hang the checker nor change what the next query sees.
+
+Result sets are compared by hash. If correct_query has a top-level ORDER BY
+the row order must match; otherwise rows are compared as a multiset.
+
+Usage:
+    python3 sql_checker.py check --database Hospital "SELECT ..." "SELECT ..."
+    python3 sql_checker.py regrade [--db ./data/jobs-tracker.db] [--dry-run]
+"""
+
+import argparse
+import hashlib
+import os
+import sqlite3
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+from sql_lexer import has_top_level_order_by
+
+
+DEFAULT_DB_PATH = './data/jobs-tracker.db'
+DEFAULT_TIME_LIMIT = 2.0  # seconds per query
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'practice_fixtures')
+
+# database_used value -> fixture script
+FIXTURE_FILES = {
+    'Hospital': 'hospital.sql',
+    'Northwind': 'northwind.sql',
+}
+
+# Progress handler granularity (SQLite VM instructions between deadline checks)
+PROGRESS_STEPS = 10000
+
+_HASH_MOD = 1 << 64
+
+
+class QueryTimeout(Exception):
+    """A query ran past its time limit."""
+
+
+def supports(database: Optional[str]) -> bool:
+    """True if there is a fixture for this database_used value."""
+    return database in FIXTURE_FILES
+
+
+# ==========================================
+# Fixtures
+# ==========================================
+@lru_cache(maxsize=None)
+def _template(database: str) -> sqlite3.Connection:
+    """Load a fixture script into an in-memory database (once per process)."""
+    path = os.path.join(FIXTURE_DIR, FIXTURE_FILES[database])
+    with open(path, encoding='utf-8') as f:
+        script = f.read()
+    conn = sqlite3.connect(':memory:', check_same_thread=False)
+    conn.executescript(script)
+    return conn
+
+
+def _fresh_copy(database: str) -> sqlite3.Connection:
+    """Copy the cached fixture into a new in-memory database."""
+    conn = sqlite3.connect(':memory:')
+    _template(database).backup(conn)
+    conn.set_authorizer(_deny_attach)
+    return conn
+
+
+def _deny_attach(action, *args):
+    # ATTACH could create files on disk; nothing else leaves the in-memory copy
+    if action in (sqlite3.SQLITE_ATTACH, sqlite3.SQLITE_DETACH):
+        return sqlite3.SQLITE_DENY
+    return sqlite3.SQLITE_OK
+
+
+# ==========================================
+# Running and hashing
+# ==========================================
+def _normalize_value(value):
+    """Make equal answers hash equally (1 == 1.0, float rounding noise)."""
+    if isinstance(value, float):
+        if value.is_integer():
+            return int(value)
+        return round(value, 6)
+    return value
+
+
+def _row_digest(row: Sequence) -> int:
+    data = repr(tuple(_normalize_value(v) for v in row)).encode('utf-8')
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), 'big')
+
+
+def result_digest(rows: Iterable[Sequence], columns: int, ordered: bool) -> Tuple[int, int, int]:
+    """
+    Hash a result set in one pass.
+
+    ordered=True chains row hashes, so row order matters. Otherwise row hashes
+    are summed, which ignores order but still counts duplicate rows.
+
+    Args:
+        rows: Result rows
+        columns: Column count of the result (len(cursor.description)), so
+            empty results still compare by shape
+
+    Returns:
+        (column_count, row_count, digest)
+    """
+    count = 0
+    if ordered:
+        chain = hashlib.blake2b(digest_size=8)
+        for row in rows:
+            count += 1
+            chain.update(_row_digest(row).to_bytes(8, 'big'))
+        return columns, count, int.from_bytes(chain.digest(), 'big')
+
+    total = 0
+    for row in rows:
+        count += 1
+        total = (total + _row_digest(row)) % _HASH_MOD
+    return columns, count, total
+
+
+def _database_digest(conn: sqlite3.Connection) -> Tuple[int, int, int]:
+    """Digest every table, for statements that return no rows (INSERT/UPDATE/DELETE)."""
+    tables = [row[0] for row in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' ORDER BY name"
+    )]
+    parts = []
+    for table in tables:
+        cursor = conn.execute(f'SELECT * FROM "{table}"')
+        parts.append((table,) + result_digest(cursor, len(cursor.description), ordered=False))
+    return 0, len(parts), _row_digest(parts)
+
+
+def run_query(database: str, query: str, ordered: bool,
+              time_limit: float = DEFAULT_TIME_LIMIT) -> Tuple[int, int, int]:
+    """
+    Run one query on a fresh fixture copy and digest its result.
+
+    Raises:
+        QueryTimeout: the query ran longer than time_limit seconds
+        sqlite3.Error: the query failed
+    """
+    conn = _fresh_copy(database)
+    deadline = time.monotonic() + time_limit
+    conn.set_progress_handler(lambda: time.monotonic() > deadline, PROGRESS_STEPS)
+    try:
+        cursor = conn.execute(query.strip().rstrip(';'))
+        if cursor.description is None:
+            return _database_digest(conn)
+        return result_digest(cursor, len(cursor.description), ordered)
+    except sqlite3.OperationalError as e:
+        if str(e) == 'interrupted':
+            raise QueryTimeout(f"query exceeded {time_limit:g}s") from e
+        raise
+    finally:
+        conn.close()
+
+
+def check_answer(my_query: str, correct_query: str, database: str,
+                 time_limit: float = DEFAULT_TIME_LIMIT) -> Dict:
+    """
+    Grade my_query against correct_query on a practice fixture.
+
+    Returns:
+        dict with status ('correct', 'incorrect', 'error', 'timeout',
+        'unsupported'), is_correct (None when it could not be decided),
+        ordered and message
+    """
+    if not supports(database):
+        return {'status': 'unsupported', 'is_correct': None, 'ordered': False,
+                'message': f"no fixture for database '{database}'"}
+    if not my_query or not correct_query:
+        return {'status': 'unsupported', 'is_correct': None, 'ordered': False,
+                'message': "both my_query and correct_query are needed"}
+
+    ordered = has_top_level_order_by(correct_query)
+
+    try:
+        expected = run_query(database, correct_query, ordered, time_limit)
+    except (QueryTimeout, sqlite3.Error) as e:
+        return {'status': 'unsupported', 'is_correct': None, 'ordered': ordered,
+                'message': f"correct_query failed: {e}"}
+
+    try:
+        actual = run_query(database, my_query, ordered, time_limit)
+    except QueryTimeout as e:
+        return {'status': 'timeout', 'is_correct': False, 'ordered': ordered, 'message': str(e)}
+    except sqlite3.Error as e:
+        return {'status': 'error', 'is_correct': False, 'ordered': ordered, 'message': str(e)}
+
+    if actual == expected:
+        return {'status': 'correct', 'is_correct': True, 'ordered': ordered,
+                'message': f"{actual[1]} rows match" if actual[0] else "database state matches"}
+
+    if actual[0] != expected[0]:
+        message = f"expected {expected[0]} columns, got {actual[0]}"
+    elif actual[1] != expected[1]:
+        message = f"expected {expected[1]} rows, got {actual[1]}"
+    else:
+        message = "row order differs" if ordered else "row values differ"
+    return {'status': 'incorrect', 'is_correct': False, 'ordered': ordered, 'message': message}
+
+
+# ==========================================
+# Bulk re-grading
+# ==========================================
+def _check_session(args: Tuple[int, str, str, str, float]) -> Tuple[int, Dict]:
+    """Process-pool worker: templates are cached per worker process."""
+    session_id, database, my_query, correct_query, time_limit = args
+    return session_id, check_answer(my_query, correct_query, database, time_limit)
+
+
+def regrade_sessions(db_path: str = DEFAULT_DB_PATH, workers: Optional[int] = None,
+                     time_limit: float = DEFAULT_TIME_LIMIT,
+                     dry_run: bool = False) -> Dict[str, int]:
+    """
+    Re-grade stored sessions that have a correct_query and a supported database.
+
+    Checks run in a process pool. Changed is_correct values are written in
+    one transaction and the practice analytics are refreshed for those rows.
+
+    Returns:
+        Counts per status plus 'checked' and 'changed'
+    """
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        placeholders = ', '.join('?' for _ in FIXTURE_FILES)
+        sessions = conn.execute(f"""
+            SELECT id, database_used, my_query, correct_query, is_correct
+            FROM sql_practice_sessions
+            WHERE database_used IN ({placeholders})
+              AND correct_query IS NOT NULL AND TRIM(correct_query) != ''
+        """, list(FIXTURE_FILES)).fetchall()
+
+        current = {row[0]: row[4] for row in sessions}
+        jobs = [(row[0], row[1], row[2], row[3], time_limit) for row in sessions]
+
+        counts = {'checked': len(jobs), 'changed': 0}
+        updates = []
+        if jobs:
+            workers = workers or os.cpu_count() or 1
+            chunksize = max(1, len(jobs) // (workers * 4))
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for session_id, result in pool.map(_check_session, jobs, chunksize=chunksize):
+                    counts[result['status']] = counts.get(result['status'], 0) + 1
+                    if result['is_correct'] is None:
+                        continue
+                    new_value = 1 if result['is_correct'] else 0
+                    if current[session_id] != new_value:
+                        updates.append((new_value, session_id))
+
+        counts['changed'] = len(updates)
+        if updates and not dry_run:
+            # Imported lazily so `check` works without the practice tables
+            from practice_analytics import migrations_hint, missing_migrations, refresh_practice_sessions
+
+            missing = missing_migrations(conn)
+            if missing:
+                print(f"⚠️  Practice analytics not updated: {migrations_hint(missing)}, "
+                      f"then run python3 practice_analytics.py rebuild")
+            conn.execute("BEGIN")
+            try:
+                conn.executemany("UPDATE sql_practice_sessions SET is_correct = ? WHERE id = ?", updates)
+                if not missing:
+                    refresh_practice_sessions(conn, [session_id for _, session_id in updates])
+                conn.execute("COMMIT")
+            except sqlite3.Error:
+                conn.execute("ROLLBACK")
+                raise
+        return counts
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Grade SQL practice answers against fixture databases")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    check = sub.add_parser('check', help="grade one query against a reference query")
+    check.add_argument('--database', required=True, choices=sorted(FIXTURE_FILES))
+    check.add_argument('my_query')
+    check.add_argument('correct_query')
+    check.add_argument('--time-limit', type=float, default=DEFAULT_TIME_LIMIT)
+
+    regrade = sub.add_parser('regrade', help="re-grade stored practice sessions")
+    regrade.add_argument('--db', default=DEFAULT_DB_PATH, help="SQLite database path")
+    regrade.add_argument('--workers', type=int, default=None, help="worker processes (default: CPU count)")
+    regrade.add_argument('--time-limit', type=float, default=DEFAULT_TIME_LIMIT)
+    regrade.add_argument('--dry-run', action='store_true', help="report changes without writing")
+
+    args = parser.parse_args()
+
+    if args.command == 'check':
+        result = check_answer(args.my_query, args.correct_query, args.database, args.time_limit)
+        icon = {'correct': '✅', 'incorrect': '❌'}.get(result['status'], '⚠️ ')
+        order = "order-aware" if result['ordered'] else "order-insensitive"
+        print(f"{icon} {result['status'].upper()} ({order}): {result['message']}")
+        sys.exit(0 if result['is_correct'] else 1)
+
+    started = time.perf_counter()
+    counts = regrade_sessions(args.db, args.workers, args.time_limit, args.dry_run)
+    elapsed = time.perf_counter() - started
+    verb = "would change" if args.dry_run else "changed"
+    print(f"✅ Checked {counts.pop('checked')} sessions in {elapsed:.2f}s, "
+          f"{verb} {counts.pop('changed')}")
+    for status, count in sorted(counts.items()):
+        print(f"   {status:<12} {count:5d}")
+
+
+if __name__ == "__main__":
+    main()
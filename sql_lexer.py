@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+SQL Lexer - Keyword Extraction for Practice Sessions
+=====================================================
+Purpose: Tag a practice query with the SQL concepts it uses (JOIN, GROUP BY,
+         WINDOW, CTE, ...) without relying on what the user types by hand.
+Author: Learning System
+Date: 2025-11-20
+
+A single compiled regex tokenizes the query in one pass. String literals,
+quoted identifiers and comments are skipped, so "WHERE name = 'group by'"
+is not tagged GROUP BY. No external parser is needed.
+
+Usage:
+    >>> extract_keywords("SELECT dept, COUNT(*) FROM emp GROUP BY dept")
+    ['COUNT', 'GROUP BY']
+"""
+
+import re
+from typing import List, Optional, Tuple
+
+
+# One alternation, tried left to right at each position
+TOKEN_RE = re.compile(r"""
+      (?P<space>\s+)
+    | (?P<comment>--[^\n]*|/\*.*?(?:\*/|\Z))
+    | (?P<string>'(?:[^']|'')*'?)
+    | (?P<quoted>"(?:[^"]|"")*"?|`[^`]*`?|\[[^\]]*\]?)
+    | (?P<number>\d+(?:\.\d*)?)
+    | (?P<word>[A-Za-z_][A-Za-z0-9_$]*)
+    | (?P<punct>.)
+""", re.VERBOSE | re.DOTALL)
+
+# Single-word keywords recorded as-is
+CLAUSE_KEYWORDS = {
+    'WHERE', 'HAVING', 'LIMIT', 'OFFSET', 'DISTINCT', 'UNION', 'INTERSECT',
+    'EXCEPT', 'CASE', 'LIKE', 'IN', 'BETWEEN', 'EXISTS', 'OVER',
+    'INSERT', 'UPDATE', 'DELETE',
+}
+
+# Keywords followed by BY
+BY_KEYWORDS = {'GROUP', 'ORDER', 'PARTITION'}
+
+JOIN_TYPES = {'LEFT', 'RIGHT', 'INNER', 'FULL', 'CROSS', 'NATURAL'}
+
+# Function names recorded only when followed by "("
+FUNCTIONS = {
+    'COUNT', 'SUM', 'AVG', 'MIN', 'MAX', 'ROUND', 'ABS', 'FLOOR', 'CEIL',
+    'CEILING', 'COALESCE', 'IFNULL', 'NULLIF', 'CAST', 'CONCAT', 'SUBSTR',
+    'SUBSTRING', 'LENGTH', 'LEN', 'UPPER', 'LOWER', 'TRIM', 'REPLACE',
+    'INSTR', 'YEAR', 'MONTH', 'DAY', 'DATE', 'STRFTIME', 'DATEDIFF',
+    'JULIANDAY', 'DATE_FORMAT', 'EXTRACT', 'GROUP_CONCAT', 'STRING_AGG',
+    'ROW_NUMBER', 'RANK', 'DENSE_RANK', 'NTILE', 'LAG', 'LEAD',
+    'FIRST_VALUE', 'LAST_VALUE',
+}
+
+
+def tokenize(query: str) -> List[Tuple[str, str]]:
+    """
+    Split a query into (kind, value) tokens.
+
+    Whitespace, comments, string literals and quoted identifiers are dropped.
+    Words are upper-cased; kind is 'word', 'number' or 'punct'.
+    """
+    tokens = []
+    for match in TOKEN_RE.finditer(query or ''):
+        kind = match.lastgroup
+        if kind == 'word':
+            tokens.append((kind, match.group().upper()))
+        elif kind in ('number', 'punct'):
+            tokens.append((kind, match.group()))
+    return tokens
+
+
+def extract_keywords(query: str) -> List[str]:
+    """
+    Return the sorted, de-duplicated SQL concepts used by a query.
+
+    Multi-word constructs are normalized: LEFT OUTER JOIN -> LEFT JOIN (plus
+    JOIN), WITH -> CTE, OVER -> WINDOW, "( SELECT" -> SUBQUERY.
+    """
+    tokens = tokenize(query)
+    found = set()
+
+    for i, (kind, value) in enumerate(tokens):
+        if kind == 'punct':
+            if value == '(' and _value_at(tokens, i + 1) == 'SELECT':
+                found.add('SUBQUERY')
+            continue
+        if kind != 'word':
+            continue
+
+        next_value = _value_at(tokens, i + 1)
+
+        if value in BY_KEYWORDS and next_value == 'BY':
+            found.add(f'{value} BY')
+        elif value == 'JOIN':
+            found.add('JOIN')
+            join_type = _previous_join_type(tokens, i)
+            if join_type:
+                found.add(f'{join_type} JOIN')
+        elif value == 'WITH' and i == _first_word_index(tokens):
+            found.add('CTE')
+            if next_value == 'RECURSIVE':
+                found.add('RECURSIVE CTE')
+        elif value == 'IS' and 'NULL' in (next_value, _value_at(tokens, i + 2)):
+            found.add('IS NULL')
+        elif value == 'OVER':
+            found.update(('OVER', 'WINDOW'))
+        elif value in CLAUSE_KEYWORDS:
+            found.add(value)
+        elif value in FUNCTIONS and next_value == '(':
+            found.add(value)
+
+    return sorted(found)
+
+
+def has_top_level_order_by(query: str) -> bool:
+    """
+    True if the outermost statement ends in ORDER BY, i.e. row order matters.
+
+    ORDER BY inside parentheses (subqueries, OVER (...)) does not count.
+    """
+    depth = 0
+    tokens = tokenize(query)
+    for i, (kind, value) in enumerate(tokens):
+        if value == '(':
+            depth += 1
+        elif value == ')':
+            depth = max(depth - 1, 0)
+        elif depth == 0 and kind == 'word' and value == 'ORDER' and _value_at(tokens, i + 1) == 'BY':
+            return True
+    return False
+
+
+def normalize_keyword(keyword: str) -> str:
+    """Normalize a hand-typed keyword ('group  by' -> 'GROUP BY')."""
+    return ' '.join(keyword.upper().split())
+
+
+def merge_keywords(query: str, keywords_used: Optional[str]) -> List[str]:
+    """Combine lexer output with the user's comma-separated keywords_used."""
+    merged = set(extract_keywords(query))
+    if keywords_used:
+        merged.update(normalize_keyword(kw) for kw in keywords_used.split(',') if kw.strip())
+    return sorted(merged)
+
+
+def _previous_join_type(tokens: List[Tuple[str, str]], join_index: int) -> Optional[str]:
+    """Find LEFT/RIGHT/... before JOIN, skipping an optional OUTER."""
+    i = join_index - 1
+    if i >= 0 and tokens[i][1] == 'OUTER':
+        i -= 1
+    if i >= 0 and tokens[i][1] in JOIN_TYPES:
+        return tokens[i][1]
+    return None
+
+
+def _value_at(tokens: List[Tuple[str, str]], index: int) -> Optional[str]:
+    return tokens[index][1] if index < len(tokens) else None
+
+
+def _first_word_index(tokens: List[Tuple[str, str]]) -> int:
+    """Index of the first word token, or -1 (WITH only opens a CTE there)."""
+    for i, (kind, _) in enumerate(tokens):
+        if kind == 'word':
+            return i
+    return -1
@@ -2,6 +2,49 @@
 # Test script for scraped jobs API endpoints
 
 API_URL="http://localhost:8081"
+PASS_COUNT=0
+FAIL_COUNT=0
+
+# check NAME EXPECTED ACTUAL: passes when ACTUAL contains EXPECTED
+check() {
+    local test_name=$1
+    local expected=$2
+    local actual=$3
+
+    if [[ "$actual" == *"$expected"* ]]; then
+        echo "   ✅ PASS: $test_name"
+        ((PASS_COUNT++))
+    else
+        echo "   ❌ FAIL: $test_name"
+        echo "      Expected (contains): $expected"
+        echo "      Got: $actual"
+        ((FAIL_COUNT++))
+    fi
+}
+
+# Scoring pipeline checks write to throwaway copies of the database and config
+TMP_DIR=$(mktemp -d)
+trap 'kill $TEST_API_PID 2>/dev/null; rm -rf "$TMP_DIR"' EXIT
+cp data/resume_config.json "$TMP_DIR/resume_config.json"
+
+# The committed database predates migrations 006+: apply them to the copy and
+# fill the derived tables the checks read, as each migration's Usage says.
+# On an already-migrated copy the ALTER TABLE lines fail and the rest re-runs.
+# Output goes to migrate.log.
+cp data/jobs-tracker.db "$TMP_DIR/migrated.db"
+for migration in migrations/0*.sql; do
+    case "$(basename "$migration")" in 00[2-5]_*) continue ;; esac
+    sqlite3 "$TMP_DIR/migrated.db" < "$migration" >> "$TMP_DIR/migrate.log" 2>&1
+done
+for backfill in description_store salary location_gazetteer job_tags near_duplicates; do
+    python3 "scrapers/$backfill.py" backfill --db "$TMP_DIR/migrated.db" >> "$TMP_DIR/migrate.log" 2>&1
+done
+# Score-time features for what-if
+python3 scrapers/feature_store.py backfill --db "$TMP_DIR/migrated.db" \
+    --config "$TMP_DIR/resume_config.json" >> "$TMP_DIR/migrate.log" 2>&1
+# Score sketches for top_pct and percentiles
+python3 scrapers/score_sketch.py rebuild --db "$TMP_DIR/migrated.db" >> "$TMP_DIR/migrate.log" 2>&1
+cp "$TMP_DIR/migrated.db" "$TMP_DIR/jobs.db"
 
 echo "========================================================================"
 echo "🧪 TESTING SCRAPED JOBS API ENDPOINTS"
@@ -77,15 +120,747 @@ for job in data['jobs']:
     print()
 "
 
+echo "========================================================================"
+echo "7️⃣ Testing /api/scraped-jobs/facets"
+echo "Command: curl \"$API_URL/api/scraped-jobs/facets?min_score=0&facet_limit=5\""
+curl -s "$API_URL/api/scraped-jobs/facets?min_score=0&facet_limit=5" | tail -1 | python3 -c "
+import sys, json
+data = json.load(sys.stdin)
+print(f'Matching jobs: {data[\"total\"]}')
+for facet, values in data['facets'].items():
+    print(f'  {facet}: ' + ', '.join(f'{v[\"value\"]} ({v[\"count\"]})' for v in values))
+"
+
+echo "========================================================================"
+echo "SCORING PIPELINE CHECKS (throwaway database copy)"
+echo "========================================================================"
+
+echo -e "\n🔁 Config reload: a malformed edit keeps the old config active"
+RESULT=$(python3 - "$TMP_DIR/resume_config.json" 2>/dev/null <<'PYEOF'
+import json, shutil, sys
+sys.path.insert(0, 'scrapers')
+from simple_scorer import SimpleJobScorer
+path = sys.argv[1] + '.reload'
+shutil.copy(sys.argv[1], path)
+scorer = SimpleJobScorer(path)
+skills, config_hash = dict(scorer.all_skills), scorer.config_hash
+config = json.load(open(path))
+del config['scoring_weights']
+config['skills']['critical']['items']['Reload Check Skill'] = 10
+json.dump(config, open(path, 'w'))
+errors = 0
+for _ in range(2):  # the second poll must still see the edit
+    try:
+        scorer.reload_if_changed()
+    except KeyError:
+        errors += 1
+print('ok' if errors == 2 and scorer.all_skills == skills and scorer.config_hash == config_hash
+      else f'errors={errors} skills_changed={scorer.all_skills != skills}')
+PYEOF
+)
+check "Malformed edit raises on every poll and leaves the scorer unchanged" "ok" "$RESULT"
+
+echo -e "\n🔁 rescoring.py apply: reweighting a skill rescores the affected jobs"
+python3 scrapers/rescoring.py apply --db "$TMP_DIR/jobs.db" --config "$TMP_DIR/resume_config.json" > /dev/null 2>&1
+python3 - "$TMP_DIR/resume_config.json" <<'PYEOF'
+import json, sys
+config = json.load(open(sys.argv[1]))
+config['skills']['critical']['items']['SQL'] = 1
+json.dump(config, open(sys.argv[1], 'w'), indent=2)
+PYEOF
+RESULT=$(python3 scrapers/rescoring.py apply --db "$TMP_DIR/jobs.db" --config "$TMP_DIR/resume_config.json" 2>/dev/null)
+check "Apply reports the changed term" "skill:SQL" "$RESULT"
+check "Apply rescores affected jobs" "Rescored:" "$RESULT"
+RESULT=$(python3 scrapers/rescoring.py apply --db "$TMP_DIR/jobs.db" --config "$TMP_DIR/resume_config.json" 2>/dev/null)
+check "A second apply finds nothing to do" "Config unchanged" "$RESULT"
+cp data/resume_config.json "$TMP_DIR/resume_config.json"
+
+echo -e "\n🧾 Requirement extractor: negated and onsite work modes, no years from seniority"
+RESULT=$(python3 2>/dev/null <<'PYEOF'
+import sys
+sys.path.insert(0, 'scrapers')
+from requirement_extractor import experience_requirement, extract_requirements
+print(extract_requirements('QA Engineer', 'No remote work. SQL testing.')['work_mode'],
+      extract_requirements('QA Engineer', 'Remote-friendly team, onsite in Austin.')['work_mode'],
+      repr(experience_requirement(extract_requirements('Principal QA Engineer', 'SQL testing.'))))
+PYEOF
+)
+check "'No remote' is not remote; onsite beats a remote mention; a title gives no years" "None onsite ''" "$RESULT"
+
+RESULT=$(python3 2>/dev/null <<'PYEOF'
+import sys
+sys.path.insert(0, 'scrapers')
+from simple_scorer import SimpleJobScorer
+scorer = SimpleJobScorer()
+austin = scorer.score_job({'title': 'QA Engineer', 'location': 'Austin, TX',
+                           'description': 'No remote work. SQL and ETL testing.'})
+city = scorer.calculate_location_score('Austin, TX', 'remote')
+blank = scorer.calculate_location_score('', 'remote')
+principal = scorer.score_job({'title': 'Principal QA Engineer', 'description': 'SQL testing.'})
+print(austin['breakdown']['location_score'], city, blank, principal['breakdown']['experience_score'])
+PYEOF
+)
+check "Location score: negated remote 0, city not overridden 0, empty location filled 100; principal title keeps experience 100" "0 0 100 100" "$RESULT"
+
+
+echo -e "\n🔤 TermMatcher: synonyms, whole-word prefixes, same terms as one search per pattern"
+RESULT=$(python3 - "$TMP_DIR/jobs.db" "$TMP_DIR/resume_config.json" 2>/dev/null <<'PYEOF'
+import json, re, sqlite3, sys
+sys.path.insert(0, 'scrapers')
+from description_store import DescriptionStore
+from simple_scorer import SimpleJobScorer, config_term_weights
+from term_matcher import TermMatcher, term_patterns
+synonyms = TermMatcher({'skill': {'SQL': 10}}, {'sql': ['mysql', 'postgresql']})
+prefix = TermMatcher({'skill': {'Selenium': 8, 'Selenium UI': 5}, 'domain': {'ETL/DWH': 8}})
+print(synonyms.match('mysql and postgres'), synonyms.match('mysqlx'),
+      sorted(prefix.match('selenium ui and dwh')['skill']), prefix.match('seleniumui etl'), end=' ')
+
+# Same terms as one r'\bpattern\b' search per pattern, on every stored job
+weights = config_term_weights(json.load(open(sys.argv[2])))
+matcher = TermMatcher(weights)
+conn = sqlite3.connect(sys.argv[1])
+descriptions = DescriptionStore(conn)
+normalize = SimpleJobScorer(config_path=sys.argv[2]).normalize_text
+rows = conn.execute("SELECT id, job_title, tags FROM scraped_jobs").fetchall()
+texts = [normalize(f"{title} {tags or ''} {descriptions.load(job_id)}") for job_id, title, tags in rows]
+print(len(texts) > 0 and all(
+    matcher.match(text) == {kind: {term for term in terms
+                                   if any(re.search(r'\b' + re.escape(p) + r'\b', text)
+                                          for p in term_patterns(kind, term))}
+                            for kind, terms in weights.items()}
+    for text in texts))
+PYEOF
+)
+check "An alias credits its term; a prefix term is credited inside a longer one; no partial words" \
+    "{'skill': {'SQL'}} {'skill': set()} ['Selenium', 'Selenium UI'] {'skill': set(), 'domain': {'ETL/DWH'}}" "$RESULT"
+check "Every stored job matches the same config terms as separate \\b searches" "} True" "$RESULT"
+
+echo -e "\n🏷️  Title stage: avoided titles skip the scan, preferred titles get the boost"
+cp "$TMP_DIR/resume_config.json" "$TMP_DIR/title_config.json"
+RESULT=$(python3 - "$TMP_DIR/title_config.json" 2>/dev/null <<'PYEOF'
+import json, sys
+sys.path.insert(0, 'scrapers')
+from simple_scorer import SimpleJobScorer
+config = json.load(open(sys.argv[1]))
+scorer = SimpleJobScorer(config_path=sys.argv[1])
+scans = []
+match_terms = scorer._match_terms
+scorer._match_terms = lambda text: scans.append(text) or match_terms(text)
+description = 'Remote. SQL, Python, ETL testing, Selenium, data quality, 6 years.'
+job = lambda title: {'title': title, 'description': description, 'location': 'Remote'}
+
+stages = [scorer.match_title(title) for title in ('QA Intern to QA Lead', 'QA Lead, Payments', 'Backend Engineer')]
+skipped = scorer.score_job(job('QA Intern'))
+preferred, neutral = scorer.score_job(job('QA Lead')), scorer.score_job(job('Data Engineer'))
+print(stages, skipped['short_circuit'], skipped['final_score'], skipped['classification'],
+      skipped['reason'], len(scans), preferred['breakdown']['title_adjustment'],
+      round(preferred['final_score'] - neutral['final_score'], 2))
+
+# short_circuit false: the avoided title is scored fully with the penalty
+config['job_title_keywords']['avoid']['short_circuit'] = False
+json.dump(config, open(sys.argv[1], 'w'))
+penalized = SimpleJobScorer(config_path=sys.argv[1]).score_job(job('QA Intern'))
+print(penalized['short_circuit'], penalized['breakdown']['title_adjustment'],
+      penalized['title_match'], bool(penalized['matched_skills']))
+PYEOF
+)
+check "Avoid wins over preferred; an avoided title is NO_FIT without a scan; preferred adds 10" \
+    "[('avoid', ['QA Intern']), ('preferred', ['QA Lead']), (None, [])] True 0.0 NO_FIT Title matches avoid keyword(s): QA Intern 2 10 10.0" "$RESULT"
+check "With short_circuit false an avoided title is scored fully with the -15 penalty" \
+    "False -15 {'stage': 'avoid', 'keywords': ['QA Intern']} True" "$RESULT"
+
+echo -e "\n🪜 Cascade: a job below the threshold never reads its description"
+RESULT=$(python3 2>/dev/null <<'PYEOF'
+import sys
+sys.path.insert(0, 'scrapers')
+import simple_scorer
+read = []
+extract = simple_scorer.extract_requirements
+simple_scorer.extract_requirements = lambda title, description: read.append(description) or extract(title, description)
+scorer = simple_scorer.SimpleJobScorer()
+job = {'title': 'React Angular Frontend Developer', 'location': 'Berlin',
+       'tags': 'Cypress, Vue.js, Body Shopping', 'description': 'Fully remote. 5+ years of SQL.'}
+partial = scorer.score_job(dict(job), threshold=80)
+full = scorer.score_job(dict(job))
+skipped = scorer.score_job({'title': 'QA Intern', 'description': 'SQL testing.'}, threshold=80)
+print(partial['is_partial_score'], read[0], full['final_score'] <= partial['score_upper_bound'] < 80,
+      set(partial) == set(full) == set(skipped))
+PYEOF
+)
+check "Partial score reads only the title and every path returns the same keys" "True None True True" "$RESULT"
+
+cp "$TMP_DIR/jobs.db" "$TMP_DIR/cascade.db"
+RESULT=$(python3 - "$TMP_DIR/cascade.db" 2>/dev/null <<'PYEOF'
+import sqlite3, sys
+sys.path.insert(0, 'scrapers')
+import simple_scorer
+read = []
+extract = simple_scorer.extract_requirements
+simple_scorer.extract_requirements = lambda title, description: read.append(description) or extract(title, description)
+from remoteok_integration import RemoteOKIntegration
+integration = RemoteOKIntegration(db_path=sys.argv[1])
+jobs = [{'id': 'cascade-1', 'position': 'Brand Designer', 'company': 'Acme', 'location': 'Berlin',
+         'tags': ['design'], 'description': 'Brand work. Python, SQL, ETL, data quality.'},
+        {'id': 'cascade-2', 'position': 'Senior QA Automation Engineer', 'company': 'Acme',
+         'location': 'Remote', 'tags': ['qa', 'sql'], 'description': 'Remote ETL testing with SQL and Python.'}]
+stored, _ = integration.score_and_store_jobs(jobs)
+partial = dict(sqlite3.connect(sys.argv[1]).execute(
+    "SELECT external_id, is_partial_score FROM scraped_jobs WHERE external_id LIKE 'cascade-%'"))
+print(integration.score_threshold, stored, partial['cascade-1'], partial['cascade-2'],
+      jobs[0]['description'] not in read, jobs[1]['description'] in read)
+PYEOF
+)
+check "Ingest stores a partial score without reading the description; a relevant job is read" \
+    "85 2 1 0 True True" "$RESULT"
+
+echo -e "\n🔎 Relevance prefilter: filters.relevance_keywords as whole words"
+RESULT=$(python3 - "$TMP_DIR/cascade.db" 2>/dev/null <<'PYEOF'
+import sys
+sys.path.insert(0, 'scrapers')
+from remoteok_integration import RemoteOKIntegration
+integration = RemoteOKIntegration(db_path=sys.argv[1])
+jobs = [{'position': 'Senior QA Engineer', 'tags': ['python'], 'description': ''},
+        {'position': 'Platform Lead', 'tags': [], 'description': 'You will own our data warehouse.'},
+        {'position': 'Aqaba Office Manager', 'tags': ['contest'], 'description': 'Equality and protests.'}]
+relevant = [job['position'] for job in integration.filter_relevant_jobs(jobs)]
+stats = integration.filter_stats
+print(relevant, stats['total'], stats['relevant'], stats['matched_on_position_tags'],
+      stats['matched_on_description'], stats['filter_rate'])
+PYEOF
+)
+check "Title hit, description hit on a config-only keyword, 'qa'/'test' inside words miss; filter_stats" \
+    "['Senior QA Engineer', 'Platform Lead'] 3 2 1 1 0.333" "$RESULT"
+
+echo -e "\n👯 Near-duplicates: the key includes the location"
+RESULT=$(python3 - "$TMP_DIR/jobs.db" 2>/dev/null <<'PYEOF'
+import sqlite3, sys
+sys.path.insert(0, 'scrapers')
+from description_store import DescriptionStore
+from near_duplicates import NearDuplicateIndex, job_signature_text, minhash_signature
+conn = sqlite3.connect(sys.argv[1])
+job_id, title, location_id = conn.execute("""
+    SELECT j.id, j.job_title, j.location_id FROM scraped_jobs j
+    JOIN job_signatures s ON s.job_id = j.id WHERE j.location_id IS NOT NULL ORDER BY j.id LIMIT 1
+""").fetchone()
+other = conn.execute("SELECT MAX(id) + 1 FROM normalized_locations").fetchone()[0]
+signature = minhash_signature(job_signature_text(title, DescriptionStore(conn).load(job_id)))
+index = NearDuplicateIndex(conn)
+same = index.find_canonical(signature, title, location_id)
+print(same is not None and same[0] == job_id, index.find_canonical(signature, title, other))
+PYEOF
+)
+check "A repost links only within the same location" "True None" "$RESULT"
+
+sqlite3 "$TMP_DIR/jobs.db" "UPDATE scraped_jobs SET canonical_job_id = (SELECT MIN(id) FROM scraped_jobs)
+    WHERE id = (SELECT MAX(id) FROM scraped_jobs WHERE location_id IS NOT
+                (SELECT location_id FROM scraped_jobs ORDER BY id LIMIT 1))"
+RESULT=$(python3 scrapers/near_duplicates.py backfill --db "$TMP_DIR/jobs.db" 2>/dev/null)
+check "Backfill unlinks a copy stored under another location" "Unlinked" "$RESULT"
+RESULT=$(sqlite3 "$TMP_DIR/jobs.db" "SELECT COUNT(*) FROM scraped_jobs d JOIN scraped_jobs c ON c.id = d.canonical_job_id
+    WHERE d.location_id IS NOT c.location_id")
+check "No near-duplicate is linked across locations" "0" "$RESULT"
+
+echo -e "\n🧭 Test API on a throwaway data directory (profile 'qa2': SQL weighted at 1)"
+REPO_DIR=$(pwd)
+TEST_ROOT="$TMP_DIR/root"
+mkdir -p "$TEST_ROOT/data/profiles"
+cp data/resume_config.json "$TEST_ROOT/data/"
+cp "$TMP_DIR/migrated.db" "$TEST_ROOT/data/jobs-tracker.db"
+python3 - "$TEST_ROOT/data" <<'PYEOF'
+import json, sys
+data = sys.argv[1]
+config = json.load(open(f'{data}/resume_config.json'))
+config['skills']['critical']['items']['SQL'] = 1
+json.dump(config, open(f'{data}/profiles/qa2.json', 'w'), indent=2)
+json.dump({'profiles': {'qa2': 'data/profiles/qa2.json'}}, open(f'{data}/profiles.json', 'w'))
+PYEOF
+(cd "$TEST_ROOT" && python3 "$REPO_DIR/db_shards.py" create qa2 > /dev/null 2>&1 \
+    && python3 "$REPO_DIR/scrapers/multi_profile.py" rescore > /dev/null 2>&1)
+# api-server.py in-process on a free port, reading the throwaway data/
+(cd "$TEST_ROOT" && exec python3 - "$REPO_DIR" > "$TMP_DIR/api_port" 2> "$TMP_DIR/api.log" <<'PYEOF'
+import importlib.util, sys
+sys.path.insert(0, sys.argv[1])
+spec = importlib.util.spec_from_file_location('api_server', f'{sys.argv[1]}/api-server.py')
+api = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(api)
+server = api.ReusableTCPServer(('127.0.0.1', 0), api.APIHandler)
+print(server.server_address[1], flush=True)
+server.serve_forever()
+PYEOF
+) &
+TEST_API_PID=$!
+for _ in $(seq 50); do [ -s "$TMP_DIR/api_port" ] && break; sleep 0.1; done
+TEST_API="http://127.0.0.1:$(cat "$TMP_DIR/api_port")"
+
+echo -e "\n👤 Profile routing reads profile_job_scores"
+RESULT=$(python3 - "$TEST_API" "$TEST_ROOT/data/jobs-tracker.db" 2>/dev/null <<'PYEOF'
+import json, sqlite3, sys, urllib.error, urllib.request
+api, db = sys.argv[1:]
+def get(path, **headers):
+    try:
+        with urllib.request.urlopen(urllib.request.Request(api + path, headers=headers)) as response:
+            return response.status, json.load(response)
+    except urllib.error.HTTPError as e:
+        return e.code, json.load(e)
+conn = sqlite3.connect(db)
+profile = dict(conn.execute("SELECT job_id, match_score FROM profile_job_scores WHERE profile = 'qa2'"))
+main = dict(conn.execute("SELECT id, match_score FROM scraped_jobs"))
+_, routed = get('/p/qa2/api/scraped-jobs?min_score=0&limit=1000')
+_, header = get('/api/scraped-jobs?min_score=0&limit=1000', **{'X-Profile': 'qa2'})
+scores = {job['id']: job['match_score'] for job in routed['jobs']}
+print(len(scores) == len(profile) and all(scores[i] == round(profile[i], 1) for i in scores),
+      any(scores[i] != round(main[i], 1) for i in scores),
+      [job['id'] for job in header['jobs']] == [job['id'] for job in routed['jobs']],
+      get('/p/qa2/api/scraped-jobs?top_pct=10')[0], get('/p/nobody/api/scraped-jobs')[0])
+PYEOF
+)
+check "/p/qa2/ and X-Profile list the profile's scores; top_pct 400; unknown profile 404" "True True True 400 404" "$RESULT"
+
+echo -e "\n🗂️  db_shards.py create: per-profile schema, seed rows and pipeline routing"
+RESULT=$(python3 - "$TEST_API" "$TEST_ROOT/data" 2>/dev/null <<'PYEOF'
+import json, sqlite3, sys, urllib.request
+sys.path.insert(0, '.')
+from db_shards import SHARED_TABLES, connect_shard, create_shard, is_shared_table
+api, data = sys.argv[1:]
+def metrics(path, **headers):
+    with urllib.request.urlopen(urllib.request.Request(api + path, headers=headers)) as response:
+        return json.load(response)['active_count']
+shared = sqlite3.connect(f'{data}/jobs-tracker.db')
+shard = sqlite3.connect(f'{data}/shards/qa2.db')
+names = lambda conn, kind: {row[0] for row in conn.execute(
+    "SELECT name FROM sqlite_master WHERE type = ? AND name NOT LIKE 'sqlite_%'", (kind,))}
+print(names(shard, 'table') == {t for t in names(shared, 'table') if not is_shared_table(t)},
+      not names(shard, 'table') & (SHARED_TABLES | {'scraped_jobs'}),
+      names(shard, 'trigger') <= names(shared, 'trigger') and bool(names(shard, 'trigger')),
+      shard.execute("SELECT * FROM job_sources ORDER BY 1").fetchall()
+      == shared.execute("SELECT * FROM job_sources ORDER BY 1").fetchall(),
+      shard.execute("SELECT COUNT(*) FROM opportunities").fetchone()[0], end=' ')
+
+# Pipeline rows written to the shard are served only to the routed profile
+conn = connect_shard('qa2', f'{data}/jobs-tracker.db', f'{data}/shards')
+conn.execute("INSERT INTO opportunities (company, role, status) VALUES ('Acme', 'QA Lead', 'Applied')")
+conn.commit()
+print(conn.execute("SELECT COUNT(*) FROM scraped_jobs").fetchone()[0]
+      == shared.execute("SELECT COUNT(*) FROM scraped_jobs").fetchone()[0],
+      metrics('/p/qa2/api/metrics'), metrics('/api/metrics', **{'X-Profile': 'qa2'}),
+      metrics('/api/metrics') == shared.execute(
+          "SELECT COUNT(*) FROM opportunities WHERE status NOT IN ('Rejected', 'Declined', 'Ghosted', 'Accepted')"
+      ).fetchone()[0], end=' ')
+for profile in ('qa2', '../qa2'):
+    try:
+        create_shard(profile, f'{data}/jobs-tracker.db', f'{data}/shards')
+    except (FileExistsError, ValueError) as e:
+        print(type(e).__name__, end=' ')
+PYEOF
+)
+check "The shard has every per-profile table and trigger, no shared table, the job_sources seed, no opportunities" \
+    "True True True True 0" "$RESULT"
+check "Shard rows reach /p/qa2/ and X-Profile only; scraped_jobs comes from the shared file" \
+    "True 1 1 True" "$RESULT"
+check "An existing shard or a path-like name is refused" "FileExistsError ValueError" "$RESULT"
+
+echo -e "\n🔁 rescoring.py apply: a profile config edit rescores that profile"
+(cd "$TEST_ROOT" && python3 "$REPO_DIR/scrapers/rescoring.py" apply > /dev/null 2>&1)
+python3 - "$TEST_ROOT/data/profiles/qa2.json" <<'PYEOF'
+import json, sys
+config = json.load(open(sys.argv[1]))
+config['skills']['critical']['items']['SQL'] = 30
+json.dump(config, open(sys.argv[1], 'w'), indent=2)
+PYEOF
+RESULT=$(cd "$TEST_ROOT" && python3 "$REPO_DIR/scrapers/rescoring.py" apply 2>/dev/null)
+check "Apply reports the profile's changed term" "Profile 'qa2'" "$RESULT"
+check "Apply rescores the profile's affected jobs" "skill:SQL" "$RESULT"
+RESULT=$(curl -s "$TEST_API/p/qa2/api/scraped-jobs?min_score=0&limit=1000" | python3 -c "
+import json, sqlite3, sys
+scores = {job['id']: job['match_score'] for job in json.load(sys.stdin)['jobs']}
+stored = dict(sqlite3.connect('$TEST_ROOT/data/jobs-tracker.db').execute(
+    \"SELECT job_id, ROUND(match_score, 1) FROM profile_job_scores WHERE profile = 'qa2'\"))
+print(scores == stored)
+")
+check "The routed listing serves the rescored profile scores" "True" "$RESULT"
+
+echo -e "\n⏳ Freshness rank: sort=rank order and the ln() check"
+RESULT=$(python3 - "$TEST_API" 2>/dev/null <<'PYEOF'
+import json, sys, urllib.request
+for path in ('/api/scraped-jobs', '/p/qa2/api/scraped-jobs'):
+    with urllib.request.urlopen(f'{sys.argv[1]}{path}?sort=rank&min_score=0&limit=1000') as response:
+        decayed = [job['decayed_score'] for job in json.load(response)['jobs']]
+    print(len(decayed) > 1 and all(a >= b - 0.01 for a, b in zip(decayed, decayed[1:])), end=' ')
+PYEOF
+)
+check "sort=rank lists jobs by decayed score (main and routed profile)" "True True" "$RESULT"
+RESULT=$(python3 2>/dev/null <<'PYEOF'
+import sqlite3, sys
+sys.path.insert(0, 'scrapers')
+from freshness import require_math_functions
+conn = sqlite3.connect(':memory:')
+require_math_functions(conn)
+# An SQLite without math functions, as far as ln() goes
+conn.set_authorizer(lambda action, arg1, function, *_: sqlite3.SQLITE_DENY
+                    if action == sqlite3.SQLITE_FUNCTION and function == 'ln' else sqlite3.SQLITE_OK)
+try:
+    require_math_functions(conn)
+except RuntimeError as e:
+    print(e)
+PYEOF
+)
+check "A SQLite without ln() is reported before any write" "no ln() math function" "$RESULT"
+
+echo -e "\n🌍 Location gazetteer: alpha-3 codes and the location= filter"
+RESULT=$(python3 2>/dev/null <<'PYEOF'
+import sys
+sys.path.insert(0, 'scrapers')
+from location_gazetteer import normalize_location
+print(normalize_location('CAN-Remote').codes, normalize_location('DEU / AUT').countries,
+      normalize_location('we can hire').codes, normalize_location('Remote (EST)').countries)
+PYEOF
+)
+check "CAN-Remote is Canada and remote; lowercase 'can' and EST match nothing" \
+    "('CA', 'NA', 'REMOTE') ('AT', 'DE') () ()" "$RESULT"
+# Stored normalizations predate gazetteer edits
+python3 scrapers/location_gazetteer.py backfill --db "$TEST_ROOT/data/jobs-tracker.db" --all > /dev/null 2>&1
+RESULT=$(python3 - "$TEST_API" "$TEST_ROOT/data/jobs-tracker.db" 2>/dev/null <<'PYEOF'
+import json, sqlite3, sys, urllib.error, urllib.request
+sys.path.insert(0, 'scrapers')
+from location_gazetteer import normalize_location
+api, db = sys.argv[1:]
+rows = sqlite3.connect(db).execute(
+    "SELECT id, location FROM scraped_jobs WHERE canonical_job_id IS NULL").fetchall()
+results = []
+for value in ('REMOTE', 'IN,EUROPE', 'NA'):
+    expected = {job_id for job_id, location in rows
+                if set(value.split(',')) & set(normalize_location(location).codes)}
+    with urllib.request.urlopen(f'{api}/api/scraped-jobs?min_score=0&limit=1000&location={value}') as response:
+        results.append({job['id'] for job in json.load(response)['jobs']} == expected)
+try:
+    urllib.request.urlopen(f'{api}/api/scraped-jobs?location=Atlantis')
+except urllib.error.HTTPError as e:
+    results.append(e.code)
+print(*results)
+PYEOF
+)
+check "location= returns exactly the jobs whose location has the code; unknown names 400" "True True True 400" "$RESULT"
+
+echo -e "\n🏷️  Tags: tag= filter, facet counts and cleanup of deleted jobs"
+RESULT=$(python3 - "$TEST_API" "$TEST_ROOT/data/jobs-tracker.db" 2>/dev/null <<'PYEOF'
+import json, sqlite3, sys, urllib.request
+from collections import Counter
+sys.path.insert(0, 'scrapers')
+from job_tags import normalize_tags
+api, db = sys.argv[1:]
+def get(path):
+    with urllib.request.urlopen(api + path) as response:
+        return json.load(response)
+tags = {job_id: set(normalize_tags(text)) for job_id, text in sqlite3.connect(db).execute(
+    "SELECT id, tags FROM scraped_jobs WHERE canonical_job_id IS NULL AND match_score >= 0")}
+listed = {job['id'] for job in get('/api/scraped-jobs?min_score=0&limit=1000&tag=python,sql')['jobs']}
+facets = get('/api/scraped-jobs/facets?min_score=0&facet_limit=1000')
+counts = Counter(tag for job_tags in tags.values() for tag in job_tags)
+print(listed == {job_id for job_id, job_tags in tags.items() if job_tags & {'python', 'sql'}},
+      facets['total'] == len(tags),
+      {f['value']: f['count'] for f in facets['facets']['tag']} == dict(counts))
+PYEOF
+)
+check "tag= lists jobs with any of the tags; facet total and tag counts match the jobs" "True True True" "$RESULT"
+RESULT=$(python3 - "$TMP_DIR/jobs.db" 2>/dev/null <<'PYEOF'
+import sqlite3, subprocess, sys
+sys.path.insert(0, 'scrapers')
+from job_tags import JobTagStore
+conn = sqlite3.connect(sys.argv[1], isolation_level=None)
+JobTagStore(conn)
+job_id = conn.execute("SELECT MIN(job_id) FROM scraped_job_tags").fetchone()[0]
+conn.execute("DELETE FROM scraped_jobs WHERE id = ?", (job_id,))
+deleted = conn.execute("SELECT COUNT(*) FROM scraped_job_tags WHERE job_id = ?", (job_id,)).fetchone()[0]
+# An orphan left by a delete before the trigger existed
+conn.execute("INSERT INTO scraped_job_tags (job_id, tag) VALUES (?, 'orphan')", (job_id,))
+conn.close()
+subprocess.run([sys.executable, 'scrapers/job_tags.py', 'backfill', '--db', sys.argv[1]], capture_output=True)
+orphans = sqlite3.connect(sys.argv[1]).execute(
+    "SELECT COUNT(*) FROM scraped_job_tags WHERE job_id NOT IN (SELECT id FROM scraped_jobs)").fetchone()[0]
+print(deleted, orphans)
+PYEOF
+)
+check "Deleting a job drops its tag rows; backfill drops older orphans" "0 0" "$RESULT"
+
+echo -e "\n🧹 Text normalization leaves accented text and bare angle brackets alone"
+RESULT=$(python3 2>/dev/null <<'PYEOF'
+import sys
+sys.path.insert(0, 'scrapers')
+from text_normalizer import normalize_text
+print([normalize_text(text) for text in (
+    'CAFÉ—Bar', 'x<y and y>z', 'weâ€™re cafÃ© â€œinâ€\x9d', '<p>x<y and y>z</p>&amp; R&D')])
+PYEOF
+)
+check "'CAFÉ—Bar' and 'x<y and y>z' unchanged; mojibake and real tags still cleaned" \
+    "['CAFÉ—Bar', 'x<y and y>z', 'we’re café “in”', 'x<y and y>z\\n& R&D']" "$RESULT"
+
+echo -e "\n🧹 text_normalizer.py backfill: keyset batches, one commit each"
+RESULT=$(python3 - "$TMP_DIR/jobs.db" "$TMP_DIR/resume_config.json" 2>/dev/null <<'PYEOF'
+import sqlite3, sys
+sys.path.insert(0, 'scrapers')
+import rescoring
+import text_normalizer
+db, config = sys.argv[1:]
+text_normalizer.backfill(db, config)  # text stored before normalization existed
+conn = sqlite3.connect(db, isolation_level=None)
+first, last = conn.execute(
+    "SELECT MIN(id), MAX(id) FROM scraped_jobs WHERE canonical_job_id IS NULL").fetchone()
+for job_id in (first, last):
+    conn.execute("UPDATE scraped_jobs SET job_title = '<b>QA&amp;Data</b>  Engineer' WHERE id = ?", (job_id,))
+title = lambda job_id: conn.execute("SELECT job_title FROM scraped_jobs WHERE id = ?", (job_id,)).fetchone()[0]
+
+# Interrupted in the last batch: the first batch stays committed
+write_scores = rescoring.write_scores
+def interrupt(conn, store, row, *args):
+    if row[0] == last:
+        raise KeyboardInterrupt
+    return write_scores(conn, store, row, *args)
+rescoring.write_scores = interrupt
+try:
+    text_normalizer.backfill(db, config, batch_size=2)
+except KeyboardInterrupt:
+    pass
+interrupted = (title(first), title(last))
+rescoring.write_scores = write_scores
+print(interrupted, text_normalizer.backfill(db, config, batch_size=2), title(last),
+      text_normalizer.backfill(db, config, batch_size=2))
+PYEOF
+)
+check "First batch kept after an interrupt; rerun finishes the rest; a third run changes nothing" \
+    "('QA&Data Engineer', '<b>QA&amp;Data</b>  Engineer') 1 QA&Data Engineer 0" "$RESULT"
+
+echo -e "\n📐 Semantic scorer and job vectorizer share one IDF snapshot"
+RESULT=$(python3 - "$TMP_DIR/jobs.db" "$TMP_DIR/resume_config.json" 2>/dev/null <<'PYEOF'
+import sqlite3, sys
+sys.path.insert(0, 'scrapers')
+from semantic_score import SemanticScorer
+from vector_index import JobVectorizer
+conn = sqlite3.connect(sys.argv[1])
+scorer, vectorizer = SemanticScorer(sys.argv[2]), JobVectorizer()
+scorer.refresh(conn)
+vectorizer.refresh(conn)
+print(scorer.documents > 0, (scorer.documents, scorer.doc_freq) == (vectorizer.documents, vectorizer.doc_freq),
+      bool(scorer._resume_vector))
+PYEOF
+)
+check "Scorer and vectorizer load the same document frequencies" "True True True" "$RESULT"
+
+echo -e "\n📄 Job detail: full description and duplicate ids"
+RESULT=$(python3 - "$TEST_API" "$TEST_ROOT/data/jobs-tracker.db" 2>/dev/null <<'PYEOF'
+import json, sqlite3, sys, urllib.error, urllib.request
+sys.path.insert(0, 'scrapers')
+from description_store import DescriptionStore
+api, db = sys.argv[1:]
+def get(path):
+    try:
+        with urllib.request.urlopen(api + path) as response:
+            return response.status, json.load(response)
+    except urllib.error.HTTPError as e:
+        return e.code, json.load(e)
+conn = sqlite3.connect(db)
+job_id = conn.execute("""
+    SELECT COALESCE(MIN(canonical_job_id), (SELECT MIN(id) FROM scraped_jobs)) FROM scraped_jobs
+""").fetchone()[0]
+duplicates = [r[0] for r in conn.execute(
+    "SELECT id FROM scraped_jobs WHERE canonical_job_id = ? ORDER BY id", (job_id,))]
+status, body = get(f'/api/scraped-jobs/{job_id}')
+job = body['job']
+print(status, job['id'] == job_id, job['description'] == DescriptionStore(conn).load(job_id),
+      job['duplicate_ids'] == duplicates, get('/api/scraped-jobs/999999999')[0])
+PYEOF
+)
+check "/api/scraped-jobs/<id> returns the full description and reposts; unknown id 404" "200 True True True 404" "$RESULT"
+
+echo -e "\n🧲 Similar jobs from the vector index"
+python3 scrapers/vector_index.py build --db "$TEST_ROOT/data/jobs-tracker.db" > /dev/null 2>&1
+RESULT=$(python3 - "$TEST_API" "$TEST_ROOT/data/jobs-tracker.db" 2>/dev/null <<'PYEOF'
+import json, sqlite3, sys, urllib.error, urllib.request
+api, db = sys.argv[1:]
+def get(path):
+    try:
+        with urllib.request.urlopen(api + path) as response:
+            return response.status, json.load(response)
+    except urllib.error.HTTPError as e:
+        return e.code, json.load(e)
+job_id = sqlite3.connect(db).execute(
+    "SELECT MIN(id) FROM scraped_jobs WHERE canonical_job_id IS NULL").fetchone()[0]
+_, body = get(f'/api/scraped-jobs/{job_id}/similar?limit=3')
+similarity = [job['similarity'] for job in body['jobs']]
+print(body['indexed'], 0 < body['count'] <= 3, job_id not in [job['id'] for job in body['jobs']],
+      similarity == sorted(similarity, reverse=True),
+      get('/api/scraped-jobs/999999999/similar')[0], get(f'/api/scraped-jobs/{job_id}/similar?limit=x')[0])
+PYEOF
+)
+check "/similar lists up to limit other jobs by similarity; unknown id 404; bad limit 400" \
+    "True True True True 404 400" "$RESULT"
+
+echo -e "\n🧪 POST /api/what-if"
+RESULT=$(python3 - "$TEST_API" 2>/dev/null <<'PYEOF'
+import json, sys, urllib.error, urllib.request
+def post(body):
+    data = body if isinstance(body, bytes) else json.dumps(body).encode()
+    request = urllib.request.Request(sys.argv[1] + '/api/what-if', data=data,
+                                     headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, json.load(response)
+    except urllib.error.HTTPError as e:
+        return e.code, json.load(e)
+_, same = post({'top_n': 5})
+_, changed = post({'term_weights': {'skill': {'SQL': 30}}, 'top_n': 5})
+print(same['before'] == same['after'], same['reclassified'], len(same['top']) == min(5, same['job_count']),
+      [job['new_rank'] for job in changed['top']] == sorted(job['new_rank'] for job in changed['top']),
+      changed['before'] != changed['after'],
+      post(b'{not json')[0], post({'term_weights': {'colour': {'red': 1}}})[0])
+PYEOF
+)
+check "what-if: current weights change nothing; top_n ranks; bad JSON and unknown kinds 400" \
+    "True 0 True True True 400 400" "$RESULT"
+
+echo -e "\n🏅 top_pct: the top N% of each source and week"
+RESULT=$(python3 - "$TEST_API" 2>/dev/null <<'PYEOF'
+import json, sys, urllib.error, urllib.request
+def get(query):
+    try:
+        with urllib.request.urlopen(f'{sys.argv[1]}/api/scraped-jobs?limit=1000&{query}') as response:
+            return response.status, json.load(response)
+    except urllib.error.HTTPError as e:
+        return e.code, json.load(e)
+ids = lambda query: {job['id'] for job in get(query)[1]['jobs']}
+every, half, tenth = ids('min_score=0'), ids('top_pct=50'), ids('top_pct=10')
+print(bool(tenth), tenth <= half < every, get('top_pct=0')[0], get('top_pct=150')[0], get('top_pct=x')[0])
+PYEOF
+)
+check "top_pct narrows the min_score=0 listing as it shrinks; values outside (0, 100] 400" \
+    "True True 400 400 400" "$RESULT"
+
+echo -e "\n💰 min_salary / max_salary (INR per year)"
+RESULT=$(python3 - "$TEST_API" "$TEST_ROOT/data/jobs-tracker.db" 2>/dev/null <<'PYEOF'
+import json, sqlite3, sys, urllib.error, urllib.request
+api, db = sys.argv[1:]
+def get(query):
+    try:
+        with urllib.request.urlopen(f'{api}/api/scraped-jobs?min_score=0&limit=1000&{query}') as response:
+            return response.status, json.load(response)
+    except urllib.error.HTTPError as e:
+        return e.code, json.load(e)
+conn = sqlite3.connect(db)
+expected = lambda where, value: {r[0] for r in conn.execute(
+    f"SELECT id FROM scraped_jobs WHERE canonical_job_id IS NULL AND {where}", (value,))}
+_, low = get('min_salary=5000000')
+_, high = get('max_salary=3000000')
+_, profile = get('min_salary=profile')
+print({job['id'] for job in low['jobs']} == expected('salary_max_inr >= ?', 5000000) != set(),
+      {job['id'] for job in high['jobs']} == expected('salary_min_inr <= ?', 3000000) != set(),
+      profile['filters_applied']['min_salary'] == 1800000,
+      all(job['salary']['meets_profile_minimum'] for job in profile['jobs']),
+      get('min_salary=lots')[0], get('max_salary=1e6x')[0])
+PYEOF
+)
+check "Salary bounds match the stored INR ranges; min_salary=profile; non-numbers 400" \
+    "True True True True 400 400" "$RESULT"
+
+echo -e "\n🔁 rescore_all.py: an interrupted run resumes from its checkpoint"
+RESULT=$(python3 - "$TMP_DIR/jobs.db" "$TMP_DIR/resume_config.json" 2>/dev/null <<'PYEOF'
+import sqlite3, sys
+sys.path.insert(0, 'scrapers')
+from rescore_all import rescore_all
+db, config = sys.argv[1:]
+def interrupt(done, total, changed, started):
+    raise KeyboardInterrupt
+try:
+    rescore_all(db, config, workers=0, chunk_size=10, restart=True, progress=interrupt)
+except KeyboardInterrupt:
+    pass
+first_chunk = sqlite3.connect(db).execute(
+    "SELECT processed, last_job_id FROM rescore_checkpoints ORDER BY run_id DESC LIMIT 1").fetchone()
+resumed = rescore_all(db, config, workers=0, chunk_size=10, progress=None)
+full = rescore_all(db, config, workers=0, chunk_size=10, progress=None)
+print(first_chunk[0], resumed['resumed'], resumed['start_after_id'] == first_chunk[1],
+      first_chunk[0] + resumed['processed'] == full['processed'], full['resumed'])
+PYEOF
+)
+check "The first chunk is checkpointed; the rerun resumes after it and finishes the rest" \
+    "10 True True True False" "$RESULT"
+
+echo -e "\n📊 Dashboard aggregates: the triggers track COUNT(*); older databases are counted directly"
+cp "$TMP_DIR/migrated.db" "$TMP_DIR/stats.db"
+RESULT=$(python3 - "$TMP_DIR/stats.db" 2>/dev/null <<'PYEOF'
+import sqlite3, sys
+conn = sqlite3.connect(sys.argv[1], isolation_level=None)
+def scraped_stats_match():
+    counted = conn.execute("""
+        SELECT COALESCE(source, ''),
+               CASE WHEN match_score IS NULL THEN 'UNSCORED' WHEN match_score >= 85 THEN 'EXCELLENT'
+                    WHEN match_score >= 75 THEN 'HIGH_FIT' WHEN match_score >= 65 THEN 'MEDIUM_FIT'
+                    WHEN match_score >= 40 THEN 'LOW_FIT' ELSE 'NO_FIT' END,
+               COUNT(*), ROUND(COALESCE(SUM(match_score), 0), 6),
+               SUM(CASE WHEN imported_to_opportunities = 1 THEN 1 ELSE 0 END)
+        FROM scraped_jobs GROUP BY 1, 2""").fetchall()
+    stored = conn.execute("""
+        SELECT source, score_bucket, job_count, ROUND(score_sum, 6), imported_count
+        FROM scraped_job_stats WHERE job_count > 0""").fetchall()
+    return sorted(counted) == sorted(stored)
+def opportunity_stats_match():
+    counted = conn.execute("""
+        SELECT COALESCE(status, ''), CASE WHEN is_remote = 1 THEN 1 ELSE 0 END, COALESCE(priority, ''), COUNT(*)
+        FROM opportunities GROUP BY 1, 2, 3""").fetchall()
+    stored = conn.execute("""
+        SELECT status, is_remote, priority, opportunity_count
+        FROM opportunity_stats WHERE opportunity_count > 0""").fetchall()
+    return sorted(counted) == sorted(stored)
+matches = []
+conn.execute("""INSERT INTO scraped_jobs (external_id, source, job_title, company, job_url, match_score)
+                VALUES ('stats-check', 'StatsCheck', 'QA Engineer', 'Stats Co', 'https://example.com', 88)""")
+conn.execute("INSERT INTO opportunities (company, role, is_remote, priority) VALUES ('Stats Co', 'QA', 1, 'High')")
+matches.append(scraped_stats_match() and opportunity_stats_match())
+conn.execute("UPDATE scraped_jobs SET match_score = 50, imported_to_opportunities = 1 WHERE external_id = 'stats-check'")
+conn.execute("UPDATE scraped_jobs SET source = 'StatsCheck' WHERE id = (SELECT MIN(id) FROM scraped_jobs)")
+conn.execute("UPDATE opportunities SET status = 'Applied', is_remote = 0 WHERE company = 'Stats Co'")
+matches.append(scraped_stats_match() and opportunity_stats_match())
+conn.execute("DELETE FROM scraped_jobs WHERE source = 'StatsCheck'")
+conn.execute("DELETE FROM opportunities WHERE company = 'Stats Co'")
+matches.append(scraped_stats_match() and opportunity_stats_match())
+print(*matches)
+PYEOF
+)
+check "scraped_job_stats and opportunity_stats equal COUNT(*) after insert, update and delete" "True True True" "$RESULT"
+
+cp data/jobs-tracker.db "$TMP_DIR/unmigrated.db"
+RESULT=$(python3 - "$TMP_DIR/unmigrated.db" 2>/dev/null <<'PYEOF'
+import contextlib, importlib.util, io, json, sqlite3, sys, threading, urllib.request
+spec = importlib.util.spec_from_file_location('api_server', 'api-server.py')
+api = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(api)
+api.DB_PATH = sys.argv[1]
+with contextlib.redirect_stdout(io.StringIO()):
+    server = api.ReusableTCPServer(('127.0.0.1', 0), api.APIHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    get = lambda path: json.load(urllib.request.urlopen(f'http://127.0.0.1:{server.server_address[1]}{path}'))
+    metrics, stats = get('/api/metrics'), get('/api/scraped-jobs/stats')
+conn = sqlite3.connect(sys.argv[1])
+active = conn.execute("""SELECT COUNT(*) FROM opportunities
+                         WHERE status NOT IN ('Rejected', 'Declined', 'Ghosted', 'Accepted')""").fetchone()[0]
+total = conn.execute("SELECT COUNT(*) FROM scraped_jobs").fetchone()[0]
+print(metrics.get('active_count') == active, stats.get('stats', {}).get('total_jobs') == total,
+      sum(source['count'] for source in stats.get('sources', [])) == total)
+PYEOF
+)
+check "/api/metrics and /api/scraped-jobs/stats count directly without migration 006" "True True True" "$RESULT"
+echo ""
 echo "========================================================================"
 echo "✅ ALL TESTS COMPLETED"
 echo "========================================================================"
+echo "Passed: $PASS_COUNT"
+echo "Failed: $FAIL_COUNT"
 echo ""
 echo "📚 AVAILABLE QUERY PARAMETERS:"
 echo "   • min_score    - Minimum match score (default: 70)"
 echo "   • limit        - Maximum number of results (default: 50)"
 echo "   • classification - Filter by classification (EXCELLENT, HIGH_FIT, MEDIUM_FIT, LOW_FIT, NO_FIT)"
 echo "   • source       - Filter by source (RemoteOK, LinkedIn, etc.)"
+echo "   • company      - Filter by company name"
+echo "   • tag          - Filter by tags, any of a comma-separated list (python,sql)"
 echo ""
 echo "📖 EXAMPLE QUERIES:"
 echo "   # Get all high-scoring jobs"
@@ -94,6 +869,11 @@ echo ""
 echo "   # Get top 10 jobs from any source"
 echo "   curl \"$API_URL/api/scraped-jobs?limit=10\""
 echo ""
+echo "   # Count jobs per tag, classification, source and company"
+echo "   curl \"$API_URL/api/scraped-jobs/facets?min_score=50\""
+echo ""
 echo "   # Get statistics"
 echo "   curl \"$API_URL/api/scraped-jobs/stats\""
 echo ""
+
+[ "$FAIL_COUNT" -eq 0 ]
@@ -119,6 +119,157 @@ else
   ((FAILED++))
 fi
 
+# Test 11: sql_checker compares column counts of empty results
+echo -n "11. Checking sql_checker grades an empty result with the wrong columns... "
+STATUS=$(python3 -c "
+import sql_checker
+print(sql_checker.check_answer('SELECT 1 AS a WHERE 0', 'SELECT 1 AS a, 2 AS b WHERE 0', 'Hospital')['status'])
+")
+if [ "$STATUS" = "incorrect" ]; then
+  echo -e "${GREEN}✓ PASS${NC}"
+  ((PASSED++))
+else
+  echo -e "${RED}✗ FAIL (got $STATUS)${NC}"
+  ((FAILED++))
+fi
+
+# Tests 12-14 write to a throwaway copy of the database. The committed
+# database predates migrations 006+, so the copy gets them applied first.
+MIGRATED_DB=$(mktemp --suffix=.db)
+cp data/jobs-tracker.db "$MIGRATED_DB"
+for migration in migrations/0*.sql; do
+  case "$(basename "$migration")" in 00[2-5]_*) continue ;; esac
+  sqlite3 "$MIGRATED_DB" < "$migration" > /dev/null 2>&1
+done
+TMP_DB=$(mktemp --suffix=.db)
+cp "$MIGRATED_DB" "$TMP_DB"
+
+# Test 12: Logging the same session twice reports the duplicate instead of raising
+echo -n "12. Checking a re-logged session is reported as a duplicate... "
+RESULT=$(python3 - "$TMP_DB" 2>&1 <<'PYEOF' | tail -1
+import importlib.util, sys
+spec = importlib.util.spec_from_file_location('log_sql_practice', 'log-sql-practice.py')
+module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(module)
+logger = module.SessionLogger(sys.argv[1])
+session = module.PracticeSession(question_text='Duplicate check', my_query='SELECT 1',
+                                 platform='sql-practice.com', difficulty='Easy', database_used='None')
+first, second = logger.save(session), logger.save(session)
+print('ok' if first and second is None else f'got {first}, {second}')
+PYEOF
+)
+if [ "$RESULT" = "ok" ]; then
+  echo -e "${GREEN}✓ PASS${NC}"
+  ((PASSED++))
+else
+  echo -e "${RED}✗ FAIL ($RESULT)${NC}"
+  ((FAILED++))
+fi
+
+# Test 13: Interactive logging works before migration 009 (no content_hash column)
+echo -n "13. Checking sessions save without the content_hash column... "
+sqlite3 "$TMP_DB" "DROP INDEX IF EXISTS idx_practice_content_hash; ALTER TABLE sql_practice_sessions DROP COLUMN content_hash;"
+RESULT=$(python3 - "$TMP_DB" 2>&1 <<'PYEOF' | tail -1
+import importlib.util, sys
+spec = importlib.util.spec_from_file_location('log_sql_practice', 'log-sql-practice.py')
+module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(module)
+session = module.PracticeSession(question_text='Pre-migration check', my_query='SELECT 2',
+                                 platform='sql-practice.com', difficulty='Easy', database_used='None')
+print('ok' if module.SessionLogger(sys.argv[1]).save(session) else 'not saved')
+PYEOF
+)
+if [ "$RESULT" = "ok" ]; then
+  echo -e "${GREEN}✓ PASS${NC}"
+  ((PASSED++))
+else
+  echo -e "${RED}✗ FAIL ($RESULT)${NC}"
+  ((FAILED++))
+fi
+
+# Test 14: Importing the same file twice skips every session the second time
+echo -n "14. Checking bulk import skips already imported sessions... "
+cp "$MIGRATED_DB" "$TMP_DB"
+TMP_IMPORT=$(mktemp --suffix=.jsonl)
+for i in 1 2 3; do
+  echo "{\"question_text\": \"Import check $i\", \"my_query\": \"SELECT $i\", \"platform\": \"sql-practice.com\", \"difficulty\": \"Easy\", \"database_used\": \"None\"}" >> "$TMP_IMPORT"
+done
+FIRST=$(python3 log-sql-practice.py --db "$TMP_DB" --import "$TMP_IMPORT" --chunk-size 2)
+SECOND=$(python3 log-sql-practice.py --db "$TMP_DB" --import "$TMP_IMPORT")
+if [[ "$FIRST" == *"Imported 3 sessions (0 duplicates"* ]] && [[ "$SECOND" == *"Imported 0 sessions (3 duplicates"* ]]; then
+  echo -e "${GREEN}✓ PASS${NC}"
+  ((PASSED++))
+else
+  echo -e "${RED}✗ FAIL ($FIRST / $SECOND)${NC}"
+  ((FAILED++))
+fi
+
+# Test 15: Without migration 007 a session still saves, and the learning
+# endpoints read the views
+echo -n "15. Checking logging and learning endpoints on a database without the analytics tables... "
+cp data/jobs-tracker.db "$TMP_DB"
+RESULT=$(python3 - "$TMP_DB" 2>&1 <<'PYEOF' | tail -1
+import contextlib, importlib.util, io, json, sys, threading, urllib.request
+def load(name, path):
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+log, api = load('log_sql_practice', 'log-sql-practice.py'), load('api_server', 'api-server.py')
+session = log.PracticeSession(question_text='Pre-007 check', my_query='SELECT 3',
+                              platform='sql-practice.com', difficulty='Easy', database_used='None')
+output = io.StringIO()
+with contextlib.redirect_stdout(output):
+    saved = log.SessionLogger(sys.argv[1]).save(session)
+    api.DB_PATH = sys.argv[1]
+    server = api.ReusableTCPServer(('127.0.0.1', 0), api.APIHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    answers = []
+    for path in ('learning-gaps', 'study-priority', 'sql-keyword-mastery', 'weekly-summary', 'common-mistakes'):
+        with urllib.request.urlopen(f'http://127.0.0.1:{server.server_address[1]}/api/{path}') as response:
+            answers.append(json.load(response))
+print('ok' if saved and '007_materialize_practice_analytics.sql' in output.getvalue()
+      and all(isinstance(answer, list) for answer in answers) and answers[2]
+      else f'saved={saved} answers={answers}')
+PYEOF
+)
+if [ "$RESULT" = "ok" ]; then
+  echo -e "${GREEN}✓ PASS${NC}"
+  ((PASSED++))
+else
+  echo -e "${RED}✗ FAIL ($RESULT)${NC}"
+  ((FAILED++))
+fi
+
+# Test 16: With 007 but not 008 (no session_keywords) a session still saves
+echo -n "16. Checking logging on a database without session_keywords... "
+cp data/jobs-tracker.db "$TMP_DB"
+sqlite3 "$TMP_DB" < migrations/007_materialize_practice_analytics.sql > /dev/null 2>&1
+RESULT=$(python3 - "$TMP_DB" 2>&1 <<'PYEOF' | tail -1
+import contextlib, importlib.util, io, sqlite3, sys
+spec = importlib.util.spec_from_file_location('log_sql_practice', 'log-sql-practice.py')
+module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(module)
+session = module.PracticeSession(question_text='Pre-008 check', my_query='SELECT 4',
+                                 platform='sql-practice.com', difficulty='Easy', database_used='None')
+output = io.StringIO()
+with contextlib.redirect_stdout(output):
+    saved = module.SessionLogger(sys.argv[1]).save(session)
+stored = sqlite3.connect(sys.argv[1]).execute(
+    "SELECT COUNT(*) FROM sql_practice_sessions WHERE question_text = 'Pre-008 check'").fetchone()[0]
+print('ok' if saved and stored == 1 and '008_add_session_keywords.sql' in output.getvalue()
+      and '007_' not in output.getvalue() else f'saved={saved} stored={stored} output={output.getvalue()!r}')
+PYEOF
+)
+if [ "$RESULT" = "ok" ]; then
+  echo -e "${GREEN}✓ PASS${NC}"
+  ((PASSED++))
+else
+  echo -e "${RED}✗ FAIL ($RESULT)${NC}"
+  ((FAILED++))
+fi
+rm -f "$MIGRATED_DB" "$TMP_DB" "$TMP_IMPORT"
+
 # Summary
 echo ""
 echo "=========================================="